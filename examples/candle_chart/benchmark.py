@@ -0,0 +1,127 @@
+"""
+Latency of loading, panning and zooming ChartWidget with large history,
+rendered with offscreen Qt platform.
+
+    python benchmark.py [bar count]
+"""
+
+import math
+import os
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from vnpy.trader.ui import create_qapp, QtCore, QtGui  # noqa: E402
+from vnpy.trader.object import BarData  # noqa: E402
+from vnpy.trader.constant import Exchange, Interval  # noqa: E402
+from vnpy.chart import ChartWidget, CandleItem, VolumeItem  # noqa: E402
+
+
+def create_bars(count: int) -> list:
+    """Random walk 1-minute bars"""
+    rng = np.random.default_rng(0)
+
+    close = 4000 + np.cumsum(rng.normal(0, 2, count))
+    open_ = close + rng.normal(0, 1, count)
+    high = np.maximum(open_, close) + rng.exponential(1, count)
+    low = np.minimum(open_, close) - rng.exponential(1, count)
+    volume = rng.integers(1, 1000, count)
+
+    start = datetime(2010, 1, 1)
+    bars = []
+
+    for i, (o, h, l, c, v) in enumerate(zip(
+        open_.tolist(), high.tolist(), low.tolist(), close.tolist(), volume.tolist()
+    )):
+        bar = BarData(
+            symbol="IF888",
+            exchange=Exchange.CFFEX,
+            datetime=start + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=v,
+            open_price=o,
+            high_price=h,
+            low_price=l,
+            close_price=c,
+            gateway_name="DB"
+        )
+        bars.append(bar)
+
+    return bars
+
+
+def render(widget: ChartWidget, image: QtGui.QImage) -> None:
+    """"""
+    painter = QtGui.QPainter(image)
+    widget.render(painter)
+    painter.end()
+
+
+def press(widget: ChartWidget, key: int, image: QtGui.QImage) -> None:
+    """Press key to move or zoom chart, and then render it"""
+    event = QtGui.QKeyEvent(QtCore.QEvent.KeyPress, key, QtCore.Qt.NoModifier)
+    widget.keyPressEvent(event)
+    render(widget, image)
+
+
+def measure(func, repeat: int) -> float:
+    """Return average latency in millisecond"""
+    start = perf_counter()
+    for _ in range(repeat):
+        func()
+    return (perf_counter() - start) / repeat * 1000
+
+
+def main():
+    """"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    app = create_qapp()     # noqa: F841
+
+    widget = ChartWidget()
+    widget.add_plot("candle", hide_x_axis=True)
+    widget.add_plot("volume", maximum_height=200)
+    widget.add_item(CandleItem, "candle", "candle")
+    widget.add_item(VolumeItem, "volume", "volume")
+    widget.add_cursor()
+    widget.resize(1400, 800)
+    widget.show()
+
+    image = QtGui.QImage(1400, 800, QtGui.QImage.Format_ARGB32)
+
+    bars = create_bars(count)
+    print(f"Bar count: {count}")
+
+    start = perf_counter()
+    widget.update_history(bars)
+    render(widget, image)
+    print(f"Load history:        {(perf_counter() - start) * 1000:>10.1f} ms")
+
+    def pan():
+        press(widget, QtCore.Qt.Key_Left, image)
+
+    def zoom_out():
+        press(widget, QtCore.Qt.Key_Down, image)
+
+    def zoom_in():
+        press(widget, QtCore.Qt.Key_Up, image)
+
+    print(f"Pan:                 {measure(pan, 10):>10.1f} ms")
+
+    # Zoom out until all bars visible
+    zoom_count = math.ceil(math.log(count / ChartWidget.MIN_BAR_COUNT, 1.2))
+    print(f"Zoom out:            {measure(zoom_out, zoom_count):>10.1f} ms")
+    print(f"Render all bars:     {measure(lambda: render(widget, image), 10):>10.1f} ms")
+    print(f"Zoom in:             {measure(zoom_in, 10):>10.1f} ms")
+    print(f"Pan:                 {measure(pan, 10):>10.1f} ms")
+
+    bar = bars[-1]
+    print(f"Update last bar:     {measure(lambda: widget.update_bar(bar), 10):>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Per call latency of option pricing functions with python and cython
+backend, and per option latency of array functions.
+
+Build cython backend first with (on Linux):
+
+    python setup.py build_ext --inplace
+"""
+
+from timeit import repeat
+
+import numpy as np
+
+from vnpy.app.option_master.pricing import (
+    MODEL_NAMES, BACKEND_CYTHON, BACKEND_PYTHON, load_model
+)
+
+
+COUNT = 200
+REPEAT = 5
+
+
+def create_inputs():
+    """"""
+    rng = np.random.default_rng(0)
+
+    s = 3000.0
+    k = rng.uniform(2700, 3300, COUNT)
+    r = 0.03
+    t = rng.uniform(0.05, 1, COUNT)
+    v = rng.uniform(0.1, 0.5, COUNT)
+    cp = rng.choice([1, -1], COUNT)
+
+    return s, k, r, t, v, cp
+
+
+def measure(func) -> float:
+    """Return best latency of calculating all options in microsecond"""
+    return min(repeat(func, number=1, repeat=REPEAT)) / COUNT * 1_000_000
+
+
+def run_model(name: str, backend: str) -> None:
+    """"""
+    try:
+        model = load_model(name, backend)
+    except ImportError:
+        print(f"{name:<15}{backend:<10}not built")
+        return
+
+    s, k, r, t, v, cp = create_inputs()
+    prices = model.calculate_price_array(s, k, r, t, v, cp)
+
+    args = [
+        (s, float(k[i]), r, float(t[i]), float(v[i]), int(cp[i]), float(prices[i]))
+        for i in range(COUNT)
+    ]
+
+    def calculate_greeks():
+        for s_, k_, r_, t_, v_, cp_, _ in args:
+            model.calculate_greeks(s_, k_, r_, t_, v_, cp_)
+
+    def calculate_impv():
+        for s_, k_, r_, t_, _, cp_, price in args:
+            # Scalar newton solver of binomial tree may diverge
+            try:
+                model.calculate_impv(price, s_, k_, r_, t_, cp_)
+            except OverflowError:
+                pass
+
+    greeks_latency = measure(calculate_greeks)
+    impv_latency = measure(calculate_impv)
+
+    print(f"{name:<15}{backend:<10}{greeks_latency:>12.2f}{impv_latency:>12.2f}")
+
+
+def run_array(name: str) -> None:
+    """"""
+    model = load_model(name, BACKEND_PYTHON)
+
+    s, k, r, t, v, cp = create_inputs()
+    prices = model.calculate_price_array(s, k, r, t, v, cp)
+
+    greeks_latency = measure(lambda: model.calculate_greeks_array(s, k, r, t, v, cp))
+    impv_latency = measure(lambda: model.calculate_impv_array(prices, s, k, r, t, cp))
+
+    print(f"{name:<15}{'array':<10}{greeks_latency:>12.2f}{impv_latency:>12.2f}")
+
+
+def main():
+    """"""
+    print(f"Latency per option (us) of {COUNT} options")
+    print(f"{'model':<15}{'backend':<10}{'greeks':>12}{'impv':>12}")
+
+    for name in MODEL_NAMES:
+        for backend in [BACKEND_PYTHON, BACKEND_CYTHON]:
+            run_model(name, backend)
+        run_array(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ import re
 import sys
 
 from setuptools import Extension, find_packages, setup
+from setuptools.command.build_ext import build_ext
 
 
 def gather_autocxxpy_generated_files(root: str):
@@ -56,11 +57,71 @@ def is_psycopg2_exists():
         return False
 
 
+def get_option_pricing_modules():
+    """
+    Cython version of option pricing models, which is optional and only
+    built when Cython is installed.
+    """
+    try:
+        import numpy
+        import Cython  # noqa
+    except ImportError:
+        return []
+
+    root = "vnpy/app/option_master/pricing"
+    modules = []
+
+    for name in ["black_76", "black_scholes", "binomial_tree"]:
+        module = Extension(
+            f"vnpy.app.option_master.pricing.{name}_cython",
+            [f"{root}/cython_model/{name}_cython/{name}_cython.pyx"],
+            include_dirs=[numpy.get_include()],
+            optional=True
+        )
+        modules.append(module)
+
+    return modules
+
+
+class CythonBuildExt(build_ext):
+    """
+    Cythonize .pyx sources only when extensions are really built, and keep
+    generated .c files in build directory instead of source tree.
+    """
+
+    def run(self):
+        from Cython.Build import cythonize
+
+        extensions = []
+        for ext in self.extensions:
+            if not any(source.endswith(".pyx") for source in ext.sources):
+                extensions.append(ext)
+                continue
+
+            # Pure python models are used if cython models failed to compile
+            try:
+                cython_ext = cythonize(
+                    ext,
+                    language_level=3,
+                    quiet=True,
+                    build_dir=self.build_temp
+                )[0]
+            except Exception:
+                continue
+
+            ext.sources = cython_ext.sources
+            extensions.append(ext)
+
+        self.extensions = extensions
+        super().run()
+
+
 def get_install_requires():
     install_requires = [
         "PyQt5",
         "qdarkstyle",
         "requests",
+        "aiohttp",
         "websocket-client",
         "peewee",
         "pymysql",
@@ -76,6 +137,7 @@ def get_install_requires():
         "ibapi",
         "deap",
         "pyzmq",
+        "msgpack",
         "QScintilla"
     ]
     if not is_psycopg2_exists():
@@ -277,18 +339,25 @@ def get_ext_modules():
         depends=[],
         language="cpp",
     )
+
+    if platform.system() in ["Linux", "Darwin"]:
+        option_pricing_modules = get_option_pricing_modules()
+    else:
+        option_pricing_modules = []
+
     if platform.system() == "Windows":
         # use pre-built pyd for windows ( support python 3.7 only )
         ext_modules = []
     elif platform.system() == "Darwin":
-        ext_modules = []
+        ext_modules = [*option_pricing_modules]
     else:
         ext_modules = [
             vnctptd, vnctpmd,
             vnxtptd, vnxtpmd,
             vnsgittd, vnsgitmd,
             vnksgoldmd, vnksgoldtd,
-            vnoes
+            vnoes,
+            *option_pricing_modules
         ]
 
     ext_modules = check_extension_build_flag(
@@ -310,6 +379,10 @@ def get_ext_modules():
     ext_modules = check_extension_build_flag(
         ext_modules, "VNPY_BUILD_ksgold", vnksgoldtd)
 
+    for module in option_pricing_modules:
+        ext_modules = check_extension_build_flag(
+            ext_modules, "VNPY_BUILD_OPTION_PRICING", module)
+
     return ext_modules
 
 
@@ -360,4 +433,5 @@ setup(
         "Natural Language :: Chinese (Simplified)"
     ],
     ext_modules=get_ext_modules(),
+    cmdclass={"build_ext": CythonBuildExt},
 )
@@ -1 +1 @@
-from .rest_client import Request, RequestStatus, RestClient
+from .rest_client import Request, RequestStatus, RestClient, PRIORITY_HIGH, PRIORITY_LOW
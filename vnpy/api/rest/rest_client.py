@@ -1,21 +1,38 @@
 import sys
 import os
 import time
+import json
+import asyncio
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
+from itertools import count
 from multiprocessing.dummy import Pool
-from queue import Empty, Queue
-from typing import Any, Callable, Optional, Union, Type
+from queue import Empty, PriorityQueue
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, Type
 from types import TracebackType
 
 import requests
+from requests.structures import CaseInsensitiveDict
+
+from vnpy.event.metrics import LatencyHistogram
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 
 CALLBACK_TYPE = Callable[[dict, "Request"], Any]
 ON_FAILED_TYPE = Callable[[int, "Request"], Any]
 ON_ERROR_TYPE = Callable[[Type, Exception, TracebackType, "Request"], Any]
 
+# Requests of smaller priority value are sent first
+PRIORITY_HIGH = 0       # Default of POST/PUT/DELETE, e.g. sending and cancelling orders
+PRIORITY_LOW = 1        # Default of GET, e.g. queries and history downloading
+
 
 class RequestStatus(Enum):
     """"""
@@ -42,6 +59,8 @@ class Request(object):
         on_failed: ON_FAILED_TYPE = None,
         on_error: ON_ERROR_TYPE = None,
         extra: Any = None,
+        priority: int = None,
+        weight: float = 1,
     ):
         """"""
         self.method: str = method
@@ -55,7 +74,17 @@ class Request(object):
         self.on_error: ON_ERROR_TYPE = on_error
         self.extra: Any = extra
 
-        self.response: requests.Response = None
+        if priority is None:
+            if method.upper() == "GET":
+                priority = PRIORITY_LOW
+            else:
+                priority = PRIORITY_HIGH
+        self.priority: int = priority
+        self.weight: float = weight
+        self.time_added: int = 0
+        self.throttled: bool = False
+
+        self.response: Union[requests.Response, "Response"] = None
         self.status: RequestStatus = RequestStatus.ready
 
     def __str__(self):
@@ -84,6 +113,70 @@ class Request(object):
         )
 
 
+class Response(object):
+    """
+    Response of request sent in asyncio mode, providing the same
+    interface used from requests.Response.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        content: bytes,
+        headers: CaseInsensitiveDict,
+        url: str,
+        reason: str,
+        encoding: str
+    ):
+        """"""
+        self.status_code: int = status_code
+        self.content: bytes = content
+        self.headers: CaseInsensitiveDict = headers
+        self.url: str = url
+        self.reason: str = reason
+        self.encoding: str = encoding or "utf-8"
+
+    @property
+    def text(self) -> str:
+        """"""
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self) -> Any:
+        """"""
+        return json.loads(self.content)
+
+
+class TokenBucket(object):
+    """
+    Token bucket for limiting request rate.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Tokens are refilled at rate per second, up to capacity.
+        """
+        self.rate: float = rate
+        self.capacity: float = capacity
+        self.tokens: float = capacity
+        self.timestamp: float = time.monotonic()
+
+    def get_delay(self, weight: float, now: float) -> float:
+        """
+        Get seconds to wait before weight of tokens is available.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.timestamp) * self.rate)
+        self.timestamp = now
+
+        weight = min(weight, self.capacity)
+        if self.tokens >= weight:
+            return 0
+        return (weight - self.tokens) / self.rate
+
+    def consume(self, weight: float) -> None:
+        """"""
+        self.tokens -= min(weight, self.capacity)
+
+
 class RestClient(object):
     """
     HTTP Client designed for all sorts of trading RESTFul API.
@@ -91,6 +184,14 @@ class RestClient(object):
     * Reimplement on_failed function to handle Non-2xx responses.
     * Use on_failed parameter in add_request function for individual Non-2xx response handling.
     * Reimplement on_error function to handle exception msg.
+
+    Requests are sent in asyncio mode with a keep-alive connection pool
+    if aiohttp is installed, otherwise by threads with requests session.
+    In both modes:
+    * Callbacks are called in one of n worker threads, never in the asyncio loop.
+    * Requests of higher priority (orders and cancels by default) are sent first.
+    * Use set_rate_limit function to limit request rate of api paths.
+    * Use get_metrics function to get queuing and round trip latency.
     """
 
     def __init__(self):
@@ -98,9 +199,35 @@ class RestClient(object):
         self.url_base: str = ""
         self._active: bool = False
 
-        self._queue: Queue = Queue()
+        self._queue: PriorityQueue = PriorityQueue()
         self._pool: Pool = None
-
+        self._count: count = count()
+
+        # Number of requests added but not processed yet
+        self._unfinished: int = 0
+        self._condition: Condition = Condition()
+
+        # Asyncio mode related. Loop and queue of running thread are set
+        # only when it is ready to receive requests, otherwise requests
+        # are kept in pending list.
+        self.async_mode: bool = aiohttp is not None
+        self._loop: asyncio.AbstractEventLoop = None
+        self._thread: Thread = None
+        self._async_queue: asyncio.PriorityQueue = None
+        self._pending: List[Tuple[int, int, Request]] = []
+        self._loop_lock: Lock = Lock()
+
+        # Rate limit related, key is path prefix
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._bucket_lock: Lock = Lock()
+
+        # Latency metrics related, key is priority
+        self._wait_histograms: Dict[int, LatencyHistogram] = {}
+        self._latency_histograms: Dict[int, LatencyHistogram] = {}
+        self._throttled_count: int = 0
+        self._metrics_lock: Lock = Lock()
+
+        self.proxy: str = ""
         self.proxies: dict = None
 
     def init(
@@ -117,39 +244,64 @@ class RestClient(object):
 
         if proxy_host and proxy_port:
             proxy = f"http://{proxy_host}:{proxy_port}"
+            self.proxy = proxy
             self.proxies = {"http": proxy, "https": proxy}
 
     def start(self, n: int = 3) -> None:
         """
-        Start rest client with session count n.
+        Start rest client with session count n, which is also the
+        number of concurrent connections in asyncio mode.
         """
         if self._active:
             return
 
         self._active = True
-        self._pool = Pool(n)
 
-        try:
-            self._pool.apply_async(self._run)
+        if self.async_mode:
+            loop = asyncio.new_event_loop()
+            with self._loop_lock:
+                self._loop = loop
 
-            while True:
-                time.sleep(1)
-                print("RestClient is running...")
-        except KeyboardInterrupt:
-            print("================== RestClient start KeyboardInterrupt ==================")
-            os._exit(0)
+            self._thread = Thread(target=self._run_loop, args=(loop, n), daemon=True)
+            self._thread.start()
+        else:
+            self._pool = Pool(n)
+            for i in range(n):
+                self._pool.apply_async(self._run)
 
     def stop(self) -> None:
         """
-        Stop rest client immediately.
+        Stop rest client immediately. Requests not sent yet are kept
+        and sent after next start.
         """
         self._active = False
 
+        with self._loop_lock:
+            loop = self._loop
+            self._loop = None
+            self._async_queue = None
+
+        if loop:
+            loop.call_soon_threadsafe(loop.stop)
+
     def join(self) -> None:
         """
         Wait till all requests are processed.
         """
-        self._queue.join()
+        with self._condition:
+            while self._unfinished:
+                self._condition.wait()
+
+    def set_rate_limit(self, path: str, rate: float, capacity: float = 0) -> None:
+        """
+        Limit rate of requests whose path starts with path, e.g.
+        set_rate_limit("", 20, 1200) for 1200 weight per minute
+        of all requests. Capacity is the max burst, rate by default.
+
+        Each request consumes its weight from every matched limit.
+        """
+        with self._bucket_lock:
+            self._buckets[path] = TokenBucket(rate, capacity or rate)
 
     def add_request(
         self,
@@ -162,6 +314,8 @@ class RestClient(object):
         on_failed: ON_FAILED_TYPE = None,
         on_error: ON_ERROR_TYPE = None,
         extra: Any = None,
+        priority: int = None,
+        weight: float = 1,
     ) -> Request:
         """
         Add a new request.
@@ -174,6 +328,8 @@ class RestClient(object):
         :param on_failed: callback function if Non-2xx status, type, type: (code, dict, Request)
         :param on_error: callback function when catching Python exception, type: (etype, evalue, tb, Request)
         :param extra: Any extra data which can be used when handling callback
+        :param priority: PRIORITY_HIGH or PRIORITY_LOW, decided by method if None
+        :param weight: tokens consumed from rate limits
         :return: Request
         """
         request = Request(
@@ -186,23 +342,119 @@ class RestClient(object):
             on_failed,
             on_error,
             extra,
+            priority,
+            weight,
         )
-        self._queue.put(request)
+        request.time_added = time.perf_counter_ns()
+
+        with self._condition:
+            self._unfinished += 1
+
+        item = (request.priority, next(self._count), request)
+
+        if not self.async_mode:
+            self._queue.put(item)
+        else:
+            self._put_async_item(item)
+
         return request
 
+    def _finish_request(self, request: Request) -> None:
+        """"""
+        latency = time.perf_counter_ns() - request.time_added
+
+        with self._metrics_lock:
+            histogram = self._latency_histograms.get(request.priority, None)
+            if not histogram:
+                histogram = LatencyHistogram()
+                self._latency_histograms[request.priority] = histogram
+            histogram.record(latency)
+
+        with self._condition:
+            self._unfinished -= 1
+            if not self._unfinished:
+                self._condition.notify_all()
+
+    def _record_wait(self, request: Request) -> None:
+        """
+        Record time from added to sent.
+        """
+        wait = time.perf_counter_ns() - request.time_added
+
+        with self._metrics_lock:
+            histogram = self._wait_histograms.get(request.priority, None)
+            if not histogram:
+                histogram = LatencyHistogram()
+                self._wait_histograms[request.priority] = histogram
+            histogram.record(wait)
+
+    def get_metrics(self) -> dict:
+        """
+        Get request count and latency statistics in microseconds of
+        each priority. Wait is time from added to sent, and latency is
+        time from added to processed.
+        """
+        with self._metrics_lock:
+            metrics = {
+                "unfinished": self._unfinished,
+                "throttled": self._throttled_count,     # Requests delayed by rate limit
+            }
+
+            for priority, histogram in self._latency_histograms.items():
+                metrics[f"latency_{priority}"] = histogram.get_summary()
+
+            for priority, histogram in self._wait_histograms.items():
+                metrics[f"wait_{priority}"] = histogram.get_summary()
+
+        return metrics
+
+    def _get_delay(self, request: Request) -> float:
+        """
+        Consume tokens and return 0 if request can be sent now,
+        otherwise return seconds to wait.
+        """
+        if not self._buckets:
+            return 0
+
+        now = time.monotonic()
+
+        with self._bucket_lock:
+            buckets = [
+                bucket for path, bucket in self._buckets.items()
+                if request.path.startswith(path)
+            ]
+
+            delay = 0
+            for bucket in buckets:
+                delay = max(delay, bucket.get_delay(request.weight, now))
+
+            if not delay:
+                for bucket in buckets:
+                    bucket.consume(request.weight)
+
+        if delay and not request.throttled:
+            request.throttled = True
+            self._throttled_count += 1
+        return delay
+
     def _run(self) -> None:
         """"""
         try:
             session = requests.session()
             while self._active:
                 try:
-                    request = self._queue.get(timeout=1)
+                    _, _, request = self._queue.get(timeout=1)
+
+                    delay = self._get_delay(request)
+                    while delay:
+                        time.sleep(delay)
+                        delay = self._get_delay(request)
+
                     try:
+                        self._record_wait(request)
                         self._process_request(request, session)
                     finally:
-                        self._queue.task_done()
-
-                    # time.sleep(0.1)
+                        self._finish_request(request)
                 except Empty:
                     pass
         except KeyboardInterrupt:
@@ -212,6 +464,165 @@ class RestClient(object):
             et, ev, tb = sys.exc_info()
             self.on_error(et, ev, tb, None)
 
+    def _put_async_item(self, item: Tuple[int, int, Request]) -> None:
+        """
+        Put request into queue of running loop, or pending list if no
+        loop is ready.
+        """
+        with self._loop_lock:
+            if self._async_queue:
+                self._loop.call_soon_threadsafe(self._async_queue.put_nowait, item)
+            else:
+                self._pending.append(item)
+
+    def _run_loop(self, loop: asyncio.AbstractEventLoop, n: int) -> None:
+        """
+        Run asyncio event loop in client thread.
+        """
+        asyncio.set_event_loop(loop)
+
+        # Callbacks may block, so they are run by executor threads
+        # the same as in thread mode.
+        executor = ThreadPoolExecutor(n, thread_name_prefix="RestClient")
+        loop.set_default_executor(executor)
+
+        queue = asyncio.PriorityQueue()
+        delayed = set()
+
+        with self._loop_lock:
+            for item in self._pending:
+                queue.put_nowait(item)
+            self._pending.clear()
+
+            # Not ready to receive if stopped before thread started
+            if self._loop is loop:
+                self._async_queue = queue
+
+        task = loop.create_task(self._dispatch(queue, delayed, n))
+
+        try:
+            loop.run_forever()
+        finally:
+            task.cancel()
+            loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+
+            with self._loop_lock:
+                if self._loop is loop:
+                    self._loop = None
+                    self._async_queue = None
+
+            # Requests not sent yet are moved to next loop
+            items = list(delayed)
+            while not queue.empty():
+                items.append(queue.get_nowait())
+            for item in items:
+                self._put_async_item(item)
+
+            loop.close()
+            executor.shutdown(wait=False)
+
+    async def _dispatch(
+        self,
+        queue: asyncio.PriorityQueue,
+        delayed: set,
+        n: int
+    ) -> None:
+        """
+        Send requests in order of priority, with at most n of them
+        being sent at the same time.
+        """
+        loop = asyncio.get_event_loop()
+        semaphore = asyncio.Semaphore(n)
+        connector = aiohttp.TCPConnector(limit=n)
+        tasks = set()
+
+        def put_delayed(item: Tuple[int, int, Request]) -> None:
+            delayed.discard(item)
+            queue.put_nowait(item)
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            try:
+                while self._active:
+                    await semaphore.acquire()
+                    item = await queue.get()
+                    request = item[2]
+
+                    # Put back into queue after delay, so that other
+                    # requests are not blocked by rate limit.
+                    delay = self._get_delay(request)
+                    if delay:
+                        semaphore.release()
+                        delayed.add(item)
+                        loop.call_later(delay, put_delayed, item)
+                        continue
+
+                    task = loop.create_task(
+                        self._process_request_async(request, session, semaphore)
+                    )
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _process_request_async(
+        self,
+        request: Request,
+        session: "aiohttp.ClientSession",
+        semaphore: asyncio.Semaphore
+    ) -> None:
+        """
+        Sending request to server and get result in asyncio mode, then
+        process result in executor thread.
+        """
+        loop = asyncio.get_event_loop()
+
+        try:
+            self._record_wait(request)
+
+            request = self.sign(request)
+            url = self.make_full_url(request.path)
+
+            # Same as requests, no content type is added for raw body
+            skip_auto_headers = None
+            if isinstance(request.data, (str, bytes)):
+                headers = request.headers or {}
+                if not any(k.lower() == "content-type" for k in headers):
+                    skip_auto_headers = ("Content-Type",)
+
+            async with session.request(
+                request.method,
+                url,
+                headers=request.headers,
+                params=convert_params(request.params),
+                data=request.data,
+                proxy=self.proxy or None,
+                skip_auto_headers=skip_auto_headers,
+            ) as resp:
+                content = await resp.read()
+                response = Response(
+                    resp.status,
+                    content,
+                    CaseInsensitiveDict(resp.headers),
+                    str(resp.url),
+                    resp.reason,
+                    resp.charset
+                )
+
+            await loop.run_in_executor(
+                None, self._handle_response, request, response
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await loop.run_in_executor(
+                None, self._handle_error, request, *sys.exc_info()
+            )
+        finally:
+            semaphore.release()
+            self._finish_request(request)
+
     def sign(self, request: Request) -> None:
         """
         This function is called before sending any request out.
@@ -277,30 +688,54 @@ class RestClient(object):
                 data=request.data,
                 proxies=self.proxies,
             )
-            request.response = response
-            status_code = response.status_code
-            if status_code // 100 == 2:  # 2xx codes are all successful
-                if status_code == 204:
-                    json_body = None
-                else:
-                    json_body = response.json()
-
-                request.callback(json_body, request)
-                request.status = RequestStatus.success
-            else:
-                request.status = RequestStatus.failed
+            self._process_response(request, response)
+        except Exception:
+            self._handle_error(request, *sys.exc_info())
 
-                if request.on_failed:
-                    request.on_failed(status_code, request)
-                else:
-                    self.on_failed(status_code, request)
+    def _handle_response(self, request: Request, response: Response) -> None:
+        """"""
+        try:
+            self._process_response(request, response)
         except Exception:
-            request.status = RequestStatus.error
-            t, v, tb = sys.exc_info()
-            if request.on_error:
-                request.on_error(t, v, tb, request)
+            self._handle_error(request, *sys.exc_info())
+
+    def _handle_error(
+        self,
+        request: Request,
+        exception_type: type,
+        exception_value: Exception,
+        tb
+    ) -> None:
+        """"""
+        request.status = RequestStatus.error
+        if request.on_error:
+            request.on_error(exception_type, exception_value, tb, request)
+        else:
+            self.on_error(exception_type, exception_value, tb, request)
+
+    def _process_response(
+        self, request: Request, response: Union[requests.Response, Response]
+    ) -> None:
+        """
+        Call callback of request with response.
+        """
+        request.response = response
+        status_code = response.status_code
+        if status_code // 100 == 2:  # 2xx codes are all successful
+            if status_code == 204:
+                json_body = None
+            else:
+                json_body = response.json()
+
+            request.callback(json_body, request)
+            request.status = RequestStatus.success
+        else:
+            request.status = RequestStatus.failed
+
+            if request.on_failed:
+                request.on_failed(status_code, request)
             else:
-                self.on_error(t, v, tb, request)
+                self.on_failed(status_code, request)
 
     def make_full_url(self, path: str) -> str:
         """
@@ -347,3 +782,22 @@ class RestClient(object):
             proxies=self.proxies,
         )
         return response
+
+
+def convert_params(params: Optional[dict]) -> Optional[List[Tuple[str, str]]]:
+    """
+    Convert params into query string items in the same way of requests:
+    None values are dropped, and list values are repeated keys.
+    """
+    if not params:
+        return None
+
+    items = []
+    for key, value in params.items():
+        if value is None:
+            continue
+        elif isinstance(value, (list, tuple)):
+            items.extend((key, str(v)) for v in value if v is not None)
+        else:
+            items.append((key, str(value)))
+    return items
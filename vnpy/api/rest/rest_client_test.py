@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from vnpy.api.rest.rest_client import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    RequestStatus,
+    RestClient,
+    TokenBucket
+)
+
+# Local server is run with aiohttp, which is optional for RestClient
+web = pytest.importorskip("aiohttp.web")
+
+
+class LocalServer:
+    """
+    aiohttp server running in background thread.
+    """
+
+    def __init__(self):
+        self.paths = []
+        self.loop = asyncio.new_event_loop()
+        self.runner: web.AppRunner = None
+        self.port = 0
+
+        started = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(started,), daemon=True)
+        self.thread.start()
+        started.wait()
+
+    def run(self, started: threading.Event) -> None:
+        asyncio.set_event_loop(self.loop)
+
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", self.handle)
+
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+
+        started.set()
+        self.loop.run_forever()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.paths.append(request.path)
+
+        if request.path == "/fail":
+            return web.json_response({"error": "bad"}, status=400)
+
+        body = await request.text()
+        return web.json_response(
+            {
+                "method": request.method,
+                "path": request.path,
+                "query": dict(request.query),
+                "body": body,
+            },
+            headers={"X-RateLimit-Remaining": "99"}
+        )
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = LocalServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture(params=[True, False], ids=["async", "thread"])
+def client(request, server):
+    client = RestClient()
+    client.async_mode = request.param
+    client.init(f"http://127.0.0.1:{server.port}")
+    server.paths.clear()
+
+    yield client
+    client.stop()
+
+
+def test_token_bucket():
+    bucket = TokenBucket(10, 2)
+    now = bucket.timestamp
+
+    assert bucket.get_delay(1, now) == 0
+    bucket.consume(1)
+    assert bucket.get_delay(1, now) == 0
+    bucket.consume(1)
+
+    # Empty bucket refilled at 10 per second
+    assert bucket.get_delay(1, now) == pytest.approx(0.1)
+    assert bucket.get_delay(1, now + 0.05) == pytest.approx(0.05)
+    assert bucket.get_delay(1, now + 0.1) == 0
+
+    # Never refilled above capacity, and weight above capacity waits for full bucket
+    assert bucket.tokens == pytest.approx(1)
+    assert bucket.get_delay(5, now + 10) == 0
+    assert bucket.tokens == 2
+
+
+def test_request_callbacks(client):
+    results = {}
+    threads = set()
+
+    def callback(data, request):
+        results[request.path] = data
+        threads.add(threading.current_thread())
+
+    def on_failed(status_code, request):
+        results[request.path] = status_code
+        threads.add(threading.current_thread())
+
+    def on_error(exception_type, exception_value, tb, request):
+        results[request.path] = exception_type
+        threads.add(threading.current_thread())
+
+    def raise_error(data, request):
+        raise ValueError(data)
+
+    client.start(2)
+
+    get = client.add_request("GET", "/get", callback, params={"a": 1, "b": None})
+    post = client.add_request("POST", "/post", callback, data="raw body")
+    failed = client.add_request("GET", "/fail", callback, on_failed=on_failed)
+    error = client.add_request("GET", "/error", raise_error, on_error=on_error)
+    client.join()
+
+    assert results["/get"]["query"] == {"a": "1"}
+    assert results["/post"] == {"method": "POST", "path": "/post", "query": {}, "body": "raw body"}
+    assert results["/fail"] == 400
+    assert results["/error"] is ValueError
+
+    assert get.status == RequestStatus.success
+    assert post.status == RequestStatus.success
+    assert failed.status == RequestStatus.failed
+    assert error.status == RequestStatus.error
+
+    # Headers looked up without case, as requests.Response
+    assert get.response.headers["x-ratelimit-remaining"] == "99"
+    assert get.response.headers.get("Retry-After", 0) == 0
+    assert get.response.json()["path"] == "/get"
+
+    # Callbacks never block asyncio loop
+    assert threading.current_thread() not in threads
+    assert client._thread not in threads
+
+
+def test_priority_order(client, server):
+    # Requests added before start are queued at the same time
+    for i in range(3):
+        client.add_request("GET", f"/query/{i}", lambda data, request: None)
+    for i in range(3):
+        client.add_request("POST", f"/order/{i}", lambda data, request: None)
+    client.add_request(
+        "GET", "/urgent", lambda data, request: None, priority=PRIORITY_HIGH
+    )
+
+    client.start(1)
+    client.join()
+
+    assert server.paths == [
+        "/order/0", "/order/1", "/order/2", "/urgent",
+        "/query/0", "/query/1", "/query/2"
+    ]
+
+    metrics = client.get_metrics()
+    assert metrics["unfinished"] == 0
+    assert metrics[f"latency_{PRIORITY_HIGH}"]["count"] == 4
+    assert metrics[f"latency_{PRIORITY_LOW}"]["count"] == 3
+
+
+def test_rate_limit_requeue(server):
+    client = RestClient()
+    client.init(f"http://127.0.0.1:{server.port}")
+    client.set_rate_limit("/limited", 10, 1)
+    server.paths.clear()
+
+    times = {}
+
+    def callback(data, request):
+        times[request.path] = time.monotonic()
+
+    client.start(2)
+    start = time.monotonic()
+
+    for i in range(3):
+        client.add_request("GET", f"/limited/{i}", callback)
+    client.add_request("GET", "/free", callback)
+    client.join()
+    client.stop()
+
+    # Limited requests are sent every 0.1 second
+    assert times["/limited/2"] - start >= 0.18
+
+    # Throttled requests are put back into queue, without blocking others
+    assert times["/free"] < times["/limited/1"]
+    assert server.paths.index("/free") < server.paths.index("/limited/1")
+    assert client.get_metrics()["throttled"] == 2
+
+
+def test_restart_keeps_requests(server):
+    client = RestClient()
+    client.async_mode = True
+    client.init(f"http://127.0.0.1:{server.port}")
+    client.set_rate_limit("/limited", 5, 1)
+
+    paths = []
+    client.start(1)
+
+    for i in range(3):
+        client.add_request("GET", f"/limited/{i}", lambda data, request: paths.append(request.path))
+
+    # Stopped and restarted before old loop finished, requests not sent
+    # yet are kept and new ones added in between are not lost
+    time.sleep(0.1)
+    old_thread = client._thread
+    client.stop()
+    client.add_request("GET", "/free", lambda data, request: paths.append(request.path))
+    client.start(1)
+
+    old_thread.join(5)
+    assert client._loop is not None
+
+    end = time.monotonic() + 5
+    while client.get_metrics()["unfinished"] and time.monotonic() < end:
+        time.sleep(0.01)
+    client.stop()
+
+    assert client.get_metrics()["unfinished"] == 0
+    assert sorted(paths) == ["/free", "/limited/0", "/limited/1", "/limited/2"]
@@ -5,15 +5,21 @@ import ssl
 import sys
 import traceback
 from datetime import datetime
+from queue import Empty, Full, Queue
 from threading import Lock, Thread
-from time import sleep
-from typing import Optional
+from time import monotonic, sleep
+from typing import Any, Dict, Hashable, Optional, Union
 from vnpy.trader.setting import get_settings
 
 import websocket
 
 from vnpy.trader.utility import get_file_logger
 
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
 
 class WebsocketClient:
     """
@@ -25,10 +31,18 @@ class WebsocketClient:
     Use stop to stop threads and disconnect websocket before destroying the client
     object (especially when exiting the programme).
 
-    Default serialization format is json.
+    Default serialization format is json, decoded by orjson if installed.
+
+    Frames are received by worker thread into a bounded buffer, and then
+    decoded and processed by decode thread. Packets with conflation key
+    (e.g. snapshot of market data) are coalesced, so only the latest one
+    of each key is processed after buffered frames are drained, or at
+    most once every websocket_interval_ms if set. Packets without key
+    (e.g. orders and trades) are always processed one by one.
 
     Callbacks to overrides:
     * unpack_data
+    * get_conflation_key
     * on_connected
     * on_disconnected
     * on_packet
@@ -47,9 +61,18 @@ class WebsocketClient:
         self._ws = None
 
         self._worker_thread = None
+        self._decode_thread = None
         self._ping_thread = None
         self._active = False
-        self._ws_internal = get_settings()["websocket_interval_ms"]
+
+        # Received frames waiting to be decoded
+        self.buffer_size = 10000
+        self._buffer: Queue = None
+
+        # Seconds between processing of conflated packets, 0 for
+        # processing them when buffer is drained
+        self.conflation_interval = get_settings()["websocket_interval_ms"] / 1000
+        self.conflated_count = 0
 
         self.proxy_host = None
         self.proxy_port = None
@@ -100,9 +123,14 @@ class WebsocketClient:
         """
 
         self._active = True
+        self._buffer = Queue(self.buffer_size)
+
         self._worker_thread = Thread(target=self._run)
         self._worker_thread.start()
 
+        self._decode_thread = Thread(target=self._run_decode)
+        self._decode_thread.start()
+
         self._ping_thread = Thread(target=self._run_ping)
         self._ping_thread.start()
 
@@ -121,6 +149,7 @@ class WebsocketClient:
         """
         self._ping_thread.join()
         self._worker_thread.join()
+        self._decode_thread.join()
 
     def send_packet(self, packet: dict):
         """
@@ -194,7 +223,6 @@ class WebsocketClient:
         Keep running till stop is called.
         """
         try:
-            initial_time = datetime.now().timestamp() * 1000
             while self._active:
                 try:
                     self._ensure_connection()
@@ -202,13 +230,6 @@ class WebsocketClient:
                     if ws:
                         text = ws.recv()
 
-                        if self._ws_internal > 0:
-                            now = datetime.now().timestamp() * 1000
-                            if now - initial_time < self._ws_internal:
-                                continue
-                            else:
-                                initial_time = now
-
                         # ws object is closed when recv function is blocking
                         if not text:
                             self._disconnect()
@@ -216,14 +237,13 @@ class WebsocketClient:
 
                         self._record_last_received_text(text)
 
-                        try:
-                            data = self.unpack_data(text)
-                        except ValueError as e:
-                            print("websocket unable to parse data: " + text)
-                            raise e
-
-                        self._log('recv data: %s', data)
-                        self.on_packet(data)
+                        # Wait for decode thread if buffer is full
+                        while self._active:
+                            try:
+                                self._buffer.put(text, timeout=1)
+                                break
+                            except Full:
+                                pass
                 # ws is closed before recv function is called
                 # For socket.error, see Issue #1608
                 except (
@@ -233,7 +253,7 @@ class WebsocketClient:
                 ):
                     self._disconnect()
 
-                # other internal exception raised in on_packet
+                # other internal exception raised in connecting
                 except:  # noqa
                     et, ev, tb = sys.exc_info()
                     self.on_error(et, ev, tb)
@@ -243,14 +263,100 @@ class WebsocketClient:
             self.on_error(et, ev, tb)
         self._disconnect()
 
+    def _run_decode(self):
+        """
+        Decode and process received frames till stop is called.
+        """
+        # Latest conflated packet of each key
+        pending: Dict[Hashable, Any] = {}
+        last_time = monotonic()
+
+        # Process conflated packets at least once every batch_size frames
+        batch_size = max(self.buffer_size // 10, 1)
+
+        while self._active:
+            if pending and self.conflation_interval:
+                timeout = max(last_time + self.conflation_interval - monotonic(), 0)
+            elif pending:
+                timeout = 0
+            else:
+                timeout = 1
+
+            try:
+                count = 0
+                text = self._buffer.get(timeout=timeout) if timeout else self._buffer.get_nowait()
+
+                while True:
+                    data = self._decode(text)
+
+                    key = self.get_conflation_key(data)
+                    if key is None:
+                        self.on_packet(data)
+                    else:
+                        if key in pending:
+                            self.conflated_count += 1
+                        pending[key] = data
+
+                    count += 1
+                    if count >= batch_size:
+                        break
+                    text = self._buffer.get_nowait()
+            except Empty:
+                pass
+            except:  # noqa
+                et, ev, tb = sys.exc_info()
+                self.on_error(et, ev, tb)
+                self._disconnect()
+                continue
+
+            if not pending:
+                continue
+
+            now = monotonic()
+            if self.conflation_interval and now - last_time < self.conflation_interval:
+                continue
+            last_time = now
+
+            packets = list(pending.values())
+            pending.clear()
+
+            for data in packets:
+                try:
+                    self.on_packet(data)
+                except:  # noqa
+                    et, ev, tb = sys.exc_info()
+                    self.on_error(et, ev, tb)
+
+    def _decode(self, text: Union[str, bytes]):
+        """"""
+        try:
+            data = self.unpack_data(text)
+        except ValueError as e:
+            print("websocket unable to parse data: " + str(text))
+            raise e
+
+        self._log('recv data: %s', data)
+        return data
+
     @staticmethod
-    def unpack_data(data: str):
+    def unpack_data(data: Union[str, bytes]):
         """
         Default serialization format is json.
 
         override this method if you want to use other serialization format.
         """
-        return json.loads(data)
+        return loads(data)
+
+    @staticmethod
+    def get_conflation_key(packet: Any) -> Optional[Hashable]:
+        """
+        Get key for coalescing packets, e.g. channel name of market data
+        snapshot. Packet returning None is never dropped.
+
+        override this method to enable conflation. Do not return key
+        for incremental updates, which cannot be coalesced.
+        """
+        return None
 
     def _run_ping(self):
         """"""
@@ -0,0 +1,122 @@
+import json
+from queue import Queue
+from threading import Event, Thread
+
+from vnpy.api.websocket.websocket_client import WebsocketClient
+
+
+SYMBOLS = ["BTCUSD", "ETHUSD", "XRPUSD"]
+
+
+class Client(WebsocketClient):
+    """
+    Client with market data conflated by channel, fed by test instead
+    of websocket connection.
+    """
+
+    def __init__(self, buffer_size: int, conflation_interval: float, count: int):
+        super().__init__()
+
+        self.buffer_size = buffer_size
+        self.conflation_interval = conflation_interval
+
+        # Latest snapshot of each channel, processed at last
+        self.waiting = {count - 3, count - 2, count - 1}
+
+        self.packets = []
+        self.errors = []
+        self.finished = Event()
+
+    def get_conflation_key(self, packet: dict):
+        return packet.get("channel", None)
+
+    def on_packet(self, packet: dict):
+        self.packets.append(packet)
+
+        self.waiting.discard(packet.get("seq", None))
+        if not self.waiting:
+            self.finished.set()
+
+    def on_error(self, exception_type, exception_value, tb):
+        self.errors.append(exception_value)
+
+    def start_decode(self, frames: list = None) -> Thread:
+        self._active = True
+        self._buffer = Queue(self.buffer_size)
+
+        for text in frames or []:
+            self._buffer.put(text)
+
+        thread = Thread(target=self._run_decode)
+        thread.start()
+        return thread
+
+
+def create_frames(count: int) -> list:
+    frames = []
+
+    for i in range(count):
+        frames.append(json.dumps({"channel": f"depth.{SYMBOLS[i % 3]}", "seq": i}))
+
+        if i % 5 == 0:
+            frames.append(json.dumps({"type": "order", "id": i}))
+
+    return frames
+
+
+def check_packets(packets: list, count: int) -> None:
+    # Orders are never dropped or reordered
+    orders = [packet["id"] for packet in packets if "id" in packet]
+    assert orders == list(range(0, count, 5))
+
+    # Snapshots of each channel are processed in order, and the latest one
+    # is always processed
+    for i, symbol in enumerate(SYMBOLS):
+        seqs = [
+            packet["seq"] for packet in packets
+            if packet.get("channel", None) == f"depth.{symbol}"
+        ]
+        assert seqs == sorted(seqs)
+        assert seqs[-1] == max(range(i, count, 3))
+
+
+def test_conflation_after_buffer_drained():
+    count = 300
+    client = Client(10000, 0, count)
+
+    # All frames received before decoding
+    thread = client.start_decode(create_frames(count))
+
+    assert client.finished.wait(5)
+    client._active = False
+    thread.join()
+
+    assert not client.errors
+    check_packets(client.packets, count)
+
+    # Only latest snapshot of each channel processed after orders
+    assert len(client.packets) == count // 5 + 3
+    assert client.conflated_count == count - 3
+    assert [packet["seq"] for packet in client.packets[-3:]] == [297, 298, 299]
+
+
+def test_conflation_while_receiving():
+    count = 5000
+    frames = create_frames(count)
+
+    for interval in [0, 0.001]:
+        client = Client(50, interval, count)
+        thread = client.start_decode()
+
+        for text in frames:
+            client._buffer.put(text)
+
+        assert client.finished.wait(5)
+        client._active = False
+        thread.join()
+
+        assert not client.errors
+        check_packets(client.packets, count)
+
+        snapshots = [packet for packet in client.packets if "seq" in packet]
+        assert len(snapshots) + client.conflated_count == count
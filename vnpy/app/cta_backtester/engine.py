@@ -399,6 +399,13 @@ class BacktesterEngine(BaseEngine):
             if data:
                 database_manager.save_bar_data(data)
                 self.write_log(f"{vt_symbol}-{interval}历史数据下载完成")
+
+                statistics = database_manager.get_write_statistics()
+                if statistics:
+                    self.write_log(
+                        f"写入{statistics['rows']}条，"
+                        f"速度{statistics['rows_per_second']:.0f}条/秒"
+                    )
             else:
                 self.write_log(f"数据下载失败，无法获取{vt_symbol}的历史数据")
         except Exception:
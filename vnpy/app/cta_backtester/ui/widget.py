@@ -1223,16 +1223,19 @@ class CandleChartDialog(QtWidgets.QDialog):
         self.updated = True
         self.chart.update_history(history)
 
-        for ix, bar in enumerate(history):
-            self.ix_bar_map[ix] = bar
-            self.dt_ix_map[bar.datetime] = ix
+        self.ix_bar_map.update(enumerate(history))
+        self.dt_ix_map.update((bar.datetime, ix) for ix, bar in enumerate(history))
+
+        if history:
+            high_price = max(bar.high_price for bar in history)
+            low_price = min(bar.low_price for bar in history)
 
             if not self.high_price:
-                self.high_price = bar.high_price
-                self.low_price = bar.low_price
+                self.high_price = high_price
+                self.low_price = low_price
             else:
-                self.high_price = max(self.high_price, bar.high_price)
-                self.low_price = min(self.low_price, bar.low_price)
+                self.high_price = max(self.high_price, high_price)
+                self.low_price = min(self.low_price, low_price)
 
         self.price_range = self.high_price - self.low_price
 
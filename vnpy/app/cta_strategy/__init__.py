@@ -8,6 +8,7 @@ from vnpy.trader.utility import BarGenerator, ArrayManager
 from .base import APP_NAME, StopOrder
 from .engine import CtaEngine
 from .template import CtaTemplate, CtaSignal, TargetPosTemplate
+from .vector import VectorTemplate, VectorSignal
 
 
 class CtaStrategyApp(BaseApp):
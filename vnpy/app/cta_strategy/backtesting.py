@@ -1,6 +1,6 @@
 from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Callable
+from typing import Callable, Union
 from itertools import product
 from functools import lru_cache
 from time import time
@@ -14,10 +14,12 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from deap import creator, base, tools, algorithms
 
+from vnpy.trader.batch import BarBatch, BaseBatch, SharedBatch
 from vnpy.trader.constant import (Direction, Offset, Exchange,
                                   Interval, Status)
 from vnpy.trader.database import database_manager
 from vnpy.trader.object import OrderData, TradeData, BarData, TickData
+from vnpy.trader.trigger import TriggerBook
 from vnpy.trader.utility import round_to
 
 from .base import (
@@ -29,6 +31,7 @@ from .base import (
     INTERVAL_DELTA_MAP
 )
 from .template import CtaTemplate
+from .vector import VectorStrategyAdapter, cross_signal, get_init_index
 
 
 # Set deap algo
@@ -133,6 +136,7 @@ class BacktestingEngine:
         self.stop_order_count = 0
         self.stop_orders = {}
         self.active_stop_orders = {}
+        self.stop_book = TriggerBook()
 
         self.limit_order_count = 0
         self.limit_orders = {}
@@ -158,6 +162,7 @@ class BacktestingEngine:
         self.stop_order_count = 0
         self.stop_orders.clear()
         self.active_stop_orders.clear()
+        self.stop_book.clear()
 
         self.limit_order_count = 0
         self.limit_orders.clear()
@@ -219,7 +224,12 @@ class BacktestingEngine:
             self.output("起始日期必须小于结束日期")
             return
 
-        self.history_data.clear()       # Clear previously loaded history data
+        if self.mode == BacktestingMode.VECTOR:
+            self.history_data = self.load_history_batch()
+            self.output(f"历史数据加载完成，数据量：{len(self.history_data)}")
+            return
+
+        self.history_data = []       # Clear previously loaded history data
 
         # Load 30 days of data each time and allow for progress update
         progress_delta = timedelta(days=30)
@@ -261,8 +271,36 @@ class BacktestingEngine:
 
         self.output(f"历史数据加载完成，数据量：{len(self.history_data)}")
 
+    def load_history_batch(self) -> BaseBatch:
+        """
+        Load history data in one query into columnar batch, which can be
+        shared with optimization workers.
+        """
+        if not self.end:
+            self.end = datetime.now()
+
+        if self.mode != BacktestingMode.TICK:
+            return database_manager.load_bar_array(
+                self.symbol,
+                self.exchange,
+                self.interval,
+                self.start,
+                self.end
+            )
+        else:
+            return database_manager.load_tick_array(
+                self.symbol,
+                self.exchange,
+                self.start,
+                self.end
+            )
+
     def run_backtesting(self):
         """"""
+        if self.mode == BacktestingMode.VECTOR:
+            self.run_vector_backtesting()
+            return
+
         if self.mode == BacktestingMode.BAR:
             func = self.new_bar
         else:
@@ -307,6 +345,205 @@ class BacktestingEngine:
 
         self.output("历史数据回放结束")
 
+    def get_history_batch(self) -> BarBatch:
+        """
+        Get history data as bar batch for vectorized backtesting.
+        """
+        if isinstance(self.history_data, BaseBatch):
+            return self.history_data
+        elif self.history_data:
+            return BarBatch.from_bars(self.history_data)
+        else:
+            return BarBatch(self.symbol, self.exchange, self.interval)
+
+    def run_vector_backtesting(self):
+        """
+        Generate signals of all bars at once and simulate fills with
+        array operations, results are the same as bar mode.
+        """
+        data = self.get_history_batch()
+        if len(data) < 2:
+            self.output("历史数据不足，回测终止")
+            return
+
+        self.strategy.on_init()
+
+        ix = get_init_index(data["datetime"], self.days)
+
+        try:
+            signal = self.strategy.generate_signal(data)
+        except Exception:
+            self.output("触发异常，回测终止")
+            self.output(traceback.format_exc())
+            return
+
+        self.strategy.inited = True
+        self.output("策略初始化完成")
+
+        self.strategy.on_start()
+        self.strategy.trading = True
+        self.output("开始向量化回测")
+
+        fill = cross_signal(data, signal, ix, self.pricetick)
+        datetimes = data["datetime"].tolist()
+
+        for bar_ix, direction, offset, price, volume in zip(
+            fill.index.tolist(),
+            fill.direction,
+            fill.offset,
+            fill.price.tolist(),
+            fill.volume.tolist()
+        ):
+            self.datetime = datetimes[bar_ix].replace(tzinfo=data.tzinfo)
+            self.limit_order_count += 1
+
+            order = OrderData(
+                symbol=self.symbol,
+                exchange=self.exchange,
+                orderid=str(self.limit_order_count),
+                direction=direction,
+                offset=offset,
+                price=price,
+                volume=volume,
+                traded=volume,
+                status=Status.ALLTRADED,
+                gateway_name=self.gateway_name,
+                datetime=self.datetime
+            )
+            self.limit_orders[order.vt_orderid] = order
+
+            self.trade_count += 1
+
+            trade = TradeData(
+                symbol=order.symbol,
+                exchange=order.exchange,
+                orderid=order.orderid,
+                tradeid=str(self.trade_count),
+                direction=direction,
+                offset=offset,
+                price=price,
+                volume=volume,
+                datetime=self.datetime,
+                gateway_name=self.gateway_name,
+            )
+            self.trades[trade.vt_tradeid] = trade
+
+        self.strategy.pos = fill.pos
+
+        # Daily close is close price of last bar of each day
+        dates = data["datetime"][ix:].astype("M8[D]")
+        close_prices = data["close_price"][ix:]
+        last = np.append(np.flatnonzero(dates[1:] != dates[:-1]), len(dates) - 1)
+
+        for d, close_price in zip(dates[last].tolist(), close_prices[last].tolist()):
+            self.daily_results[d] = DailyResult(d, close_price)
+
+        self.datetime = datetimes[-1].replace(tzinfo=data.tzinfo)
+        self.output("向量化回测结束")
+
+    def check_vector_result(self, tolerance: float = 1e-6) -> dict:
+        """
+        Run signals of current vector strategy again with event driven
+        bar mode on the same data, and compare trades and daily pnl.
+        """
+        data = self.get_history_batch()
+
+        engine = BacktestingEngine()
+        engine.set_parameters(
+            vt_symbol=self.vt_symbol,
+            interval=self.interval,
+            start=self.start,
+            rate=self.rate,
+            slippage=self.slippage,
+            size=self.size,
+            pricetick=self.pricetick,
+            capital=self.capital,
+            end=self.end,
+            mode=BacktestingMode.BAR,
+            inverse=self.inverse
+        )
+        engine.output = lambda msg: None
+        engine.history_data = data
+
+        vector_strategy = self.strategy_class(
+            engine,
+            self.strategy_class.__name__,
+            self.vt_symbol,
+            self.strategy.get_parameters()
+        )
+        engine.strategy_class = self.strategy_class
+        engine.strategy = VectorStrategyAdapter(engine, vector_strategy, data)
+
+        engine.run_backtesting()
+
+        vector_trades = [
+            (t.datetime, t.direction, t.price, t.volume) for t in self.get_all_trades()
+        ]
+        event_trades = [
+            (t.datetime, t.direction, t.price, t.volume) for t in engine.get_all_trades()
+        ]
+
+        mismatch_count = 0
+        for vector_trade, event_trade in zip(vector_trades, event_trades):
+            if (
+                vector_trade[:2] != event_trade[:2]
+                or abs(vector_trade[2] - event_trade[2]) > tolerance
+                or abs(vector_trade[3] - event_trade[3]) > tolerance
+            ):
+                mismatch_count += 1
+        mismatch_count += abs(len(vector_trades) - len(event_trades))
+
+        vector_pnl = self.calculate_daily_pnl()
+        event_pnl = engine.calculate_daily_pnl()
+
+        if vector_pnl.keys() == event_pnl.keys():
+            pnl_diff = max(
+                [abs(vector_pnl[d] - event_pnl[d]) for d in vector_pnl],
+                default=0
+            )
+        else:
+            pnl_diff = np.inf
+
+        result = {
+            "vector_trade_count": len(vector_trades),
+            "event_trade_count": len(event_trades),
+            "mismatch_trade_count": mismatch_count,
+            "max_pnl_diff": pnl_diff,
+            "passed": bool(not mismatch_count and pnl_diff <= tolerance),
+        }
+
+        self.output(f"向量化回测校验结果：{result}")
+        return result
+
+    def calculate_daily_pnl(self) -> dict:
+        """
+        Net pnl of each day calculated by trades and daily close.
+        """
+        daily_results = {
+            d: DailyResult(d, result.close_price)
+            for d, result in self.daily_results.items()
+        }
+
+        for trade in self.trades.values():
+            daily_results[trade.datetime.date()].add_trade(trade)
+
+        pre_close = 0
+        start_pos = 0
+
+        for daily_result in daily_results.values():
+            daily_result.calculate_pnl(
+                pre_close,
+                start_pos,
+                self.size,
+                self.rate,
+                self.slippage,
+                self.inverse
+            )
+            pre_close = daily_result.close_price
+            start_pos = daily_result.end_pos
+
+        return {d: result.net_pnl for d, result in daily_results.items()}
+
     def calculate_result(self):
         """"""
         self.output("开始计算逐日盯市盈亏")
@@ -573,14 +810,13 @@ class BacktestingEngine:
             self.output("优化目标未设置，请检查")
             return
 
-        # Use multiprocessing pool for running backtesting with different setting
-        # Force to use spawn method to create new process (instead of fork on Linux)
-        ctx = multiprocessing.get_context("spawn")
-        pool = ctx.Pool(multiprocessing.cpu_count())
+        # Load history data once and share it with all worker processes
+        self.output("开始加载历史数据")
+        history = SharedBatch(self.load_history_batch())
+        self.output(f"历史数据加载完成，数据量：{history.length}")
 
-        results = []
-        for setting in settings:
-            result = (pool.apply_async(optimize, (
+        tasks = [
+            (
                 target_name,
                 self.strategy_class,
                 setting,
@@ -594,15 +830,35 @@ class BacktestingEngine:
                 self.capital,
                 self.end,
                 self.mode,
-                self.inverse
-            )))
-            results.append(result)
+                self.inverse,
+                history
+            )
+            for setting in settings
+        ]
+
+        # Use multiprocessing pool for running backtesting with different setting
+        # Force to use spawn method to create new process (instead of fork on Linux)
+        ctx = multiprocessing.get_context("spawn")
+        pool = ctx.Pool(multiprocessing.cpu_count())
 
-        pool.close()
-        pool.join()
+        # Collect results as soon as each one finished
+        result_values = []
+        total = len(tasks)
+        step = max(total // 10, 1)
+
+        try:
+            for value in pool.imap_unordered(optimize_task, tasks):
+                result_values.append(value)
+
+                count = len(result_values)
+                if output and (count % step == 0 or count == total):
+                    self.output(f"优化进度：{count}/{total}")
+        finally:
+            pool.close()
+            pool.join()
+            history.close()
 
         # Sort results and output
-        result_values = [result.get() for result in results]
         result_values.sort(reverse=True, key=lambda result: result[1])
 
         if output:
@@ -655,6 +911,7 @@ class BacktestingEngine:
         global ga_end
         global ga_mode
         global ga_inverse
+        global ga_history
 
         ga_target_name = target_name
         ga_strategy_class = self.strategy_class
@@ -670,6 +927,11 @@ class BacktestingEngine:
         ga_end = self.end
         ga_mode = self.mode
         ga_inverse = self.inverse
+        ga_history = self.load_history_batch()
+
+        # Convert into objects once instead of in every evaluation
+        if self.mode != BacktestingMode.VECTOR:
+            ga_history = list(ga_history)
 
         # Set up genetic algorithem
         toolbox = base.Toolbox()
@@ -859,21 +1121,17 @@ class BacktestingEngine:
             long_best_price = long_cross_price
             short_best_price = short_cross_price
 
-        for stop_order in list(self.active_stop_orders.values()):
-            # Check whether stop order can be triggered.
-            long_cross = (
-                stop_order.direction == Direction.LONG
-                and stop_order.price <= long_cross_price
-            )
-
-            short_cross = (
-                stop_order.direction == Direction.SHORT
-                and stop_order.price >= short_cross_price
-            )
+        triggered = self.stop_book.get_triggered(
+            self.vt_symbol, long_cross_price, short_cross_price
+        )
 
-            if not long_cross and not short_cross:
+        for stop_order in triggered:
+            # Skip stop order cancelled by strategy callback.
+            if stop_order.stop_orderid not in self.active_stop_orders:
                 continue
 
+            long_cross = stop_order.direction == Direction.LONG
+
             # Create order data.
             self.limit_order_count += 1
 
@@ -922,8 +1180,8 @@ class BacktestingEngine:
             stop_order.vt_orderids.append(order.vt_orderid)
             stop_order.status = StopOrderStatus.TRIGGERED
 
-            if stop_order.stop_orderid in self.active_stop_orders:
-                self.active_stop_orders.pop(stop_order.stop_orderid)
+            self.active_stop_orders.pop(stop_order.stop_orderid)
+            self.stop_book.remove(stop_order.stop_orderid)
 
             # Push update to strategy.
             self.strategy.on_stop_order(stop_order)
@@ -989,6 +1247,7 @@ class BacktestingEngine:
 
         self.active_stop_orders[stop_order.stop_orderid] = stop_order
         self.stop_orders[stop_order.stop_orderid] = stop_order
+        self.stop_book.add(self.vt_symbol, stop_order.stop_orderid, direction, price, stop_order)
 
         return stop_order.stop_orderid
 
@@ -1034,6 +1293,7 @@ class BacktestingEngine:
         if vt_orderid not in self.active_stop_orders:
             return
         stop_order = self.active_stop_orders.pop(vt_orderid)
+        self.stop_book.remove(vt_orderid)
 
         stop_order.status = StopOrderStatus.CANCELLED
         self.strategy.on_stop_order(stop_order)
@@ -1223,10 +1483,14 @@ def optimize(
     capital: int,
     end: datetime,
     mode: BacktestingMode,
-    inverse: bool
+    inverse: bool,
+    history: Union[SharedBatch, BaseBatch] = None
 ):
     """
     Function for running in multiprocessing.pool
+
+    If history is given, it is used as history data instead of
+    loading from database.
     """
     engine = BacktestingEngine()
 
@@ -1245,7 +1509,17 @@ def optimize(
     )
 
     engine.add_strategy(strategy_class, setting)
-    engine.load_data()
+
+    if isinstance(history, SharedBatch):
+        if mode == BacktestingMode.VECTOR:
+            engine.history_data = history.attach()
+        else:
+            engine.history_data = load_shared_history(history)
+    elif history is not None:
+        engine.history_data = history
+    else:
+        engine.load_data()
+
     engine.run_backtesting()
     engine.calculate_result()
     statistics = engine.calculate_statistics(output=False)
@@ -1254,6 +1528,13 @@ def optimize(
     return (str(setting), target_value, statistics)
 
 
+def optimize_task(args: tuple):
+    """
+    Unpack arguments for pool.imap_unordered.
+    """
+    return optimize(*args)
+
+
 @lru_cache(maxsize=1000000)
 def _ga_optimize(parameter_values: tuple):
     """"""
@@ -1273,7 +1554,8 @@ def _ga_optimize(parameter_values: tuple):
         ga_capital,
         ga_end,
         ga_mode,
-        ga_inverse
+        ga_inverse,
+        ga_history
     )
     return (result[1],)
 
@@ -1310,7 +1592,17 @@ def load_tick_data(
     )
 
 
+@lru_cache(maxsize=999)
+def load_shared_history(history: SharedBatch) -> list:
+    """
+    Convert shared history data into objects once in each worker
+    process, and reused by all settings run in the same process.
+    """
+    return list(history.attach())
+
+
 # GA related global value
+ga_history = None
 ga_end = None
 ga_mode = None
 ga_target_name = None
@@ -0,0 +1,62 @@
+import pickle
+from datetime import datetime
+
+from vnpy.app.cta_strategy.backtesting import load_shared_history, optimize
+from vnpy.app.cta_strategy.base import BacktestingMode
+from vnpy.app.cta_strategy.strategies.double_ma_strategy import DoubleMaStrategy
+from vnpy.app.cta_strategy.vector_test import generate_bars
+from vnpy.trader import batch as batch_module
+from vnpy.trader.batch import SharedBatch
+from vnpy.trader.constant import Interval
+
+
+def run_optimize(setting: dict, history: SharedBatch) -> float:
+    _, target_value, _ = optimize(
+        "total_net_pnl",
+        DoubleMaStrategy,
+        setting,
+        "IF88.CFFEX",
+        Interval.MINUTE,
+        datetime(2020, 1, 1),
+        0.3 / 10000,
+        0.2,
+        300,
+        0.2,
+        1_000_000,
+        datetime(2020, 3, 1),
+        BacktestingMode.BAR,
+        False,
+        history
+    )
+    return target_value
+
+
+def test_shared_history_converted_once():
+    bars = generate_bars(5000)
+    shared = SharedBatch(bars)
+
+    try:
+        load_shared_history.cache_clear()
+
+        # Each task receives a new copy pickled from the same shared memory
+        results = []
+        for fast_window in [5, 10, 15]:
+            history = pickle.loads(pickle.dumps(shared))
+            results.append(run_optimize({"fast_window": fast_window}, history))
+
+        info = load_shared_history.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
+
+        history = pickle.loads(pickle.dumps(shared))
+        assert load_shared_history(history) == list(bars)
+
+        # Same result as history data not shared
+        assert results[1]
+        assert results[1] == run_optimize({"fast_window": 10}, bars)
+    finally:
+        load_shared_history.cache_clear()
+
+        shm, _ = batch_module._attached_batches.pop(shared.name)
+        shm.close()
+        shared.close()
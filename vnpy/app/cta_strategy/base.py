@@ -26,6 +26,7 @@ class EngineType(Enum):
 class BacktestingMode(Enum):
     BAR = 1
     TICK = 2
+    VECTOR = 3
 
 
 @dataclass
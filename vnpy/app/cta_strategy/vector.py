@@ -0,0 +1,347 @@
+"""
+Vectorized backtesting of bar mode CTA strategies.
+
+A vector strategy generates order signals of all bars at once from
+numpy arrays, and fills of the signals are simulated with array
+operations instead of replaying bars one by one.
+"""
+
+from abc import ABC, abstractmethod
+from copy import copy
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Union
+
+import numpy as np
+
+from vnpy.trader.batch import BarBatch
+from vnpy.trader.constant import Interval, Direction, Offset
+from vnpy.trader.object import BarData
+
+from .template import CtaTemplate
+
+
+@dataclass
+class VectorSignal:
+    """
+    Order signals generated on close of each bar.
+
+    An order is sent on bar i to change position to target[i] at
+    price[i], and is cancelled if not filled by bar i + 1. Target of
+    nan means no order sent on that bar. Stop can be a bool for all
+    bars or a bool array choosing stop or limit order of each bar.
+    """
+
+    target: np.ndarray
+    price: np.ndarray
+    stop: Union[bool, np.ndarray] = False
+
+
+@dataclass
+class VectorFill:
+    """
+    Arrays of simulated trades, one element per trade.
+    """
+
+    index: np.ndarray
+    direction: np.ndarray
+    offset: np.ndarray
+    price: np.ndarray
+    volume: np.ndarray
+    pos: float = 0
+
+
+class VectorTemplate(ABC):
+    """
+    Template for strategies running in BacktestingMode.VECTOR.
+    """
+
+    author = ""
+    parameters = []
+    variables = []
+
+    def __init__(
+        self,
+        cta_engine: Any,
+        strategy_name: str,
+        vt_symbol: str,
+        setting: dict,
+    ):
+        """"""
+        self.cta_engine = cta_engine
+        self.strategy_name = strategy_name
+        self.vt_symbol = vt_symbol
+
+        self.inited = False
+        self.trading = False
+        self.pos = 0
+
+        self.variables = copy(self.variables)
+        self.variables.insert(0, "inited")
+        self.variables.insert(1, "trading")
+        self.variables.insert(2, "pos")
+
+        self.update_setting(setting)
+
+    def update_setting(self, setting: dict):
+        """
+        Update strategy parameter wtih value in setting dict.
+        """
+        for name in self.parameters:
+            if name in setting:
+                setattr(self, name, setting[name])
+
+    @classmethod
+    def get_class_parameters(cls):
+        """
+        Get default parameters dict of strategy class.
+        """
+        return {name: getattr(cls, name) for name in cls.parameters}
+
+    def get_parameters(self):
+        """
+        Get strategy parameters dict.
+        """
+        return {name: getattr(self, name) for name in self.parameters}
+
+    def get_variables(self):
+        """
+        Get strategy variables dict.
+        """
+        return {name: getattr(self, name) for name in self.variables}
+
+    def on_init(self):
+        """
+        Callback when strategy is inited.
+        """
+        pass
+
+    def on_start(self):
+        """
+        Callback when strategy is started.
+        """
+        pass
+
+    def load_bar(self, days: int, interval: Interval = Interval.MINUTE):
+        """
+        Set number of days used for initializing strategy, no order
+        signal is traded within these days.
+        """
+        self.cta_engine.load_bar(self.vt_symbol, days, interval, None, False)
+
+    def write_log(self, msg: str):
+        """
+        Write a log message.
+        """
+        self.cta_engine.write_log(msg, self)
+
+    @abstractmethod
+    def generate_signal(self, data: BarBatch) -> VectorSignal:
+        """
+        Generate order signals from all bars, e.g. using talib
+        functions on data["close_price"].
+        """
+        pass
+
+
+class VectorStrategyAdapter(CtaTemplate):
+    """
+    Run signals of vector strategy in event driven backtesting,
+    used for checking result of vectorized simulation.
+    """
+
+    def __init__(self, cta_engine: Any, vector_strategy: VectorTemplate, data: BarBatch):
+        """"""
+        super().__init__(cta_engine, vector_strategy.strategy_name, vector_strategy.vt_symbol, {})
+
+        self.vector_strategy: VectorTemplate = vector_strategy
+        self.data: BarBatch = data
+        self.signal: VectorSignal = None
+        self.stop: np.ndarray = None
+        self.bar_count: int = 0
+
+    def on_init(self):
+        """"""
+        self.vector_strategy.on_init()
+        self.load_bar(self.cta_engine.days)
+
+        self.signal = self.vector_strategy.generate_signal(self.data)
+        self.stop = np.broadcast_to(self.signal.stop, len(self.data))
+
+    def on_bar(self, bar: BarData):
+        """"""
+        ix = self.bar_count
+        self.bar_count += 1
+
+        self.cancel_all()
+
+        target = self.signal.target[ix]
+        if np.isnan(target) or target == self.pos:
+            return
+
+        if target > self.pos:
+            direction = Direction.LONG
+        else:
+            direction = Direction.SHORT
+
+        self.send_order(
+            direction,
+            get_offset(self.pos, target),
+            float(self.signal.price[ix]),
+            abs(target - self.pos),
+            bool(self.stop[ix])
+        )
+
+
+def get_offset(pos: float, target: float) -> Offset:
+    """"""
+    if abs(target) > abs(pos):
+        return Offset.OPEN
+    return Offset.CLOSE
+
+
+def round_to_array(values: np.ndarray, target: float) -> np.ndarray:
+    """
+    Vectorized version of utility.round_to.
+
+    Values close to half tick are rounded with Decimal like round_to,
+    and multiples of tick are divided by power of ten as integers, so
+    that results are the same floats as converted from Decimal.
+    """
+    exponent = -Decimal(str(target)).normalize().as_tuple().exponent
+    scale = 10 ** max(exponent, 0)
+    tick_units = round(target * scale)
+
+    quotient = values / target
+    ticks = np.round(quotient)
+
+    fraction = quotient - np.floor(quotient)
+    for ix in np.flatnonzero(np.abs(fraction - 0.5) < 1e-6).tolist():
+        value = Decimal(str(values[ix])) / Decimal(str(target))
+        ticks[ix] = int(round(value))
+
+    return ticks * tick_units / scale
+
+
+def get_init_index(datetimes: np.ndarray, days: int) -> int:
+    """
+    Index of first bar after initialization days, the same as bar
+    replay of BacktestingEngine.
+    """
+    dates = datetimes.astype("M8[D]")
+    changes = np.flatnonzero(dates[1:] != dates[:-1]) + 1
+
+    count = max(days - 1, 1)
+    if len(changes) >= count:
+        return int(changes[count - 1])
+    return len(datetimes) - 1
+
+
+def cross_signal(data: BarBatch, signal: VectorSignal, start: int, pricetick: float) -> VectorFill:
+    """
+    Simulate limit and stop order fills of signals.
+
+    Cross conditions and trade prices of both directions are
+    calculated for all bars first. Then each run of bars with the same
+    target position is filled at its first crossed bar, so that only
+    changes of target are iterated in python.
+    """
+    size = len(data)
+
+    target = np.array(signal.target, dtype=float)
+    price = np.array(signal.price, dtype=float)
+    stop = np.broadcast_to(np.asarray(signal.stop, dtype=bool), size)
+
+    if pricetick:
+        price = round_to_array(price, pricetick)
+
+    # Orders before start are not traded, and order of last bar
+    # has no bar to be crossed with.
+    target[:start] = np.nan
+    target[-1:] = np.nan
+
+    # Order of bar i is crossed with bar i + 1
+    open_price = data["open_price"][1:]
+    high_price = data["high_price"][1:]
+    low_price = data["low_price"][1:]
+    order_price = price[:-1]
+    order_stop = stop[:-1]
+
+    long_cross = np.where(
+        order_stop,
+        order_price <= high_price,
+        (order_price >= low_price) & (low_price > 0)
+    )
+    short_cross = np.where(
+        order_stop,
+        order_price >= low_price,
+        (order_price <= high_price) & (high_price > 0)
+    )
+    long_price = np.where(
+        order_stop,
+        np.maximum(order_price, open_price),
+        np.minimum(order_price, open_price)
+    )
+    short_price = np.where(
+        order_stop,
+        np.minimum(order_price, open_price),
+        np.maximum(order_price, open_price)
+    )
+
+    # Split orders into runs of same target
+    valid = ~np.isnan(target)
+    changed = np.empty(size, dtype=bool)
+    changed[0] = True
+    changed[1:] = target[1:] != target[:-1]
+
+    run_starts = np.flatnonzero(changed)
+    run_ends = np.append(run_starts[1:], size)
+    keep = valid[run_starts]
+    run_starts = run_starts[keep]
+    run_ends = run_ends[keep]
+
+    trades = []
+    pos = 0
+
+    for run_start, run_end in zip(run_starts.tolist(), run_ends.tolist()):
+        run_target = target[run_start]
+        if run_target == pos:
+            continue
+
+        if run_target > pos:
+            cross = long_cross
+            cross_price = long_price
+            direction = Direction.LONG
+        else:
+            cross = short_cross
+            cross_price = short_price
+            direction = Direction.SHORT
+
+        crossed = cross[run_start:run_end]
+        n = crossed.argmax()
+        if not crossed[n]:
+            continue
+
+        ix = run_start + n
+        trades.append((
+            ix + 1,
+            direction,
+            get_offset(pos, run_target),
+            cross_price[ix],
+            abs(run_target - pos)
+        ))
+        pos = run_target
+
+    if trades:
+        index, direction, offset, trade_price, volume = zip(*trades)
+    else:
+        index = direction = offset = trade_price = volume = ()
+
+    return VectorFill(
+        index=np.array(index, dtype=int),
+        direction=np.array(direction, dtype=object),
+        offset=np.array(offset, dtype=object),
+        price=np.array(trade_price, dtype=float),
+        volume=np.array(volume, dtype=float),
+        pos=pos
+    )
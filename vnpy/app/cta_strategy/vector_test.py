@@ -0,0 +1,105 @@
+from datetime import datetime
+
+import numpy as np
+
+from vnpy.app.cta_strategy.backtesting import BacktestingEngine
+from vnpy.app.cta_strategy.base import BacktestingMode
+from vnpy.app.cta_strategy.vector import VectorSignal, VectorTemplate
+from vnpy.trader.batch import BarBatch
+from vnpy.trader.constant import Exchange, Interval
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    result = np.full(len(values), np.nan)
+    cumsum = np.cumsum(values)
+    result[window - 1:] = (cumsum[window - 1:] - np.append(0, cumsum[:-window])) / window
+    return result
+
+
+class MaCrossVectorStrategy(VectorTemplate):
+
+    fast_window = 10
+    slow_window = 30
+    use_stop = False
+
+    parameters = ["fast_window", "slow_window", "use_stop"]
+
+    def on_init(self):
+        self.load_bar(2)
+
+    def generate_signal(self, data: BarBatch) -> VectorSignal:
+        close_price = data["close_price"]
+        fast_ma = moving_average(close_price, self.fast_window)
+        slow_ma = moving_average(close_price, self.slow_window)
+
+        target = np.where(fast_ma > slow_ma, 2.0, -1.0)
+        target[np.isnan(slow_ma)] = np.nan
+
+        if self.use_stop:
+            price = np.where(target > 0, close_price + 0.3, close_price - 0.3)
+            stop = np.arange(len(close_price)) % 3 != 0
+        else:
+            price = np.where(target > 0, close_price - 0.15, close_price + 0.15)
+            stop = False
+
+        return VectorSignal(target=target, price=price, stop=stop)
+
+
+def generate_bars(count: int) -> BarBatch:
+    rng = np.random.default_rng(7)
+
+    data = np.zeros(count, dtype=BarBatch.dtype)
+    data["datetime"] = np.datetime64("2020-01-01T09:00") + np.arange(count) * np.timedelta64(7, "m")
+
+    close_price = np.round(3000 + np.cumsum(rng.normal(0, 1, count)), 1)
+    open_price = np.append(3000, close_price[:-1])
+    spread = np.round(np.abs(rng.normal(0, 0.5, count)), 1)
+
+    data["open_price"] = open_price
+    data["close_price"] = close_price
+    data["high_price"] = np.maximum(open_price, close_price) + spread
+    data["low_price"] = np.minimum(open_price, close_price) - spread
+    data["volume"] = 1
+
+    return BarBatch("IF88", Exchange.CFFEX, Interval.MINUTE, data)
+
+
+def run_vector_engine(setting: dict) -> BacktestingEngine:
+    engine = BacktestingEngine()
+    engine.output = lambda msg: None
+    engine.set_parameters(
+        vt_symbol="IF88.CFFEX",
+        interval=Interval.MINUTE,
+        start=datetime(2020, 1, 1),
+        end=datetime(2020, 3, 1),
+        rate=0.3 / 10000,
+        slippage=0.2,
+        size=300,
+        pricetick=0.2,
+        capital=1_000_000,
+        mode=BacktestingMode.VECTOR
+    )
+    engine.add_strategy(MaCrossVectorStrategy, setting)
+    engine.history_data = generate_bars(5000)
+    engine.run_backtesting()
+    return engine
+
+
+def test_vector_limit_order_matches_bar_mode():
+    engine = run_vector_engine({"use_stop": False})
+    result = engine.check_vector_result()
+
+    assert result["vector_trade_count"] > 50
+    assert result["passed"], result
+
+
+def test_vector_stop_order_matches_bar_mode():
+    engine = run_vector_engine({"use_stop": True})
+    result = engine.check_vector_result()
+
+    assert result["vector_trade_count"] > 50
+    assert result["passed"], result
+
+    engine.calculate_result()
+    statistics = engine.calculate_statistics(output=False)
+    assert statistics["total_trade_count"] == result["vector_trade_count"]
@@ -83,6 +83,12 @@ class ManagerEngine(BaseEngine):
         end = bar.datetime
         return start, end, count
 
+    def get_write_statistics(self) -> Dict:
+        """
+        Get rows/sec of last database write.
+        """
+        return database_manager.get_write_statistics()
+
     def output_data_to_csv(
         self,
         file_path: str,
@@ -239,6 +239,11 @@ class ManagerWidget(QtWidgets.QWidget):
         结束：{end}\n\
         总数量：{count}\n\
         "
+
+        statistics = self.engine.get_write_statistics()
+        if statistics:
+            msg += f"写入速度：{statistics['rows_per_second']:.0f}条/秒\n"
+
         QtWidgets.QMessageBox.information(self, "载入成功！", msg)
 
     def output_data(
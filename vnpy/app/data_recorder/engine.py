@@ -1,11 +1,16 @@
 """"""
 
+import pickle
 import sys
 from threading import Thread
 from queue import Queue, Empty
 from copy import copy
+from pathlib import Path
+from time import perf_counter_ns, time
+from typing import Dict, List
 
 from vnpy.event import Event, EventEngine
+from vnpy.event.metrics import LatencyHistogram
 from vnpy.trader.engine import BaseEngine, MainEngine
 from vnpy.trader.constant import Exchange
 from vnpy.trader.object import (
@@ -15,8 +20,9 @@ from vnpy.trader.object import (
     ContractData
 )
 from vnpy.trader.event import EVENT_TICK, EVENT_CONTRACT
-from vnpy.trader.utility import load_json, save_json, BarGenerator
+from vnpy.trader.utility import load_json, save_json, BarGenerator, get_folder_path
 from vnpy.trader.database import database_manager
+from vnpy.trader.setting import SETTINGS
 from vnpy.app.spread_trading.base import EVENT_SPREAD_DATA, SpreadData
 
 
@@ -25,6 +31,10 @@ APP_NAME = "DataRecorder"
 EVENT_RECORDER_LOG = "eRecorderLog"
 EVENT_RECORDER_UPDATE = "eRecorderUpdate"
 EVENT_RECORDER_EXCEPTION = "eRecorderException"
+EVENT_RECORDER_STATUS = "eRecorderStatus"
+
+SPILL_FILENAME = "spill.dat"
+REPLAY_FILENAME = "replay.dat"
 
 
 class RecorderEngine(BaseEngine):
@@ -43,6 +53,26 @@ class RecorderEngine(BaseEngine):
         self.bar_recordings = {}
         self.bar_generators = {}
 
+        # Data waiting for flush, grouped by task type and vt_symbol
+        self.batch_size: int = SETTINGS["recorder.batch_size"]
+        self.flush_interval: float = SETTINGS["recorder.flush_interval"]
+        self.max_backlog: int = SETTINGS["recorder.max_backlog"]
+        self.retry_interval: float = SETTINGS["recorder.retry_interval"]
+
+        self.buffers: Dict[str, Dict[str, list]] = {"tick": {}, "bar": {}}
+        self.buffer_count: int = 0
+
+        # Data saved into local file when database is slow or failed
+        folder = get_folder_path("data_recorder")
+        self.spill_path: Path = folder.joinpath(SPILL_FILENAME)
+        self.replay_path: Path = folder.joinpath(REPLAY_FILENAME)
+        self.spill_count: int = 0
+        self.retry_time: float = 0
+
+        self.flush_latency: LatencyHistogram = LatencyHistogram()
+        self.flush_count: int = 0
+        self.saved_count: int = 0
+
         self.load_setting()
         self.register_event()
         self.start()
@@ -63,19 +93,24 @@ class RecorderEngine(BaseEngine):
         save_json(self.setting_filename, setting)
 
     def run(self):
-        """"""
+        """
+        Drain queue into batches per symbol, and flush them when any
+        batch is full or every flush interval.
+        """
+        flush_time = time()
+
         while self.active:
             try:
-                task = self.queue.get(timeout=1)
-                task_type, data = task
+                timeout = max(flush_time + self.flush_interval - time(), 0.01)
+                full = self.drain(timeout)
 
-                if task_type == "tick":
-                    database_manager.save_tick_data([data])
-                elif task_type == "bar":
-                    database_manager.save_bar_data([data])
-
-            except Empty:
-                continue
+                if time() >= flush_time + self.flush_interval:
+                    self.flush()
+                    self.replay()
+                    self.put_status_event()
+                    flush_time = time()
+                elif full:
+                    self.flush(full_only=True)
 
             except Exception:
                 self.active = False
@@ -84,13 +119,158 @@ class RecorderEngine(BaseEngine):
                 event = Event(EVENT_RECORDER_EXCEPTION, info)
                 self.event_engine.put(event)
 
+    def drain(self, timeout: float) -> bool:
+        """
+        Move tasks from queue into batches, return True if any batch
+        reaches batch size.
+        """
+        try:
+            task = self.queue.get(timeout=timeout)
+        except Empty:
+            return False
+
+        full = False
+
+        for _ in range(self.batch_size * 10):
+            task_type, data = task
+
+            buffer = self.buffers[task_type].setdefault(data.vt_symbol, [])
+            buffer.append(data)
+            self.buffer_count += 1
+
+            if len(buffer) >= self.batch_size:
+                full = True
+
+            try:
+                task = self.queue.get_nowait()
+            except Empty:
+                break
+
+        return full
+
+    def flush(self, full_only: bool = False):
+        """
+        Save batches into database, all data of same type are saved in
+        one call to use bulk write of database manager.
+        """
+        for task_type, buffers in self.buffers.items():
+            datas = []
+
+            for vt_symbol, buffer in list(buffers.items()):
+                if full_only and len(buffer) < self.batch_size:
+                    continue
+
+                buffers.pop(vt_symbol)
+                self.buffer_count -= len(buffer)
+
+                # Keep last data of same datetime
+                datas.extend({data.datetime: data for data in buffer}.values())
+
+            if datas:
+                self.save(task_type, datas)
+
+    def save(self, task_type: str, datas: list) -> bool:
+        """
+        Save data into database, or spill into local file if database
+        is not available or backlog is too large.
+        """
+        if time() < self.retry_time or self.queue.qsize() > self.max_backlog:
+            self.spill(task_type, datas)
+            return False
+
+        start = perf_counter_ns()
+
+        try:
+            if task_type == "tick":
+                database_manager.save_tick_data(datas)
+            else:
+                database_manager.save_bar_data(datas)
+        except Exception as e:
+            self.retry_time = time() + self.retry_interval
+            self.spill(task_type, datas)
+            self.write_log(f"数据库写入失败，{len(datas)}条数据转存本地文件：{e}")
+            return False
+
+        self.flush_latency.record(perf_counter_ns() - start)
+        self.flush_count += 1
+        self.saved_count += len(datas)
+        return True
+
+    def spill(self, task_type: str, datas: list):
+        """
+        Append data into local spill file.
+        """
+        with open(self.spill_path, "ab") as f:
+            pickle.dump((task_type, datas), f, pickle.HIGHEST_PROTOCOL)
+
+        self.spill_count += len(datas)
+
+    def replay(self):
+        """
+        Save spilled data into database after it recovered. Data left
+        by last run are also replayed after start.
+        """
+        if time() < self.retry_time or self.queue.qsize() > self.batch_size:
+            return
+
+        if not self.replay_path.exists():
+            if not self.spill_path.exists():
+                return
+            self.spill_path.replace(self.replay_path)
+            self.spill_count = 0
+
+        with open(self.replay_path, "rb") as f:
+            while True:
+                try:
+                    task_type, datas = pickle.load(f)
+                except EOFError:
+                    break
+                except Exception as e:
+                    self.write_log(f"本地转存文件读取失败：{e}")
+                    break
+
+                # Stop replay if database failed or new data is coming
+                if self.queue.qsize() > self.batch_size:
+                    self.spill(task_type, datas)
+                elif self.save(task_type, datas):
+                    continue
+
+                for task_type, datas in load_records(f):
+                    self.spill(task_type, datas)
+                break
+
+        self.replay_path.unlink()
+
+    def get_statistics(self) -> dict:
+        """
+        Get backlog gauge and flush latency of recorder.
+        """
+        return {
+            "queue": self.queue.qsize(),
+            "buffered": self.buffer_count,
+            "spilled": self.spill_count,
+            "saved": self.saved_count,
+            "flush": self.flush_latency.get_summary(),
+        }
+
+    def put_status_event(self):
+        """"""
+        event = Event(EVENT_RECORDER_STATUS, self.get_statistics())
+        self.event_engine.put(event)
+
     def close(self):
         """"""
         self.active = False
 
-        if self.thread.isAlive():
+        if self.thread.is_alive():
             self.thread.join()
 
+        # Save all remaining data before exit
+        while not self.queue.empty():
+            self.drain(0.01)
+            self.flush(full_only=True)
+        self.flush()
+
     def start(self):
         """"""
         self.active = True
@@ -268,3 +448,19 @@ class RecorderEngine(BaseEngine):
             exchange=contract.exchange
         )
         self.main_engine.subscribe(req, contract.gateway_name)
+
+
+def load_records(f) -> List[tuple]:
+    """
+    Load remaining records of spill file, a truncated record at the end
+    is ignored.
+    """
+    records = []
+
+    while True:
+        try:
+            records.append(pickle.load(f))
+        except Exception:
+            break
+
+    return records
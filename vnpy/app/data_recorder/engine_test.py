@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+from time import monotonic, sleep
+from types import SimpleNamespace
+
+import pytest
+
+from vnpy.app.data_recorder import engine as engine_module
+from vnpy.app.data_recorder.engine import (
+    EVENT_RECORDER_LOG,
+    EVENT_RECORDER_STATUS,
+    RecorderEngine,
+    load_records
+)
+from vnpy.trader.constant import Exchange
+from vnpy.trader.object import TickData
+from vnpy.trader.setting import SETTINGS
+
+
+class FakeDatabase:
+
+    def __init__(self):
+        self.fail = True
+        self.ticks = []
+
+    def save_tick_data(self, datas):
+        if self.fail:
+            raise ConnectionError("database down")
+        self.ticks.extend(datas)
+
+
+class FakeEventEngine:
+
+    def __init__(self):
+        self.events = []
+
+    def register(self, type, handler):
+        pass
+
+    def put(self, event):
+        self.events.append(event)
+
+    def get_data(self, type: str) -> list:
+        return [event.data for event in list(self.events) if event.type == type]
+
+
+@pytest.fixture
+def database(monkeypatch, tmp_path):
+    database = FakeDatabase()
+
+    monkeypatch.setattr(engine_module, "database_manager", database)
+    monkeypatch.setattr(engine_module, "get_folder_path", lambda name: tmp_path)
+    monkeypatch.setattr(engine_module, "load_json", lambda filename: {})
+    monkeypatch.setitem(SETTINGS, "recorder.flush_interval", 0.05)
+    monkeypatch.setitem(SETTINGS, "recorder.retry_interval", 60)
+
+    return database
+
+
+def create_engine():
+    event_engine = FakeEventEngine()
+    engine = RecorderEngine(SimpleNamespace(), event_engine)
+    return engine, event_engine
+
+
+def wait_until(condition, timeout: float = 5) -> bool:
+    end = monotonic() + timeout
+    while monotonic() < end:
+        if condition():
+            return True
+        sleep(0.01)
+    return False
+
+
+def create_ticks(count: int) -> list:
+    start = datetime(2020, 1, 2, 9, 30)
+    return [
+        TickData(
+            symbol="rb2101",
+            exchange=Exchange.SHFE,
+            datetime=start + timedelta(seconds=i),
+            last_price=4000 + i,
+            gateway_name="CTP"
+        )
+        for i in range(count)
+    ]
+
+
+def test_spill_and_replay(database):
+    engine, event_engine = create_engine()
+    engine.tick_recordings["rb2101.SHFE"] = {}
+
+    ticks = create_ticks(50)
+    for tick in ticks:
+        engine.update_tick(tick)
+
+    # Failed flush is saved into spill file
+    assert wait_until(lambda: engine.spill_count == 50)
+    engine.close()
+
+    assert not database.ticks
+    assert engine.spill_path.exists()
+    assert engine.retry_time
+
+    with open(engine.spill_path, "rb") as f:
+        records = load_records(f)
+    assert [task_type for task_type, _ in records] == ["tick"]
+    assert records[0][1] == ticks
+
+    logs = event_engine.get_data(EVENT_RECORDER_LOG)
+    assert any("database down" in msg for msg in logs)
+
+    statuses = event_engine.get_data(EVENT_RECORDER_STATUS)
+    assert statuses[-1]["spilled"] == 50
+    assert statuses[-1]["saved"] == 0
+
+    # Spilled data replayed after restart with database recovered
+    database.fail = False
+    engine, event_engine = create_engine()
+
+    assert wait_until(lambda: len(database.ticks) == 50)
+    assert database.ticks == ticks
+
+    assert wait_until(lambda: any(
+        status["saved"] == 50 for status in event_engine.get_data(EVENT_RECORDER_STATUS)
+    ))
+    engine.close()
+
+    status = event_engine.get_data(EVENT_RECORDER_STATUS)[-1]
+    assert status["spilled"] == 0
+    assert status["flush"]["count"] == 1
+    assert not engine.spill_path.exists()
+    assert not engine.replay_path.exists()
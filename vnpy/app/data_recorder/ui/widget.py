@@ -10,7 +10,8 @@ from ..engine import (
     APP_NAME,
     EVENT_RECORDER_LOG,
     EVENT_RECORDER_UPDATE,
-    EVENT_RECORDER_EXCEPTION
+    EVENT_RECORDER_EXCEPTION,
+    EVENT_RECORDER_STATUS
 )
 
 
@@ -21,6 +22,7 @@ class RecorderManager(QtWidgets.QWidget):
     signal_update = QtCore.pyqtSignal(Event)
     signal_contract = QtCore.pyqtSignal(Event)
     signal_exception = QtCore.pyqtSignal(Event)
+    signal_status = QtCore.pyqtSignal(Event)
 
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine):
         super().__init__()
@@ -73,6 +75,8 @@ class RecorderManager(QtWidgets.QWidget):
         self.log_edit = QtWidgets.QTextEdit()
         self.log_edit.setReadOnly(True)
 
+        self.status_label = QtWidgets.QLabel()
+
         # Set layout
         grid = QtWidgets.QGridLayout()
         grid.addWidget(QtWidgets.QLabel("K线记录"), 0, 0)
@@ -95,6 +99,7 @@ class RecorderManager(QtWidgets.QWidget):
         grid2.addWidget(self.bar_recording_edit, 1, 0)
         grid2.addWidget(self.tick_recording_edit, 1, 1)
         grid2.addWidget(self.log_edit, 2, 0, 1, 2)
+        grid2.addWidget(self.status_label, 3, 0, 1, 2)
 
         vbox = QtWidgets.QVBoxLayout()
         vbox.addLayout(hbox)
@@ -107,6 +112,7 @@ class RecorderManager(QtWidgets.QWidget):
         self.signal_contract.connect(self.process_contract_event)
         self.signal_update.connect(self.process_update_event)
         self.signal_exception.connect(self.process_exception_event)
+        self.signal_status.connect(self.process_status_event)
 
         self.event_engine.register(EVENT_CONTRACT, self.signal_contract.emit)
         self.event_engine.register(
@@ -114,6 +120,7 @@ class RecorderManager(QtWidgets.QWidget):
         self.event_engine.register(
             EVENT_RECORDER_UPDATE, self.signal_update.emit)
         self.event_engine.register(EVENT_RECORDER_EXCEPTION, self.signal_exception.emit)
+        self.event_engine.register(EVENT_RECORDER_STATUS, self.signal_status.emit)
 
     def process_log_event(self, event: Event):
         """"""
@@ -141,6 +148,17 @@ class RecorderManager(QtWidgets.QWidget):
         model = self.symbol_completer.model()
         model.setStringList(self.vt_symbols)
 
+    def process_status_event(self, event: Event):
+        """"""
+        data = event.data
+        flush = data["flush"]
+
+        self.status_label.setText(
+            f"队列：{data['queue']}    缓存：{data['buffered']}    "
+            f"本地转存：{data['spilled']}    已写入：{data['saved']}    "
+            f"写入耗时(ms) p50：{flush['p50'] / 1000:.1f}  p99：{flush['p99'] / 1000:.1f}"
+        )
+
     def process_exception_event(self, event: Event):
         """"""
         exc_info = event.data
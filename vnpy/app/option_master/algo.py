@@ -260,6 +260,9 @@ class ElectronicEyeAlgo:
         """"""
         option = self.option
 
+        # Greeks are not updated by tick until calculated
+        self.algo_engine.calculate_option(option)
+
         # Get ref price
         self.pricing_impv = option.pricing_impv
         ref_price = option.calculate_ref_price()
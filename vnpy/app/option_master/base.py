@@ -2,6 +2,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Callable
 from types import ModuleType
 
+import numpy as np
+
 from vnpy.trader.object import ContractData, TickData, TradeData
 from vnpy.trader.constant import Exchange, OptionType, Direction, Offset
 from vnpy.trader.converter import PositionHolding
@@ -12,6 +14,7 @@ from .time import calculate_days_to_expiry, ANNUAL_DAYS
 APP_NAME = "OptionMaster"
 
 EVENT_OPTION_NEW_PORTFOLIO = "eOptionNewPortfolio"
+EVENT_OPTION_PORTFOLIO_CALCULATED = "eOptionPortfolioCalculated"
 EVENT_OPTION_ALGO_PRICING = "eOptionAlgoPricing"
 EVENT_OPTION_ALGO_TRADING = "eOptionAlgoTrading"
 EVENT_OPTION_ALGO_STATUS = "eOptionAlgoStatus"
@@ -266,8 +269,6 @@ class OptionData(InstrumentData):
             self.days_to_expiry = self.option_expiry - current_dt
             self.time_to_expiry = self.days_to_expiry / timedelta(365)
 
-        self.calculate_option_impv()
-
     def update_trade(self, trade: TradeData) -> None:
         """"""
         super().update_trade(trade)
@@ -325,7 +326,7 @@ class UnderlyingData(InstrumentData):
 
         self.cash_delta = self.size * self.mid_price / 100
         for chain in self.chains.values():
-            chain.update_underlying_tick()
+            chain.underlying_dirty = True
 
         self.calculate_pos_greeks()
 
@@ -372,6 +373,14 @@ class ChainData:
         self.days_to_expiry: int = 0
         self.inverse: bool = False
 
+        # Pricing model with array functions calculates whole chain at once
+        self.pricing_model: ModuleType = None
+        self.array_pricing: bool = False
+
+        # Ticks received since last calculation
+        self.underlying_dirty: bool = False
+        self.dirty_options: Dict[str, OptionData] = {}
+
     def add_option(self, option: OptionData) -> None:
         """"""
         self.options[option.vt_symbol] = option
@@ -425,15 +434,160 @@ class ChainData:
         option = self.options[tick.vt_symbol]
         option.update_tick(tick)
 
+        self.dirty_options[option.vt_symbol] = option
+
+    def calculate(self) -> bool:
+        """
+        Calculate options with tick received since last calculation, or
+        all options if underlying tick received. Return False if nothing
+        to calculate.
+        """
+        if not self.underlying:
+            self.dirty_options.clear()
+            return False
+
+        if self.underlying_dirty:
+            self.update_underlying_tick()
+        elif self.dirty_options:
+            self.calculate_options(list(self.dirty_options.values()))
+            self.calculate_pos_greeks()
+        else:
+            return False
+
+        self.underlying_dirty = False
+        self.dirty_options.clear()
+        return True
+
     def update_underlying_tick(self) -> None:
         """"""
         self.calculate_underlying_adjustment()
 
-        for option in self.options.values():
-            option.update_underlying_tick(self.underlying_adjustment)
+        if self.array_pricing:
+            self.calculate_chain()
+        else:
+            for option in self.options.values():
+                option.update_underlying_tick(self.underlying_adjustment)
 
         self.calculate_pos_greeks()
 
+    def calculate_chain(self) -> None:
+        """
+        Calculate implied volatility and greeks of all options in chain
+        with array functions of pricing model, which is same as calling
+        update_underlying_tick of every option.
+        """
+        options = self.options.values()
+        for option in options:
+            option.underlying_adjustment = self.underlying_adjustment
+
+        self.calculate_options(options)
+
+    def calculate_options(self, options: List[OptionData]) -> None:
+        """
+        Calculate implied volatility and greeks of options with current
+        underlying adjustment.
+        """
+        if not self.array_pricing:
+            for option in options:
+                option.update_underlying_tick(self.underlying_adjustment)
+            return
+
+        underlying_price = self.underlying.mid_price
+        quoted = [option for option in options if option.tick]
+
+        if underlying_price and quoted:
+            underlying_price += self.underlying_adjustment
+            self.calculate_quoted_options(quoted, underlying_price)
+
+        # Pos greeks of options without position are always 0
+        for option in options:
+            if option.net_pos:
+                option.calculate_pos_greeks()
+
+    def calculate_quoted_options(
+        self,
+        quoted: List[OptionData],
+        underlying_price: float
+    ) -> None:
+        """"""
+        model = self.pricing_model
+        count = len(quoted)
+
+        data = np.array([
+            (
+                option.tick.ask_price_1,
+                option.tick.bid_price_1,
+                option.ask_impv,
+                option.bid_impv,
+                option.strike_price,
+                option.interest_rate,
+                option.time_to_expiry,
+                option.option_type,
+                option.size
+            )
+            for option in quoted
+        ])
+        strikes, rates, times, types, sizes = data[:, 4:].T
+
+        # Adjustment for crypto inverse option contract
+        prices = data[:, :2].T.ravel()
+        if self.inverse:
+            prices = prices * underlying_price
+            sizes = sizes / underlying_price
+
+        # Implied volatility of ask and bid price solved together, with
+        # result of last calculation as initial guess
+        impvs = model.calculate_impv_array(
+            prices,
+            underlying_price,
+            np.tile(strikes, 2),
+            np.tile(rates, 2),
+            np.tile(times, 2),
+            np.tile(types, 2),
+            data[:, 2:4].T.ravel()
+        )
+        ask_impvs = impvs[:count]
+        bid_impvs = impvs[count:]
+        mid_impvs = (ask_impvs + bid_impvs) / 2
+
+        for option, ask_impv, bid_impv, mid_impv in zip(
+            quoted,
+            ask_impvs.tolist(),
+            bid_impvs.tolist(),
+            mid_impvs.tolist()
+        ):
+            option.ask_impv = ask_impv
+            option.bid_impv = bid_impv
+            option.mid_impv = mid_impv
+
+        # Cash greeks only calculated for options with implied volatility
+        ix = np.flatnonzero(mid_impvs)
+        if not len(ix):
+            return
+
+        _, deltas, gammas, thetas, vegas = model.calculate_greeks_array(
+            underlying_price,
+            strikes[ix],
+            rates[ix],
+            times[ix],
+            mid_impvs[ix],
+            types[ix]
+        )
+        sizes = sizes[ix]
+
+        for i, cash_delta, cash_gamma, cash_theta, cash_vega in zip(
+            ix.tolist(),
+            (deltas * sizes).tolist(),
+            (gammas * sizes).tolist(),
+            (thetas * sizes).tolist(),
+            (vegas * sizes).tolist()
+        ):
+            option = quoted[i]
+            option.cash_delta = cash_delta
+            option.cash_gamma = cash_gamma
+            option.cash_theta = cash_theta
+            option.cash_vega = cash_vega
+
     def update_trade(self, trade: TradeData) -> None:
         """"""
         option = self.options[trade.vt_symbol]
@@ -476,6 +630,12 @@ class ChainData:
 
     def set_pricing_model(self, pricing_model: ModuleType) -> None:
         """"""
+        self.pricing_model = pricing_model
+        self.array_pricing = (
+            hasattr(pricing_model, "calculate_impv_array")
+            and hasattr(pricing_model, "calculate_greeks_array")
+        )
+
         for option in self.options.values():
             option.set_pricing_model(pricing_model)
 
@@ -557,6 +717,10 @@ class PortfolioData:
         # Greeks decimals precision
         self.precision: int = 0
 
+        # Ticks only mark instruments dirty, greeks are updated by calculate
+        self.underlying_dirty: bool = False
+        self.dirty_chains: Dict[str, ChainData] = {}
+
     def calculate_pos_greeks(self) -> None:
         """"""
         self.long_pos = 0
@@ -589,11 +753,31 @@ class PortfolioData:
             option = self.options[tick.vt_symbol]
             chain = option.chain
             chain.update_tick(tick)
-            self.calculate_pos_greeks()
+            self.dirty_chains[chain.chain_symbol] = chain
         elif tick.vt_symbol in self.underlyings:
             underlying = self.underlyings[tick.vt_symbol]
             underlying.update_tick(tick)
-            self.calculate_pos_greeks()
+            self.underlying_dirty = True
+
+            for chain in underlying.chains.values():
+                self.dirty_chains[chain.chain_symbol] = chain
+
+    def calculate(self) -> bool:
+        """
+        Calculate chains with tick received since last calculation and
+        then portfolio pos greeks. Return False if nothing to calculate.
+        """
+        if not self.dirty_chains and not self.underlying_dirty:
+            return False
+
+        for chain in self.dirty_chains.values():
+            chain.calculate()
+
+        self.calculate_pos_greeks()
+
+        self.dirty_chains.clear()
+        self.underlying_dirty = False
+        return True
 
     def update_trade(self, trade: TradeData) -> None:
         """"""
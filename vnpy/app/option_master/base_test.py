@@ -0,0 +1,108 @@
+import pytest
+
+from vnpy.app.option_master.pricing import black_76
+from vnpy.app.option_master.pricing.pricing_test import create_portfolio, create_tick
+
+
+def create_option_ticks(portfolio, s: float, volatility: float) -> list:
+    ticks = []
+
+    for option in portfolio.options.values():
+        price = black_76.calculate_price(
+            s,
+            option.strike_price,
+            0.03,
+            option.time_to_expiry,
+            volatility,
+            option.option_type
+        )
+        if price > 1:
+            ticks.append(create_tick(option.symbol, price - 0.4, price + 0.4))
+
+    return ticks
+
+
+def init_portfolio():
+    portfolio = create_portfolio(20)
+    portfolio.set_pricing_model(black_76)
+    portfolio.set_interest_rate(0.03)
+    return portfolio
+
+
+def test_tick_only_marks_dirty():
+    portfolio = init_portfolio()
+    chain = portfolio.chains["IO.CFFEX"]
+
+    tick = create_option_ticks(portfolio, 3000, 0.25)[0]
+    portfolio.update_tick(tick)
+    portfolio.update_tick(create_tick("IF", 2999.8, 3000.2))
+
+    option = portfolio.options[tick.vt_symbol]
+    assert option.tick is tick
+    assert not option.mid_impv
+    assert chain.underlying_dirty
+    assert tick.vt_symbol in chain.dirty_options
+    assert portfolio.dirty_chains == {chain.chain_symbol: chain}
+
+    assert portfolio.calculate()
+    assert option.mid_impv == pytest.approx(0.25, abs=0.01)
+    assert not chain.underlying_dirty
+    assert not chain.dirty_options
+    assert not portfolio.dirty_chains
+
+    # Nothing to calculate without new tick
+    assert not portfolio.calculate()
+
+
+def test_dirty_options_match_full_calculation():
+    portfolio = init_portfolio()
+    expected = init_portfolio()
+
+    for tick in create_option_ticks(portfolio, 3000, 0.25):
+        portfolio.update_tick(tick)
+        expected.update_tick(tick)
+
+    underlying_tick = create_tick("IF", 2999.8, 3000.2)
+    portfolio.update_tick(underlying_tick)
+    portfolio.calculate()
+
+    # Only options with new tick calculated after underlying unchanged
+    ticks = create_option_ticks(portfolio, 3000, 0.3)[::3]
+    for tick in ticks:
+        portfolio.update_tick(tick)
+        expected.update_tick(tick)
+
+    chain = portfolio.chains["IO.CFFEX"]
+    assert len(chain.dirty_options) == len(ticks)
+    assert not chain.underlying_dirty
+
+    portfolio.calculate()
+
+    expected.update_tick(underlying_tick)
+    expected.calculate()
+
+    for vt_symbol, option in expected.options.items():
+        result = portfolio.options[vt_symbol]
+        assert result.mid_impv == option.mid_impv
+        assert result.cash_vega == pytest.approx(option.cash_vega)
+
+    for tick in ticks:
+        assert portfolio.options[tick.vt_symbol].mid_impv == pytest.approx(0.3, abs=0.01)
+
+
+def test_pos_greeks_aggregated_on_calculate():
+    portfolio = init_portfolio()
+
+    tick = create_option_ticks(portfolio, 3000, 0.25)[0]
+    option = portfolio.options[tick.vt_symbol]
+    option.long_pos = 2
+    option.calculate_net_pos()
+
+    portfolio.update_tick(create_tick("IF", 2999.8, 3000.2))
+    portfolio.update_tick(tick)
+    assert not portfolio.pos_vega
+
+    portfolio.calculate()
+    assert option.cash_vega
+    assert portfolio.net_pos == 2
+    assert portfolio.pos_vega == pytest.approx(option.cash_vega * 2)
@@ -1,8 +1,9 @@
 """"""
 
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Set
 from copy import copy
 from collections import defaultdict
+from time import perf_counter, perf_counter_ns
 
 from vnpy.trader.object import (
     LogData, ContractData, TickData,
@@ -10,6 +11,7 @@ from vnpy.trader.object import (
     SubscribeRequest, OrderRequest
 )
 from vnpy.event import Event, EventEngine
+from vnpy.event.metrics import LatencyHistogram
 from vnpy.trader.engine import BaseEngine, MainEngine
 from vnpy.trader.event import (
     EVENT_TRADE, EVENT_TICK, EVENT_CONTRACT,
@@ -23,29 +25,25 @@ from vnpy.trader.utility import round_to, save_json, load_json
 
 from .base import (
     APP_NAME, CHAIN_UNDERLYING_MAP,
-    EVENT_OPTION_NEW_PORTFOLIO,
+    EVENT_OPTION_NEW_PORTFOLIO, EVENT_OPTION_PORTFOLIO_CALCULATED,
     EVENT_OPTION_ALGO_PRICING, EVENT_OPTION_ALGO_TRADING,
     EVENT_OPTION_ALGO_STATUS, EVENT_OPTION_ALGO_LOG,
-    InstrumentData, PortfolioData
+    InstrumentData, PortfolioData, ChainData, OptionData
 )
-try:
-    from .pricing import black_76_cython as black_76
-    from .pricing import binomial_tree_cython as binomial_tree
-    from .pricing import black_scholes_cython as black_scholes
-except ImportError:
-    from .pricing import (
-        black_76, binomial_tree, black_scholes
-    )
-    print("Faile to import cython option pricing model, please rebuild with cython in cmd.")
+from .pricing import load_model
 from .algo import ElectronicEyeAlgo
 
 
+# Cython version of models is used if built, otherwise python version
 PRICING_MODELS = {
-    "Black-76 欧式期货期权": black_76,
-    "Black-Scholes 欧式股票期权": black_scholes,
-    "二叉树 美式期货期权": binomial_tree
+    "Black-76 欧式期货期权": load_model("black_76"),
+    "Black-Scholes 欧式股票期权": load_model("black_scholes"),
+    "二叉树 美式期货期权": load_model("binomial_tree")
 }
 
+# Seconds between two greeks calculations triggered by ticks
+CALCULATE_INTERVAL = 0.2
+
 
 class OptionEngine(BaseEngine):
     """"""
@@ -72,6 +70,14 @@ class OptionEngine(BaseEngine):
 
         self.setting: Dict = {}
 
+        # Portfolios with tick received since last calculation
+        self.dirty_portfolios: Dict[str, PortfolioData] = {}
+        self.calculate_interval: float = CALCULATE_INTERVAL
+        self.last_calculate: float = 0
+
+        self.calculate_latency: LatencyHistogram = LatencyHistogram()
+        self.calculate_count: int = 0
+
         self.load_setting()
         self.register_event()
 
@@ -83,6 +89,9 @@ class OptionEngine(BaseEngine):
     def load_setting(self) -> None:
         """"""
         self.setting = load_json(self.setting_filename)
+        self.calculate_interval = self.setting.get(
+            "calculate_interval", CALCULATE_INTERVAL
+        )
 
     def save_setting(self) -> None:
         """
@@ -171,6 +180,10 @@ class OptionEngine(BaseEngine):
             return
 
         portfolio.update_tick(tick)
+        self.dirty_portfolios[portfolio.name] = portfolio
+
+        if perf_counter() - self.last_calculate >= self.calculate_interval:
+            self.calculate_all()
 
     def process_order_event(self, event: Event) -> None:
         """"""
@@ -212,6 +225,10 @@ class OptionEngine(BaseEngine):
 
     def process_timer_event(self, event: Event) -> None:
         """"""
+        # Calculate portfolios not calculated after their last tick
+        if self.dirty_portfolios:
+            self.calculate_all()
+
         self.timer_count += 1
         if self.timer_count < self.timer_trigger:
             return
@@ -220,6 +237,78 @@ class OptionEngine(BaseEngine):
         for portfolio in self.active_portfolios.values():
             portfolio.calculate_atm_price()
 
+    def calculate_all(self) -> None:
+        """
+        Calculate greeks of all portfolios with tick received since last
+        calculation.
+        """
+        start = perf_counter_ns()
+
+        portfolios = list(self.dirty_portfolios.values())
+        self.dirty_portfolios.clear()
+
+        for portfolio in portfolios:
+            portfolio.calculate()
+
+        self.record_calculate(start)
+        self.last_calculate = perf_counter()
+
+        for portfolio in portfolios:
+            self.put_calculated_event(portfolio)
+
+    def calculate_portfolio(self, portfolio_name: str) -> None:
+        """
+        Calculate greeks of portfolio immediately if it has tick received
+        since last calculation.
+        """
+        portfolio = self.dirty_portfolios.pop(portfolio_name, None)
+        if not portfolio:
+            return
+
+        start = perf_counter_ns()
+        portfolio.calculate()
+        self.record_calculate(start)
+
+        self.put_calculated_event(portfolio)
+
+    def put_calculated_event(self, portfolio: PortfolioData) -> None:
+        """
+        Notify monitors to refresh prices and greeks of portfolio.
+        """
+        event = Event(EVENT_OPTION_PORTFOLIO_CALCULATED, portfolio.name)
+        self.event_engine.put(event)
+
+    def calculate_chain(self, chain: ChainData) -> None:
+        """
+        Calculate greeks of options in chain immediately, portfolio pos
+        greeks are still updated in next calculation.
+        """
+        start = perf_counter_ns()
+        if chain.calculate():
+            self.record_calculate(start)
+
+    def record_calculate(self, start: int) -> None:
+        """"""
+        self.calculate_latency.record(perf_counter_ns() - start)
+        self.calculate_count += 1
+
+    def get_calculate_metrics(self) -> Dict[str, Any]:
+        """
+        Get count and latency (in nanoseconds) of greeks calculation.
+        """
+        return {
+            "count": self.calculate_count,
+            "dirty": len(self.dirty_portfolios),
+            "calculate": self.calculate_latency.get_summary(),
+        }
+
+    def set_calculate_interval(self, calculate_interval: float) -> None:
+        """"""
+        self.calculate_interval = calculate_interval
+
+        self.setting["calculate_interval"] = calculate_interval
+        self.save_setting()
+
     def get_portfolio(self, portfolio_name: str) -> PortfolioData:
         """"""
         portfolio = self.portfolios.get(portfolio_name, None)
@@ -433,6 +522,7 @@ class OptionHedgeEngine:
         delta_min = self.delta_target - self.delta_range
 
         # Do nothing if portfolio delta is in the allowed range
+        self.option_engine.calculate_portfolio(self.portfolio_name)
         portfolio = self.option_engine.get_portfolio(self.portfolio_name)
         if delta_min <= portfolio.pos_delta <= delta_max:
             return
@@ -670,6 +760,10 @@ class OptionAlgoEngine:
         req = order.create_cancel_request()
         self.main_engine.cancel_order(req, order.gateway_name)
 
+    def calculate_option(self, option: OptionData) -> None:
+        """"""
+        self.option_engine.calculate_chain(option.chain)
+
     def write_algo_log(self, algo: ElectronicEyeAlgo, msg: str) -> None:
         """"""
         msg = f"[{algo.vt_symbol}] {msg}"
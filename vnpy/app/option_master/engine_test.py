@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+from vnpy.event import Event
+from vnpy.trader.constant import Exchange
+from vnpy.trader.event import EVENT_TICK, EVENT_TIMER
+from vnpy.trader.object import TickData
+
+from vnpy.app.option_master import engine as engine_module
+from vnpy.app.option_master.base import EVENT_OPTION_PORTFOLIO_CALCULATED
+from vnpy.app.option_master.engine import OptionEngine
+
+
+class FakeEventEngine:
+
+    def __init__(self):
+        self.events = []
+
+    def register(self, type, handler):
+        pass
+
+    def put(self, event):
+        self.events.append(event)
+
+    def get_data(self, type: str) -> list:
+        return [event.data for event in self.events if event.type == type]
+
+
+class FakePortfolio:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calculate_count = 0
+
+    def update_tick(self, tick: TickData) -> None:
+        pass
+
+    def calculate(self) -> None:
+        self.calculate_count += 1
+
+
+def create_engine(monkeypatch):
+    monkeypatch.setattr(engine_module, "load_json", lambda filename: {})
+
+    event_engine = FakeEventEngine()
+    engine = OptionEngine(SimpleNamespace(), event_engine)
+
+    portfolio = FakePortfolio("IO.CFFEX")
+    for vt_symbol in ["IO2101-C-5000.CFFEX", "IO2101-P-5000.CFFEX"]:
+        engine.instruments[vt_symbol] = SimpleNamespace(portfolio=portfolio)
+
+    return engine, event_engine, portfolio
+
+
+def create_tick_event(vt_symbol: str) -> Event:
+    symbol, exchange = vt_symbol.split(".")
+    tick = TickData(
+        symbol=symbol,
+        exchange=Exchange(exchange),
+        datetime=None,
+        gateway_name="CTP"
+    )
+    return Event(EVENT_TICK, tick)
+
+
+def test_calculated_event(monkeypatch):
+    engine, event_engine, portfolio = create_engine(monkeypatch)
+    engine.calculate_interval = 60
+
+    # First tick calculated immediately, later ones only marked dirty
+    engine.process_tick_event(create_tick_event("IO2101-C-5000.CFFEX"))
+    engine.process_tick_event(create_tick_event("IO2101-P-5000.CFFEX"))
+
+    assert portfolio.calculate_count == 1
+    assert event_engine.get_data(EVENT_OPTION_PORTFOLIO_CALCULATED) == ["IO.CFFEX"]
+    assert engine.get_calculate_metrics()["dirty"] == 1
+
+    # Dirty portfolio calculated and published by timer
+    engine.process_timer_event(Event(EVENT_TIMER))
+
+    assert portfolio.calculate_count == 2
+    assert event_engine.get_data(EVENT_OPTION_PORTFOLIO_CALCULATED) == ["IO.CFFEX"] * 2
+    assert engine.get_calculate_metrics()["dirty"] == 0
+
+    # Nothing published without new tick
+    engine.process_timer_event(Event(EVENT_TIMER))
+    engine.calculate_portfolio("IO.CFFEX")
+    assert portfolio.calculate_count == 2
+
+    engine.process_tick_event(create_tick_event("IO2101-C-5000.CFFEX"))
+    engine.calculate_portfolio("IO.CFFEX")
+
+    assert portfolio.calculate_count == 3
+    assert event_engine.get_data(EVENT_OPTION_PORTFOLIO_CALCULATED) == ["IO.CFFEX"] * 3
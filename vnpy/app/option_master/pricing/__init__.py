@@ -0,0 +1,63 @@
+"""
+Option pricing models.
+
+Every model has a pure python version (e.g. black_76) and a cython
+version (e.g. black_76_cython) compiled from source in cython_model,
+which is optional. Use load_model to get a model with the fastest
+scalar functions available, and array functions of python version.
+"""
+
+from importlib import import_module
+from types import ModuleType
+
+
+MODEL_NAMES = ["black_76", "black_scholes", "binomial_tree"]
+
+BACKEND_CYTHON = "cython"
+BACKEND_PYTHON = "python"
+
+
+def load_cython_model(name: str) -> ModuleType:
+    """
+    Import cython version of model, return None if not built for current
+    platform and python version.
+    """
+    try:
+        return import_module(f"{__name__}.{name}_cython")
+    except ImportError:
+        return None
+
+
+def load_model(name: str, backend: str = "") -> ModuleType:
+    """
+    Load pricing model with scalar functions of given backend. Cython
+    backend is used if available when backend is not specified, and
+    ImportError is raised if cython backend is required but not built.
+
+    The backend used is saved as attribute "backend" of model returned.
+    """
+    python_model = import_module(f"{__name__}.{name}")
+
+    cython_model = None
+    if backend != BACKEND_PYTHON:
+        cython_model = load_cython_model(name)
+
+        if not cython_model and backend == BACKEND_CYTHON:
+            raise ImportError(f"Cython version of {name} is not built")
+
+    model = ModuleType(python_model.__name__, python_model.__doc__)
+    model.__dict__.update(
+        (key, value) for key, value in vars(python_model).items()
+        if not key.startswith("__")
+    )
+
+    if cython_model:
+        model.__dict__.update(
+            (key, value) for key, value in vars(cython_model).items()
+            if key.startswith("calculate_")
+        )
+        model.backend = BACKEND_CYTHON
+    else:
+        model.backend = BACKEND_PYTHON
+
+    return model
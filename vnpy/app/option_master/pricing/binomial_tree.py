@@ -1,6 +1,10 @@
 from numpy import zeros, ndarray
 from math import exp, sqrt
-from typing import Tuple
+from typing import List, Tuple
+
+import numpy as np
+
+from .solver import solve_impv, guess_impv
 
 
 DEFAULT_STEP = 15
@@ -257,3 +261,167 @@ def calculate_impv(
     v = round(v, 4)
 
     return v
+
+
+def calculate_tree_array(
+    f: ndarray,
+    k: ndarray,
+    r: ndarray,
+    t: ndarray,
+    v: ndarray,
+    cp: ndarray,
+    n: int = DEFAULT_STEP
+) -> Tuple[List[ndarray], List[ndarray], ndarray]:
+    """
+    Calculate binomial trees of options in arrays together, and return
+    option and underlying prices of first 3 steps, and time of a step.
+
+    Node j of step i is column j of array i, same as option_tree[j, i]
+    of generate_tree.
+    """
+    f, k, t, v, cp = (
+        np.asarray(a, dtype=float).reshape(-1, 1)
+        for a in np.broadcast_arrays(f, k, t, v, cp)
+    )
+
+    dt = t / n
+    u = np.exp(v * np.sqrt(dt))
+    d = 1 / u
+    p1 = (1 - d) / (u - d)
+    p2 = 1 - p1
+
+    # Underlying price of node j at step i is f * u^(i-j) * d^j
+    powers = np.arange(n, -n - 1, -2)
+    underlying = f * u ** powers
+    option = np.maximum(0, cp * (underlying - k))
+
+    option_steps = [None] * 3
+    underlying_steps = [None] * 3
+
+    for i in range(n - 1, -1, -1):
+        underlying = underlying[:, :-1] * d
+        option = np.maximum(
+            p1 * option[:, :-1] + p2 * option[:, 1:],
+            cp * (underlying - k)
+        )
+
+        if i < 3:
+            option_steps[i] = option
+            underlying_steps[i] = underlying
+
+    return option_steps, underlying_steps, dt[:, 0]
+
+
+def calculate_price_array(
+    f: ndarray,
+    k: ndarray,
+    r: ndarray,
+    t: ndarray,
+    v: ndarray,
+    cp: ndarray,
+    n: int = DEFAULT_STEP
+) -> ndarray:
+    """Calculate option price of arrays"""
+    f, k, v, cp = (np.ravel(a) for a in np.broadcast_arrays(f, k, v, cp))
+
+    with np.errstate(all="ignore"):
+        option_steps, _, _ = calculate_tree_array(f, k, r, t, v, cp, n)
+        price = option_steps[0][:, 0]
+
+    # Return option space value if volatility not positive
+    return np.where(v > 0, price, np.maximum(0, cp * (f - k)))
+
+
+def calculate_original_vega_array(
+    f: ndarray,
+    k: ndarray,
+    r: ndarray,
+    t: ndarray,
+    v: ndarray,
+    cp: ndarray,
+    n: int = DEFAULT_STEP
+) -> ndarray:
+    """Calculate option vega of arrays"""
+    price_1 = calculate_price_array(f, k, r, t, v, cp, n)
+    price_2 = calculate_price_array(f, k, r, t, v * 1.001, cp, n)
+    return (price_2 - price_1) / (v * 0.001)
+
+
+def calculate_greeks_array(
+    f: ndarray,
+    k: ndarray,
+    r: ndarray,
+    t: ndarray,
+    v: ndarray,
+    cp: ndarray,
+    n: int = DEFAULT_STEP,
+    annual_days: int = 240
+) -> Tuple[ndarray, ndarray, ndarray, ndarray, ndarray]:
+    """Calculate option price and greeks of arrays"""
+    f, k, r, t, v, cp = (
+        np.asarray(a, dtype=float).ravel()
+        for a in np.broadcast_arrays(f, k, r, t, v, cp)
+    )
+
+    with np.errstate(all="ignore"):
+        (o0, o1, o2), (u0, u1, u2), dt = calculate_tree_array(f, k, r, t, v, cp, n)
+        price_vega = calculate_price_array(f, k, r, t, v * 1.001, cp, n)
+
+        # Price
+        price = o0[:, 0]
+
+        # Delta
+        _delta = (o1[:, 0] - o1[:, 1]) / (u1[:, 0] - u1[:, 1])
+        delta = _delta * f * 0.01
+
+        # Gamma
+        gamma_delta_1 = (o2[:, 0] - o2[:, 1]) / (u2[:, 0] - u2[:, 1])
+        gamma_delta_2 = (o2[:, 1] - o2[:, 2]) / (u2[:, 1] - u2[:, 2])
+        _gamma = (gamma_delta_1 - gamma_delta_2) / (0.5 * (u2[:, 0] - u2[:, 2]))
+        gamma = _gamma * f * f * 0.0001
+
+        # Theta
+        theta = (o2[:, 1] - price) / (2 * dt * annual_days)
+
+        # Vega
+        vega = (price_vega - price) / (0.001 * v * 100)
+
+    # Greeks are 0 if volatility not positive
+    valid = v > 0
+    price = np.where(valid, price, np.maximum(0, cp * (f - k)))
+    delta = np.where(valid, delta, 0)
+    gamma = np.where(valid, gamma, 0)
+    theta = np.where(valid, theta, 0)
+    vega = np.where(valid, vega, 0)
+
+    return price, delta, gamma, theta, vega
+
+
+def calculate_impv_array(
+    price: ndarray,
+    f: ndarray,
+    k: ndarray,
+    r: ndarray,
+    t: ndarray,
+    cp: ndarray,
+    n: int = DEFAULT_STEP,
+    v0: ndarray = None
+) -> ndarray:
+    """
+    Calculate option implied volatility of arrays, v0 is initial guess
+    of volatility (optional).
+    """
+    price, f, k, r, t, cp = np.broadcast_arrays(price, f, k, r, t, cp)
+
+    # Check option price must be positive, and meet minimum value
+    # (exercise value)
+    valid = (price > 0) & (price > cp * (f - k))
+
+    return solve_impv(
+        price,
+        valid,
+        guess_impv(price, f, k, t, v0),
+        (f, k, r, t, cp),
+        lambda v, f, k, r, t, cp: calculate_price_array(f, k, r, t, v, cp, n),
+        lambda v, f, k, r, t, cp: calculate_original_vega_array(f, k, r, t, v, cp, n)
+    )
@@ -1,7 +1,13 @@
 from scipy import stats
+from scipy.special import ndtr
 from math import log, pow, sqrt, exp
 from typing import Tuple
 
+import numpy as np
+from numpy import ndarray
+
+from .solver import solve_impv, guess_impv
+
 cdf = stats.norm.cdf
 pdf = stats.norm.pdf
 
@@ -214,3 +220,126 @@ def calculate_impv(
     v = round(v, 4)
 
     return v
+
+
+def calculate_d1_array(
+    s: ndarray,
+    k: ndarray,
+    r: ndarray,
+    t: ndarray,
+    v: ndarray
+) -> ndarray:
+    """Calculate option D1 value of arrays"""
+    return (np.log(s / k) + (r + 0.5 * v * v) * t) / (v * np.sqrt(t))
+
+
+def calculate_price_array(
+    s: ndarray,
+    k: ndarray,
+    r: ndarray,
+    t: ndarray,
+    v: ndarray,
+    cp: ndarray
+) -> ndarray:
+    """Calculate option price of arrays"""
+    with np.errstate(all="ignore"):
+        d1 = calculate_d1_array(s, k, r, t, v)
+        d2 = d1 - v * np.sqrt(t)
+        price = cp * (s * ndtr(cp * d1) - k * ndtr(cp * d2) * np.exp(-r * t))
+
+    # Return option space value if volatility not positive
+    return np.where(v > 0, price, np.maximum(0, cp * (s - k)))
+
+
+def calculate_original_vega_array(
+    s: ndarray,
+    k: ndarray,
+    r: ndarray,
+    t: ndarray,
+    v: ndarray
+) -> ndarray:
+    """Calculate option vega of arrays"""
+    with np.errstate(all="ignore"):
+        d1 = calculate_d1_array(s, k, r, t, v)
+        vega = s * npdf(d1) * np.sqrt(t)
+
+    return np.where(v > 0, vega, 0)
+
+
+def calculate_greeks_array(
+    s: ndarray,
+    k: ndarray,
+    r: ndarray,
+    t: ndarray,
+    v: ndarray,
+    cp: ndarray,
+    annual_days: int = 240
+) -> Tuple[ndarray, ndarray, ndarray, ndarray, ndarray]:
+    """Calculate option price and greeks of arrays"""
+    s, k, r, t, v, cp = np.broadcast_arrays(s, k, r, t, v, cp)
+
+    with np.errstate(all="ignore"):
+        sqrt_t = np.sqrt(t)
+        discount = np.exp(-r * t)
+
+        d1 = calculate_d1_array(s, k, r, t, v)
+        d2 = d1 - v * sqrt_t
+        cdf1 = ndtr(cp * d1)
+        cdf2 = ndtr(cp * d2)
+        pdf1 = npdf(d1)
+
+        price = cp * (s * cdf1 - k * cdf2 * discount)
+        delta = cp * cdf1 * s * 0.01
+        gamma = pdf1 / (s * v * sqrt_t) * s * s * 0.0001
+        theta = (
+            -s * pdf1 * v / (2 * sqrt_t)
+            - cp * r * k * discount * cdf2
+        ) / annual_days
+        vega = s * pdf1 * sqrt_t / 100
+
+    # Greeks are 0 if volatility not positive
+    valid = v > 0
+    price = np.where(valid, price, np.maximum(0, cp * (s - k)))
+    delta = np.where(valid, delta, 0)
+    gamma = np.where(valid, gamma, 0)
+    theta = np.where(valid, theta, 0)
+    vega = np.where(valid, vega, 0)
+
+    return price, delta, gamma, theta, vega
+
+
+def calculate_impv_array(
+    price: ndarray,
+    s: ndarray,
+    k: ndarray,
+    r: ndarray,
+    t: ndarray,
+    cp: ndarray,
+    v0: ndarray = None
+) -> ndarray:
+    """
+    Calculate option implied volatility of arrays, v0 is initial guess
+    of volatility (optional).
+    """
+    price, s, k, r, t, cp = np.broadcast_arrays(price, s, k, r, t, cp)
+
+    # Check option price must be positive, and meet minimum value
+    # (exercise value)
+    discount = np.exp(-r * t)
+    min_value = np.where(cp > 0, (s - k) * discount, k * discount - s)
+    valid = (price > 0) & (price > min_value)
+
+    return solve_impv(
+        price,
+        valid,
+        guess_impv(price, s, k, t, v0),
+        (s, k, r, t, cp),
+        lambda v, s, k, r, t, cp: calculate_price_array(s, k, r, t, v, cp),
+        lambda v, s, k, r, t, cp: calculate_original_vega_array(s, k, r, t, v)
+    )
+
+
+def npdf(x: ndarray) -> ndarray:
+    """Standard normal pdf of array"""
+    # 1 / sqrt(2 * pi) = 0.3989422804014327
+    return np.exp(-0.5 * x * x) * 0.3989422804014327
@@ -57,7 +57,7 @@ def calculate_delta(
     double d1 = 0.0
 ) -> float:
     """Calculate option delta"""
-    cdef _delta, delta
+    cdef double _delta, delta
 
     if v <= 0:
         return 0
@@ -65,8 +65,8 @@ def calculate_delta(
     if not d1:
         d1 = calculate_d1(s, k, r, t, v)
 
-    _delta: float = cp * cdf(cp * d1)
-    delta: float = _delta * s * 0.01
+    _delta = cp * cdf(cp * d1)
+    delta = _delta * s * 0.01
     return delta
 
 
@@ -79,7 +79,7 @@ def calculate_gamma(
     double d1 = 0.0
 ) -> float:
     """Calculate option gamma"""
-    cdef _gamma, gamma
+    cdef double _gamma, gamma
 
     if v <= 0 or s <= 0 or t<= 0:
         return 0
@@ -111,7 +111,7 @@ def calculate_theta(
 
     if not d1:
         d1 = calculate_d1(s, k, r, t, v)
-    d2: float = d1 - v * sqrt(t)
+    d2 = d1 - v * sqrt(t)
 
     _theta = -s * pdf(d1) * v / (2 * sqrt(t)) \
         - cp * r * k * exp(-r * t) * cdf(cp * d2)
@@ -150,7 +150,7 @@ def calculate_original_vega(
     if not d1:
         d1 = calculate_d1(s, k, r, t, v)
 
-    vega: float = s * pdf(d1) * sqrt(t)
+    vega = s * pdf(d1) * sqrt(t)
 
     return vega
 
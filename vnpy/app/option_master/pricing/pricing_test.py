@@ -0,0 +1,223 @@
+from datetime import datetime, timedelta
+from importlib import import_module
+
+import numpy as np
+import pytest
+
+from vnpy.trader.constant import Exchange, OptionType, Product
+from vnpy.trader.object import ContractData, TickData
+from vnpy.app.option_master.base import PortfolioData
+from vnpy.app.option_master.pricing import (
+    black_76, black_scholes, binomial_tree,
+    MODEL_NAMES, BACKEND_CYTHON, BACKEND_PYTHON, load_model, load_cython_model
+)
+
+
+MODELS = [black_76, black_scholes, binomial_tree]
+
+
+def create_inputs(count: int = 200):
+    rng = np.random.default_rng(3)
+
+    s = 3000.0
+    k = rng.uniform(2500, 3500, count)
+    r = 0.03
+    t = rng.uniform(0.02, 1, count)
+    v = rng.uniform(0.1, 0.6, count)
+    cp = rng.choice([1, -1], count)
+
+    return s, k, r, t, v, cp
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_greeks_array_matches_scalar(model):
+    s, k, r, t, v, cp = create_inputs()
+
+    result = np.array(model.calculate_greeks_array(s, k, r, t, v, cp))
+    expected = np.array([
+        model.calculate_greeks(s, k[i], r, t[i], v[i], int(cp[i]))
+        for i in range(len(k))
+    ]).T
+
+    np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_impv_array_recovers_volatility(model):
+    s, k, r, t, v, cp = create_inputs()
+
+    prices = model.calculate_price_array(s, k, r, t, v, cp)
+    impv = model.calculate_impv_array(prices, s, k, r, t, cp)
+
+    # Binomial tree price of far otm option may be 0, and of deep itm
+    # american option may be just exercise value, with few steps
+    solved = (impv > 0) & (prices > np.maximum(0, cp * (s - k)) + 1e-6)
+    assert solved.sum() > len(k) * 0.95
+    np.testing.assert_allclose(impv[solved], v[solved], atol=1e-4)
+
+
+@pytest.mark.parametrize("model", [black_76, black_scholes])
+def test_impv_array_invalid_price(model):
+    impv = model.calculate_impv_array(
+        np.array([0, 50, 0.01, 4000]),
+        3000,
+        np.array([3000, 2900, 3000, 3000]),
+        0.03,
+        0.5,
+        np.array([1, 1, 1, 1])
+    )
+
+    # Zero price, below intrinsic value, and beyond volatility range
+    assert impv[0] == 0
+    assert impv[1] == 0
+    assert impv[2] == 0
+    assert impv[3] == 0
+
+
+@pytest.mark.parametrize("name", MODEL_NAMES)
+def test_load_model(name):
+    python_model = import_module(f"vnpy.app.option_master.pricing.{name}")
+
+    model = load_model(name, BACKEND_PYTHON)
+    assert model.backend == BACKEND_PYTHON
+    assert model.calculate_greeks is python_model.calculate_greeks
+
+    model = load_model(name)
+    assert hasattr(model, "calculate_impv_array")
+
+    if load_cython_model(name):
+        assert model.backend == BACKEND_CYTHON
+    else:
+        assert model.backend == BACKEND_PYTHON
+
+        with pytest.raises(ImportError):
+            load_model(name, BACKEND_CYTHON)
+
+
+@pytest.mark.parametrize("name", MODEL_NAMES)
+def test_cython_model_matches_python(name):
+    if not load_cython_model(name):
+        pytest.skip("cython model not built")
+
+    python_model = load_model(name, BACKEND_PYTHON)
+    cython_model = load_model(name, BACKEND_CYTHON)
+
+    s, k, r, t, v, cp = create_inputs(50)
+    prices = python_model.calculate_price_array(s, k, r, t, v, cp)
+
+    for i in range(len(k)):
+        args = (s, k[i], r, t[i], v[i], int(cp[i]))
+
+        np.testing.assert_allclose(
+            cython_model.calculate_greeks(*args),
+            python_model.calculate_greeks(*args),
+            rtol=1e-9,
+            atol=1e-9
+        )
+
+        # Scalar newton solver of binomial tree may diverge
+        args = (prices[i], s, k[i], r, t[i], int(cp[i]))
+        try:
+            expected = python_model.calculate_impv(*args)
+        except OverflowError:
+            continue
+
+        if np.isfinite(expected):
+            assert cython_model.calculate_impv(*args) == pytest.approx(expected, abs=1e-4)
+
+
+def create_portfolio(count: int) -> PortfolioData:
+    portfolio = PortfolioData("test")
+    expiry = datetime.now() + timedelta(days=60)
+
+    for i in range(count):
+        strike = 2500 + i * 10
+
+        for option_type, suffix in [(OptionType.CALL, "C"), (OptionType.PUT, "P")]:
+            contract = ContractData(
+                symbol=f"IO-{suffix}-{strike}",
+                exchange=Exchange.CFFEX,
+                name="",
+                product=Product.OPTION,
+                size=100,
+                pricetick=0.2,
+                option_strike=strike,
+                option_underlying="IO",
+                option_type=option_type,
+                option_expiry=expiry,
+                option_portfolio="IO",
+                option_index=str(strike),
+                gateway_name="test"
+            )
+            portfolio.add_option(contract)
+
+    underlying = ContractData(
+        symbol="IF",
+        exchange=Exchange.CFFEX,
+        name="",
+        product=Product.FUTURES,
+        size=300,
+        pricetick=0.2,
+        gateway_name="test"
+    )
+    portfolio.set_chain_underlying("IO.CFFEX", underlying)
+
+    return portfolio
+
+
+def create_tick(symbol: str, bid_price: float, ask_price: float) -> TickData:
+    return TickData(
+        symbol=symbol,
+        exchange=Exchange.CFFEX,
+        datetime=datetime.now(),
+        bid_price_1=bid_price,
+        ask_price_1=ask_price,
+        last_price=(bid_price + ask_price) / 2,
+        gateway_name="test"
+    )
+
+
+def test_chain_calculation_matches_options():
+    portfolio = create_portfolio(50)
+    portfolio.set_pricing_model(black_76)
+    portfolio.set_interest_rate(0.03)
+
+    chain = portfolio.chains["IO.CFFEX"]
+    assert chain.array_pricing
+
+    s = 3000
+    for option in chain.options.values():
+        price = black_76.calculate_price(
+            s,
+            option.strike_price,
+            0.03,
+            option.time_to_expiry,
+            0.25,
+            option.option_type
+        )
+        if price > 1:
+            tick = create_tick(option.symbol, price - 0.4, price + 0.4)
+            portfolio.update_tick(tick)
+
+    portfolio.update_tick(create_tick("IF", s - 0.2, s + 0.2))
+    portfolio.calculate()
+
+    quoted = [option for option in chain.options.values() if option.tick]
+    assert quoted
+
+    for option in quoted:
+        assert option.mid_impv == pytest.approx(0.25, abs=0.01)
+
+        _, delta, gamma, theta, vega = black_76.calculate_greeks(
+            s + option.underlying_adjustment,
+            option.strike_price,
+            option.interest_rate,
+            option.time_to_expiry,
+            option.mid_impv,
+            option.option_type
+        )
+
+        assert option.cash_delta == pytest.approx(delta * option.size)
+        assert option.cash_gamma == pytest.approx(gamma * option.size)
+        assert option.cash_theta == pytest.approx(theta * option.size)
+        assert option.cash_vega == pytest.approx(vega * option.size)
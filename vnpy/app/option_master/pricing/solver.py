@@ -0,0 +1,122 @@
+"""
+Implied volatility solver over numpy arrays, shared by pricing models.
+"""
+
+from typing import Callable, Sequence
+
+import numpy as np
+from numpy import ndarray
+
+
+MIN_VOLATILITY = 0.0001
+MAX_VOLATILITY = 10.0
+MAX_ITERATIONS = 50
+TOLERANCE = 0.00001
+
+
+def solve_impv(
+    target: ndarray,
+    valid: ndarray,
+    v0: ndarray,
+    args: Sequence[ndarray],
+    calculate_price: Callable[..., ndarray],
+    calculate_vega: Callable[..., ndarray]
+) -> ndarray:
+    """
+    Solve implied volatility with safeguarded Newton's method.
+
+    Each option keeps a bracket [low, high] of volatility, which is
+    narrowed by sign of price error in every round. Newton step falling
+    out of bracket (or with vega close to 0) is replaced by bisection,
+    so that solver always converges for price monotonic in volatility.
+
+    calculate_price and calculate_vega are called with volatility array
+    and args (pricing parameter arrays) of options not yet solved. Result
+    is 0 for options not valid or not solved, otherwise rounded to 4
+    decimal places.
+    """
+    result = np.zeros(len(target))
+
+    ix = np.flatnonzero(valid)
+    if not len(ix):
+        return result
+
+    target = target[ix]
+    args = [a[ix] for a in args]
+    low = np.full(len(ix), MIN_VOLATILITY)
+    high = np.full(len(ix), MAX_VOLATILITY)
+
+    with np.errstate(all="ignore"):
+        # Price out of range of volatility is not solved
+        solvable = (
+            (calculate_price(low, *args) < target)
+            & (calculate_price(high, *args) > target)
+        )
+        if not solvable.all():
+            ix = ix[solvable]
+            target = target[solvable]
+            args = [a[solvable] for a in args]
+            low = low[solvable]
+            high = high[solvable]
+
+        v = np.clip(v0[ix], MIN_VOLATILITY, MAX_VOLATILITY)
+
+        for _ in range(MAX_ITERATIONS):
+            if not len(ix):
+                break
+
+            diff = calculate_price(v, *args) - target
+            vega = calculate_vega(v, *args)
+
+            high = np.where(diff > 0, v, high)
+            low = np.where(diff < 0, v, low)
+
+            new_v = v - diff / vega
+            bisect = ~((new_v > low) & (new_v < high))
+            new_v[bisect] = ((low + high) / 2)[bisect]
+
+            done = np.abs(new_v - v) < TOLERANCE
+            v = new_v
+
+            if done.all():
+                result[ix] = v
+                break
+
+            # Save solved options, and continue with the rest
+            if done.any():
+                result[ix[done]] = v[done]
+
+                left = ~done
+                ix = ix[left]
+                v = v[left]
+                target = target[left]
+                args = [a[left] for a in args]
+                low = low[left]
+                high = high[left]
+
+    return np.round(result, 4)
+
+
+def guess_impv(
+    price: ndarray,
+    s: ndarray,
+    k: ndarray,
+    t: ndarray,
+    v0: ndarray = None
+) -> ndarray:
+    """
+    Initial guess of implied volatility. Positive values of v0 (e.g.
+    result of last calculation) are used if given, otherwise use the
+    larger of Manaster-Koehler starting point (from which Newton's method
+    converges monotonically) and Brenner-Subrahmanyam approximation (for
+    options near the money).
+    """
+    with np.errstate(all="ignore"):
+        guess = np.sqrt(2 * np.abs(np.log(s / k)) / t)
+        guess = np.maximum(guess, price / s * np.sqrt(2 * np.pi / t))
+    guess = np.nan_to_num(guess, nan=0.5, posinf=0.5)
+
+    if v0 is not None:
+        guess = np.where(v0 > 0, v0, guess)
+
+    return guess
@@ -10,7 +10,10 @@ from vnpy.trader.event import (
 )
 from vnpy.trader.utility import round_to
 from ..engine import OptionEngine
-from ..base import UnderlyingData, OptionData, ChainData, PortfolioData
+from ..base import (
+    EVENT_OPTION_PORTFOLIO_CALCULATED,
+    UnderlyingData, OptionData, ChainData, PortfolioData
+)
 
 
 COLOR_WHITE = QtGui.QColor("white")
@@ -112,6 +115,7 @@ class OptionMarketMonitor(MonitorTable):
     signal_tick = QtCore.pyqtSignal(Event)
     signal_trade = QtCore.pyqtSignal(Event)
     signal_position = QtCore.pyqtSignal(Event)
+    signal_calculated = QtCore.pyqtSignal(Event)
 
     headers: List[Dict] = [
         {"name": "symbol", "display": "代码", "cell": MonitorCell},
@@ -241,10 +245,14 @@ class OptionMarketMonitor(MonitorTable):
         self.signal_tick.connect(self.process_tick_event)
         self.signal_trade.connect(self.process_trade_event)
         self.signal_position.connect(self.process_position_event)
+        self.signal_calculated.connect(self.process_calculated_event)
 
         self.event_engine.register(EVENT_TICK, self.signal_tick.emit)
         self.event_engine.register(EVENT_TRADE, self.signal_trade.emit)
         self.event_engine.register(EVENT_POSITION, self.signal_position.emit)
+        self.event_engine.register(
+            EVENT_OPTION_PORTFOLIO_CALCULATED, self.signal_calculated.emit
+        )
 
     def process_tick_event(self, event: Event) -> None:
         """"""
@@ -252,13 +260,18 @@ class OptionMarketMonitor(MonitorTable):
 
         if tick.vt_symbol in self.option_symbols:
             self.update_price(tick.vt_symbol)
-            self.update_impv(tick.vt_symbol)
-        elif tick.vt_symbol in self.underlying_option_map:
-            option_symbols = self.underlying_option_map[tick.vt_symbol]
 
-            for vt_symbol in option_symbols:
-                self.update_impv(vt_symbol)
-                self.update_greeks(vt_symbol)
+    def process_calculated_event(self, event: Event) -> None:
+        """
+        Impv and greeks are refreshed after calculation instead of tick,
+        so that they always match prices shown.
+        """
+        if event.data != self.portfolio_name:
+            return
+
+        for vt_symbol in self.option_symbols:
+            self.update_impv(vt_symbol)
+            self.update_greeks(vt_symbol)
 
     def process_trade_event(self, event: Event) -> None:
         """"""
@@ -321,7 +334,7 @@ class OptionMarketMonitor(MonitorTable):
 
 class OptionGreeksMonitor(MonitorTable):
     """"""
-    signal_tick = QtCore.pyqtSignal(Event)
+    signal_calculated = QtCore.pyqtSignal(Event)
     signal_trade = QtCore.pyqtSignal(Event)
     signal_position = QtCore.pyqtSignal(Event)
 
@@ -436,22 +449,25 @@ class OptionGreeksMonitor(MonitorTable):
 
     def register_event(self) -> None:
         """"""
-        self.signal_tick.connect(self.process_tick_event)
+        self.signal_calculated.connect(self.process_calculated_event)
         self.signal_trade.connect(self.process_trade_event)
         self.signal_position.connect(self.process_position_event)
 
-        self.event_engine.register(EVENT_TICK, self.signal_tick.emit)
+        self.event_engine.register(
+            EVENT_OPTION_PORTFOLIO_CALCULATED, self.signal_calculated.emit
+        )
         self.event_engine.register(EVENT_TRADE, self.signal_trade.emit)
         self.event_engine.register(EVENT_POSITION, self.signal_position.emit)
 
-    def process_tick_event(self, event: Event) -> None:
-        """"""
-        tick = event.data
-
-        if tick.vt_symbol not in self.underlying_option_map:
+    def process_calculated_event(self, event: Event) -> None:
+        """
+        Pos greeks are refreshed after calculation instead of tick.
+        """
+        if event.data != self.portfolio_name:
             return
 
-        self.update_underlying_tick(tick.vt_symbol)
+        for vt_symbol in self.underlying_option_map.keys():
+            self.update_underlying_tick(vt_symbol)
 
     def process_trade_event(self, event: Event) -> None:
         """"""
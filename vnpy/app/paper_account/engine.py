@@ -20,6 +20,7 @@ from vnpy.trader.event import (
     EVENT_LOG,
     EVENT_TIMER
 )
+from vnpy.trader.trigger import TriggerBook
 from vnpy.trader.constant import (
     Status,
     OrderType,
@@ -50,6 +51,7 @@ class PaperEngine(BaseEngine):
         self.timer_count: int = 0
 
         self.active_orders: Dict[str, Dict[str, OrderData]] = {}
+        self.stop_book: TriggerBook = TriggerBook()
         self.gateway_map: Dict[str, str] = {}
         self.ticks: Dict[str, TickData] = {}
         self.positions: Dict[Tuple[str, Direction], PositionData] = {}
@@ -90,6 +92,16 @@ class PaperEngine(BaseEngine):
 
         self.ticks[tick.vt_symbol] = tick
 
+        # Only stop orders triggered by tick price are crossed
+        triggered = self.stop_book.get_triggered(
+            tick.vt_symbol, tick.ask_price_1, tick.bid_price_1
+        )
+        for order in triggered:
+            self.cross_order(order, tick)
+
+            if not order.is_active():
+                self.stop_book.remove(order.orderid)
+
         if tick.vt_symbol not in self.active_orders:
             return
 
@@ -160,8 +172,12 @@ class PaperEngine(BaseEngine):
         if order.status != Status.REJECTED:
             order.datetime = datetime.now(LOCAL_TZ)
             order.status = Status.NOTTRADED
-            active_orders = self.active_orders.setdefault(order.vt_symbol, {})
-            active_orders[orderid] = order
+
+            if order.type == OrderType.STOP:
+                self.stop_book.add(order.vt_symbol, orderid, order.direction, order.price, order)
+            else:
+                active_orders = self.active_orders.setdefault(order.vt_symbol, {})
+                active_orders[orderid] = order
 
         self.put_event(EVENT_ORDER, copy(order))
 
@@ -176,16 +192,22 @@ class PaperEngine(BaseEngine):
                 self.cross_order(order, tick)
 
                 if not order.is_active():
-                    active_orders.pop(orderid)
+                    if order.type == OrderType.STOP:
+                        self.stop_book.remove(orderid)
+                    else:
+                        active_orders.pop(orderid)
 
         return vt_orderid
 
     def cancel_order(self, req: CancelRequest, gateway_name: str) -> None:
         """"""
-        active_orders: Dict[str, OrderRequest] = self.active_orders[req.vt_symbol]
+        order: OrderData = self.stop_book.remove(req.orderid)
+
+        if not order:
+            active_orders: Dict[str, OrderData] = self.active_orders.get(req.vt_symbol, {})
+            order = active_orders.pop(req.orderid, None)
 
-        if req.orderid in active_orders:
-            order: OrderData = active_orders.pop(req.orderid)
+        if order:
             order.status = Status.CANCELLED
             self.put_event(EVENT_ORDER, copy(order))
 
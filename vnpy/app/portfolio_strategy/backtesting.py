@@ -1,6 +1,8 @@
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Set, Tuple
+from math import isnan
+from typing import Dict, List, Tuple
 from functools import lru_cache
 from copy import copy
 import traceback
@@ -8,13 +10,15 @@ import traceback
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from pandas import DataFrame
+from pandas import DataFrame, DatetimeIndex
 
-from vnpy.trader.constant import Direction, Offset, Interval, Status
+from vnpy.trader.batch import BarBatch, concat_batches
+from vnpy.trader.constant import Direction, Offset, Interval, Status, Exchange
 from vnpy.trader.database import database_manager
 from vnpy.trader.object import OrderData, TradeData, BarData
 from vnpy.trader.utility import round_to, extract_vt_symbol
 
+from .base import FillMode
 from .template import StrategyTemplate
 
 
@@ -24,6 +28,17 @@ INTERVAL_DELTA_MAP = {
     Interval.DAILY: timedelta(days=1),
 }
 
+# Fields of the last axis of history data matrix, in the same order as
+# BarData so that bar can be created with positional arguments
+MATRIX_FIELDS = [
+    "volume",
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+]
+
 
 class BacktestingEngine:
     """"""
@@ -43,14 +58,22 @@ class BacktestingEngine:
 
         self.capital: float = 1_000_000
 
+        self.fill_mode: FillMode = FillMode.FORWARD
+        self.load_workers: int = 4
+
         self.strategy: StrategyTemplate = None
         self.bars: Dict[str, BarData] = {}
         self.datetime: datetime = None
 
         self.interval: Interval = None
         self.days: int = 0
-        self.history_data: Dict[Tuple, BarData] = {}
-        self.dts: Set[datetime] = set()
+
+        # History data aligned by datetime: datetime x symbol x field,
+        # with nan for missing bar
+        self.history_data: np.ndarray = None
+        self.dts: List[datetime] = []
+        self.symbol_exchanges: List[Tuple[str, Exchange]] = []
+        self.close_prices: Dict[str, float] = {}
 
         self.limit_order_count = 0
         self.limit_orders = {}
@@ -71,6 +94,7 @@ class BacktestingEngine:
         self.strategy = None
         self.bars = {}
         self.datetime = None
+        self.close_prices = {}
 
         self.limit_order_count = 0
         self.limit_orders.clear()
@@ -93,7 +117,9 @@ class BacktestingEngine:
         sizes: Dict[str, float],
         priceticks: Dict[str, float],
         capital: int = 0,
-        end: datetime = None
+        end: datetime = None,
+        fill_mode: FillMode = FillMode.FORWARD,
+        load_workers: int = 4
     ) -> None:
         """"""
         self.vt_symbols = vt_symbols
@@ -108,6 +134,9 @@ class BacktestingEngine:
         self.end = end
         self.capital = capital
 
+        self.fill_mode = fill_mode
+        self.load_workers = load_workers
+
     def add_strategy(self, strategy_class: type, setting: dict) -> None:
         """"""
         self.strategy = strategy_class(
@@ -115,7 +144,10 @@ class BacktestingEngine:
         )
 
     def load_data(self) -> None:
-        """"""
+        """
+        Load history data of each symbol in parallel threads, and align
+        them by datetime into one matrix.
+        """
         self.output("开始加载历史数据")
 
         if not self.end:
@@ -126,67 +158,99 @@ class BacktestingEngine:
             return
 
         # Clear previously loaded history data
-        self.history_data.clear()
-        self.dts.clear()
+        self.history_data = None
+        self.dts = []
+        self.symbol_exchanges = [extract_vt_symbol(vt_symbol) for vt_symbol in self.vt_symbols]
+
+        workers = max(min(self.load_workers, len(self.vt_symbols)), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            batches = list(executor.map(self.load_symbol_data, self.vt_symbols))
+
+        # Union of datetimes of all symbols
+        datetimes = np.unique(np.concatenate([batch.data["datetime"] for batch in batches]))
+
+        matrix = np.full(
+            (len(datetimes), len(self.vt_symbols), len(MATRIX_FIELDS)),
+            np.nan
+        )
+
+        for i, batch in enumerate(batches):
+            data = batch.data
+            rows = np.searchsorted(datetimes, data["datetime"])
+
+            for j, name in enumerate(MATRIX_FIELDS):
+                matrix[rows, i, j] = data[name]
+
+        # Localize all datetimes at once, instead of one by one
+        index = DatetimeIndex(datetimes)
+        tzinfo = batches[0].tzinfo if batches else None
+        if tzinfo:
+            index = index.tz_localize(tzinfo)
+
+        self.dts = list(index.to_pydatetime())
+        self.history_data = matrix
+
+        self.output("所有历史数据加载完成")
+
+    def load_symbol_data(self, vt_symbol: str) -> BarBatch:
+        """
+        Load history data of one symbol, 30 days each time.
+        """
+        symbol, exchange = extract_vt_symbol(vt_symbol)
 
         # Load 30 days of data each time and allow for progress update
         progress_delta = timedelta(days=30)
         total_delta = self.end - self.start
         interval_delta = INTERVAL_DELTA_MAP[self.interval]
 
-        for vt_symbol in self.vt_symbols:
-            start = self.start
-            end = self.start + progress_delta
-            progress = 0
-
-            data_count = 0
-            while start < self.end:
-                end = min(end, self.end)  # Make sure end time stays within set range
+        start = self.start
+        end = self.start + progress_delta
+        progress = 0
 
-                data = load_bar_data(
-                    vt_symbol,
-                    self.interval,
-                    start,
-                    end
-                )
+        batches = []
+        while start < self.end:
+            end = min(end, self.end)  # Make sure end time stays within set range
 
-                for bar in data:
-                    self.dts.add(bar.datetime)
-                    self.history_data[(bar.datetime, vt_symbol)] = bar
-                    data_count += 1
+            batch = load_bar_array(
+                vt_symbol,
+                self.interval,
+                start,
+                end
+            )
+            batches.append(batch)
 
-                progress += progress_delta / total_delta
-                progress = min(progress, 1)
-                progress_bar = "#" * int(progress * 10)
-                self.output(f"{vt_symbol}加载进度：{progress_bar} [{progress:.0%}]")
+            progress += progress_delta / total_delta
+            progress = min(progress, 1)
+            progress_bar = "#" * int(progress * 10)
+            self.output(f"{vt_symbol}加载进度：{progress_bar} [{progress:.0%}]")
 
-                start = end + interval_delta
-                end += (progress_delta + interval_delta)
+            start = end + interval_delta
+            end += (progress_delta + interval_delta)
 
-            self.output(f"{vt_symbol}历史数据加载完成，数据量：{data_count}")
+        if batches:
+            batch = concat_batches(batches)
+        else:
+            batch = BarBatch(symbol, exchange, self.interval)
 
-        self.output("所有历史数据加载完成")
+        self.output(f"{vt_symbol}历史数据加载完成，数据量：{len(batch)}")
+        return batch
 
     def run_backtesting(self) -> None:
         """"""
         self.strategy.on_init()
 
-        # Generate sorted datetime list
-        dts = list(self.dts)
-        dts.sort()
-
         # Use the first [days] of history data for initializing strategy
         day_count = 0
         ix = 0
 
-        for ix, dt in enumerate(dts):
+        for ix, dt in enumerate(self.dts):
             if self.datetime and dt.day != self.datetime.day:
                 day_count += 1
                 if day_count >= self.days:
                     break
 
             try:
-                self.new_bars(dt)
+                self.new_bars(ix)
             except Exception:
                 self.output("触发异常，回测终止")
                 self.output(traceback.format_exc())
@@ -200,9 +264,9 @@ class BacktestingEngine:
         self.output("开始回放历史数据")
 
         # Use the rest of history data for running backtesting
-        for dt in dts[ix:]:
+        for ix in range(ix, len(self.dts)):
             try:
-                self.new_bars(dt)
+                self.new_bars(ix)
             except Exception:
                 self.output("触发异常，回测终止")
                 self.output(traceback.format_exc())
@@ -470,14 +534,10 @@ class BacktestingEngine:
         fig.update_layout(height=1000, width=1000)
         fig.show()
 
-    def update_daily_close(self, bars: Dict[str, BarData], dt: datetime) -> None:
+    def update_daily_close(self, close_prices: Dict[str, float], dt: datetime) -> None:
         """"""
         d = dt.date()
 
-        close_prices = {}
-        for bar in bars.values():
-            close_prices[bar.vt_symbol] = bar.close_price
-
         daily_result = self.daily_results.get(d, None)
 
         if daily_result:
@@ -485,44 +545,64 @@ class BacktestingEngine:
         else:
             self.daily_results[d] = PortfolioDailyResult(d, close_prices)
 
-    def new_bars(self, dt: datetime) -> None:
-        """"""
+    def new_bars(self, ix: int) -> None:
+        """
+        Replay bars of row ix in history data matrix.
+        """
+        dt = self.dts[ix]
         self.datetime = dt
 
-        # self.bars.clear()
-        for vt_symbol in self.vt_symbols:
-            bar = self.history_data.get((dt, vt_symbol), None)
+        interval = self.interval
+        fill_forward = self.fill_mode == FillMode.FORWARD
+
+        for vt_symbol, (symbol, exchange), values in zip(
+            self.vt_symbols,
+            self.symbol_exchanges,
+            self.history_data[ix].tolist()
+        ):
+            close_price = values[-1]
 
             # If bar data of vt_symbol at dt exists
-            if bar:
+            if not isnan(close_price):
+                bar = BarData("DB", symbol, exchange, dt, interval, *values)
                 self.bars[vt_symbol] = bar
+                self.close_prices[vt_symbol] = close_price
             # Otherwise, use previous data to backfill
+            elif fill_forward:
+                if vt_symbol in self.bars:
+                    old_bar = self.bars[vt_symbol]
+
+                    bar = BarData(
+                        symbol=old_bar.symbol,
+                        exchange=old_bar.exchange,
+                        datetime=dt,
+                        open_price=old_bar.close_price,
+                        high_price=old_bar.close_price,
+                        low_price=old_bar.close_price,
+                        close_price=old_bar.close_price,
+                        gateway_name=old_bar.gateway_name
+                    )
+                    self.bars[vt_symbol] = bar
+            # Or remove symbol from bars
             elif vt_symbol in self.bars:
-                old_bar = self.bars[vt_symbol]
-
-                bar = BarData(
-                    symbol=old_bar.symbol,
-                    exchange=old_bar.exchange,
-                    datetime=dt,
-                    open_price=old_bar.close_price,
-                    high_price=old_bar.close_price,
-                    low_price=old_bar.close_price,
-                    close_price=old_bar.close_price,
-                    gateway_name=old_bar.gateway_name
-                )
-                self.bars[vt_symbol] = bar
+                self.bars.pop(vt_symbol)
 
         self.cross_limit_order()
         self.strategy.on_bars(self.bars)
 
-        self.update_daily_close(self.bars, dt)
+        # Only close prices of last bars in a day are needed
+        next_ix = ix + 1
+        if next_ix == len(self.dts) or self.dts[next_ix].date() != dt.date():
+            self.update_daily_close(copy(self.close_prices), dt)
 
     def cross_limit_order(self) -> None:
         """
         Cross limit order with last bar/tick data.
         """
         for order in list(self.active_limit_orders.values()):
-            bar = self.bars[order.vt_symbol]
+            bar = self.bars.get(order.vt_symbol, None)
+            if not bar:
+                continue
 
             long_cross_price = bar.low_price
             short_cross_price = bar.high_price
@@ -831,18 +911,20 @@ class PortfolioDailyResult:
             contract_result = self.contract_results.get(vt_symbol, None)
             if contract_result:
                 contract_result.update_close_price(close_price)
+            else:
+                self.contract_results[vt_symbol] = ContractDailyResult(self.date, close_price)
 
 
 @lru_cache(maxsize=999)
-def load_bar_data(
+def load_bar_array(
     vt_symbol: str,
     interval: Interval,
     start: datetime,
     end: datetime
-):
+) -> BarBatch:
     """"""
     symbol, exchange = extract_vt_symbol(vt_symbol)
 
-    return database_manager.load_bar_data(
+    return database_manager.load_bar_array(
         symbol, exchange, interval, start, end
     )
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from vnpy.app.portfolio_strategy import backtesting
+from vnpy.app.portfolio_strategy.backtesting import BacktestingEngine
+from vnpy.app.portfolio_strategy.base import FillMode
+from vnpy.trader.batch import BarBatch
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.database.database import DB_TZ
+from vnpy.trader.object import BarData
+
+
+START = datetime(2020, 1, 2, 9, 0, tzinfo=DB_TZ)
+
+# Minutes with bar data of each symbol, rb2105 has gaps
+MINUTES = {
+    "rb2101.SHFE": [0, 1, 2, 3, 4, 5],
+    "rb2105.SHFE": [1, 2, 5],
+}
+
+
+def create_batch(vt_symbol: str) -> BarBatch:
+    symbol, exchange = vt_symbol.split(".")
+
+    bars = [
+        BarData(
+            symbol=symbol,
+            exchange=Exchange(exchange),
+            datetime=START + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=10 + i,
+            open_price=4000 + i,
+            high_price=4010 + i,
+            low_price=3990 + i,
+            close_price=4005 + i,
+            gateway_name="DB"
+        )
+        for i in MINUTES[vt_symbol]
+    ]
+    return BarBatch.from_bars(bars)
+
+
+def load_bar_array(vt_symbol: str, interval: Interval, start: datetime, end: datetime) -> BarBatch:
+    return create_batch(vt_symbol).slice_by_time(start, end)
+
+
+def replay(monkeypatch, fill_mode: FillMode) -> list:
+    monkeypatch.setattr(backtesting, "load_bar_array", load_bar_array)
+
+    engine = BacktestingEngine()
+    engine.output = lambda msg: None
+    engine.set_parameters(
+        vt_symbols=list(MINUTES),
+        interval=Interval.MINUTE,
+        start=START,
+        end=START + timedelta(days=1),
+        rates={},
+        slippages={},
+        sizes={},
+        priceticks={},
+        fill_mode=fill_mode
+    )
+    engine.load_data()
+
+    assert engine.dts == [START + timedelta(minutes=i) for i in range(6)]
+    assert engine.history_data.shape == (6, 2, len(backtesting.MATRIX_FIELDS))
+
+    missing = np.isnan(engine.history_data[:, 1, -1])
+    assert missing.tolist() == [True, False, False, True, True, False]
+    assert not np.isnan(engine.history_data[:, 0]).any()
+
+    history = []
+    engine.strategy = SimpleNamespace(on_bars=lambda bars: history.append(dict(bars)))
+
+    for ix in range(len(engine.dts)):
+        engine.new_bars(ix)
+
+    return history
+
+
+def test_aligned_matrix_fill_forward(monkeypatch):
+    history = replay(monkeypatch, FillMode.FORWARD)
+
+    # No previous bar to fill before first bar
+    assert list(history[0]) == ["rb2101.SHFE"]
+
+    for ix in [1, 2, 5]:
+        bar = history[ix]["rb2105.SHFE"]
+        assert bar.datetime == START + timedelta(minutes=ix)
+        assert bar.close_price == 4005 + ix
+        assert bar.volume == 10 + ix
+
+    # Flat bars from previous close price
+    for ix in [3, 4]:
+        bar = history[ix]["rb2105.SHFE"]
+        assert bar.datetime == START + timedelta(minutes=ix)
+        assert bar.open_price == bar.high_price == bar.low_price == bar.close_price == 4007
+        assert bar.volume == 0
+
+    assert [bars["rb2101.SHFE"].close_price for bars in history] == [4005 + i for i in range(6)]
+
+
+def test_aligned_matrix_fill_none(monkeypatch):
+    history = replay(monkeypatch, FillMode.NONE)
+
+    assert [sorted(bars) for bars in history] == [
+        ["rb2101.SHFE"],
+        ["rb2101.SHFE", "rb2105.SHFE"],
+        ["rb2101.SHFE", "rb2105.SHFE"],
+        ["rb2101.SHFE"],
+        ["rb2101.SHFE"],
+        ["rb2101.SHFE", "rb2105.SHFE"],
+    ]
+    assert history[5]["rb2105.SHFE"].close_price == 4010
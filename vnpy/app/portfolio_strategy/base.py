@@ -13,5 +13,13 @@ class EngineType(Enum):
     BACKTESTING = "回测"
 
 
+class FillMode(Enum):
+    """
+    How backtesting handles a symbol without bar at a datetime.
+    """
+    FORWARD = "前值填充"    # Flat bar from previous close price
+    NONE = "不填充"         # Symbol not included in bars
+
+
 EVENT_PORTFOLIO_LOG = "ePortfolioLog"
 EVENT_PORTFOLIO_STRATEGY = "ePortfolioStrategy"
@@ -1,19 +1,121 @@
 """"""
 
-from collections import defaultdict
-from vnpy.trader.object import OrderRequest, LogData
-from vnpy.event import Event, EventEngine, EVENT_TIMER
+from collections import defaultdict, deque
+from itertools import zip_longest
+from threading import Lock
+from time import monotonic, perf_counter_ns
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from vnpy.trader.object import (
+    OrderRequest, OrderData, TradeData, PositionData, LogData
+)
+from vnpy.event import Event, EventEngine
+from vnpy.event.metrics import LatencyHistogram
 from vnpy.trader.engine import BaseEngine, MainEngine
-from vnpy.trader.event import EVENT_TRADE, EVENT_ORDER, EVENT_LOG
-from vnpy.trader.constant import Status
+from vnpy.trader.event import EVENT_TRADE, EVENT_ORDER, EVENT_POSITION, EVENT_LOG
+from vnpy.trader.constant import Direction, OrderType, Status
 from vnpy.trader.utility import load_json, save_json
 
 
 APP_NAME = "RiskManager"
 
 
+class SymbolState:
+    """
+    Risk state of one symbol in one account (gateway), which is
+    updated incrementally by order, trade and position events.
+    """
+
+    def __init__(self, vt_symbol: str):
+        """"""
+        self.vt_symbol: str = vt_symbol
+        self.size: float = 0
+
+        # Net position, positive for long
+        self.pos: float = 0
+        self.position_volumes: Dict[Direction, float] = {}
+
+        # Active orders: vt_orderid -> (direction, price, remaining volume,
+        # price used for notional value)
+        self.orders: Dict[Any, Tuple[Direction, float, float, float]] = {}
+        self.long_working: float = 0
+        self.short_working: float = 0
+        self.open_notional: float = 0
+
+        self.cancel_count: int = 0
+        self.flow_times: Deque[float] = deque()
+
+    def update_order(
+        self,
+        key: Any,
+        direction: Direction,
+        price: float,
+        remaining: float,
+        value_price: float = None
+    ) -> int:
+        """
+        Set remaining volume of active order, 0 means order finished.
+        Notional value is calculated with value_price if given, which
+        is used for market order without price.
+
+        Return change of active order count.
+        """
+        change = 0
+
+        old = self.orders.pop(key, None)
+        if old:
+            self._add_working(*old, -1)
+            change -= 1
+
+        if remaining > 0:
+            if value_price is None:
+                value_price = price
+
+            order = (direction, price, remaining, value_price)
+            self.orders[key] = order
+            self._add_working(*order, 1)
+            change += 1
+
+        return change
+
+    def _add_working(
+        self,
+        direction: Direction,
+        price: float,
+        volume: float,
+        value_price: float,
+        sign: int
+    ) -> None:
+        """"""
+        if direction == Direction.LONG:
+            self.long_working += volume * sign
+        else:
+            self.short_working += volume * sign
+
+        self.open_notional += value_price * volume * (self.size or 1) * sign
+
+    def update_position(self, direction: Direction, volume: float) -> None:
+        """
+        Set position volume of direction reported by gateway.
+        """
+        self.position_volumes[direction] = volume
+
+        volumes = self.position_volumes
+        self.pos = (
+            volumes.get(Direction.LONG, 0)
+            - volumes.get(Direction.SHORT, 0)
+            + volumes.get(Direction.NET, 0)
+        )
+
+
 class RiskManagerEngine(BaseEngine):
-    """"""
+    """
+    Pre-trade risk checks of orders sent by MainEngine.
+
+    State of each account and symbol is kept up to date by events, so
+    that checking an order never scans orders or positions. Enabled
+    rules are compiled into one check function when setting changes.
+    """
     setting_filename = "risk_manager_setting.json"
 
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine):
@@ -22,11 +124,9 @@ class RiskManagerEngine(BaseEngine):
 
         self.active = False
 
-        self.order_flow_count = 0
         self.order_flow_limit = 50
-
         self.order_flow_clear = 1
-        self.order_flow_timer = 0
+        self.symbol_flow_limit = 0
 
         self.order_size_limit = 100
 
@@ -34,28 +134,79 @@ class RiskManagerEngine(BaseEngine):
         self.trade_limit = 1000
 
         self.order_cancel_limit = 500
-        self.order_cancel_counts = defaultdict(int)
 
         self.active_order_limit = 50
+        self.active_order_count = 0
+
+        self.position_limit = 0
+        self.notional_limit = 0
+        self.self_trade_check = False
 
+        self.states: Dict[Tuple[str, str], SymbolState] = {}
+        self.flow_times: Deque[float] = deque()
+        self.lock: Lock = Lock()
+
+        self.check_func: Callable[[OrderRequest, SymbolState], str] = None
+        self.check_latency: LatencyHistogram = LatencyHistogram()
+        self.reject_counts: Dict[str, int] = defaultdict(int)
+
+        self.compile_rules()
         self.load_setting()
         self.register_event()
         self.patch_send_order()
 
     def patch_send_order(self):
         """
-        Patch send order function of MainEngine.
+        Patch send order functions of MainEngine.
         """
         self._send_order = self.main_engine.send_order
         self.main_engine.send_order = self.send_order
 
+        self._send_orders = self.main_engine.send_orders
+        self.main_engine.send_orders = self.send_orders
+
+        self.main_engine.get_risk_metrics = self.get_metrics
+
     def send_order(self, req: OrderRequest, gateway_name: str):
         """"""
-        result = self.check_risk(req, gateway_name)
+        with self.lock:
+            result = self.check_risk(req, gateway_name)
         if not result:
             return ""
 
-        return self._send_order(req, gateway_name)
+        # Order counted in check_risk is released if sending failed
+        vt_orderid = ""
+        try:
+            vt_orderid = self._send_order(req, gateway_name)
+        finally:
+            with self.lock:
+                self.confirm_order(req, gateway_name, vt_orderid)
+
+        return vt_orderid
+
+    def send_orders(self, reqs: Sequence[OrderRequest], gateway_name: str) -> List[str]:
+        """
+        Check basket of orders in one pass. Each order passed is counted
+        into state before checking the next one, so that limits apply
+        to the basket as a whole.
+
+        Rejected orders get empty vt_orderid in result.
+        """
+        with self.lock:
+            passed = [req for req in reqs if self.check_risk(req, gateway_name)]
+
+        # Orders counted in check_risk are released if sending failed
+        vt_orderids = []
+        try:
+            if passed:
+                vt_orderids = self._send_orders(passed, gateway_name)
+        finally:
+            with self.lock:
+                for req, vt_orderid in zip_longest(passed, vt_orderids, fillvalue=""):
+                    self.confirm_order(req, gateway_name, vt_orderid)
+
+        sent = dict(zip(map(id, passed), vt_orderids))
+        return [sent.get(id(req), "") for req in reqs]
 
     def update_setting(self, setting: dict):
         """"""
@@ -67,6 +218,13 @@ class RiskManagerEngine(BaseEngine):
         self.active_order_limit = setting["active_order_limit"]
         self.order_cancel_limit = setting["order_cancel_limit"]
 
+        self.symbol_flow_limit = setting.get("symbol_flow_limit", 0)
+        self.position_limit = setting.get("position_limit", 0)
+        self.notional_limit = setting.get("notional_limit", 0)
+        self.self_trade_check = setting.get("self_trade_check", False)
+
+        self.compile_rules()
+
         if self.active:
             self.write_log("交易风控功能启动")
         else:
@@ -82,6 +240,10 @@ class RiskManagerEngine(BaseEngine):
             "trade_limit": self.trade_limit,
             "active_order_limit": self.active_order_limit,
             "order_cancel_limit": self.order_cancel_limit,
+            "symbol_flow_limit": self.symbol_flow_limit,
+            "position_limit": self.position_limit,
+            "notional_limit": self.notional_limit,
+            "self_trade_check": self.self_trade_check,
         }
         return setting
 
@@ -98,31 +260,103 @@ class RiskManagerEngine(BaseEngine):
         setting = self.get_setting()
         save_json(self.setting_filename, setting)
 
+    def compile_rules(self):
+        """
+        Build check function from rules enabled by current setting.
+        Optional rules are enabled by setting limit above 0.
+        """
+        rules = [
+            self.check_order_size,
+            self.check_trade_limit,
+            self.check_order_flow,
+            self.check_active_order,
+            self.check_order_cancel,
+        ]
+
+        if self.symbol_flow_limit:
+            rules.append(self.check_symbol_flow)
+        if self.position_limit:
+            rules.append(self.check_position)
+        if self.notional_limit:
+            rules.append(self.check_notional)
+        if self.self_trade_check:
+            rules.append(self.check_self_trade)
+
+        rules = tuple(rules)
+
+        def check(req: OrderRequest, state: SymbolState) -> str:
+            for rule in rules:
+                msg = rule(req, state)
+                if msg:
+                    return msg
+            return ""
+
+        self.check_func = check
+
     def register_event(self):
         """"""
         self.event_engine.register(EVENT_TRADE, self.process_trade_event)
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
         self.event_engine.register(EVENT_ORDER, self.process_order_event)
+        self.event_engine.register(EVENT_POSITION, self.process_position_event)
+
+    def get_state(self, gateway_name: str, vt_symbol: str) -> SymbolState:
+        """"""
+        key = (gateway_name, vt_symbol)
+        state = self.states.get(key, None)
+
+        if not state:
+            state = SymbolState(vt_symbol)
+            self.states[key] = state
+
+        if not state.size:
+            contract = self.main_engine.get_contract(vt_symbol)
+            if contract:
+                state.size = contract.size
+
+        return state
 
     def process_order_event(self, event: Event):
         """"""
-        order = event.data
-        if order.status != Status.CANCELLED:
-            return
-        self.order_cancel_counts[order.symbol] += 1
+        order: OrderData = event.data
+        with self.lock:
+            state = self.get_state(order.gateway_name, order.vt_symbol)
+            if order.is_active():
+                remaining = order.volume - order.traded
+            else:
+                remaining = 0
+
+            self.active_order_count += state.update_order(
+                order.vt_orderid,
+                order.direction,
+                order.price,
+                remaining,
+                self.get_value_price(order.vt_symbol, order.price)
+            )
+
+            if order.status == Status.CANCELLED:
+                state.cancel_count += 1
 
     def process_trade_event(self, event: Event):
         """"""
-        trade = event.data
-        self.trade_count += trade.volume
+        trade: TradeData = event.data
+        with self.lock:
+            state = self.get_state(trade.gateway_name, trade.vt_symbol)
+            self.trade_count += trade.volume
 
-    def process_timer_event(self, event: Event):
-        """"""
-        self.order_flow_timer += 1
+            if trade.direction == Direction.LONG:
+                state.pos += trade.volume
+            else:
+                state.pos -= trade.volume
 
-        if self.order_flow_timer >= self.order_flow_clear:
-            self.order_flow_count = 0
-            self.order_flow_timer = 0
+    def process_position_event(self, event: Event):
+        """
+        Position reported by gateway replaces position accumulated
+        from trades.
+        """
+        position: PositionData = event.data
+        with self.lock:
+            state = self.get_state(position.gateway_name, position.vt_symbol)
+            state.update_position(position.direction, position.volume)
 
     def write_log(self, msg: str):
         """"""
@@ -131,45 +365,190 @@ class RiskManagerEngine(BaseEngine):
         self.event_engine.put(event)
 
     def check_risk(self, req: OrderRequest, gateway_name: str):
-        """"""
+        """
+        Check order and count it into state if passed. Should be called
+        with lock held.
+        """
         if not self.active:
             return True
 
-        # Check order volume
-        if req.volume <= 0:
-            self.write_log("委托数量必须大于0")
+        start = perf_counter_ns()
+
+        state = self.get_state(gateway_name, req.vt_symbol)
+        now = monotonic()
+        self.clear_flow(self.flow_times, now)
+        self.clear_flow(state.flow_times, now)
+
+        msg = self.check_func(req, state)
+
+        if not msg:
+            self.flow_times.append(now)
+            state.flow_times.append(now)
+            self.active_order_count += state.update_order(
+                id(req),
+                req.direction,
+                req.price,
+                req.volume,
+                self.get_value_price(req.vt_symbol, req.price)
+            )
+
+        self.check_latency.record(perf_counter_ns() - start)
+
+        if msg:
+            self.reject_counts[req.vt_symbol] += 1
+            self.write_log(msg)
             return False
 
+        return True
+
+    def confirm_order(self, req: OrderRequest, gateway_name: str, vt_orderid: str):
+        """
+        Replace order counted in check_risk with vt_orderid returned,
+        or only release it if vt_orderid is empty.
+        """
+        state = self.get_state(gateway_name, req.vt_symbol)
+        self.active_order_count += state.update_order(id(req), req.direction, req.price, 0)
+
+        # Order already updated or finished by event
+        if not vt_orderid or vt_orderid in state.orders:
+            return
+
+        order = self.main_engine.get_order(vt_orderid)
+        if order and not order.is_active():
+            return
+
+        self.active_order_count += state.update_order(
+            vt_orderid,
+            req.direction,
+            req.price,
+            req.volume,
+            self.get_value_price(req.vt_symbol, req.price)
+        )
+
+    def get_value_price(self, vt_symbol: str, price: float) -> float:
+        """
+        Price for calculating notional value of order. Market order
+        without price is valued at last price of latest tick, or 0 if
+        no tick received.
+        """
+        if price:
+            return price
+
+        tick = self.main_engine.get_tick(vt_symbol)
+        if tick:
+            return tick.last_price
+        return 0
+
+    def clear_flow(self, flow_times: Deque[float], now: float):
+        """
+        Remove order times out of sliding window.
+        """
+        start = now - self.order_flow_clear
+        while flow_times and flow_times[0] <= start:
+            flow_times.popleft()
+
+    def check_order_size(self, req: OrderRequest, state: SymbolState) -> str:
+        """"""
+        if req.volume <= 0:
+            return "委托数量必须大于0"
+
         if req.volume > self.order_size_limit:
-            self.write_log(
-                f"单笔委托数量{req.volume}，超过限制{self.order_size_limit}")
-            return False
+            return f"单笔委托数量{req.volume}，超过限制{self.order_size_limit}"
 
-        # Check trade volume
+        return ""
+
+    def check_trade_limit(self, req: OrderRequest, state: SymbolState) -> str:
+        """"""
         if self.trade_count >= self.trade_limit:
-            self.write_log(
-                f"今日总成交合约数量{self.trade_count}，超过限制{self.trade_limit}")
-            return False
+            return f"今日总成交合约数量{self.trade_count}，超过限制{self.trade_limit}"
+        return ""
 
-        # Check flow count
-        if self.order_flow_count >= self.order_flow_limit:
-            self.write_log(
-                f"委托流数量{self.order_flow_count}，超过限制每{self.order_flow_clear}秒{self.order_flow_limit}次")
-            return False
+    def check_order_flow(self, req: OrderRequest, state: SymbolState) -> str:
+        """"""
+        count = len(self.flow_times)
+        if count >= self.order_flow_limit:
+            return f"委托流数量{count}，超过限制每{self.order_flow_clear}秒{self.order_flow_limit}次"
+        return ""
 
-        # Check all active orders
-        active_order_count = len(self.main_engine.get_all_active_orders())
-        if active_order_count >= self.active_order_limit:
-            self.write_log(
-                f"当前活动委托次数{active_order_count}，超过限制{self.active_order_limit}")
-            return False
+    def check_symbol_flow(self, req: OrderRequest, state: SymbolState) -> str:
+        """"""
+        count = len(state.flow_times)
+        if count >= self.symbol_flow_limit:
+            return (
+                f"{req.vt_symbol}委托流数量{count}，"
+                f"超过限制每{self.order_flow_clear}秒{self.symbol_flow_limit}次"
+            )
+        return ""
+
+    def check_active_order(self, req: OrderRequest, state: SymbolState) -> str:
+        """"""
+        if self.active_order_count >= self.active_order_limit:
+            return f"当前活动委托次数{self.active_order_count}，超过限制{self.active_order_limit}"
+        return ""
 
-        # Check order cancel counts
-        if req.symbol in self.order_cancel_counts and self.order_cancel_counts[req.symbol] >= self.order_cancel_limit:
-            self.write_log(
-                f"当日{req.symbol}撤单次数{self.order_cancel_counts[req.symbol]}，超过限制{self.order_cancel_limit}")
-            return False
+    def check_order_cancel(self, req: OrderRequest, state: SymbolState) -> str:
+        """"""
+        if state.cancel_count >= self.order_cancel_limit:
+            return f"当日{req.symbol}撤单次数{state.cancel_count}，超过限制{self.order_cancel_limit}"
+        return ""
 
-        # Add flow count if pass all checks
-        self.order_flow_count += 1
-        return True
+    def check_position(self, req: OrderRequest, state: SymbolState) -> str:
+        """
+        Net position if all active orders of the same direction and this
+        order are traded.
+        """
+        if req.direction == Direction.LONG:
+            pos = state.pos + state.long_working + req.volume
+        else:
+            pos = state.pos - state.short_working - req.volume
+
+        if abs(pos) > self.position_limit:
+            return f"{req.vt_symbol}委托后最大持仓{pos}，超过限制{self.position_limit}"
+        return ""
+
+    def check_notional(self, req: OrderRequest, state: SymbolState) -> str:
+        """
+        Market order is rejected if it cannot be valued with latest tick.
+        """
+        price = self.get_value_price(req.vt_symbol, req.price)
+        if not price:
+            return f"{req.vt_symbol}没有最新行情，无法计算市价委托金额"
+
+        notional = state.open_notional + price * req.volume * (state.size or 1)
+        if notional > self.notional_limit:
+            return f"{req.vt_symbol}活动委托金额{notional}，超过限制{self.notional_limit}"
+        return ""
+
+    def check_self_trade(self, req: OrderRequest, state: SymbolState) -> str:
+        """
+        Reject order which may trade with active order of opposite
+        direction in the same account.
+        """
+        market = req.type not in {OrderType.LIMIT, OrderType.FAK, OrderType.FOK}
+
+        for direction, price, _, _ in state.orders.values():
+            if direction == req.direction:
+                continue
+
+            if (
+                market
+                or (req.direction == Direction.LONG and req.price >= price)
+                or (req.direction == Direction.SHORT and req.price <= price)
+            ):
+                return f"{req.vt_symbol}委托价格{req.price}与反向活动委托{price}存在自成交风险"
+
+        return ""
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get check latency statistics and reject counts.
+        """
+        return {
+            "check": self.check_latency.get_summary(),
+            "rejects": dict(self.reject_counts),
+            "active_orders": self.active_order_count,
+        }
+
+    def get_symbol_state(self, gateway_name: str, vt_symbol: str) -> Optional[SymbolState]:
+        """"""
+        return self.states.get((gateway_name, vt_symbol), None)
@@ -0,0 +1,185 @@
+from types import SimpleNamespace
+
+import pytest
+
+from vnpy.app.risk_manager.engine import RiskManagerEngine
+from vnpy.event import Event, EventEngine
+from vnpy.trader.constant import Direction, Exchange, OrderType, Product, Status
+from vnpy.trader.event import EVENT_ORDER, EVENT_TRADE
+from vnpy.trader.object import ContractData, OrderRequest, TickData, TradeData
+
+
+def create_engine():
+    orders = {}
+    sent = []
+    ticks = {}
+
+    def send_order(req, gateway_name):
+        vt_orderid = f"{gateway_name}.{len(sent)}"
+        sent.append(req)
+        orders[vt_orderid] = req.create_order_data(str(len(sent) - 1), gateway_name)
+        return vt_orderid
+
+    def send_orders(reqs, gateway_name):
+        return [send_order(req, gateway_name) for req in reqs]
+
+    contract = ContractData(
+        symbol="rb2101",
+        exchange=Exchange.SHFE,
+        name="rb2101",
+        product=Product.FUTURES,
+        size=10,
+        pricetick=1,
+        gateway_name="CTP"
+    )
+
+    main_engine = SimpleNamespace(
+        send_order=send_order,
+        send_orders=send_orders,
+        get_contract=lambda vt_symbol: contract,
+        get_order=orders.get,
+        get_tick=ticks.get,
+        ticks=ticks
+    )
+    engine = RiskManagerEngine(main_engine, EventEngine())
+
+    setting = engine.get_setting()
+    setting.update({
+        "active": True,
+        "order_flow_limit": 100,
+        "position_limit": 10,
+        "notional_limit": 200000,
+        "self_trade_check": True,
+    })
+    engine.update_setting(setting)
+
+    return engine, main_engine, orders
+
+
+def create_request(
+    direction: Direction,
+    price: float,
+    volume: float,
+    order_type: OrderType = OrderType.LIMIT
+) -> OrderRequest:
+    return OrderRequest(
+        symbol="rb2101",
+        exchange=Exchange.SHFE,
+        direction=direction,
+        type=order_type,
+        volume=volume,
+        price=price
+    )
+
+
+def test_risk_manager_incremental_state():
+    engine, main_engine, orders = create_engine()
+
+    # Basket is checked as a whole: third order exceeds position limit
+    reqs = [create_request(Direction.LONG, 1000, 4) for _ in range(3)]
+    vt_orderids = main_engine.send_orders(reqs, "CTP")
+    assert vt_orderids == ["CTP.0", "CTP.1", ""]
+
+    state = engine.get_symbol_state("CTP", "rb2101.SHFE")
+    assert state.long_working == 8
+    assert state.open_notional == 80000
+    assert engine.active_order_count == 2
+
+    # Self trade with active long orders
+    assert not main_engine.send_order(create_request(Direction.SHORT, 1000, 1), "CTP")
+    assert main_engine.send_order(create_request(Direction.SHORT, 1001, 1), "CTP")
+
+    # Fill first order, which becomes position
+    order = orders["CTP.0"]
+    order.traded = 4
+    order.status = Status.ALLTRADED
+    engine.process_order_event(Event(EVENT_ORDER, order))
+
+    trade = TradeData(
+        symbol="rb2101",
+        exchange=Exchange.SHFE,
+        orderid=order.orderid,
+        tradeid="1",
+        direction=Direction.LONG,
+        price=1000,
+        volume=4,
+        gateway_name="CTP"
+    )
+    engine.process_trade_event(Event(EVENT_TRADE, trade))
+
+    assert state.pos == 4
+    assert state.long_working == 4
+    assert engine.active_order_count == 2
+    assert not main_engine.send_order(create_request(Direction.LONG, 900, 3), "CTP")
+    assert main_engine.send_order(create_request(Direction.LONG, 900, 2), "CTP")
+
+    # Notional limit: 4 * 1000 * 10 + 2 * 900 * 10 + 1 * 1001 * 10 active
+    assert state.open_notional == 68010
+    assert not main_engine.send_order(create_request(Direction.SHORT, 20000, 1), "CTP")
+
+    metrics = engine.get_metrics()
+    assert metrics["check"]["count"] == 8
+    assert metrics["rejects"]["rb2101.SHFE"] == 4
+
+
+def test_market_order_notional():
+    engine, main_engine, orders = create_engine()
+    state = engine.get_symbol_state("CTP", "rb2101.SHFE")
+
+    # Rejected without tick to value the order
+    req = create_request(Direction.LONG, 0, 2, OrderType.MARKET)
+    assert not main_engine.send_order(req, "CTP")
+
+    main_engine.ticks["rb2101.SHFE"] = TickData(
+        symbol="rb2101",
+        exchange=Exchange.SHFE,
+        datetime=None,
+        last_price=5000,
+        gateway_name="CTP"
+    )
+
+    # Valued at last price: 2 * 5000 * 10 active
+    assert main_engine.send_order(req, "CTP") == "CTP.0"
+    state = engine.get_symbol_state("CTP", "rb2101.SHFE")
+    assert state.open_notional == 100000
+
+    # 100000 + 3 * 5000 * 10 exceeds limit
+    req = create_request(Direction.LONG, 0, 3, OrderType.MARKET)
+    assert not main_engine.send_order(req, "CTP")
+
+    # Order event removes notional counted with the same price
+    main_engine.ticks["rb2101.SHFE"].last_price = 6000
+    order = orders["CTP.0"]
+    order.status = Status.NOTTRADED
+    engine.process_order_event(Event(EVENT_ORDER, order))
+    assert state.open_notional == 120000
+
+    order.status = Status.CANCELLED
+    engine.process_order_event(Event(EVENT_ORDER, order))
+    assert state.open_notional == 0
+    assert engine.active_order_count == 0
+
+
+def test_send_error_releases_order():
+    engine, main_engine, orders = create_engine()
+
+    def send_error(req, gateway_name):
+        raise ConnectionError("gateway down")
+
+    engine._send_order = send_error
+    engine._send_orders = send_error
+
+    req = create_request(Direction.LONG, 1000, 4)
+    with pytest.raises(ConnectionError):
+        main_engine.send_order(req, "CTP")
+
+    reqs = [create_request(Direction.LONG, 1000, 4) for _ in range(2)]
+    with pytest.raises(ConnectionError):
+        main_engine.send_orders(reqs, "CTP")
+
+    # Orders counted in check are not kept after sending failed
+    state = engine.get_symbol_state("CTP", "rb2101.SHFE")
+    assert not state.orders
+    assert state.long_working == 0
+    assert state.open_notional == 0
+    assert engine.active_order_count == 0
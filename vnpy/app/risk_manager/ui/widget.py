@@ -31,6 +31,15 @@ class RiskManager(QtWidgets.QDialog):
         self.trade_limit_spin = RiskManagerSpinBox()
         self.active_limit_spin = RiskManagerSpinBox()
         self.cancel_limit_spin = RiskManagerSpinBox()
+        self.symbol_flow_spin = RiskManagerSpinBox()
+        self.position_limit_spin = RiskManagerSpinBox()
+        self.notional_limit_spin = RiskManagerSpinBox()
+        self.notional_limit_spin.setMaximum(2 ** 31 - 1)
+
+        self.self_trade_combo = QtWidgets.QComboBox()
+        self.self_trade_combo.addItems(["停止", "启动"])
+
+        self.latency_label = QtWidgets.QLabel()
 
         save_button = QtWidgets.QPushButton("保存")
         save_button.clicked.connect(self.save_setting)
@@ -44,6 +53,11 @@ class RiskManager(QtWidgets.QDialog):
         form.addRow("总成交上限（笔）", self.trade_limit_spin)
         form.addRow("活动委托上限（笔）", self.active_limit_spin)
         form.addRow("合约撤单上限（笔）", self.cancel_limit_spin)
+        form.addRow("合约流控上限（笔）", self.symbol_flow_spin)
+        form.addRow("合约持仓上限（数量）", self.position_limit_spin)
+        form.addRow("合约委托金额上限", self.notional_limit_spin)
+        form.addRow("自成交检查", self.self_trade_combo)
+        form.addRow("检查耗时（微秒）", self.latency_label)
         form.addRow(save_button)
 
         self.setLayout(form)
@@ -68,6 +82,10 @@ class RiskManager(QtWidgets.QDialog):
             "trade_limit": self.trade_limit_spin.value(),
             "active_order_limit": self.active_limit_spin.value(),
             "order_cancel_limit": self.cancel_limit_spin.value(),
+            "symbol_flow_limit": self.symbol_flow_spin.value(),
+            "position_limit": self.position_limit_spin.value(),
+            "notional_limit": self.notional_limit_spin.value(),
+            "self_trade_check": self.self_trade_combo.currentText() == "启动",
         }
 
         self.rm_engine.update_setting(setting)
@@ -89,6 +107,16 @@ class RiskManager(QtWidgets.QDialog):
         self.trade_limit_spin.setValue(setting["trade_limit"])
         self.active_limit_spin.setValue(setting["active_order_limit"])
         self.cancel_limit_spin.setValue(setting["order_cancel_limit"])
+        self.symbol_flow_spin.setValue(setting["symbol_flow_limit"])
+        self.position_limit_spin.setValue(setting["position_limit"])
+        self.notional_limit_spin.setValue(setting["notional_limit"])
+        self.self_trade_combo.setCurrentIndex(int(setting["self_trade_check"]))
+
+        summary = self.rm_engine.get_metrics()["check"]
+        self.latency_label.setText(
+            f"P50 {summary['p50']:.1f} / P99 {summary['p99']:.1f} / "
+            f"最大 {summary['max']:.1f}"
+        )
 
     def exec_(self):
         """"""
@@ -1,11 +1,20 @@
 """"""
 
 import traceback
-from typing import Optional
+from threading import Event as ThreadEvent, Lock, Thread
+from time import monotonic
+from typing import Dict, Optional
 
-from vnpy.event import Event, EventEngine
+from vnpy.event import Event, EventEngine, EVENT_TIMER
 from vnpy.rpc import RpcServer
 from vnpy.trader.engine import BaseEngine, MainEngine
+from vnpy.trader.event import (
+    EVENT_TICK,
+    EVENT_TRADE,
+    EVENT_ORDER,
+    EVENT_POSITION,
+    EVENT_ACCOUNT
+)
 from vnpy.trader.utility import load_json, save_json
 from vnpy.trader.object import LogData
 
@@ -13,6 +22,16 @@ APP_NAME = "RpcService"
 
 EVENT_RPC_LOG = "eRpcLog"
 
+# Events with specific suffix are generated again by RpcGateway,
+# so only the general ones are published.
+GENERAL_EVENTS = (
+    EVENT_TICK,
+    EVENT_TRADE,
+    EVENT_ORDER,
+    EVENT_POSITION,
+    EVENT_ACCOUNT
+)
+
 
 class RpcEngine(BaseEngine):
     """"""
@@ -27,6 +46,14 @@ class RpcEngine(BaseEngine):
 
         self.server: Optional[RpcServer] = None
 
+        # Seconds between published ticks of each symbol, 0 for no conflation
+        self.tick_interval: float = 0
+        self.tick_lock: Lock = Lock()
+        self.tick_published: Dict[str, float] = {}
+        self.tick_pending: Dict[str, Event] = {}
+        self.tick_thread: Optional[Thread] = None
+        self.tick_stop: ThreadEvent = ThreadEvent()
+
         self.init_server()
         self.load_setting()
         self.register_event()
@@ -35,38 +62,47 @@ class RpcEngine(BaseEngine):
         """"""
         self.server = RpcServer()
 
-        self.server.register(self.main_engine.subscribe)
-        self.server.register(self.main_engine.send_order)
-        self.server.register(self.main_engine.send_orders)
-        self.server.register(self.main_engine.cancel_order)
-        self.server.register(self.main_engine.cancel_orders)
-        self.server.register(self.main_engine.query_history)
-
-        self.server.register(self.main_engine.get_tick)
-        self.server.register(self.main_engine.get_order)
-        self.server.register(self.main_engine.get_trade)
-        self.server.register(self.main_engine.get_position)
-        self.server.register(self.main_engine.get_account)
-        self.server.register(self.main_engine.get_contract)
-        self.server.register(self.main_engine.get_all_ticks)
-        self.server.register(self.main_engine.get_all_orders)
-        self.server.register(self.main_engine.get_all_trades)
-        self.server.register(self.main_engine.get_all_positions)
-        self.server.register(self.main_engine.get_all_accounts)
-        self.server.register(self.main_engine.get_all_contracts)
-        self.server.register(self.main_engine.get_all_active_orders)
+        # Trading functions are executed one by one in order, and are
+        # not blocked by slow queries running in other worker threads.
+        self.server.register(self.main_engine.subscribe, group="trading")
+        self.server.register(self.main_engine.send_order, group="trading")
+        self.server.register(self.main_engine.send_orders, group="trading")
+        self.server.register(self.main_engine.cancel_order, group="trading")
+        self.server.register(self.main_engine.cancel_orders, group="trading")
+
+        self.server.register(self.main_engine.query_history, concurrency=2, timeout=120)
+
+        for func in [
+            self.main_engine.get_tick,
+            self.main_engine.get_order,
+            self.main_engine.get_trade,
+            self.main_engine.get_position,
+            self.main_engine.get_account,
+            self.main_engine.get_contract,
+            self.main_engine.get_all_ticks,
+            self.main_engine.get_all_orders,
+            self.main_engine.get_all_trades,
+            self.main_engine.get_all_positions,
+            self.main_engine.get_all_accounts,
+            self.main_engine.get_all_contracts,
+            self.main_engine.get_all_active_orders,
+            self.main_engine.get_active_order_count
+        ]:
+            self.server.register(func, concurrency=4, group="query")
 
     def load_setting(self):
         """"""
         setting = load_json(self.setting_filename)
         self.rep_address = setting.get("rep_address", self.rep_address)
         self.pub_address = setting.get("pub_address", self.pub_address)
+        self.tick_interval = setting.get("tick_interval", self.tick_interval)
 
     def save_setting(self):
         """"""
         setting = {
             "rep_address": self.rep_address,
-            "pub_address": self.pub_address
+            "pub_address": self.pub_address,
+            "tick_interval": self.tick_interval
         }
         save_json(self.setting_filename, setting)
 
@@ -86,6 +122,11 @@ class RpcEngine(BaseEngine):
             self.write_log(f"RPC服务启动失败：{msg}")
             return False
 
+        if self.tick_interval:
+            self.tick_stop.clear()
+            self.tick_thread = Thread(target=self.run_tick_flush, daemon=True)
+            self.tick_thread.start()
+
         self.save_setting()
         self.write_log("RPC服务启动成功")
         return True
@@ -96,6 +137,11 @@ class RpcEngine(BaseEngine):
             self.write_log("RPC服务未启动")
             return False
 
+        if self.tick_thread:
+            self.tick_stop.set()
+            self.tick_thread.join()
+            self.tick_thread = None
+
         self.server.stop()
         self.server.join()
         self.write_log("RPC服务已停止")
@@ -111,8 +157,66 @@ class RpcEngine(BaseEngine):
 
     def process_event(self, event: Event):
         """"""
-        if self.server.is_active():
-            self.server.publish("", event)
+        if not self.server.is_active():
+            return
+
+        type_ = event.type
+        if type_ == EVENT_TIMER:
+            return
+        elif type_ not in GENERAL_EVENTS and type_.startswith(GENERAL_EVENTS):
+            return
+
+        if type_ == EVENT_TICK and self.tick_interval:
+            self.conflate_tick(event)
+        else:
+            self.publish_event(event)
+
+    def publish_event(self, event: Event) -> None:
+        """
+        Topic is event type followed by vt_symbol of data, e.g.
+        "eTick.rb2101.SHFE", so that client can subscribe by prefix.
+        """
+        vt_symbol = getattr(event.data, "vt_symbol", "") or ""
+        self.server.publish(event.type + vt_symbol, event)
+
+    def conflate_tick(self, event: Event) -> None:
+        """
+        Publish at most one tick of each symbol within tick interval.
+        Tick received within interval is kept as pending, and replaced
+        by later ones, until published by flush thread.
+        """
+        vt_symbol = event.data.vt_symbol
+        now = monotonic()
+
+        with self.tick_lock:
+            published = self.tick_published.get(vt_symbol, 0)
+            if now - published < self.tick_interval:
+                self.tick_pending[vt_symbol] = event
+                return
+
+            self.tick_published[vt_symbol] = now
+            self.tick_pending.pop(vt_symbol, None)
+
+        self.publish_event(event)
+
+    def run_tick_flush(self) -> None:
+        """
+        Publish pending ticks whose interval has passed.
+        """
+        wait = self.tick_interval / 2
+
+        while not self.tick_stop.wait(wait):
+            now = monotonic()
+            events = []
+
+            with self.tick_lock:
+                for vt_symbol, event in list(self.tick_pending.items()):
+                    if now - self.tick_published[vt_symbol] >= self.tick_interval:
+                        self.tick_published[vt_symbol] = now
+                        events.append(self.tick_pending.pop(vt_symbol))
+
+            for event in events:
+                self.publish_event(event)
 
     def write_log(self, msg: str) -> None:
         """"""
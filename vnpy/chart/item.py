@@ -2,6 +2,7 @@ from abc import abstractmethod
 from typing import List, Dict, Tuple
 
 import pyqtgraph as pg
+from numpy import ndarray
 
 from vnpy.trader.ui import QtCore, QtGui, QtWidgets
 from vnpy.trader.object import BarData
@@ -19,9 +20,14 @@ class ChartItem(pg.GraphicsObject):
 
         self._manager: BarManager = manager
 
-        self._bar_picutures: Dict[int, QtGui.QPicture] = {}
         self._item_picuture: QtGui.QPicture = None
 
+        # Subclass overriding legacy hook is drawn bar by bar
+        self._legacy: bool = (
+            type(self)._draw_bar_picture is not ChartItem._draw_bar_picture
+        )
+        self._bar_picutures: Dict[int, QtGui.QPicture] = {}
+
         self._black_brush: QtGui.QBrush = pg.mkBrush(color=BLACK_COLOR)
 
         self._up_pen: QtGui.QPen = pg.mkPen(
@@ -34,15 +40,34 @@ class ChartItem(pg.GraphicsObject):
         )
         self._down_brush: QtGui.QBrush = pg.mkBrush(color=DOWN_COLOR)
 
-        self._rect_area: Tuple[float, float] = None
+        self._rect_area: Tuple[int, int, int] = None
 
         # Very important! Only redraw the visible part and improve speed a lot.
         self.setFlag(self.ItemUsesExtendedStyleOption)
 
     @abstractmethod
+    def _draw_bars(
+        self,
+        painter: QtGui.QPainter,
+        index: ndarray,
+        open_: ndarray,
+        high: ndarray,
+        low: ndarray,
+        close: ndarray,
+        volume: ndarray,
+        bar_width: float
+    ) -> None:
+        """
+        Draw bars with data arrays, bar_width is half width of bar body.
+        """
+        pass
+
     def _draw_bar_picture(self, ix: int, bar: BarData) -> QtGui.QPicture:
         """
         Draw picture for specific bar.
+
+        Legacy hook, only used when overridden by subclass instead of
+        _draw_bars. Bars are then drawn one by one without aggregation.
         """
         pass
 
@@ -74,23 +99,24 @@ class ChartItem(pg.GraphicsObject):
         Update a list of bar data.
         """
         self._bar_picutures.clear()
-
-        bars = self._manager.get_all_bars()
-        for ix, bar in enumerate(bars):
-            bar_picture = self._draw_bar_picture(ix, bar)
-            self._bar_picutures[ix] = bar_picture
-
+        self._item_picuture = None
+        self.prepareGeometryChange()
         self.update()
 
     def update_bar(self, bar: BarData) -> BarData:
         """
         Update single bar data.
         """
-        ix = self._manager.get_index(bar.datetime)
-
-        bar_picture = self._draw_bar_picture(ix, bar)
-        self._bar_picutures[ix] = bar_picture
+        if self._legacy:
+            # Index of later bars changed if bar inserted before them
+            ix = self._manager.get_index(bar.datetime)
+            if ix == self._manager.get_count() - 1:
+                self._bar_picutures.pop(ix, None)
+            else:
+                self._bar_picutures.clear()
 
+        self._item_picuture = None
+        self.prepareGeometryChange()
         self.update()
 
     def update(self) -> None:
@@ -113,36 +139,68 @@ class ChartItem(pg.GraphicsObject):
         """
         rect = opt.exposedRect
 
-        min_ix = int(rect.left())
-        max_ix = int(rect.right())
-        max_ix = min(max_ix, len(self._bar_picutures))
+        # Exposed rect may be the whole item, so limit it to visible range
+        view_rect = self.viewRect()
+        if view_rect:
+            rect = rect.intersected(view_rect)
+
+        min_ix = max(0, int(rect.left()))
+        max_ix = min(int(rect.right()) + 1, self._manager.get_count())
 
-        rect_area = (min_ix, max_ix)
+        # Bars in one pixel are aggregated into one bar
+        pixel_width = abs(painter.transform().m11())
+        if pixel_width:
+            step = max(1, int(1 / pixel_width))
+        else:
+            step = 1
+
+        rect_area = (min_ix, max_ix, step)
         if rect_area != self._rect_area or not self._item_picuture:
             self._rect_area = rect_area
-            self._draw_item_picture(min_ix, max_ix)
+            self._draw_item_picture(min_ix, max_ix, step)
 
         self._item_picuture.play(painter)
 
-    def _draw_item_picture(self, min_ix: int, max_ix: int) -> None:
+    def _draw_item_picture(self, min_ix: int, max_ix: int, step: int) -> None:
         """
         Draw the picture of item in specific range.
         """
         self._item_picuture = QtGui.QPicture()
         painter = QtGui.QPainter(self._item_picuture)
 
-        for n in range(min_ix, max_ix):
-            bar_picture = self._bar_picutures[n]
-            bar_picture.play(painter)
+        if self._legacy:
+            self._draw_bar_pictures(painter, min_ix, max_ix)
+        else:
+            arrays = self._manager.get_aggregated_arrays(min_ix, max_ix, step)
+            if len(arrays[0]):
+                self._draw_bars(painter, *arrays, BAR_WIDTH * step)
 
         painter.end()
 
+    def _draw_bar_pictures(
+        self,
+        painter: QtGui.QPainter,
+        min_ix: int,
+        max_ix: int
+    ) -> None:
+        """
+        Draw bars in specific range with cached picture of each bar.
+        """
+        for ix in range(min_ix, max_ix):
+            bar_picture = self._bar_picutures.get(ix, None)
+            if not bar_picture:
+                bar = self._manager.get_bar(ix)
+                bar_picture = self._draw_bar_picture(ix, bar)
+                self._bar_picutures[ix] = bar_picture
+
+            bar_picture.play(painter)
+
     def clear_all(self) -> None:
         """
         Clear all data in the item.
         """
-        self._item_picuture = None
         self._bar_picutures.clear()
+        self._item_picuture = None
         self.update()
 
 
@@ -153,45 +211,61 @@ class CandleItem(ChartItem):
         """"""
         super().__init__(manager)
 
-    def _draw_bar_picture(self, ix: int, bar: BarData) -> QtGui.QPicture:
+    def _draw_bars(
+        self,
+        painter: QtGui.QPainter,
+        index: ndarray,
+        open_: ndarray,
+        high: ndarray,
+        low: ndarray,
+        close: ndarray,
+        volume: ndarray,
+        bar_width: float
+    ) -> None:
         """"""
-        # Create objects
-        candle_picture = QtGui.QPicture()
-        painter = QtGui.QPainter(candle_picture)
-
-        # Set painter color
-        if bar.close_price >= bar.open_price:
-            painter.setPen(self._up_pen)
-            painter.setBrush(self._black_brush)
-        else:
-            painter.setPen(self._down_pen)
-            painter.setBrush(self._down_brush)
-
-        # Draw candle shadow
-        if bar.high_price > bar.low_price:
-            painter.drawLine(
-                QtCore.QPointF(ix, bar.high_price),
-                QtCore.QPointF(ix, bar.low_price)
-            )
+        up = close >= open_
+
+        for mask, pen, brush in [
+            (up, self._up_pen, self._black_brush),
+            (~up, self._down_pen, self._down_brush)
+        ]:
+            # Set painter color
+            painter.setPen(pen)
+            painter.setBrush(brush)
+
+            ix = index[mask]
+            o = open_[mask]
+            h = high[mask]
+            lo = low[mask]
+            c = close[mask]
+
+            # Draw candle shadow
+            shadow = h > lo
+            lines = [
+                QtCore.QLineF(x, y1, x, y2)
+                for x, y1, y2 in zip(
+                    ix[shadow].tolist(), h[shadow].tolist(), lo[shadow].tolist()
+                )
+            ]
 
-        # Draw candle body
-        if bar.open_price == bar.close_price:
-            painter.drawLine(
-                QtCore.QPointF(ix - BAR_WIDTH, bar.open_price),
-                QtCore.QPointF(ix + BAR_WIDTH, bar.open_price),
+            # Draw candle body
+            flat = o == c
+            lines.extend(
+                QtCore.QLineF(x - bar_width, y, x + bar_width, y)
+                for x, y in zip(ix[flat].tolist(), o[flat].tolist())
             )
-        else:
-            rect = QtCore.QRectF(
-                ix - BAR_WIDTH,
-                bar.open_price,
-                BAR_WIDTH * 2,
-                bar.close_price - bar.open_price
-            )
-            painter.drawRect(rect)
 
-        # Finish
-        painter.end()
-        return candle_picture
+            rects = [
+                QtCore.QRectF(x - bar_width, y1, bar_width * 2, y2 - y1)
+                for x, y1, y2 in zip(
+                    ix[~flat].tolist(), o[~flat].tolist(), c[~flat].tolist()
+                )
+            ]
+
+            if lines:
+                painter.drawLines(lines)
+            if rects:
+                painter.drawRects(rects)
 
     def boundingRect(self) -> QtCore.QRectF:
         """"""
@@ -199,7 +273,7 @@ class CandleItem(ChartItem):
         rect = QtCore.QRectF(
             0,
             min_price,
-            len(self._bar_picutures),
+            self._manager.get_count(),
             max_price - min_price
         )
         return rect
@@ -253,32 +327,35 @@ class VolumeItem(ChartItem):
         """"""
         super().__init__(manager)
 
-    def _draw_bar_picture(self, ix: int, bar: BarData) -> QtGui.QPicture:
+    def _draw_bars(
+        self,
+        painter: QtGui.QPainter,
+        index: ndarray,
+        open_: ndarray,
+        high: ndarray,
+        low: ndarray,
+        close: ndarray,
+        volume: ndarray,
+        bar_width: float
+    ) -> None:
         """"""
-        # Create objects
-        volume_picture = QtGui.QPicture()
-        painter = QtGui.QPainter(volume_picture)
-
-        # Set painter color
-        if bar.close_price >= bar.open_price:
-            painter.setPen(self._up_pen)
-            painter.setBrush(self._up_brush)
-        else:
-            painter.setPen(self._down_pen)
-            painter.setBrush(self._down_brush)
-
-        # Draw volume body
-        rect = QtCore.QRectF(
-            ix - BAR_WIDTH,
-            0,
-            BAR_WIDTH * 2,
-            bar.volume
-        )
-        painter.drawRect(rect)
-
-        # Finish
-        painter.end()
-        return volume_picture
+        up = close >= open_
+
+        for mask, pen, brush in [
+            (up, self._up_pen, self._up_brush),
+            (~up, self._down_pen, self._down_brush)
+        ]:
+            # Set painter color
+            painter.setPen(pen)
+            painter.setBrush(brush)
+
+            # Draw volume body
+            rects = [
+                QtCore.QRectF(x - bar_width, 0, bar_width * 2, y)
+                for x, y in zip(index[mask].tolist(), volume[mask].tolist())
+            ]
+            if rects:
+                painter.drawRects(rects)
 
     def boundingRect(self) -> QtCore.QRectF:
         """"""
@@ -286,7 +363,7 @@ class VolumeItem(ChartItem):
         rect = QtCore.QRectF(
             0,
             min_volume,
-            len(self._bar_picutures),
+            self._manager.get_count(),
             max_volume - min_volume
         )
         return rect
@@ -1,175 +1,364 @@
-from typing import Dict, List, Tuple
+from bisect import bisect_left
+from operator import attrgetter
+from typing import Callable, Dict, List, Tuple
 from datetime import datetime, timezone
 
+import numpy as np
+from numpy import ndarray
+
 from vnpy.trader.object import BarData
 
 from .base import to_int
 
 
+# Number of bars aggregated into one element of sparse table
+BLOCK_SIZE = 64
+
+# Initial length of bar data arrays, doubled when full
+INIT_CAPACITY = 1024
+
+# Array name: bar attribute
+FIELDS = {
+    "open": "open_price",
+    "high": "high_price",
+    "low": "low_price",
+    "close": "close_price",
+    "volume": "volume"
+}
+
+
+class SparseTable:
+    """
+    Min or max value of any index range in an array.
+
+    Array is divided into blocks of BLOCK_SIZE, and level k of table
+    saves result of 2^k blocks starting from each block, so that range
+    of complete blocks is covered by two overlapped table elements, and
+    only partial blocks at both ends are scanned.
+    """
+
+    def __init__(self, ufunc: Callable):
+        """
+        ufunc is np.minimum or np.maximum.
+        """
+        self.ufunc = ufunc
+        self.levels: List[ndarray] = []
+        self.count: int = 0             # Number of blocks in table
+
+    def build(self, data: ndarray) -> None:
+        """
+        Build table with complete blocks of data.
+        """
+        self.count = len(data) // BLOCK_SIZE
+        self.levels = []
+
+        if not self.count:
+            return
+
+        blocks = data[:self.count * BLOCK_SIZE].reshape(self.count, BLOCK_SIZE)
+        level = self.ufunc.reduce(blocks, axis=1)
+        self.levels.append(level)
+
+        width = 1
+        while width * 2 <= self.count:
+            level = self.ufunc(level[:-width], level[width:])
+            self.levels.append(level)
+            width *= 2
+
+    def update(self, data: ndarray, ix: int) -> None:
+        """
+        Update table after data[ix] changed, only elements covering the
+        block of ix are recalculated.
+        """
+        block = ix // BLOCK_SIZE
+        if block >= self.count:
+            return
+
+        ufunc = self.ufunc
+        start = block * BLOCK_SIZE
+        self.levels[0][block] = ufunc.reduce(data[start:start + BLOCK_SIZE])
+
+        width = 1
+        for previous, level in zip(self.levels[:-1], self.levels[1:]):
+            first = max(0, block - width * 2 + 1)
+            last = min(block, len(level) - 1) + 1
+
+            level[first:last] = ufunc(
+                previous[first:last],
+                previous[first + width:last + width]
+            )
+            width *= 2
+
+    def query(self, data: ndarray, start: int, end: int) -> float:
+        """
+        Get result of data[start:end], which should not be empty.
+        """
+        ufunc = self.ufunc
+
+        first_block = -(-start // BLOCK_SIZE)
+        last_block = min(end // BLOCK_SIZE, self.count)
+
+        if first_block >= last_block:
+            return ufunc.reduce(data[start:end])
+
+        k = (last_block - first_block).bit_length() - 1
+        level = self.levels[k]
+        result = ufunc(level[first_block], level[last_block - (1 << k)])
+
+        head_end = first_block * BLOCK_SIZE
+        if start < head_end:
+            result = ufunc(result, ufunc.reduce(data[start:head_end]))
+
+        tail_start = last_block * BLOCK_SIZE
+        if tail_start < end:
+            result = ufunc(result, ufunc.reduce(data[tail_start:end]))
+
+        return result
+
+
 class BarManager:
-    """"""
+    """
+    Bar data sorted by datetime, with price and volume saved in arrays.
+    """
 
     def __init__(self):
         """"""
-        self._bars: Dict[datetime, BarData] = {}
-        self._datetime_index_map: Dict[datetime, int] = {}
-        self._index_datetime_map: Dict[int, datetime] = {}
+        self._bars: List[BarData] = []
+        self._datetimes: List[datetime] = []
 
-        self._price_ranges: Dict[Tuple[int, int], Tuple[float, float]] = {}
-        self._volume_ranges: Dict[Tuple[int, int], Tuple[float, float]] = {}
+        self._count: int = 0
+        self._arrays: Dict[str, ndarray] = {
+            field: np.zeros(INIT_CAPACITY) for field in FIELDS
+        }
+
+        self._low_table: SparseTable = SparseTable(np.minimum)
+        self._high_table: SparseTable = SparseTable(np.maximum)
+        self._volume_table: SparseTable = SparseTable(np.maximum)
+        self._table_dirty: bool = False
 
     def update_history(self, history: List[BarData]) -> None:
         """
         Update a list of bar data.
         """
         # Put all new bars into dict
+        bars = dict(zip(self._datetimes, self._bars))
+
         for bar in history:
             bar.datetime = bar.datetime.astimezone(tz=timezone.utc)
-            self._bars[bar.datetime] = bar
+            bars[bar.datetime] = bar
 
-        # Sort bars dict according to bar.datetime
-        kk = self._bars.keys()
-        # for val in kk:
-        #     if val. <= 0:
-        #         break
-        self._bars = dict(sorted(self._bars.items(), key=lambda tp: tp[0]))
+        # Sort bars according to bar.datetime
+        self._datetimes = sorted(bars)
+        self._bars = [bars[dt] for dt in self._datetimes]
+        self._count = len(self._bars)
 
-        # Update map relationiship
-        ix_list = range(len(self._bars))
-        dt_list = self._bars.keys()
+        # Save data into arrays
+        capacity = max(INIT_CAPACITY, self._count * 2)
+        for field, name in FIELDS.items():
+            array = np.zeros(capacity)
+            array[:self._count] = list(map(attrgetter(name), self._bars))
+            self._arrays[field] = array
 
-        self._datetime_index_map = dict(zip(dt_list, ix_list))
-        self._index_datetime_map = dict(zip(ix_list, dt_list))
-
-        # Clear data range cache
-        self._clear_cache()
+        self._table_dirty = True
 
     def update_bar(self, bar: BarData) -> None:
         """
         Update one single bar data.
         """
+        bar.datetime = bar.datetime.astimezone(tz=timezone.utc)
         dt = bar.datetime
 
-        if dt not in self._datetime_index_map:
-            ix = len(self._bars)
-            self._datetime_index_map[dt] = ix
-            self._index_datetime_map[ix] = dt
+        ix = bisect_left(self._datetimes, dt)
 
-        self._bars[dt] = bar
+        if ix < self._count and self._datetimes[ix] == dt:
+            self._bars[ix] = bar
+            inserted = False
+        else:
+            self._insert_bar(ix, bar)
+            inserted = True
+
+        for field, name in FIELDS.items():
+            self._arrays[field][ix] = getattr(bar, name)
+
+        # Table is rebuilt when bars moved or a new block completed,
+        # otherwise only updated around changed bar
+        if self._table_dirty:
+            return
+
+        if inserted and (
+            ix < self._high_table.count * BLOCK_SIZE
+            or self._count // BLOCK_SIZE != self._high_table.count
+        ):
+            self._table_dirty = True
+        else:
+            self._low_table.update(self._arrays["low"], ix)
+            self._high_table.update(self._arrays["high"], ix)
+            self._volume_table.update(self._arrays["volume"], ix)
+
+    def _insert_bar(self, ix: int, bar: BarData) -> None:
+        """
+        Insert new bar at index, bars after it are moved backward.
+        """
+        capacity = len(self._arrays["close"])
 
-        self._clear_cache()
+        for field, array in self._arrays.items():
+            if self._count == capacity:
+                new_array = np.zeros(capacity * 2)
+                new_array[:capacity] = array
+                array = new_array
+                self._arrays[field] = array
+
+            array[ix + 1:self._count + 1] = array[ix:self._count]
+
+        self._bars.insert(ix, bar)
+        self._datetimes.insert(ix, bar.datetime)
+        self._count += 1
 
     def get_count(self) -> int:
         """
         Get total number of bars.
         """
-        return len(self._bars)
+        return self._count
 
     def get_index(self, dt: datetime) -> int:
         """
         Get index with datetime.
         """
-        return self._datetime_index_map.get(dt, None)
+        dt = dt.astimezone(tz=timezone.utc)
+
+        ix = bisect_left(self._datetimes, dt)
+        if ix < self._count and self._datetimes[ix] == dt:
+            return ix
+        return None
 
     def get_datetime(self, ix: float) -> datetime:
         """
         Get datetime with index.
         """
         ix = to_int(ix)
-        return self._index_datetime_map.get(ix, None)
+        if 0 <= ix < self._count:
+            return self._datetimes[ix]
+        return None
 
     def get_bar(self, ix: float) -> BarData:
         """
         Get bar data with index.
         """
         ix = to_int(ix)
-        dt = self._index_datetime_map.get(ix, None)
-        if not dt:
-            return None
-
-        return self._bars[dt]
+        if 0 <= ix < self._count:
+            return self._bars[ix]
+        return None
 
     def get_all_bars(self) -> List[BarData]:
         """
         Get all bar data.
         """
-        return list(self._bars.values())
+        return list(self._bars)
 
-    def get_price_range(self, min_ix: float = None, max_ix: float = None) -> Tuple[float, float]:
+    def get_array(self, field: str) -> ndarray:
         """
-        Get price range to show within given index range.
+        Get array of open/high/low/close/volume of all bars.
         """
-        if not self._bars:
-            return 0, 1
+        return self._arrays[field][:self._count]
+
+    def get_aggregated_arrays(
+        self,
+        min_ix: int,
+        max_ix: int,
+        step: int
+    ) -> Tuple[ndarray, ndarray, ndarray, ndarray, ndarray, ndarray]:
+        """
+        Get index, open, high, low, close and volume of bars within index
+        range [min_ix, max_ix), with every step bars aggregated into one.
 
-        if not min_ix:
-            min_ix = 0
-            max_ix = len(self._bars) - 1
-        else:
-            min_ix = to_int(min_ix)
-            max_ix = to_int(max_ix)
-            max_ix = min(max_ix, self.get_count())
+        Groups are aligned to multiple of step, so that aggregated bars
+        do not change when moving range. Index of aggregated bar is the
+        center of group, and volume is the max volume in group.
+        """
+        min_ix = max(0, min_ix // step * step)
+        max_ix = min(self._count, max_ix)
 
-        buf = self._price_ranges.get((min_ix, max_ix), None)
-        if buf:
-            return buf
+        if min_ix >= max_ix:
+            empty = np.zeros(0)
+            return empty, empty, empty, empty, empty, empty
 
-        bar_list = list(self._bars.values())[min_ix:max_ix + 1]
-        first_bar = bar_list[0]
-        max_price = first_bar.high_price
-        min_price = first_bar.low_price
+        open_ = self._arrays["open"][min_ix:max_ix]
+        high = self._arrays["high"][min_ix:max_ix]
+        low = self._arrays["low"][min_ix:max_ix]
+        close = self._arrays["close"][min_ix:max_ix]
+        volume = self._arrays["volume"][min_ix:max_ix]
 
-        for bar in bar_list[1:]:
-            max_price = max(max_price, bar.high_price)
-            min_price = min(min_price, bar.low_price)
+        if step == 1:
+            index = np.arange(min_ix, max_ix, dtype=float)
+            return index, open_, high, low, close, volume
 
-        self._price_ranges[(min_ix, max_ix)] = (min_price, max_price)
-        return min_price, max_price
+        starts = np.arange(0, max_ix - min_ix, step)
+        ends = np.minimum(starts + step, max_ix - min_ix) - 1
 
-    def get_volume_range(self, min_ix: float = None, max_ix: float = None) -> Tuple[float, float]:
+        index = min_ix + (starts + ends) / 2
+        open_ = open_[starts]
+        high = np.maximum.reduceat(high, starts)
+        low = np.minimum.reduceat(low, starts)
+        close = close[ends]
+        volume = np.maximum.reduceat(volume, starts)
+
+        return index, open_, high, low, close, volume
+
+    def get_price_range(self, min_ix: float = None, max_ix: float = None) -> Tuple[float, float]:
         """
-        Get volume range to show within given index range.
+        Get price range to show within given index range.
         """
-        if not self._bars:
+        start, end = self._get_range(min_ix, max_ix)
+        if start >= end:
             return 0, 1
 
-        if not min_ix:
-            min_ix = 0
-            max_ix = len(self._bars) - 1
-        else:
-            min_ix = to_int(min_ix)
-            max_ix = to_int(max_ix)
-            max_ix = min(max_ix, self.get_count())
+        self._update_table()
 
-        buf = self._volume_ranges.get((min_ix, max_ix), None)
-        if buf:
-            return buf
+        min_price = self._low_table.query(self._arrays["low"], start, end)
+        max_price = self._high_table.query(self._arrays["high"], start, end)
+        return float(min_price), float(max_price)
 
-        bar_list = list(self._bars.values())[min_ix:max_ix + 1]
+    def get_volume_range(self, min_ix: float = None, max_ix: float = None) -> Tuple[float, float]:
+        """
+        Get volume range to show within given index range.
+        """
+        start, end = self._get_range(min_ix, max_ix)
+        if start >= end:
+            return 0, 1
 
-        first_bar = bar_list[0]
-        max_volume = first_bar.volume
-        min_volume = 0
+        self._update_table()
 
-        for bar in bar_list[1:]:
-            max_volume = max(max_volume, bar.volume)
+        max_volume = self._volume_table.query(self._arrays["volume"], start, end)
+        return 0, float(max_volume)
 
-        self._volume_ranges[(min_ix, max_ix)] = (min_volume, max_volume)
-        return min_volume, max_volume
+    def _get_range(self, min_ix: float, max_ix: float) -> Tuple[int, int]:
+        """
+        Convert index range [min_ix, max_ix] into slice range within data.
+        """
+        if min_ix is None:
+            return 0, self._count
 
-    def _clear_cache(self) -> None:
+        start = max(0, to_int(min_ix))
+        end = min(self._count, to_int(max_ix) + 1)
+        return start, end
+
+    def _update_table(self) -> None:
         """
-        Clear cached range data.
+        Rebuild sparse table of range data if bars changed.
         """
-        self._price_ranges.clear()
-        self._volume_ranges.clear()
+        if not self._table_dirty:
+            return
+        self._table_dirty = False
+
+        self._low_table.build(self.get_array("low"))
+        self._high_table.build(self.get_array("high"))
+        self._volume_table.build(self.get_array("volume"))
 
     def clear_all(self) -> None:
         """
         Clear all data in manager.
         """
         self._bars.clear()
-        self._datetime_index_map.clear()
-        self._index_datetime_map.clear()
-
-        self._clear_cache()
+        self._datetimes.clear()
+        self._count = 0
+        self._table_dirty = True
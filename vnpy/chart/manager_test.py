@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData
+from vnpy.chart.manager import BarManager, BLOCK_SIZE
+
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def create_bar(i: int, rng: np.random.Generator) -> BarData:
+    low, high = sorted(rng.uniform(3000, 4000, 2).tolist())
+    open_, close = rng.uniform(low, high, 2).tolist()
+
+    return BarData(
+        symbol="IF888",
+        exchange=Exchange.CFFEX,
+        datetime=START + timedelta(minutes=i),
+        interval=Interval.MINUTE,
+        volume=float(rng.integers(1, 1000)),
+        open_price=open_,
+        high_price=high,
+        low_price=low,
+        close_price=close,
+        gateway_name="DB"
+    )
+
+
+def check_ranges(manager: BarManager, rng: np.random.Generator) -> None:
+    bars = manager.get_all_bars()
+    count = len(bars)
+
+    assert manager.get_price_range() == (
+        min(bar.low_price for bar in bars),
+        max(bar.high_price for bar in bars)
+    )
+
+    for _ in range(200):
+        min_ix, max_ix = sorted(rng.integers(0, count, 2).tolist())
+        selected = bars[min_ix:max_ix + 1]
+
+        assert manager.get_price_range(min_ix, max_ix) == (
+            min(bar.low_price for bar in selected),
+            max(bar.high_price for bar in selected)
+        )
+        assert manager.get_volume_range(min_ix, max_ix) == (
+            0, max(bar.volume for bar in selected)
+        )
+
+
+def test_update_history_sorted():
+    rng = np.random.default_rng(0)
+    bars = [create_bar(i, rng) for i in range(1000)]
+
+    manager = BarManager()
+    manager.update_history(bars[500:])
+    manager.update_history(bars[:600][::-1])
+
+    assert manager.get_count() == 1000
+    assert manager.get_all_bars() == bars
+
+    for ix in [0, 1, 555, 999]:
+        bar = bars[ix]
+        assert manager.get_index(bar.datetime) == ix
+        assert manager.get_datetime(ix) == bar.datetime
+        assert manager.get_bar(ix) is bar
+
+    assert manager.get_index(START - timedelta(minutes=1)) is None
+    assert manager.get_bar(-1) is None
+    assert manager.get_bar(1000) is None
+
+    check_ranges(manager, rng)
+
+
+def test_update_bar():
+    rng = np.random.default_rng(1)
+    bars = [create_bar(i, rng) for i in range(BLOCK_SIZE * 20)]
+
+    manager = BarManager()
+    manager.update_history(bars[:BLOCK_SIZE * 10])
+    check_ranges(manager, rng)
+
+    # Update old bars inside complete blocks
+    for ix in [0, BLOCK_SIZE * 3 + 5, BLOCK_SIZE * 10 - 1]:
+        bar = create_bar(ix, rng)
+        bar.high_price = 5000
+        bar.low_price = 2000
+        manager.update_bar(bar)
+        bars[ix] = bar
+
+        check_ranges(manager, rng)
+
+    # Append new bars across block boundary
+    for bar in bars[BLOCK_SIZE * 10:]:
+        manager.update_bar(bar)
+
+    # Insert missing bar in the middle
+    bar = create_bar(0, rng)
+    bar.datetime = START + timedelta(seconds=30)
+    manager.update_bar(bar)
+    bars.insert(1, bar)
+
+    assert manager.get_all_bars() == bars
+    assert manager.get_index(bar.datetime) == 1
+    check_ranges(manager, rng)
+
+
+def test_aggregated_arrays():
+    rng = np.random.default_rng(2)
+    bars = [create_bar(i, rng) for i in range(1000)]
+
+    manager = BarManager()
+    manager.update_history(bars)
+
+    index, open_, high, low, close, volume = manager.get_aggregated_arrays(103, 1100, 10)
+
+    # Groups aligned to multiple of step, last group is partial
+    assert len(index) == 90
+    assert index[0] == 104.5
+    assert index[-1] == 994.5
+
+    for i, start in enumerate(range(100, 1000, 10)):
+        group = bars[start:start + 10]
+
+        assert open_[i] == group[0].open_price
+        assert close[i] == group[-1].close_price
+        assert high[i] == max(bar.high_price for bar in group)
+        assert low[i] == min(bar.low_price for bar in group)
+        assert volume[i] == max(bar.volume for bar in group)
+
+    index, open_, high, low, close, volume = manager.get_aggregated_arrays(5, 8, 1)
+    assert index.tolist() == [5, 6, 7]
+    assert close.tolist() == [bar.close_price for bar in bars[5:8]]
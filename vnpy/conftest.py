@@ -0,0 +1,6 @@
+# Chart package can only be imported with all dependencies of trader ui installed
+try:
+    import vnpy.trader.ui  # noqa: F401
+    collect_ignore = []
+except ImportError:
+    collect_ignore = ["chart/manager_test.py"]
@@ -2,21 +2,19 @@
 Event-driven framework of vn.py framework.
 """
 
-import re
-
 from collections import defaultdict
 from queue import Empty, Queue
-from threading import Thread
-from time import sleep, time
-from typing import Any, Callable, List
-from kafka.errors import TopicAlreadyExistsError
+from threading import Lock, Thread
+from time import perf_counter_ns, sleep, time
+from typing import Any, Callable, Dict, List
 
 from vnpy.trader.setting import get_settings
-from kafka import KafkaProducer
-from kafka.admin import KafkaAdminClient, NewTopic
-import json
+
+from .metrics import EventMetrics, merge_metrics
+from .sink import BaseEventSink, ConsoleEventSink, EventLogFilter, KafkaEventSink
 
 EVENT_TIMER = "eTimer"
+EVENT_METRICS = "eMetrics"
 
 
 class Event:
@@ -30,6 +28,7 @@ class Event:
         """"""
         self.type: str = type
         self.data: Any = data
+        self.time: int = 0      # perf_counter_ns when put into queue
 
     def __str__(self):
         return "type: {}, data: {}".format(self.type, self.data)
@@ -38,6 +37,27 @@ class Event:
 # Defines handler function to be used in event engine.
 HandlerType = Callable[[Event], None]
 
+# Defines function returning the shard key of an event.
+ShardKeyType = Callable[[Event], str]
+
+
+def shard_by_type(event: Event) -> str:
+    """
+    Use event type prefix as shard key, e.g. "eTick" for "eTick.".
+    """
+    return event.type.split(".", 1)[0]
+
+
+def shard_by_symbol(event: Event) -> str:
+    """
+    Use vt_symbol of event data as shard key, or event type prefix
+    if data has no vt_symbol.
+    """
+    vt_symbol = getattr(event.data, "vt_symbol", None)
+    if vt_symbol:
+        return vt_symbol
+    return shard_by_type(event)
+
 
 class EventEngine:
     """
@@ -46,63 +66,122 @@ class EventEngine:
 
     It also generates timer event by every interval seconds,
     which can be used for timing purpose.
+
+    By default all events are processed in one thread. If workers is
+    larger than 1, events are routed to worker threads by shard key,
+    each with its own queue. Events with same key always go to the
+    same worker, so their order is preserved, but handlers may then be
+    called from different threads at the same time.
     """
 
-    def __init__(self, interval: int = 1):
+    def __init__(
+        self,
+        interval: int = 1,
+        workers: int = 0,
+        shard_key: ShardKeyType = shard_by_symbol,
+        metrics: bool = None
+    ):
         """
         Timer event is generated every 1 second by default, if
         interval not specified.
+
+        If metrics is enabled (default by event_metrics setting),
+        queue wait and handler latency are recorded, and a snapshot
+        is published as eMetrics event every event_metrics_interval
+        seconds.
         """
         self._interval: int = interval
         self._queue: Queue = Queue()
         self._active: bool = False
-        self._thread: Thread = Thread(target=self._run)
+        self._thread: Thread = Thread(target=self._run, args=(self._queue,))
         self._timer: Thread = Thread(target=self._run_timer)
         self._handlers: defaultdict = defaultdict(list)
         self._general_handlers: List = []
-        self._log_debug = get_settings()["log_debug"]
-        self._log_debug_exclude_events = get_settings()["log_debug_exclude_events"].split(",")
-
-        self._kafka_host_port = get_settings()["kafka_broker_host_port"]
-        self._kafka_event_log_topic = "EVENTLOGGG"
-        
-        try:
-            admin_client = KafkaAdminClient(
-                bootstrap_servers=self._kafka_host_port,
-                api_version=(0, 11, 5),
-                client_id='vnpy_muzhi'
-            )
-            topic_list = []
-            topic_list.append(
-                NewTopic(
-                    name=self._kafka_event_log_topic,
-                    num_partitions=1,
-                    replication_factor=1
-                )
-            )
-            admin_client.create_topics(new_topics=topic_list, validate_only=False)
-        except TopicAlreadyExistsError:
-            print("kafka topic {} already exists".format(self._kafka_event_log_topic))
-        
-        self._kafka_producer = KafkaProducer(
-            bootstrap_servers=self._kafka_host_port,
-            api_version=(0, 11, 5),
-            # security_protocol="SASL_SSL",
-            # ssl_context=context,
-            value_serializer=lambda x: json.dumps(x).encode('utf-8')
+
+        self._shard_key: ShardKeyType = shard_key
+        self._shard_queues: List[Queue] = []
+        self._shard_threads: List[Thread] = []
+        self._shard_map: Dict[str, int] = {}
+        self._shard_key_counts: List[int] = []
+        self._shard_lock: Lock = Lock()
+
+        if workers > 1:
+            for _ in range(workers):
+                queue = Queue()
+                self._shard_queues.append(queue)
+                self._shard_threads.append(Thread(target=self._run, args=(queue,)))
+                self._shard_key_counts.append(0)
+
+        settings = get_settings()
+
+        if metrics is None:
+            metrics = settings["event_metrics"]
+        self._metrics_active: bool = metrics
+        self._metrics_interval: int = settings["event_metrics_interval"]
+        self._metrics_list: List[EventMetrics] = []
+
+        # Only updated by timer thread, so that rate does not depend on
+        # other callers of get_metrics
+        self._event_rate: float = 0
+
+        self._log_debug: bool = settings["log_debug"]
+        self._log_filter: EventLogFilter = EventLogFilter(
+            settings["log_debug_exclude_events"]
         )
-        
-    def _run(self) -> None:
+        self._sinks: List[BaseEventSink] = []
+
+        if self._log_debug:
+            sink_setting = {
+                "capacity": settings["log_debug_buffer_size"],
+                "batch_size": settings["log_debug_batch_size"],
+            }
+            if settings["log_debug_console"]:
+                self.add_sink(ConsoleEventSink(**sink_setting))
+            self.add_sink(
+                KafkaEventSink(settings["kafka_broker_host_port"], **sink_setting)
+            )
+
+    def _run(self, queue: Queue) -> None:
         """
         Get event from queue and then process it.
         """
+        if self._metrics_active:
+            metrics = EventMetrics()
+            self._metrics_list.append(metrics)
+        else:
+            metrics = None
+
         while self._active:
             try:
-                event = self._queue.get(block=True, timeout=1)
-                self._process(event)
+                event = queue.get(block=True, timeout=1)
+                if metrics:
+                    self._process_measured(event, metrics)
+                else:
+                    self._process(event)
             except Empty:
                 pass
 
+    def _route(self, event: Event) -> Queue:
+        """
+        Get shard queue of the event.
+
+        A new key is assigned to the worker with fewest keys, and then
+        always goes to the same worker.
+        """
+        key = self._shard_key(event)
+        index = self._shard_map.get(key, None)
+
+        if index is None:
+            with self._shard_lock:
+                index = self._shard_map.get(key, None)
+                if index is None:
+                    counts = self._shard_key_counts
+                    index = counts.index(min(counts))
+                    counts[index] += 1
+                    self._shard_map[key] = index
+
+        return self._shard_queues[index]
+
     def _process(self, event: Event) -> None:
         """
         First ditribute event to those handlers registered listening
@@ -117,50 +196,128 @@ class EventEngine:
         if self._general_handlers:
             [handler(event) for handler in self._general_handlers]
 
-        # print("log debug ex: {}", self._log_debug_exclude_events)
-        if self._log_debug:
-            skip = False
-            for val in self._log_debug_exclude_events:
-                if val != "" and re.match(val, event.type):
-                    skip = True
-                    break
-            if not skip:
-                # event_msg = "ts: {}, {}".format(time(), event)
-                event_msg = str(event)
-                print(event_msg)
-                self._kafka_producer.send(self._kafka_event_log_topic, event_msg)
+        if self._sinks and self._log_filter.accept(event.type):
+            [sink.put(event) for sink in self._sinks]
+
+    def _process_measured(self, event: Event, metrics: EventMetrics) -> None:
+        """
+        Same as _process, but also record latency into metrics.
+        """
+        start = perf_counter_ns()
+        if event.time:
+            metrics.get_histogram(metrics.wait, event.type).record(start - event.time)
+
+        handler_histograms = metrics.handlers
+
+        for handlers in [self._handlers.get(event.type, None), self._general_handlers]:
+            if not handlers:
+                continue
 
+            for handler in handlers:
+                handler_start = perf_counter_ns()
+                handler(event)
+                handler_end = perf_counter_ns()
+
+                histogram = handler_histograms.get(handler, None)
+                if not histogram:
+                    histogram = metrics.get_histogram(handler_histograms, handler)
+                histogram.record(handler_end - handler_start)
+
+        if self._sinks and self._log_filter.accept(event.type):
+            [sink.put(event) for sink in self._sinks]
+
+        metrics.get_histogram(metrics.process, event.type).record(perf_counter_ns() - start)
 
     def _run_timer(self) -> None:
         """
         Sleep by interval second(s) and then generate a timer event.
+
+        Metrics snapshot is also generated here if enabled.
         """
+        elapsed = 0
+        last_time = time()
+        last_count = 0
+
         while self._active:
             sleep(self._interval)
             event = Event(EVENT_TIMER)
             self.put(event)
 
+            if self._metrics_active:
+                elapsed += self._interval
+                if elapsed >= self._metrics_interval:
+                    elapsed = 0
+
+                    now = time()
+                    count = self.get_event_count()
+                    self._event_rate = (count - last_count) / max(now - last_time, 1e-9)
+                    last_time = now
+                    last_count = count
+
+                    self.put(Event(EVENT_METRICS, self.get_metrics()))
+
     def start(self) -> None:
         """
         Start event engine to process events and generate timer events.
         """
         self._active = True
-        self._thread.start()
+
+        if self._shard_threads:
+            for thread in self._shard_threads:
+                thread.start()
+        else:
+            self._thread.start()
+
         self._timer.start()
 
+        for sink in self._sinks:
+            sink.start()
+
     def stop(self) -> None:
         """
         Stop event engine.
         """
         self._active = False
         self._timer.join()
-        self._thread.join()
+
+        if self._shard_threads:
+            for thread in self._shard_threads:
+                thread.join()
+        else:
+            self._thread.join()
+
+        for sink in self._sinks:
+            sink.stop()
 
     def put(self, event: Event) -> None:
         """
         Put an event object into event queue.
         """
-        self._queue.put(event)
+        if self._metrics_active:
+            event.time = perf_counter_ns()
+
+        if self._shard_queues:
+            self._route(event).put(event)
+        else:
+            self._queue.put(event)
+
+    def get_queue_sizes(self) -> List[int]:
+        """
+        Get number of events waiting in each queue.
+
+        Return one value in default mode, or one per worker in
+        sharded mode.
+        """
+        if self._shard_queues:
+            return [queue.qsize() for queue in self._shard_queues]
+        else:
+            return [self._queue.qsize()]
+
+    def get_shard_keys(self) -> Dict[str, int]:
+        """
+        Get worker index of each shard key seen so far.
+        """
+        return dict(self._shard_map)
 
     def register(self, type: str, handler: HandlerType) -> None:
         """
@@ -197,4 +354,49 @@ class EventEngine:
         """
         if handler in self._general_handlers:
             self._general_handlers.remove(handler)
-    
\ No newline at end of file
+
+    def add_sink(self, sink: BaseEventSink) -> None:
+        """
+        Add a sink for recording events not excluded by
+        log_debug_exclude_events.
+        """
+        if sink not in self._sinks:
+            self._sinks.append(sink)
+
+        if self._active:
+            sink.start()
+
+    def get_sink_statistics(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get counters of all sinks, keyed by sink name.
+        """
+        return {sink.sink_name: sink.get_statistics() for sink in self._sinks}
+
+    def get_event_count(self) -> int:
+        """
+        Get count of events processed since start.
+        """
+        return sum(
+            histogram.count
+            for metrics in self._metrics_list
+            for histogram in list(metrics.process.values())
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get snapshot of latency histograms (in microseconds, cumulative
+        since start), queue sizes, sink counters and event rate of the
+        last event_metrics_interval.
+
+        Return empty dict if metrics is not enabled.
+        """
+        if not self._metrics_active:
+            return {}
+
+        snapshot = merge_metrics(self._metrics_list)
+
+        snapshot["queue_sizes"] = self.get_queue_sizes()
+        snapshot["sinks"] = self.get_sink_statistics()
+        snapshot["event_count"] = sum(v["count"] for v in snapshot["process"].values())
+        snapshot["event_rate"] = self._event_rate
+        return snapshot
@@ -0,0 +1,130 @@
+import threading
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+
+from vnpy.event import EVENT_METRICS, Event, EventEngine
+from vnpy.event.engine import shard_by_symbol, shard_by_type
+from vnpy.trader.setting import SETTINGS
+
+
+SYMBOLS = [f"rb210{i}.SHFE" for i in range(6)]
+
+
+@pytest.fixture(autouse=True)
+def no_event_sinks(monkeypatch):
+    # Debug log sinks would write every event to console and Kafka
+    monkeypatch.setitem(SETTINGS, "log_debug", False)
+
+
+def create_tick_event(vt_symbol: str, seq: int) -> Event:
+    return Event(f"eTick.{vt_symbol}", SimpleNamespace(vt_symbol=vt_symbol, seq=seq))
+
+
+def test_shard_key():
+    event = create_tick_event("rb2101.SHFE", 0)
+    assert shard_by_symbol(event) == "rb2101.SHFE"
+    assert shard_by_type(event) == "eTick"
+
+    event = Event("eAccount.CTP.123", SimpleNamespace(accountid="123"))
+    assert shard_by_symbol(event) == "eAccount"
+
+
+def test_sticky_routing():
+    engine = EventEngine(workers=3, metrics=False)
+
+    for seq in range(10):
+        for vt_symbol in SYMBOLS:
+            engine.put(create_tick_event(vt_symbol, seq))
+    engine.put(Event("eTimer"))
+
+    # New keys assigned to worker with fewest keys
+    shard_keys = engine.get_shard_keys()
+    assert list(shard_keys) == SYMBOLS + ["eTimer"]
+    assert [index for index in shard_keys.values()] == [0, 1, 2, 0, 1, 2, 0]
+
+    # Events not processed before start
+    assert engine.get_queue_sizes() == [21, 20, 20]
+
+    # Same key always goes to the same worker
+    for vt_symbol in SYMBOLS:
+        engine.put(create_tick_event(vt_symbol, 10))
+    assert engine.get_shard_keys() == shard_keys
+    assert engine.get_queue_sizes() == [23, 22, 22]
+
+    engine = EventEngine(metrics=False)
+    engine.put(Event("eTimer"))
+    assert engine.get_queue_sizes() == [1]
+
+
+def test_order_within_shard():
+    engine = EventEngine(workers=3, metrics=False)
+
+    count = 1000
+    finished = threading.Event()
+    lock = threading.Lock()
+    received = defaultdict(list)
+    threads = defaultdict(set)
+
+    def process_event(event: Event) -> None:
+        data = event.data
+        with lock:
+            received[data.vt_symbol].append(data.seq)
+            threads[data.vt_symbol].add(threading.current_thread())
+
+            if sum(len(seqs) for seqs in received.values()) == count * len(SYMBOLS):
+                finished.set()
+
+    for vt_symbol in SYMBOLS:
+        engine.register(f"eTick.{vt_symbol}", process_event)
+
+    engine.start()
+
+    for seq in range(count):
+        for vt_symbol in SYMBOLS:
+            engine.put(create_tick_event(vt_symbol, seq))
+
+    assert finished.wait(5)
+    engine.stop()
+
+    assert engine.get_queue_sizes() == [0, 0, 0]
+
+    for vt_symbol in SYMBOLS:
+        assert received[vt_symbol] == list(range(count))
+        assert len(threads[vt_symbol]) == 1
+
+    # Keys distributed to all workers
+    assert len(set.union(*threads.values())) == 3
+
+
+def test_event_rate(monkeypatch):
+    monkeypatch.setitem(SETTINGS, "event_metrics_interval", 0.2)
+    engine = EventEngine(interval=0.1, metrics=True)
+
+    published = []
+    received = threading.Event()
+
+    def process_metrics(event: Event) -> None:
+        published.append(event.data)
+        if len(published) >= 2:
+            received.set()
+
+    engine.register(EVENT_METRICS, process_metrics)
+    engine.register("eTest", lambda event: None)
+    engine.start()
+
+    # Other callers of get_metrics do not change rate published
+    for _ in range(100):
+        engine.put(Event("eTest"))
+        engine.get_metrics()
+
+    assert received.wait(5)
+    engine.stop()
+
+    assert published[0]["event_rate"] > 0
+
+    # Rate is not reset by get_metrics
+    metrics = engine.get_metrics()
+    assert metrics["event_rate"] == engine.get_metrics()["event_rate"]
+    assert metrics["event_count"] >= 100
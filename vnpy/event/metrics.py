@@ -0,0 +1,185 @@
+"""
+Latency and throughput instrumentation of event engine.
+"""
+
+from typing import Any, Dict, List
+
+# Each power of two range is split into 2 ** SUB_BUCKET_BITS linear
+# buckets, so recorded values have relative error below 1 / 16.
+SUB_BUCKET_BITS = 4
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+BUCKET_COUNT = (64 - SUB_BUCKET_BITS) * SUB_BUCKET_COUNT
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    HDR style histogram of latency values in nanoseconds.
+
+    Values are put into log-linear buckets, so that recording is one
+    list increment. No lock is used: a histogram should only be
+    recorded by one thread, and readers from other threads get an
+    approximate view.
+    """
+
+    def __init__(self):
+        """"""
+        self.counts: List[int] = [0] * BUCKET_COUNT
+        self.count: int = 0
+        self.total: int = 0
+        self.min: int = 0
+        self.max: int = 0
+
+    def record(self, value: int) -> None:
+        """
+        Record a latency value in nanoseconds.
+        """
+        if value < 0:
+            value = 0
+
+        if value < SUB_BUCKET_COUNT:
+            index = value
+        else:
+            shift = value.bit_length() - SUB_BUCKET_BITS - 1
+            index = ((shift + 1) << SUB_BUCKET_BITS) + (value >> shift) - SUB_BUCKET_COUNT
+
+        self.counts[index] += 1
+
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add values recorded by another histogram.
+        """
+        if not other.count:
+            return
+
+        counts = self.counts
+        for index, n in enumerate(other.counts):
+            if n:
+                counts[index] += n
+
+        if not self.count or other.min < self.min:
+            self.min = other.min
+        if other.max > self.max:
+            self.max = other.max
+
+        self.count += other.count
+        self.total += other.total
+
+    def get_percentile(self, percentile: float) -> int:
+        """
+        Get value at percentile (0-100), as upper bound of the bucket.
+        """
+        if not self.count:
+            return 0
+
+        target = self.count * percentile / 100
+        accumulated = 0
+
+        for index, n in enumerate(self.counts):
+            accumulated += n
+            if n and accumulated >= target:
+                return min(bucket_upper_bound(index), self.max)
+
+        return self.max
+
+    def get_summary(self) -> Dict[str, float]:
+        """
+        Get count and latency statistics in microseconds.
+        """
+        summary = {
+            "count": self.count,
+            "mean": self.total / self.count / 1000 if self.count else 0,
+            "min": self.min / 1000,
+            "max": self.max / 1000,
+        }
+
+        for percentile in PERCENTILES:
+            summary[f"p{percentile}"] = self.get_percentile(percentile) / 1000
+
+        return summary
+
+
+def bucket_upper_bound(index: int) -> int:
+    """
+    Get largest value which is recorded into the bucket.
+    """
+    if index < SUB_BUCKET_COUNT:
+        return index
+
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    sub = index & (SUB_BUCKET_COUNT - 1)
+    lower = (SUB_BUCKET_COUNT + sub) << shift
+    return lower + (1 << shift) - 1
+
+
+class EventMetrics:
+    """
+    Latency histograms recorded by one event processing thread:
+        * queue wait time, per event type
+        * total processing time, per event type
+        * processing time of each handler.
+    """
+
+    def __init__(self):
+        """"""
+        self.wait: Dict[str, LatencyHistogram] = {}
+        self.process: Dict[str, LatencyHistogram] = {}
+        self.handlers: Dict[Any, LatencyHistogram] = {}
+
+    def get_histogram(self, histograms: Dict[Any, LatencyHistogram], key: Any) -> LatencyHistogram:
+        """"""
+        histogram = histograms.get(key, None)
+        if not histogram:
+            histogram = LatencyHistogram()
+            histograms[key] = histogram
+        return histogram
+
+
+def get_handler_name(handler: Any) -> str:
+    """
+    Get readable name of handler, e.g. "OmsEngine.process_tick_event".
+    """
+    return getattr(handler, "__qualname__", repr(handler))
+
+
+def merge_metrics(metrics_list: List[EventMetrics]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Merge metrics of all threads into summary dicts.
+    """
+    merged = {
+        "wait": {},
+        "process": {},
+        "handlers": {},
+    }
+
+    for metrics in metrics_list:
+        for name, histograms in [
+            ("wait", metrics.wait),
+            ("process", metrics.process),
+        ]:
+            result = merged[name]
+            for key, histogram in list(histograms.items()):
+                if key not in result:
+                    result[key] = LatencyHistogram()
+                result[key].merge(histogram)
+
+        result = merged["handlers"]
+        for handler, histogram in list(metrics.handlers.items()):
+            key = get_handler_name(handler)
+            if key not in result:
+                result[key] = LatencyHistogram()
+            result[key].merge(histogram)
+
+    return {
+        name: {key: histogram.get_summary() for key, histogram in result.items()}
+        for name, result in merged.items()
+    }
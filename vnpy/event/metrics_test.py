@@ -0,0 +1,29 @@
+from vnpy.event.metrics import LatencyHistogram
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    for value in range(1, 100_001):
+        histogram.record(value * 1000)
+
+    assert histogram.count == 100_000
+    assert histogram.min == 1000
+    assert histogram.max == 100_000_000
+
+    for percentile in [50, 90, 99]:
+        expected = percentile * 1_000_000
+        value = histogram.get_percentile(percentile)
+        assert expected <= value <= expected * 1.07
+
+
+def test_latency_histogram_merge():
+    a = LatencyHistogram()
+    b = LatencyHistogram()
+    a.record(10)
+    b.record(5000)
+    a.merge(b)
+
+    assert a.count == 2
+    assert a.min == 10
+    assert a.max == 5000
+    assert a.get_percentile(50) == 10
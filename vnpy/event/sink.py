@@ -0,0 +1,283 @@
+"""
+Event log sinks used by event engine for recording dispatched events.
+"""
+
+import json
+import re
+import sys
+from abc import ABC, abstractmethod
+from collections import deque
+from threading import Event as ThreadEvent, Thread
+from time import time
+from typing import Any, Deque, Dict, List, Tuple
+
+from kafka import KafkaProducer
+from kafka.admin import KafkaAdminClient, NewTopic
+from kafka.errors import TopicAlreadyExistsError
+
+
+class EventLogFilter:
+    """
+    Decides whether an event type should be recorded.
+
+    All exclude patterns are compiled into one regex, and the result
+    for each event type is cached so that the check on dispatch thread
+    is a single dict lookup.
+    """
+
+    def __init__(self, exclude_patterns: str = ""):
+        """
+        exclude_patterns is a comma separated list of regex, which are
+        matched against the beginning of event type.
+        """
+        patterns = [p for p in exclude_patterns.split(",") if p]
+
+        if patterns:
+            self._regex = re.compile("|".join(f"(?:{p})" for p in patterns))
+        else:
+            self._regex = None
+
+        self._cache: Dict[str, bool] = {}
+
+    def accept(self, type: str) -> bool:
+        """
+        Return True if the event type is not excluded.
+        """
+        result = self._cache.get(type, None)
+        if result is None:
+            result = not (self._regex and self._regex.match(type))
+            self._cache[type] = result
+        return result
+
+
+class BaseEventSink(ABC):
+    """
+    Abstract class for implementing an event log sink.
+
+    Events are put into a bounded ring buffer by the dispatch thread
+    and drained in batches by a background thread, so that slow output
+    never delays event handlers. When the buffer is full, new events
+    are dropped and counted instead of blocking.
+    """
+
+    sink_name: str = ""
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        batch_size: int = 500,
+        interval: float = 0.1
+    ):
+        """"""
+        self.capacity: int = capacity
+        self.batch_size: int = batch_size
+        self.interval: float = interval
+
+        self._buffer: Deque[Tuple[float, Any]] = deque()
+        self._signal: ThreadEvent = ThreadEvent()
+        self._active: bool = False
+        self._thread: Thread = None
+
+        self.received_count: int = 0
+        self.written_count: int = 0
+        self.dropped_count: int = 0
+        self.error_count: int = 0
+
+    def put(self, event: Any) -> bool:
+        """
+        Put an event into buffer without blocking.
+
+        Return False if the event is dropped because buffer is full.
+        """
+        self.received_count += 1
+
+        if len(self._buffer) >= self.capacity:
+            self.dropped_count += 1
+            return False
+
+        self._buffer.append((time(), event))
+
+        if len(self._buffer) >= self.batch_size:
+            self._signal.set()
+        return True
+
+    def start(self) -> None:
+        """
+        Start background thread for writing events.
+        """
+        if self._active:
+            return
+
+        self._active = True
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop background thread and write remaining events.
+        """
+        if not self._active:
+            return
+
+        self._active = False
+        self._signal.set()
+        self._thread.join()
+
+        self._drain()
+        self.close()
+
+    def _run(self) -> None:
+        """"""
+        self.open()
+
+        while self._active:
+            self._signal.wait(self.interval)
+            self._signal.clear()
+            self._drain()
+
+    def _drain(self) -> None:
+        """
+        Write all buffered events batch by batch.
+        """
+        buffer = self._buffer
+
+        while buffer:
+            records = []
+            for _ in range(min(self.batch_size, len(buffer))):
+                records.append(buffer.popleft())
+
+            try:
+                if self.write_batch(records):
+                    self.written_count += len(records)
+                else:
+                    self.dropped_count += len(records)
+            except Exception as e:
+                self.error_count += 1
+                print(f"{self.sink_name}写入事件日志失败：{e}", file=sys.stderr)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Get counters of the sink.
+        """
+        return {
+            "received": self.received_count,
+            "written": self.written_count,
+            "dropped": self.dropped_count,
+            "errors": self.error_count,
+            "backlog": len(self._buffer),
+        }
+
+    def open(self) -> None:
+        """
+        Called in background thread before writing first batch.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Called after background thread stopped.
+        """
+        pass
+
+    @abstractmethod
+    def write_batch(self, records: List[Tuple[float, Any]]) -> bool:
+        """
+        Write a batch of (timestamp, event) records.
+
+        Return False if the records are discarded.
+        """
+        pass
+
+
+class ConsoleEventSink(BaseEventSink):
+    """
+    Print events to console.
+    """
+
+    sink_name: str = "console"
+
+    def write_batch(self, records: List[Tuple[float, Any]]) -> bool:
+        """"""
+        text = "\n".join(str(event) for _, event in records)
+        sys.stdout.write(text + "\n")
+        return True
+
+
+class KafkaEventSink(BaseEventSink):
+    """
+    Send events to a kafka topic.
+
+    Connection to broker is made in background thread, and messages
+    are batched by producer with linger_ms before sending.
+    """
+
+    sink_name: str = "kafka"
+
+    def __init__(
+        self,
+        host_port: str,
+        topic: str = "EVENTLOGGG",
+        linger_ms: int = 50,
+        **kwargs
+    ):
+        """"""
+        super().__init__(**kwargs)
+
+        self.host_port: str = host_port
+        self.topic: str = topic
+        self.linger_ms: int = linger_ms
+
+        self._producer: KafkaProducer = None
+
+    def open(self) -> None:
+        """
+        Create topic if not exists and then connect producer.
+        """
+        try:
+            admin_client = KafkaAdminClient(
+                bootstrap_servers=self.host_port,
+                api_version=(0, 11, 5),
+                client_id="vnpy_muzhi"
+            )
+            admin_client.create_topics(
+                new_topics=[
+                    NewTopic(
+                        name=self.topic,
+                        num_partitions=1,
+                        replication_factor=1
+                    )
+                ],
+                validate_only=False
+            )
+        except TopicAlreadyExistsError:
+            pass
+        except Exception as e:
+            print(f"kafka topic {self.topic} 创建失败：{e}", file=sys.stderr)
+
+        try:
+            self._producer = KafkaProducer(
+                bootstrap_servers=self.host_port,
+                api_version=(0, 11, 5),
+                linger_ms=self.linger_ms,
+                batch_size=1024 * 1024,
+                max_block_ms=1000,
+                value_serializer=lambda x: json.dumps(x).encode("utf-8")
+            )
+        except Exception as e:
+            print(f"kafka producer 连接失败：{e}", file=sys.stderr)
+
+    def close(self) -> None:
+        """"""
+        if self._producer:
+            self._producer.flush()
+            self._producer.close()
+            self._producer = None
+
+    def write_batch(self, records: List[Tuple[float, Any]]) -> bool:
+        """"""
+        if not self._producer:
+            return False
+
+        for _, event in records:
+            self._producer.send(self.topic, str(event))
+        return True
@@ -0,0 +1,43 @@
+from typing import Any, List, Tuple
+
+from vnpy.event.sink import BaseEventSink, EventLogFilter
+
+
+class ListEventSink(BaseEventSink):
+
+    sink_name: str = "list"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.records: List[Tuple[float, Any]] = []
+
+    def write_batch(self, records: List[Tuple[float, Any]]) -> bool:
+        self.records.extend(records)
+        return True
+
+
+def test_event_log_filter():
+    log_filter = EventLogFilter("eTimer,eAccount.*,eContract.")
+
+    assert not log_filter.accept("eTimer")
+    assert not log_filter.accept("eAccount.BINANCE.123")
+    assert not log_filter.accept("eContract.")
+    assert log_filter.accept("eTick.BTCUSDT.BINANCE")
+    assert log_filter.accept("eLog")
+
+    assert EventLogFilter("").accept("eTimer")
+
+
+def test_sink_drops_when_full():
+    sink = ListEventSink(capacity=10, batch_size=4)
+
+    results = [sink.put(i) for i in range(15)]
+    assert results.count(False) == 5
+    assert sink.get_statistics()["dropped"] == 5
+
+    sink.start()
+    sink.stop()
+
+    assert [event for _, event in sink.records] == list(range(10))
+    assert sink.get_statistics()["written"] == 10
+    assert sink.get_statistics()["backlog"] == 0
@@ -738,6 +738,13 @@ class BinanceDataWebsocketApi(WebsocketClient):
         self.init(url, self.proxy_host, self.proxy_port)
         self.start()
 
+    @staticmethod
+    def get_conflation_key(packet: dict) -> str:
+        """
+        Both ticker and depth5 streams are snapshots.
+        """
+        return packet.get("stream", None)
+
     def on_packet(self, packet):
         """"""
         stream = packet["stream"]
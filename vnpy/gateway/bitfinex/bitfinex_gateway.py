@@ -25,6 +25,7 @@ from vnpy.trader.constant import (
     Interval
 )
 from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.orderbook import OrderBook
 from vnpy.trader.object import (
     TickData,
     OrderData,
@@ -383,8 +384,7 @@ class BitfinexWebsocketApi(WebsocketClient):
         self.orders = {}
         self.trades = set()
         self.ticks = {}
-        self.bids = {}
-        self.asks = {}
+        self.books = {}
         self.channels = {}       # channel_id : (Channel, Symbol)
 
         self.subscribed = {}
@@ -552,69 +552,37 @@ class BitfinexWebsocketApi(WebsocketClient):
 
         # Update deep quote
         elif channel == "book":
-            bid = self.bids.setdefault(symbol, {})
-            ask = self.asks.setdefault(symbol, {})
+            book = self.books.get(symbol, None)
+            if not book:
+                book = OrderBook(5)
+                self.books[symbol] = book
 
             if len(l_data1) > 3:
-                for price, count, amount in l_data1:
-                    price = float(price)
-                    count = int(count)
-                    amount = float(amount)
+                bids = []
+                asks = []
 
+                for price, count, amount in l_data1:
                     if amount > 0:
-                        bid[price] = amount
+                        bids.append((price, amount))
                     else:
-                        ask[price] = -amount
+                        asks.append((price, -amount))
+
+                book.on_snapshot(bids, asks)
             else:
                 price, count, amount = l_data1
-                price = float(price)
-                count = int(count)
-                amount = float(amount)
 
+                # Amount is 1 for bid and -1 for ask when level is deleted
                 if not count:
-                    if price in bid:
-                        del bid[price]
-                    elif price in ask:
-                        del ask[price]
-                else:
                     if amount > 0:
-                        bid[price] = amount
+                        book.update_bid(price, 0)
                     else:
-                        ask[price] = -amount
-
-            try:
-                # BID
-                bid_keys = bid.keys()
-                bidPriceList = sorted(bid_keys, reverse=True)
-
-                tick.bid_price_1 = bidPriceList[0]
-                tick.bid_price_2 = bidPriceList[1]
-                tick.bid_price_3 = bidPriceList[2]
-                tick.bid_price_4 = bidPriceList[3]
-                tick.bid_price_5 = bidPriceList[4]
-
-                tick.bid_volume_1 = bid[tick.bid_price_1]
-                tick.bid_volume_2 = bid[tick.bid_price_2]
-                tick.bid_volume_3 = bid[tick.bid_price_3]
-                tick.bid_volume_4 = bid[tick.bid_price_4]
-                tick.bid_volume_5 = bid[tick.bid_price_5]
-
-                # ASK
-                ask_keys = ask.keys()
-                askPriceList = sorted(ask_keys)
-
-                tick.ask_price_1 = askPriceList[0]
-                tick.ask_price_2 = askPriceList[1]
-                tick.ask_price_3 = askPriceList[2]
-                tick.ask_price_4 = askPriceList[3]
-                tick.ask_price_5 = askPriceList[4]
-
-                tick.ask_volume_1 = ask[tick.ask_price_1]
-                tick.ask_volume_2 = ask[tick.ask_price_2]
-                tick.ask_volume_3 = ask[tick.ask_price_3]
-                tick.ask_volume_4 = ask[tick.ask_price_4]
-                tick.ask_volume_5 = ask[tick.ask_price_5]
-            except IndexError:
+                        book.update_ask(price, 0)
+                elif amount > 0:
+                    book.update_bid(price, amount)
+                else:
+                    book.update_ask(price, -amount)
+
+            if not book.update_tick(tick):
                 return
 
         dt = datetime.now(UTC_TZ)
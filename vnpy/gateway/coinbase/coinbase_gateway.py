@@ -26,6 +26,7 @@ from vnpy.trader.constant import (
     Interval
 )
 from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.orderbook import OrderBook
 from vnpy.trader.object import (
     TickData,
     OrderData,
@@ -234,7 +235,7 @@ class CoinbaseWebsocketApi(WebsocketClient):
         symbol = req.symbol
         exchange = req.exchange
 
-        orderbook = OrderBook(symbol, exchange, self.gateway)
+        orderbook = CoinbaseOrderBook(symbol, exchange, self.gateway)
         self.orderbooks[symbol] = orderbook
 
         sub_req = {
@@ -381,7 +382,7 @@ class CoinbaseWebsocketApi(WebsocketClient):
         self.gateway.on_trade(trade)
 
 
-class OrderBook():
+class CoinbaseOrderBook():
     """
     Used to maintain orderbook of coinbase data
     """
@@ -390,9 +391,7 @@ class OrderBook():
         """
         one symbol per orderbook
         """
-
-        self.asks = dict()
-        self.bids = dict()
+        self.book = OrderBook(5)
         self.gateway = gateway
 
         self.tick = TickData(
@@ -411,36 +410,23 @@ class OrderBook():
         """
         if d["type"] == "l2update":
             dt = generate_datetime(d["time"])
-            self.on_update(d["changes"][0], dt)
+            self.on_update(d["changes"], dt)
         elif d["type"] == "snapshot":
             self.on_snapshot(d["asks"], d["bids"])
         else:
             self.on_ticker(d)
 
-    def on_update(self, d: list, dt):
+    def on_update(self, changes: Sequence[List], dt: datetime):
         """
-        call back  when type is 12update
+        call back  when type is l2update
         """
-        size = d[2]
-        price = d[1]
-        side = d[0]
+        book = self.book
 
-        if side == "buy":
-            if float(price) in self.bids:
-                if size == 0:
-                    del self.bids[float(price)]
-                else:
-                    self.bids[float(price)] = float(size)
-            else:
-                self.bids[float(price)] = float(size)
-        else:
-            if float(price) in self.asks:
-                if size == 0:
-                    del self.asks[float(price)]
-                else:
-                    self.asks[float(price)] = float(size)
+        for side, price, size in changes:
+            if side == "buy":
+                book.update_bid(price, size)
             else:
-                self.asks[float(price)] = float(size)
+                book.update_ask(price, size)
 
         self.generate_tick(dt)
 
@@ -462,45 +448,16 @@ class OrderBook():
         """
         call back when type is snapshot
         """
-        for price, size in asks:
-            self.asks[float(price)] = float(size)
-
-        for price, size in bids:
-            self.bids[float(price)] = float(size)
+        self.book.on_snapshot(bids, asks)
 
     def generate_tick(self, dt: datetime):
-        """"""
+        """
+        Push tick only if top 5 levels are changed.
+        """
         tick = self.tick
 
-        bids_keys = self.bids.keys()
-        bids_keys = sorted(bids_keys, reverse=True)
-
-        tick.bid_price_1 = bids_keys[0]
-        tick.bid_price_2 = bids_keys[1]
-        tick.bid_price_3 = bids_keys[2]
-        tick.bid_price_4 = bids_keys[3]
-        tick.bid_price_5 = bids_keys[4]
-
-        tick.bid_volume_1 = self.bids[bids_keys[0]]
-        tick.bid_volume_2 = self.bids[bids_keys[1]]
-        tick.bid_volume_3 = self.bids[bids_keys[2]]
-        tick.bid_volume_4 = self.bids[bids_keys[3]]
-        tick.bid_volume_5 = self.bids[bids_keys[4]]
-
-        asks_keys = self.asks.keys()
-        asks_keys = sorted(asks_keys)
-
-        tick.ask_price_1 = asks_keys[0]
-        tick.ask_price_2 = asks_keys[1]
-        tick.ask_price_3 = asks_keys[2]
-        tick.ask_price_4 = asks_keys[3]
-        tick.ask_price_5 = asks_keys[4]
-
-        tick.ask_volume_1 = self.asks[asks_keys[0]]
-        tick.ask_volume_2 = self.asks[asks_keys[1]]
-        tick.ask_volume_3 = self.asks[asks_keys[2]]
-        tick.ask_volume_4 = self.asks[asks_keys[3]]
-        tick.ask_volume_5 = self.asks[asks_keys[4]]
+        if not self.book.update_tick(tick):
+            return
 
         tick.datetime = dt
         self.gateway.on_tick(copy(tick))
@@ -804,6 +804,15 @@ class HuobiDataWebsocketApi(HuobiWebsocketApiBase):
         }
         self.send_packet(req)
 
+    @staticmethod
+    def get_conflation_key(packet: dict) -> str:
+        """
+        Depth step0 and detail channels are snapshots.
+        """
+        if "tick" in packet:
+            return packet.get("ch", None)
+        return None
+
     def on_data(self, packet: dict) -> None:
         """"""
         channel = packet.get("ch", None)
@@ -1,5 +1,12 @@
 from vnpy.event import Event
 from vnpy.rpc import RpcClient
+from vnpy.trader.event import (
+    EVENT_TICK,
+    EVENT_TRADE,
+    EVENT_ORDER,
+    EVENT_POSITION,
+    EVENT_ACCOUNT
+)
 from vnpy.trader.gateway import BaseGateway
 from vnpy.trader.object import (
     SubscribeRequest,
@@ -16,7 +23,8 @@ class RpcGateway(BaseGateway):
 
     default_setting = {
         "主动请求地址": "tcp://127.0.0.1:2014",
-        "推送订阅地址": "tcp://127.0.0.1:4102"
+        "推送订阅地址": "tcp://127.0.0.1:4102",
+        "订阅主题": ""
     }
 
     exchanges = list(Exchange)
@@ -30,12 +38,24 @@ class RpcGateway(BaseGateway):
         self.client = RpcClient()
         self.client.callback = self.client_callback
 
+        self.callbacks = {
+            EVENT_TICK: self.on_tick,
+            EVENT_TRADE: self.on_trade,
+            EVENT_ORDER: self.on_order,
+            EVENT_POSITION: self.on_position,
+            EVENT_ACCOUNT: self.on_account,
+        }
+
     def connect(self, setting: dict):
         """"""
         req_address = setting["主动请求地址"]
         pub_address = setting["推送订阅地址"]
 
-        self.client.subscribe_topic("")
+        # Topics are separated by comma, e.g. "eTick.rb2101.SHFE,eOrder.",
+        # and all data is subscribed if empty.
+        topics = setting.get("订阅主题", "").split(",")
+        for topic in topics:
+            self.client.subscribe_topic(topic.strip())
         self.client.start(req_address, pub_address)
 
         self.write_log("服务器连接成功，开始初始化查询")
@@ -67,32 +87,40 @@ class RpcGateway(BaseGateway):
 
     def query_all(self):
         """"""
-        contracts = self.client.get_all_contracts()
+        # Send all queries first, so that they are processed by server concurrently
+        futures = [
+            self.client.call_async(name)
+            for name in [
+                "get_all_contracts",
+                "get_all_accounts",
+                "get_all_positions",
+                "get_all_orders",
+                "get_all_trades"
+            ]
+        ]
+        contracts, accounts, positions, orders, trades = [f.result() for f in futures]
+
         for contract in contracts:
             self.symbol_gateway_map[contract.vt_symbol] = contract.gateway_name
             contract.gateway_name = self.gateway_name
             self.on_contract(contract)
         self.write_log("合约信息查询成功")
 
-        accounts = self.client.get_all_accounts()
         for account in accounts:
             account.gateway_name = self.gateway_name
             self.on_account(account)
         self.write_log("资金信息查询成功")
 
-        positions = self.client.get_all_positions()
         for position in positions:
             position.gateway_name = self.gateway_name
             self.on_position(position)
         self.write_log("持仓信息查询成功")
 
-        orders = self.client.get_all_orders()
         for order in orders:
             order.gateway_name = self.gateway_name
             self.on_order(order)
         self.write_log("委托信息查询成功")
 
-        trades = self.client.get_all_trades()
         for trade in trades:
             trade.gateway_name = self.gateway_name
             self.on_trade(trade)
@@ -114,4 +142,9 @@ class RpcGateway(BaseGateway):
         if hasattr(data, "gateway_name"):
             data.gateway_name = self.gateway_name
 
-        self.event_engine.put(event)
+        # Events with specific suffix are not published by server
+        callback = self.callbacks.get(event.type, None)
+        if callback:
+            callback(data)
+        else:
+            self.event_engine.put(event)
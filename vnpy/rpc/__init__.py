@@ -2,16 +2,23 @@ import os
 import signal
 import threading
 import traceback
+from asyncio import wrap_future
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
 from datetime import datetime, timedelta
 from functools import lru_cache
-from typing import Any, Callable, Dict
+from heapq import heappush, heappop
+from itertools import count
+from time import monotonic
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 from pathlib import Path
 
 import zmq
 import zmq.auth
-from zmq.backend.cython.constants import NOBLOCK
 from zmq.auth.thread import ThreadAuthenticator
 
+from .serializer import pack, unpack
+
 
 # Achieve Ctrl-c interrupt recv
 signal.signal(signal.SIGINT, signal.SIG_DFL)
@@ -40,29 +47,94 @@ class RemoteException(Exception):
         return self.__value
 
 
-class RpcServer:
+def to_bytes(n: int) -> bytes:
     """"""
+    return n.to_bytes(8, "little")
 
-    def __init__(self):
+
+def from_bytes(data: bytes) -> int:
+    """"""
+    return int.from_bytes(data, "little")
+
+
+class RpcRequest:
+    """
+    Function call request received by RpcServer.
+    """
+
+    def __init__(
+        self,
+        serial: int,
+        identity: bytes,
+        req_id: bytes,
+        name: str,
+        args: list,
+        kwargs: dict,
+        group: str
+    ):
+        """"""
+        self.serial: int = serial
+        self.identity: bytes = identity
+        self.req_id: bytes = req_id
+        self.name: str = name
+        self.args: list = args
+        self.kwargs: dict = kwargs
+        self.group: str = group
+
+        self.replied: bool = False
+
+
+class RpcServer:
+    """
+    Requests are received on a ROUTER socket and executed by a pool of
+    worker threads, so that a slow function does not block others.
+
+    Each function belongs to a group (the function name by default),
+    and requests of the same group are executed in order with at most
+    concurrency limit of the group at the same time.
+    """
+
+    def __init__(self, max_workers: int = 8):
         """
         Constructor
         """
         # Save functions dict: key is fuction name, value is fuction object
         self.__functions: Dict[str, Any] = {}
+        self.__function_groups: Dict[str, str] = {}
+        self.__function_timeouts: Dict[str, float] = {}
+
+        # Concurrency control of function groups
+        self.__group_limits: Dict[str, int] = {}
+        self.__group_running: Dict[str, int] = defaultdict(int)
+        self.__group_queues: Dict[str, Deque[RpcRequest]] = defaultdict(deque)
+
+        # Running requests and heap of request deadlines
+        self.__requests: Dict[int, RpcRequest] = {}
+        self.__deadlines: List[Tuple[float, int, RpcRequest]] = []
+        self.__serial: int = 0
 
         # Zmq port related
         self.__context: zmq.Context = zmq.Context()
 
-        # Reply socket (Request–reply pattern)
-        self.__socket_rep: zmq.Socket = self.__context.socket(zmq.REP)
+        # Router socket (Asynchronous request–reply pattern)
+        self.__socket_router: zmq.Socket = self.__context.socket(zmq.ROUTER)
 
         # Publish socket (Publish–subscribe pattern)
         self.__socket_pub: zmq.Socket = self.__context.socket(zmq.PUB)
 
+        # Pull socket receiving results from worker threads, since
+        # router socket can only be used in server thread
+        self.__socket_pull: zmq.Socket = self.__context.socket(zmq.PULL)
+        self.__pull_address: str = f"inproc://rpc_server_{id(self)}"
+        self.__push_sockets: List[zmq.Socket] = []
+        self.__local: threading.local = threading.local()
+
         # Worker thread related
         self.__active: bool = False                     # RpcServer status
         self.__thread: threading.Thread = None          # RpcServer thread
         self.__lock: threading.Lock = threading.Lock()
+        self.__max_workers: int = max_workers
+        self.__executor: ThreadPoolExecutor = None
 
         # Authenticator used to ensure data security
         self.__authenticator: ThreadAuthenticator = None
@@ -100,18 +172,21 @@ class RpcServer:
             self.__socket_pub.curve_publickey = publickey
             self.__socket_pub.curve_server = True
 
-            self.__socket_rep.curve_secretkey = secretkey
-            self.__socket_rep.curve_publickey = publickey
-            self.__socket_rep.curve_server = True
+            self.__socket_router.curve_secretkey = secretkey
+            self.__socket_router.curve_publickey = publickey
+            self.__socket_router.curve_server = True
 
         # Bind socket address
-        self.__socket_rep.bind(rep_address)
+        self.__socket_router.bind(rep_address)
         self.__socket_pub.bind(pub_address)
+        self.__socket_pull.bind(self.__pull_address)
 
         # Start RpcServer status
         self.__active = True
 
-        # Start RpcServer thread
+        # Start worker threads and RpcServer thread
+        self.__executor = ThreadPoolExecutor(self.__max_workers)
+
         self.__thread = threading.Thread(target=self.run)
         self.__thread.start()
 
@@ -135,84 +210,243 @@ class RpcServer:
         """
         Run RpcServer functions
         """
+        poller = zmq.Poller()
+        poller.register(self.__socket_router, zmq.POLLIN)
+        poller.register(self.__socket_pull, zmq.POLLIN)
+
         start = datetime.utcnow()
 
         while self.__active:
-            # Use poll to wait event arrival, waiting time is 1 second (1000 milliseconds)
             cur = datetime.utcnow()
             delta = cur - start
 
             if delta >= KEEP_ALIVE_INTERVAL:
                 self.publish(KEEP_ALIVE_TOPIC, cur)
+                start = cur
 
-            if not self.__socket_rep.poll(1000):
-                continue
+            # Use poll to wait event arrival, waiting time is 1 second (1000 milliseconds)
+            # at most, or until the next request deadline
+            timeout = 1000
+            if self.__deadlines:
+                left = (self.__deadlines[0][0] - monotonic()) * 1000
+                timeout = min(timeout, max(int(left), 0))
 
-            # Receive request data from Reply socket
-            req = self.__socket_rep.recv_pyobj()
+            events = dict(poller.poll(timeout))
 
-            # Get function name and parameters
-            name, args, kwargs = req
+            if self.__socket_router in events:
+                self.receive_requests()
 
-            # Try to get and execute callable function object; capture exception information if it fails
-            try:
-                func = self.__functions[name]
-                r = func(*args, **kwargs)
-                rep = [True, r]
-            except Exception as e:  # noqa
-                rep = [False, traceback.format_exc()]
+            if self.__socket_pull in events:
+                self.receive_results()
 
-            # send callable response by Reply socket
-            self.__socket_rep.send_pyobj(rep)
+            self.check_deadlines()
+
+        # Wait for running functions to finish
+        self.__executor.shutdown()
+        self.__executor = None
+
+        for socket in self.__push_sockets:
+            socket.close(linger=0)
+        self.__push_sockets.clear()
 
         # Unbind socket address
         self.__socket_pub.unbind(self.__socket_pub.LAST_ENDPOINT)
-        self.__socket_rep.unbind(self.__socket_rep.LAST_ENDPOINT)
+        self.__socket_router.unbind(self.__socket_router.LAST_ENDPOINT)
+        self.__socket_pull.unbind(self.__pull_address)
+
+    def receive_requests(self) -> None:
+        """
+        Receive all requests available on router socket.
+        """
+        while True:
+            try:
+                identity, req_id, msg = self.__socket_router.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+            except ValueError:
+                continue
+
+            # Get function name and parameters
+            try:
+                name, args, kwargs = unpack(msg)
+            except Exception as e:  # noqa
+                msg = pack([False, traceback.format_exc()])
+                self.__socket_router.send_multipart([identity, req_id, msg])
+                continue
+            group = self.__function_groups.get(name, name)
+
+            self.__serial += 1
+            req = RpcRequest(self.__serial, identity, req_id, name, args, kwargs, group)
+
+            timeout = self.__function_timeouts.get(name, 0)
+            if timeout:
+                heappush(self.__deadlines, (monotonic() + timeout, req.serial, req))
+
+            self.__group_queues[group].append(req)
+            self.dispatch_group(group)
+
+    def dispatch_group(self, group: str) -> None:
+        """
+        Execute queued requests of group within its concurrency limit.
+        """
+        queue = self.__group_queues[group]
+        limit = self.__group_limits.get(group, 1)
+
+        while queue and self.__group_running[group] < limit:
+            req = queue.popleft()
+
+            # Already timed out while waiting in queue
+            if req.replied:
+                continue
+
+            self.__group_running[group] += 1
+            self.__requests[req.serial] = req
+            self.__executor.submit(self.execute_request, req)
+
+    def execute_request(self, req: RpcRequest) -> None:
+        """
+        Run in worker thread, send result to server thread by push socket.
+        """
+        # Try to get and execute callable function object; capture exception information if it fails
+        try:
+            func = self.__functions[req.name]
+            r = func(*req.args, **req.kwargs)
+            msg = pack([True, r])
+        except Exception as e:  # noqa
+            msg = pack([False, traceback.format_exc()])
+
+        socket = getattr(self.__local, "socket", None)
+        if not socket:
+            socket = self.__context.socket(zmq.PUSH)
+            socket.connect(self.__pull_address)
+            self.__local.socket = socket
+            self.__push_sockets.append(socket)
+
+        socket.send_multipart([to_bytes(req.serial), msg])
+
+    def receive_results(self) -> None:
+        """
+        Reply results from worker threads, and start next queued requests.
+        """
+        while True:
+            try:
+                serial, msg = self.__socket_pull.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+
+            req = self.__requests.pop(from_bytes(serial))
+            self.__group_running[req.group] -= 1
+
+            if not req.replied:
+                req.replied = True
+                self.__socket_router.send_multipart([req.identity, req.req_id, msg])
+
+            self.dispatch_group(req.group)
+
+    def check_deadlines(self) -> None:
+        """
+        Reply timeout error of requests not finished before deadline.
+        """
+        now = monotonic()
+
+        while self.__deadlines and self.__deadlines[0][0] <= now:
+            _, _, req = heappop(self.__deadlines)
+            if req.replied:
+                continue
+
+            req.replied = True
+            timeout = self.__function_timeouts[req.name]
+            msg = pack([False, f"Function {req.name} timeout after {timeout} seconds"])
+            self.__socket_router.send_multipart([req.identity, req.req_id, msg])
 
     def publish(self, topic: str, data: Any) -> None:
         """
-        Publish data
+        Publish data with topic frame, so that subscribers can filter
+        data by topic prefix before it is deserialized.
         """
-        with self.__lock:
-            self.__socket_pub.send_pyobj([topic, data])
+        # Serialize outside lock, only sending is serialized
+        msg = [topic.encode("utf-8"), pack(data)]
 
-    def register(self, func: Callable) -> None:
+        with self.__lock:
+            self.__socket_pub.send_multipart(msg)
+
+    def register(
+        self,
+        func: Callable,
+        concurrency: int = 1,
+        timeout: float = 0,
+        group: str = ""
+    ) -> None:
         """
         Register function
-        """
-        return self._register(func.__name__, func)
 
-    def _register(self, name: str, func: Callable) -> None:
+        Functions registered with the same group share the concurrency
+        limit. Timeout error is replied if function is not finished in
+        timeout seconds (0 for no timeout), but the function itself is
+        not interrupted.
+        """
+        return self._register(func.__name__, func, concurrency, timeout, group)
+
+    def _register(
+        self,
+        name: str,
+        func: Callable,
+        concurrency: int = 1,
+        timeout: float = 0,
+        group: str = ""
+    ) -> None:
         """
         Register function
         """
+        group = group or name
+
         self.__functions[name] = func
+        self.__function_groups[name] = group
+        self.__function_timeouts[name] = timeout
+        self.__group_limits[group] = concurrency
 
 
 class RpcClient:
-    """"""
+    """
+    Calls are sent through a DEALER socket with request id, so that
+    multiple calls from different threads can be processed by server
+    concurrently.
+    """
 
     def __init__(self):
         """Constructor"""
         # zmq port related
         self.__context: zmq.Context = zmq.Context()
 
-        # Request socket (Request–reply pattern)
-        self.__socket_req: zmq.Socket = self.__context.socket(zmq.REQ)
+        # Dealer socket (Asynchronous request–reply pattern)
+        self.__socket_dealer: zmq.Socket = self.__context.socket(zmq.DEALER)
 
         # Subscribe socket (Publish–subscribe pattern)
         self.__socket_sub: zmq.Socket = self.__context.socket(zmq.SUB)
 
+        # Requests from caller threads are forwarded to dealer socket
+        # by client thread, since dealer socket is not thread safe
+        self.__socket_push: zmq.Socket = self.__context.socket(zmq.PUSH)
+        self.__socket_pull: zmq.Socket = self.__context.socket(zmq.PULL)
+        self.__pull_address: str = f"inproc://rpc_client_{id(self)}"
+
         # Worker thread relate, used to process data pushed from server
         self.__active: bool = False                 # RpcClient status
         self.__thread: threading.Thread = None      # RpcClient thread
         self.__lock: threading.Lock = threading.Lock()
 
+        # Futures of calls waiting for reply
+        self.__futures: Dict[int, Future] = {}
+        self.__count: count = count()
+
         # Authenticator used to ensure data security
         self.__authenticator: ThreadAuthenticator = None
 
         self._last_received_ping: datetime = datetime.utcnow()
 
+        # Seconds to wait for reply of synchronous call, None for no limit
+        self.timeout: Optional[float] = None
+
     @lru_cache(100)
     def __getattr__(self, name: str):
         """
@@ -221,22 +455,49 @@ class RpcClient:
 
         # Perform remote call task
         def dorpc(*args, **kwargs):
-            # Generate request
-            req = [name, args, kwargs]
-
             # Send request and wait for response
-            with self.__lock:
-                self.__socket_req.send_pyobj(req)
-                rep = self.__socket_req.recv_pyobj()
+            future = self.call_async(name, *args, **kwargs)
 
             # Return response if successed; Trigger exception if failed
-            if rep[0]:
-                return rep[1]
-            else:
-                raise RemoteException(rep[1])
+            try:
+                return future.result(self.timeout)
+            except TimeoutError:
+                # Stop waiting for reply, which may never come
+                future.cancel()
+                raise
 
         return dorpc
 
+    def call_async(self, name: str, *args, **kwargs) -> Future:
+        """
+        Call remote function without waiting for reply.
+
+        Result is set into the future returned, or RemoteException if
+        the call failed. Cancel the future to stop waiting for reply.
+        """
+        future = Future()
+
+        if not self.__active:
+            future.set_exception(RemoteException("RpcClient is not started"))
+            return future
+
+        # Generate request
+        req_id = next(self.__count)
+        msg = pack([name, args, kwargs])
+        self.__futures[req_id] = future
+        future.add_done_callback(lambda f: self.__futures.pop(req_id, None))
+
+        with self.__lock:
+            self.__socket_push.send_multipart([to_bytes(req_id), msg])
+
+        return future
+
+    async def call_await(self, name: str, *args, **kwargs) -> Any:
+        """
+        Call remote function in asyncio event loop.
+        """
+        return await wrap_future(self.call_async(name, *args, **kwargs))
+
     def start(
         self, 
         req_address: str, 
@@ -266,14 +527,20 @@ class RpcClient:
             self.__socket_sub.curve_publickey = publickey
             self.__socket_sub.curve_serverkey = serverkey
 
-            self.__socket_req.curve_secretkey = secretkey
-            self.__socket_req.curve_publickey = publickey
-            self.__socket_req.curve_serverkey = serverkey
+            self.__socket_dealer.curve_secretkey = secretkey
+            self.__socket_dealer.curve_publickey = publickey
+            self.__socket_dealer.curve_serverkey = serverkey
 
         # Connect zmq port
-        self.__socket_req.connect(req_address)
+        self.__socket_dealer.connect(req_address)
         self.__socket_sub.connect(sub_address)
 
+        self.__socket_pull.bind(self.__pull_address)
+        self.__socket_push.connect(self.__pull_address)
+
+        # Keep alive data is always needed for checking connection
+        self.subscribe_topic(KEEP_ALIVE_TOPIC)
+
         # Start RpcClient status
         self.__active = True
 
@@ -303,15 +570,95 @@ class RpcClient:
         """
         Run RpcClient function
         """
-        pull_tolerance = int(KEEP_ALIVE_TOLERANCE.total_seconds() * 1000)
+        poller = zmq.Poller()
+        poller.register(self.__socket_sub, zmq.POLLIN)
+        poller.register(self.__socket_dealer, zmq.POLLIN)
+        poller.register(self.__socket_pull, zmq.POLLIN)
+
+        tolerance = KEEP_ALIVE_TOLERANCE.total_seconds()
+        last_received = monotonic()
 
         while self.__active:
-            if not self.__socket_sub.poll(pull_tolerance):
+            events = dict(poller.poll(1000))
+
+            if self.__socket_pull in events:
+                self.send_requests()
+
+            if self.__socket_dealer in events:
+                self.receive_replies()
+
+            if self.__socket_sub in events:
+                self.receive_data()
+                last_received = monotonic()
+            elif monotonic() - last_received > tolerance:
                 self._on_unexpected_disconnected()
+                last_received = monotonic()
+
+        # Calls not replied can never be finished
+        futures = list(self.__futures.values())
+        self.__futures.clear()
+
+        for future in futures:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RemoteException("RpcClient is stopped"))
+
+        # Close socket
+        self.__socket_push.close()
+        self.__socket_pull.close()
+        self.__socket_dealer.close()
+        self.__socket_sub.close()
+
+    def send_requests(self) -> None:
+        """
+        Forward requests from caller threads to server.
+        """
+        while True:
+            try:
+                msg = self.__socket_pull.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+
+            self.__socket_dealer.send_multipart(msg)
+
+    def receive_replies(self) -> None:
+        """
+        Set result of calls replied by server.
+        """
+        while True:
+            try:
+                req_id, msg = self.__socket_dealer.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+
+            # Skip calls cancelled by caller
+            future = self.__futures.pop(from_bytes(req_id), None)
+            if not future or not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                rep = unpack(msg)
+            except Exception as e:  # noqa
+                future.set_exception(e)
                 continue
 
+            if rep[0]:
+                future.set_result(rep[1])
+            else:
+                future.set_exception(RemoteException(rep[1]))
+
+    def receive_data(self) -> None:
+        """
+        Process data published by server.
+        """
+        while self.__active:
             # Receive data from subscribe socket
-            topic, data = self.__socket_sub.recv_pyobj(flags=NOBLOCK)
+            try:
+                topic, msg = self.__socket_sub.recv_multipart(flags=zmq.NOBLOCK, copy=False)
+            except zmq.Again:
+                return
+
+            topic = topic.bytes.decode("utf-8")
+            data = unpack(msg.buffer)
 
             if topic == KEEP_ALIVE_TOPIC:
                 self._last_received_ping = data
@@ -319,10 +666,6 @@ class RpcClient:
                 # Process data by callable function
                 self.callback(topic, data)
 
-        # Close socket
-        self.__socket_req.close()
-        self.__socket_sub.close()
-
     @staticmethod
     def _on_unexpected_disconnected():
         print("RpcServer has no response over {tolerance} seconds, please check you connection."
@@ -0,0 +1,167 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from time import monotonic, sleep
+
+import pytest
+
+from vnpy.rpc import RemoteException, RpcClient, RpcServer
+
+
+class Recorder:
+    """
+    Count functions running at the same time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def run(self, seconds: float) -> None:
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        sleep(seconds)
+
+        with self.lock:
+            self.running -= 1
+
+
+class Client(RpcClient):
+
+    def callback(self, topic, data):
+        pass
+
+
+@pytest.fixture(scope="module")
+def rpc(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("rpc")
+    rep_address = f"ipc://{folder}/rep"
+    pub_address = f"ipc://{folder}/pub"
+
+    release = threading.Event()
+    recorder = Recorder()
+
+    def slow():
+        release.wait(5)
+        return "slow"
+
+    def fast():
+        return "fast"
+
+    def sleepy(seconds):
+        sleep(seconds)
+        return seconds
+
+    def echo(value, seconds):
+        sleep(seconds)
+        return value
+
+    def query_account(seconds):
+        recorder.run(seconds)
+
+    def query_position(seconds):
+        recorder.run(seconds)
+
+    server = RpcServer()
+    server.register(slow)
+    server.register(fast)
+    server.register(sleepy, concurrency=2, timeout=0.2)
+    server.register(echo, concurrency=4)
+    server.register(query_account, concurrency=2, group="query")
+    server.register(query_position, concurrency=2, group="query")
+    server.start(rep_address, pub_address)
+
+    client = Client()
+    client.timeout = 5
+    client.start(rep_address, pub_address)
+
+    yield client, release, recorder
+
+    release.set()
+    client.stop()
+    server.stop()
+    client.join()
+    server.join()
+
+
+def test_fast_call_not_blocked(rpc):
+    client, release, _ = rpc
+
+    future = client.call_async("slow")
+
+    start = monotonic()
+    assert client.fast() == "fast"
+    assert monotonic() - start < 1
+    assert not future.done()
+
+    release.set()
+    assert future.result(5) == "slow"
+
+
+def test_deadline_timeout(rpc):
+    client, _, _ = rpc
+
+    start = monotonic()
+    with pytest.raises(RemoteException, match="timeout"):
+        client.sleepy(1)
+    assert monotonic() - start < 0.8
+
+    # Finished within deadline, while the timed out call still running
+    assert client.sleepy(0.01) == 0.01
+
+
+def test_group_concurrency_limit(rpc):
+    client, _, recorder = rpc
+
+    futures = []
+    for _ in range(4):
+        futures.append(client.call_async("query_account", 0.05))
+        futures.append(client.call_async("query_position", 0.05))
+
+    start = monotonic()
+    for future in futures:
+        future.result(5)
+
+    # 8 calls in group executed 2 at a time
+    assert recorder.max_running == 2
+    assert monotonic() - start >= 0.19
+
+
+def test_reply_to_caller(rpc):
+    client, _, _ = rpc
+
+    # Later calls finish earlier
+    def call(i):
+        return client.echo(i, (20 - i) * 0.005)
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(call, range(20)))
+
+    assert results == list(range(20))
+
+    futures = [client.call_async("echo", {"id": i}, 0) for i in range(50)]
+    assert [future.result(5) for future in futures] == [{"id": i} for i in range(50)]
+
+
+def test_sync_call_timeout(rpc):
+    client, release, _ = rpc
+
+    # Call without server side timeout may never be replied
+    release.clear()
+    client.timeout = 0.1
+    try:
+        with pytest.raises(TimeoutError):
+            client.slow()
+    finally:
+        client.timeout = 5
+        release.set()
+
+    assert not client._RpcClient__futures
+
+    # Late reply of the cancelled call is ignored
+    assert client.fast() == "fast"
+    future = client.call_async("slow")
+    assert future.result(5) == "slow"
+    assert not client._RpcClient__futures
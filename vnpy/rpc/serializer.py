@@ -0,0 +1,229 @@
+"""
+Compact binary serialization of data published by RpcServer.
+
+Data is packed with msgpack. Objects of vnpy.trader.object are packed
+as ext types holding their field values by position, so that no class
+path or field name is sent with each object. Any other object falls
+back to pickle.
+"""
+
+import pickle
+from dataclasses import fields
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from enum import Enum
+from operator import attrgetter
+from struct import Struct
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import msgpack
+import pytz
+
+from vnpy.event import Event
+from vnpy.trader.object import (
+    TickData,
+    BarData,
+    OrderData,
+    TradeData,
+    PositionData,
+    AccountData,
+    LogData,
+    ContractData,
+    SubscribeRequest,
+    OrderRequest,
+    CancelRequest,
+    HistoryRequest
+)
+
+
+EXT_PICKLE = 1
+EXT_DATETIME = 2
+EXT_EVENT = 3
+
+
+class ObjectSchema:
+    """
+    Field layout of a dataclass packed by position.
+    """
+
+    def __init__(self, code: int, data_class: type, extra: Sequence[str] = ()):
+        """
+        Extra are attributes not passed to constructor, but also
+        need to be sent, e.g. time of LogData.
+        """
+        init_fields = [f for f in fields(data_class) if f.init]
+
+        self.code: int = code
+        self.data_class: type = data_class
+        self.init_count: int = len(init_fields)
+        self.extra: Sequence[str] = extra
+
+        names = [f.name for f in init_fields] + list(extra)
+        self.getter: attrgetter = attrgetter(*names)
+
+        self.enums: List[Tuple[int, type]] = [
+            (i, f.type) for i, f in enumerate(init_fields)
+            if isinstance(f.type, type) and issubclass(f.type, Enum)
+        ]
+
+    def encode(self, obj: Any) -> list:
+        """"""
+        values = list(self.getter(obj))
+
+        for i, _ in self.enums:
+            value = values[i]
+            if value is not None:
+                values[i] = value.value
+
+        return values
+
+    def decode(self, values: list) -> Any:
+        """"""
+        for i, enum_class in self.enums:
+            value = values[i]
+            if value is not None:
+                values[i] = enum_class(value)
+
+        obj = self.data_class(*values[:self.init_count])
+
+        for name, value in zip(self.extra, values[self.init_count:]):
+            setattr(obj, name, value)
+
+        return obj
+
+
+# Codes should never be changed, so that different versions of server
+# and client can still communicate.
+SCHEMAS: Dict[type, ObjectSchema] = {}
+CODE_SCHEMAS: Dict[int, ObjectSchema] = {}
+
+for code, data_class, extra in [
+    (10, TickData, ()),
+    (11, BarData, ()),
+    (12, OrderData, ()),
+    (13, TradeData, ()),
+    (14, PositionData, ()),
+    (15, AccountData, ()),
+    (16, LogData, ("time",)),
+    (17, ContractData, ()),
+    (18, SubscribeRequest, ()),
+    (19, OrderRequest, ()),
+    (20, CancelRequest, ()),
+    (21, HistoryRequest, ()),
+]:
+    schema = ObjectSchema(code, data_class, extra)
+    SCHEMAS[data_class] = schema
+    CODE_SCHEMAS[code] = schema
+
+
+DATETIME_STRUCT = Struct("<qi")
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+NAIVE_OFFSET = -2 ** 31
+
+_timezones: Dict[Tuple[str, int], tzinfo] = {}
+
+
+def encode_datetime(dt: datetime) -> bytes:
+    """
+    Microseconds of wall clock time since epoch and utc offset seconds,
+    followed by timezone name if any.
+    """
+    seconds = (
+        (dt.toordinal() - EPOCH_ORDINAL) * 86400
+        + dt.hour * 3600 + dt.minute * 60 + dt.second
+    )
+    microseconds = seconds * 1_000_000 + dt.microsecond
+
+    tz = dt.tzinfo
+    if tz is None:
+        return DATETIME_STRUCT.pack(microseconds, NAIVE_OFFSET)
+
+    offset = int(tz.utcoffset(dt).total_seconds())
+    name = getattr(tz, "zone", None) or getattr(tz, "key", None) or ""
+    return DATETIME_STRUCT.pack(microseconds, offset) + name.encode("utf-8")
+
+
+def get_timezone(name: str, offset: int, dt: datetime) -> tzinfo:
+    """
+    Get tzinfo by timezone name and utc offset. For pytz timezone,
+    it is the tzinfo of datetime localized with the same offset.
+    """
+    key = (name, offset)
+    tz = _timezones.get(key, None)
+    if tz:
+        return tz
+
+    utc_offset = timedelta(seconds=offset)
+
+    if not name:
+        tz = timezone(utc_offset)
+    else:
+        zone = pytz.timezone(name)
+        localized = zone.localize(dt)
+
+        # Ambiguous time of DST transition
+        if localized.utcoffset() != utc_offset:
+            localized = zone.localize(dt, is_dst=not localized.dst())
+
+        tz = localized.tzinfo
+
+    _timezones[key] = tz
+    return tz
+
+
+def decode_datetime(data: bytes) -> datetime:
+    """"""
+    microseconds, offset = DATETIME_STRUCT.unpack_from(data)
+    dt = EPOCH + ONE_MICROSECOND * microseconds
+
+    if offset == NAIVE_OFFSET:
+        return dt
+
+    name = bytes(data[DATETIME_STRUCT.size:]).decode("utf-8")
+    return dt.replace(tzinfo=get_timezone(name, offset, dt))
+
+
+def _encode(obj: Any) -> msgpack.ExtType:
+    """
+    Called by msgpack for objects it cannot pack.
+    """
+    schema = SCHEMAS.get(type(obj), None)
+    if schema:
+        return msgpack.ExtType(schema.code, pack(schema.encode(obj)))
+    elif isinstance(obj, datetime):
+        return msgpack.ExtType(EXT_DATETIME, encode_datetime(obj))
+    elif type(obj) is Event:
+        return msgpack.ExtType(EXT_EVENT, pack([obj.type, obj.data]))
+
+    return msgpack.ExtType(EXT_PICKLE, pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+
+def _decode(code: int, data: bytes) -> Any:
+    """"""
+    schema = CODE_SCHEMAS.get(code, None)
+    if schema:
+        return schema.decode(unpack(data))
+    elif code == EXT_DATETIME:
+        return decode_datetime(data)
+    elif code == EXT_EVENT:
+        type_, data = unpack(data)
+        return Event(type_, data)
+    elif code == EXT_PICKLE:
+        return pickle.loads(data)
+
+    return msgpack.ExtType(code, data)
+
+
+def pack(obj: Any) -> bytes:
+    """
+    Serialize object into bytes.
+    """
+    return msgpack.packb(obj, default=_encode, use_bin_type=True)
+
+
+def unpack(data: Union[bytes, memoryview]) -> Any:
+    """
+    Deserialize object from bytes. Tuples are returned as lists.
+    """
+    return msgpack.unpackb(data, ext_hook=_decode, raw=False, strict_map_key=False)
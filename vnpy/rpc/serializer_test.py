@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+from vnpy.event import Event
+from vnpy.rpc.serializer import pack, unpack
+from vnpy.trader.constant import Direction, Exchange, Offset, OrderType, Status
+from vnpy.trader.object import LogData, OrderData, TickData
+
+
+def test_pack_event_with_tick():
+    tick = TickData(
+        symbol="rb2101",
+        exchange=Exchange.SHFE,
+        datetime=pytz.timezone("Asia/Shanghai").localize(datetime(2020, 12, 1, 9, 0, 0, 500000)),
+        name="螺纹钢",
+        last_price=3800.5,
+        bid_price_1=3800,
+        ask_price_1=3801,
+        gateway_name="CTP"
+    )
+    event = unpack(pack(Event("eTick.", tick)))
+
+    assert event.type == "eTick."
+    assert event.data == tick
+    assert event.data.vt_symbol == "rb2101.SHFE"
+    assert event.data.datetime.utcoffset() == timedelta(hours=8)
+
+
+def test_pack_objects_and_datetimes():
+    order = OrderData(
+        symbol="IF2012",
+        exchange=Exchange.CFFEX,
+        orderid="1",
+        type=OrderType.LIMIT,
+        direction=Direction.SHORT,
+        offset=Offset.CLOSETODAY,
+        price=5000,
+        volume=2,
+        status=Status.PARTTRADED,
+        datetime=datetime(2020, 12, 1, tzinfo=timezone.utc),
+        gateway_name="CTP"
+    )
+    log = LogData(msg="test", gateway_name="CTP")
+
+    new_york = pytz.timezone("America/New_York")
+    datetimes = [
+        datetime(2020, 1, 1, 1, 2, 3, 4),
+        datetime(1960, 5, 5, tzinfo=timezone(timedelta(hours=-3, minutes=-30))),
+        new_york.localize(datetime(2020, 11, 1, 1, 30), is_dst=True),
+        new_york.localize(datetime(2020, 11, 1, 1, 30), is_dst=False),
+    ]
+
+    data = unpack(pack({"order": order, "log": log, "datetimes": datetimes, 1: {1, 2}}))
+
+    assert data["order"] == order
+    assert data["log"].time == log.time
+    assert data[1] == {1, 2}
+
+    for dt, expected in zip(data["datetimes"], datetimes):
+        assert dt == expected
+        assert dt.utcoffset() == expected.utcoffset()
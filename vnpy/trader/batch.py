@@ -0,0 +1,351 @@
+"""
+Columnar containers for moving blocks of market data without creating
+one python object per row.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime, tzinfo
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .constant import Exchange, Interval
+from .object import BarData, TickData
+
+BAR_COLUMNS = [
+    "volume",
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+]
+
+TICK_COLUMNS = [
+    "volume",
+    "open_interest",
+    "last_price",
+    "last_volume",
+    "limit_up",
+    "limit_down",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+] + [
+    f"{side}_{kind}_{i}"
+    for side in ["bid", "ask"]
+    for kind in ["price", "volume"]
+    for i in range(1, 6)
+]
+
+BAR_DTYPE = np.dtype([("datetime", "M8[us]")] + [(name, "f8") for name in BAR_COLUMNS])
+TICK_DTYPE = np.dtype([("datetime", "M8[us]")] + [(name, "f8") for name in TICK_COLUMNS])
+
+
+class BaseBatch(ABC):
+    """
+    Market data of one contract stored in a numpy structured array.
+
+    Datetime is stored without timezone as wall clock time of tzinfo,
+    which is attached again when rows are converted into objects.
+    """
+
+    dtype: np.dtype = None
+    columns: List[str] = []
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        data: np.ndarray = None,
+        tzinfo: tzinfo = None,
+        gateway_name: str = "DB"
+    ):
+        """"""
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.tzinfo: tzinfo = tzinfo
+        self.gateway_name: str = gateway_name
+        self.vt_symbol: str = f"{symbol}.{exchange.value}" if exchange else ""
+
+        if data is None:
+            data = np.empty(0, dtype=self.dtype)
+        self.data: np.ndarray = data
+
+    def __len__(self) -> int:
+        """"""
+        return len(self.data)
+
+    def __iter__(self) -> Iterator:
+        """
+        Convert rows into data objects lazily.
+        """
+        for row in self.data.tolist():
+            yield self._to_object(row)
+
+    def __getitem__(self, key: Union[int, slice, str]) -> Any:
+        """
+        batch["close_price"] returns a column array,
+        batch[i] returns a data object,
+        batch[i:j] returns a new batch sharing same memory.
+        """
+        if isinstance(key, str):
+            return self.data[key]
+        elif isinstance(key, slice):
+            return self._new(self.data[key])
+        else:
+            return self._to_object(self.data[key].tolist())
+
+    def _new(self, data: np.ndarray) -> "BaseBatch":
+        """"""
+        batch = self.__class__.__new__(self.__class__)
+        batch.__dict__.update(self.__dict__)
+        batch.data = data
+        return batch
+
+    @abstractmethod
+    def _to_object(self, row: tuple) -> Any:
+        """"""
+        pass
+
+    def _from_object(self, obj: Any) -> tuple:
+        """"""
+        dt: datetime = obj.datetime
+        if self.tzinfo and dt.tzinfo:
+            dt = dt.astimezone(self.tzinfo)
+        dt = dt.replace(tzinfo=None)
+
+        return (dt,) + tuple(getattr(obj, name) for name in self.columns)
+
+    def get_datetimes(self) -> List[datetime]:
+        """
+        Get datetime column as list of datetime with tzinfo.
+        """
+        return [
+            dt.replace(tzinfo=self.tzinfo)
+            for dt in self.data["datetime"].tolist()
+        ]
+
+    def slice_by_time(self, start: datetime, end: datetime) -> "BaseBatch":
+        """
+        Get rows with start <= datetime <= end, data should be sorted.
+        """
+        values = self.data["datetime"]
+        start_ix = np.searchsorted(values, self._to_datetime64(start), side="left")
+        end_ix = np.searchsorted(values, self._to_datetime64(end), side="right")
+        return self._new(self.data[start_ix:end_ix])
+
+    def _to_datetime64(self, dt: datetime) -> np.datetime64:
+        """"""
+        if self.tzinfo and dt.tzinfo:
+            dt = dt.astimezone(self.tzinfo)
+        return np.datetime64(dt.replace(tzinfo=None), "us")
+
+    def to_dataframe(self):
+        """
+        Convert into pandas DataFrame with datetime index.
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(self.data)
+        df.set_index("datetime", inplace=True)
+        return df
+
+
+class BarBatch(BaseBatch):
+    """
+    Bar data of one contract and interval in columnar storage.
+    """
+
+    dtype: np.dtype = BAR_DTYPE
+    columns: List[str] = BAR_COLUMNS
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        data: np.ndarray = None,
+        tzinfo: tzinfo = None,
+        gateway_name: str = "DB"
+    ):
+        """"""
+        super().__init__(symbol, exchange, data, tzinfo, gateway_name)
+        self.interval: Interval = interval
+
+    @classmethod
+    def from_bars(cls, bars: Sequence[BarData], tzinfo: tzinfo = None) -> "BarBatch":
+        """
+        Create batch from a list of bars of the same contract, empty
+        batch without contract information is returned if no bar given.
+        """
+        if not bars:
+            return cls("", None, None, tzinfo=tzinfo)
+
+        bar = bars[0]
+        if not tzinfo:
+            tzinfo = bar.datetime.tzinfo
+
+        batch = cls(bar.symbol, bar.exchange, bar.interval, tzinfo=tzinfo, gateway_name=bar.gateway_name)
+        batch.data = np.array([batch._from_object(bar) for bar in bars], dtype=cls.dtype)
+        return batch
+
+    def _to_object(self, row: tuple) -> BarData:
+        """"""
+        dt, volume, open_interest, open_price, high_price, low_price, close_price = row
+
+        return BarData(
+            symbol=self.symbol,
+            exchange=self.exchange,
+            datetime=dt.replace(tzinfo=self.tzinfo),
+            interval=self.interval,
+            volume=volume,
+            open_interest=open_interest,
+            open_price=open_price,
+            high_price=high_price,
+            low_price=low_price,
+            close_price=close_price,
+            gateway_name=self.gateway_name
+        )
+
+
+class TickBatch(BaseBatch):
+    """
+    Tick data of one contract in columnar storage.
+    """
+
+    dtype: np.dtype = TICK_DTYPE
+    columns: List[str] = TICK_COLUMNS
+
+    def __init__(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        data: np.ndarray = None,
+        tzinfo: tzinfo = None,
+        gateway_name: str = "DB",
+        name: str = ""
+    ):
+        """"""
+        super().__init__(symbol, exchange, data, tzinfo, gateway_name)
+        self.name: str = name
+
+    @classmethod
+    def from_ticks(cls, ticks: Sequence[TickData], tzinfo: tzinfo = None) -> "TickBatch":
+        """
+        Create batch from a list of ticks of the same contract, empty
+        batch without contract information is returned if no tick given.
+        """
+        if not ticks:
+            return cls("", None, tzinfo=tzinfo)
+
+        tick = ticks[0]
+        if not tzinfo:
+            tzinfo = tick.datetime.tzinfo
+
+        batch = cls(tick.symbol, tick.exchange, tzinfo=tzinfo, gateway_name=tick.gateway_name, name=tick.name)
+        batch.data = np.array([batch._from_object(tick) for tick in ticks], dtype=cls.dtype)
+        return batch
+
+    def _to_object(self, row: tuple) -> TickData:
+        """"""
+        tick = TickData(
+            symbol=self.symbol,
+            exchange=self.exchange,
+            datetime=row[0].replace(tzinfo=self.tzinfo),
+            name=self.name,
+            gateway_name=self.gateway_name
+        )
+
+        for name, value in zip(self.columns, row[1:]):
+            setattr(tick, name, value)
+
+        return tick
+
+
+def concat_batches(batches: Sequence[BaseBatch]) -> BaseBatch:
+    """
+    Concatenate batches of the same contract into one.
+    """
+    first = batches[0]
+    return first._new(np.concatenate([batch.data for batch in batches]))
+
+
+# Shared memory attached in current process, keyed by name.
+_attached_batches: Dict[str, Tuple[SharedMemory, BaseBatch]] = {}
+
+
+class SharedBatch:
+    """
+    Batch data copied into shared memory once by owner process.
+
+    The object can be pickled to other processes (e.g. optimization
+    workers), where attach returns a batch viewing the shared memory
+    directly without loading or copying data again.
+    """
+
+    def __init__(self, batch: BaseBatch):
+        """"""
+        self._shm: SharedMemory = SharedMemory(create=True, size=max(batch.data.nbytes, 1))
+
+        array = np.ndarray(len(batch), dtype=batch.dtype, buffer=self._shm.buf)
+        array[:] = batch.data
+        del array
+
+        self.name: str = self._shm.name
+        self.length: int = len(batch)
+        self.template: BaseBatch = batch._new(np.empty(0, dtype=batch.dtype))
+
+    def __getstate__(self) -> dict:
+        """
+        Only pass name and metadata to other processes.
+        """
+        return {
+            "_shm": None,
+            "name": self.name,
+            "length": self.length,
+            "template": self.template,
+        }
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Objects pickled from the same shared memory are equal, so that
+        they can be used as cache key in worker process.
+        """
+        return isinstance(other, SharedBatch) and other.name == self.name
+
+    def __hash__(self) -> int:
+        """"""
+        return hash(self.name)
+
+    def attach(self) -> BaseBatch:
+        """
+        Get batch viewing shared memory, attached once per process.
+        """
+        if self._shm:
+            shm = self._shm
+        elif self.name in _attached_batches:
+            return _attached_batches[self.name][1]
+        else:
+            shm = SharedMemory(name=self.name)
+
+        data = np.ndarray(self.length, dtype=self.template.dtype, buffer=shm.buf)
+        batch = self.template._new(data)
+
+        if shm is not self._shm:
+            _attached_batches[self.name] = (shm, batch)
+        return batch
+
+    def close(self) -> None:
+        """
+        Release shared memory, should be called by owner process after
+        all workers finished.
+        """
+        if not self._shm:
+            return
+
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
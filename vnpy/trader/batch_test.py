@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from vnpy.trader.batch import BarBatch, TickBatch, SharedBatch, concat_batches
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.database.database import DB_TZ
+from vnpy.trader.object import BarData, TickData, CompactBarData, CompactTickData
+
+
+START = datetime(2020, 1, 2, 9, 30, tzinfo=DB_TZ)
+
+
+def create_bars(count: int) -> list:
+    bars = []
+
+    for i in range(count):
+        bar = BarData(
+            symbol="IF2001",
+            exchange=Exchange.CFFEX,
+            datetime=START + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=100 + i,
+            open_interest=1000 + i,
+            open_price=4000 + i,
+            high_price=4010 + i,
+            low_price=3990 + i,
+            close_price=4005 + i,
+            gateway_name="DB"
+        )
+        bars.append(bar)
+
+    return bars
+
+
+def create_ticks(count: int) -> list:
+    ticks = []
+
+    for i in range(count):
+        tick = TickData(
+            symbol="IF2001",
+            exchange=Exchange.CFFEX,
+            datetime=START + timedelta(seconds=i),
+            name="IF2001 Future",
+            volume=10 + i,
+            last_price=4000 + i,
+            bid_price_1=3999 + i,
+            ask_price_1=4001 + i,
+            bid_volume_5=i,
+            ask_volume_5=i * 2,
+            gateway_name="DB"
+        )
+        ticks.append(tick)
+
+    return ticks
+
+
+def test_compact_conversion():
+    tick = create_ticks(1)[0]
+    compact = CompactTickData(**{
+        name: getattr(tick, name) for name in tick.__dataclass_fields__
+    })
+
+    assert not hasattr(compact, "__dict__")
+    assert compact.vt_symbol == tick.vt_symbol
+    assert compact.to_tick() == tick
+
+    bar = create_bars(1)[0]
+    compact = CompactBarData(
+        symbol=bar.symbol,
+        exchange=bar.exchange,
+        datetime=bar.datetime,
+        interval=bar.interval,
+        close_price=bar.close_price,
+        gateway_name=bar.gateway_name
+    )
+
+    assert compact.volume == 0
+    assert compact.vt_symbol == bar.vt_symbol
+    assert compact.to_bar().close_price == bar.close_price
+
+    with pytest.raises(AttributeError):
+        compact.extra = 1
+
+
+def test_bar_batch_round_trip():
+    bars = create_bars(10)
+    batch = BarBatch.from_bars(bars)
+
+    assert len(batch) == 10
+    assert batch.vt_symbol == "IF2001.CFFEX"
+    assert batch.interval == Interval.MINUTE
+    assert list(batch) == bars
+    assert batch[3] == bars[3]
+    assert batch.get_datetimes() == [bar.datetime for bar in bars]
+    assert batch["close_price"].tolist() == [bar.close_price for bar in bars]
+
+
+def test_tick_batch_round_trip():
+    ticks = create_ticks(10)
+    batch = TickBatch.from_ticks(ticks)
+
+    assert batch.name == "IF2001 Future"
+    assert list(batch) == ticks
+    assert batch[-1] == ticks[-1]
+
+
+def test_slice_shares_memory():
+    bars = create_bars(10)
+    batch = BarBatch.from_bars(bars)
+
+    view = batch[2:5]
+    assert isinstance(view, BarBatch)
+    assert view.vt_symbol == batch.vt_symbol
+    assert list(view) == bars[2:5]
+    assert np.shares_memory(view.data, batch.data)
+
+    view["close_price"][0] = 0
+    assert batch[2].close_price == 0
+
+    view = batch.slice_by_time(bars[4].datetime, bars[6].datetime)
+    assert list(view) == bars[4:7]
+    assert np.shares_memory(view.data, batch.data)
+
+    view = batch.slice_by_time(START - timedelta(days=2), START - timedelta(days=1))
+    assert not len(view)
+
+
+def test_empty_batch():
+    batch = BarBatch.from_bars([])
+    assert not len(batch)
+    assert not list(batch)
+    assert batch.vt_symbol == ""
+
+    batch = TickBatch.from_ticks([])
+    assert not len(batch)
+    assert batch["last_price"].tolist() == []
+
+
+def test_concat_batches():
+    bars = create_bars(10)
+    batches = [BarBatch.from_bars(bars[:4]), BarBatch.from_bars(bars[4:])]
+
+    batch = concat_batches(batches)
+    assert list(batch) == bars
+
+
+def test_shared_batch():
+    bars = create_bars(10)
+    shared = SharedBatch(BarBatch.from_bars(bars))
+
+    try:
+        batch = shared.attach()
+        assert list(batch) == bars
+        assert batch.interval == Interval.MINUTE
+    finally:
+        shared.close()
@@ -9,6 +9,7 @@ from vnpy.trader.setting import SETTINGS
 if TYPE_CHECKING:
     from vnpy.trader.constant import Interval, Exchange  # noqa
     from vnpy.trader.object import BarData, TickData  # noqa
+    from vnpy.trader.batch import BarBatch, TickBatch  # noqa
 
 
 DB_TZ = timezone(SETTINGS["database.timezone"])
@@ -20,6 +21,7 @@ class Driver(Enum):
     POSTGRESQL = "postgresql"
     MONGODB = "mongodb"
     INFLUX = "influxdb"
+    COLUMNAR = "columnar"
 
 
 class BaseDatabaseManager(ABC):
@@ -45,6 +47,49 @@ class BaseDatabaseManager(ABC):
     ) -> Sequence["TickData"]:
         pass
 
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        interval: "Interval",
+        start: datetime,
+        end: datetime
+    ) -> "BarBatch":
+        """
+        Load bar data into columnar BarBatch, rows are converted into
+        BarData only when iterated.
+
+        Default implementation converts result of load_bar_data,
+        drivers should override it with a query into arrays directly.
+        """
+        from vnpy.trader.batch import BarBatch
+
+        bars = self.load_bar_data(symbol, exchange, interval, start, end)
+        if not bars:
+            return BarBatch(symbol, exchange, interval, tzinfo=DB_TZ)
+        return BarBatch.from_bars(bars, DB_TZ)
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        start: datetime,
+        end: datetime
+    ) -> "TickBatch":
+        """
+        Load tick data into columnar TickBatch, rows are converted into
+        TickData only when iterated.
+
+        Default implementation converts result of load_tick_data,
+        drivers should override it with a query into arrays directly.
+        """
+        from vnpy.trader.batch import TickBatch
+
+        ticks = self.load_tick_data(symbol, exchange, start, end)
+        if not ticks:
+            return TickBatch(symbol, exchange, tzinfo=DB_TZ)
+        return TickBatch.from_ticks(ticks, DB_TZ)
+
     @abstractmethod
     def save_bar_data(
         self,
@@ -59,6 +104,23 @@ class BaseDatabaseManager(ABC):
     ):
         pass
 
+    def update_write_statistics(self, count: int, seconds: float) -> None:
+        """
+        Record rows and time used of last save.
+        """
+        self.write_statistics = {
+            "rows": count,
+            "seconds": seconds,
+            "rows_per_second": count / seconds if seconds else 0,
+        }
+
+    def get_write_statistics(self) -> Dict:
+        """
+        Return rows, seconds and rows_per_second of last save, or
+        empty dict if not recorded by the driver.
+        """
+        return getattr(self, "write_statistics", {})
+
     @abstractmethod
     def get_newest_bar_data(
         self,
@@ -0,0 +1,398 @@
+"""
+Local columnar storage of bar and tick data.
+
+Data of each contract is partitioned into one file per month, holding
+records of BarBatch/TickBatch dtype without header:
+
+    root/bar/{exchange}/{symbol}/{interval}/{YYYYMM}.bin
+    root/tick/{exchange}/{symbol}/{YYYYMM}.bin
+
+Contract name of ticks is saved in a text file in the tick folder.
+
+Files are read with numpy memmap, so range queries within a month
+do not copy data. Data newer than the end of a file is appended,
+otherwise the month file is merged into a new version of the file:
+
+    root/bar/{exchange}/{symbol}/{interval}/{YYYYMM}.{version}.bin
+
+Readers always use the latest version, while arrays already mapped
+from older versions stay valid. Older versions are removed once they
+are no longer mapped (files in use can not be removed on Windows).
+A partial record left by interrupted append is ignored by readers,
+and dropped by next merge.
+"""
+
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vnpy.trader.batch import BarBatch, BaseBatch, TickBatch
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData, TickData
+from vnpy.trader.utility import get_folder_path
+
+from .database import BaseDatabaseManager, Driver, DB_TZ
+
+
+FILE_SUFFIX = ".bin"
+NAME_FILE = "name.txt"
+
+
+def init(_: Driver, settings: dict):
+    database = settings["database"]
+
+    if os.path.isabs(database):
+        root = Path(database)
+        root.mkdir(parents=True, exist_ok=True)
+    else:
+        root = get_folder_path(f"{database}_columnar")
+
+    return ColumnarManager(root)
+
+
+def to_db_datetime(dt: datetime) -> np.datetime64:
+    """
+    Convert into wall clock time of database timezone.
+    """
+    if dt.tzinfo:
+        dt = dt.astimezone(DB_TZ)
+    return np.datetime64(dt.replace(tzinfo=None), "us")
+
+
+def get_month(value: np.datetime64) -> str:
+    """"""
+    return str(value.astype("M8[M]")).replace("-", "")
+
+
+def parse_file_name(path: Path) -> Tuple[str, int]:
+    """
+    Get month and version from name of month file.
+    """
+    month, _, version = path.stem.partition(".")
+    return month, int(version or 0)
+
+
+class ColumnarManager(BaseDatabaseManager):
+
+    def __init__(self, root: Path):
+        """"""
+        self.root: Path = root
+
+    def get_bar_folder(self, symbol: str, exchange: Exchange, interval: Interval) -> Path:
+        """"""
+        return self.root.joinpath("bar", exchange.value, symbol, interval.value)
+
+    def get_tick_folder(self, symbol: str, exchange: Exchange) -> Path:
+        """"""
+        return self.root.joinpath("tick", exchange.value, symbol)
+
+    def read_name(self, folder: Path) -> str:
+        """
+        Contract name saved in tick folder.
+        """
+        path = folder.joinpath(NAME_FILE)
+        if not path.exists():
+            return ""
+        return path.read_text(encoding="utf-8")
+
+    def write_name(self, folder: Path, name: str) -> None:
+        """"""
+        if name != self.read_name(folder):
+            folder.joinpath(NAME_FILE).write_text(name, encoding="utf-8")
+
+    def list_files(self, folder: Path) -> List[Path]:
+        """
+        Latest version of month files sorted by time.
+        """
+        if not folder.exists():
+            return []
+
+        files: Dict[str, Tuple[int, Path]] = {}
+        for path in folder.glob(f"*{FILE_SUFFIX}"):
+            month, version = parse_file_name(path)
+            if month not in files or version > files[month][0]:
+                files[month] = (version, path)
+
+        return [files[month][1] for month in sorted(files)]
+
+    def remove_old_files(self, folder: Path) -> None:
+        """
+        Remove older versions of month files, which may still be mapped
+        by readers.
+        """
+        latest = set(self.list_files(folder))
+
+        for path in folder.glob(f"*{FILE_SUFFIX}"):
+            if path in latest:
+                continue
+
+            try:
+                path.unlink()
+            except OSError:
+                continue
+
+    def read_file(self, path: Path, dtype: np.dtype) -> np.ndarray:
+        """
+        Map whole records of file into read only array without loading.
+        """
+        count = path.stat().st_size // dtype.itemsize
+        if not count:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+    def read_range(
+        self,
+        folder: Path,
+        dtype: np.dtype,
+        start: datetime,
+        end: datetime
+    ) -> np.ndarray:
+        """
+        Read records with start <= datetime <= end.
+        """
+        start_value = to_db_datetime(start)
+        end_value = to_db_datetime(end)
+        start_month = get_month(start_value)
+        end_month = get_month(end_value)
+
+        chunks = []
+        for path in self.list_files(folder):
+            month, _ = parse_file_name(path)
+            if not start_month <= month <= end_month:
+                continue
+
+            data = self.read_file(path, dtype)
+            values = data["datetime"]
+            start_ix = np.searchsorted(values, start_value, side="left")
+            end_ix = np.searchsorted(values, end_value, side="right")
+
+            if end_ix > start_ix:
+                chunks.append(data[start_ix:end_ix])
+
+        if not chunks:
+            return np.empty(0, dtype=dtype)
+        elif len(chunks) == 1:
+            return chunks[0]
+        return np.concatenate(chunks)
+
+    def write(self, folder: Path, data: np.ndarray) -> None:
+        """
+        Write records into month files of the folder.
+        """
+        folder.mkdir(parents=True, exist_ok=True)
+        self.remove_old_files(folder)
+
+        paths = {parse_file_name(path)[0]: path for path in self.list_files(folder)}
+
+        data = np.sort(data, order="datetime", kind="stable")
+        months = data["datetime"].astype("M8[M]")
+
+        for month in np.unique(months):
+            part = data[months == month]
+
+            month = get_month(month)
+            path = paths.get(month, folder.joinpath(month + FILE_SUFFIX))
+            self.write_month(path, part)
+
+    def write_month(self, path: Path, data: np.ndarray) -> None:
+        """
+        Append if all records are newer than existing ones, otherwise
+        merge into a new version of the file.
+        """
+        if path.exists():
+            existing = self.read_file(path, data.dtype)
+            partial = path.stat().st_size % data.dtype.itemsize
+
+            if partial or (len(existing) and data["datetime"][0] <= existing["datetime"][-1]):
+                merged = np.concatenate([existing, data])
+                del existing
+
+                # Keep the last record of same datetime
+                reverse = merged[::-1]
+                _, index = np.unique(reverse["datetime"], return_index=True)
+                merged = reverse[index]
+
+                month, version = parse_file_name(path)
+                new_path = path.with_name(f"{month}.{version + 1}{FILE_SUFFIX}")
+
+                temp_path = new_path.with_suffix(".tmp")
+                merged.tofile(temp_path)
+                os.replace(temp_path, new_path)
+
+                self.remove_old_files(path.parent)
+                return
+
+        data = self.dedup(data)
+        with open(path, "ab") as f:
+            f.write(data.tobytes())
+
+    @staticmethod
+    def dedup(data: np.ndarray) -> np.ndarray:
+        """
+        Remove records with same datetime in sorted data, keeping the last one.
+        """
+        values = data["datetime"]
+        if len(values) < 2:
+            return data
+
+        keep = np.append(values[1:] != values[:-1], True)
+        return data[keep]
+
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> BarBatch:
+        """"""
+        folder = self.get_bar_folder(symbol, exchange, interval)
+        data = self.read_range(folder, BarBatch.dtype, start, end)
+        return BarBatch(symbol, exchange, interval, data, DB_TZ)
+
+    def load_tick_array(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> TickBatch:
+        """"""
+        folder = self.get_tick_folder(symbol, exchange)
+        data = self.read_range(folder, TickBatch.dtype, start, end)
+        name = self.read_name(folder)
+        return TickBatch(symbol, exchange, data, DB_TZ, name=name)
+
+    def load_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> Sequence[BarData]:
+        """"""
+        return list(self.load_bar_array(symbol, exchange, interval, start, end))
+
+    def load_tick_data(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> Sequence[TickData]:
+        """"""
+        return list(self.load_tick_array(symbol, exchange, start, end))
+
+    def save_bar_data(self, datas: Sequence[BarData]):
+        """"""
+        groups: Dict[Tuple, List[BarData]] = {}
+        for bar in datas:
+            key = (bar.symbol, bar.exchange, bar.interval)
+            groups.setdefault(key, []).append(bar)
+
+        for (symbol, exchange, interval), bars in groups.items():
+            batch = BarBatch.from_bars(bars, DB_TZ)
+            folder = self.get_bar_folder(symbol, exchange, interval)
+            self.write(folder, batch.data)
+
+    def save_tick_data(self, datas: Sequence[TickData]):
+        """"""
+        groups: Dict[Tuple, List[TickData]] = {}
+        for tick in datas:
+            key = (tick.symbol, tick.exchange)
+            groups.setdefault(key, []).append(tick)
+
+        for (symbol, exchange), ticks in groups.items():
+            batch = TickBatch.from_ticks(ticks, DB_TZ)
+            folder = self.get_tick_folder(symbol, exchange)
+            self.write(folder, batch.data)
+            self.write_name(folder, ticks[-1].name)
+
+    def get_edge_record(self, folder: Path, batch: BaseBatch, newest: bool):
+        """
+        Get first record of oldest file or last record of newest file.
+        """
+        paths = self.list_files(folder)
+        if newest:
+            paths.reverse()
+
+        for path in paths:
+            data = self.read_file(path, batch.dtype)
+            if len(data):
+                batch.data = data[-1:] if newest else data[:1]
+                return batch[0]
+
+        return None
+
+    def get_newest_bar_data(
+        self, symbol: str, exchange: "Exchange", interval: "Interval"
+    ) -> Optional["BarData"]:
+        """"""
+        folder = self.get_bar_folder(symbol, exchange, interval)
+        batch = BarBatch(symbol, exchange, interval, tzinfo=DB_TZ)
+        return self.get_edge_record(folder, batch, True)
+
+    def get_oldest_bar_data(
+        self, symbol: str, exchange: "Exchange", interval: "Interval"
+    ) -> Optional["BarData"]:
+        """"""
+        folder = self.get_bar_folder(symbol, exchange, interval)
+        batch = BarBatch(symbol, exchange, interval, tzinfo=DB_TZ)
+        return self.get_edge_record(folder, batch, False)
+
+    def get_newest_tick_data(
+        self, symbol: str, exchange: "Exchange"
+    ) -> Optional["TickData"]:
+        """"""
+        folder = self.get_tick_folder(symbol, exchange)
+        name = self.read_name(folder)
+        batch = TickBatch(symbol, exchange, tzinfo=DB_TZ, name=name)
+        return self.get_edge_record(folder, batch, True)
+
+    def count_records(self, folder: Path) -> int:
+        """"""
+        itemsize = BarBatch.dtype.itemsize
+        return sum(path.stat().st_size // itemsize for path in self.list_files(folder))
+
+    def get_bar_data_statistics(self) -> List[Dict]:
+        """"""
+        result = []
+
+        bar_root = self.root.joinpath("bar")
+        if not bar_root.exists():
+            return result
+
+        for folder in sorted(bar_root.glob("*/*/*")):
+            count = self.count_records(folder)
+            if not count:
+                continue
+
+            result.append({
+                "symbol": folder.parent.name,
+                "exchange": folder.parent.parent.name,
+                "interval": folder.name,
+                "count": count
+            })
+
+        return result
+
+    def delete_bar_data(
+        self,
+        symbol: str,
+        exchange: "Exchange",
+        interval: "Interval"
+    ) -> int:
+        """
+        Delete all bar data with given symbol + exchange + interval.
+        """
+        folder = self.get_bar_folder(symbol, exchange, interval)
+        count = self.count_records(folder)
+
+        if folder.exists():
+            shutil.rmtree(folder)
+
+        return count
+
+    def clean(self, symbol: str):
+        """"""
+        for kind in ["bar", "tick"]:
+            for folder in self.root.joinpath(kind).glob(f"*/{symbol}"):
+                shutil.rmtree(folder)
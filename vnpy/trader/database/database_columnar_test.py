@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData, TickData
+
+from .database import DB_TZ
+from .database_columnar import ColumnarManager
+
+
+# Data saved across month boundary
+START = datetime(2020, 1, 31, 23, 0, tzinfo=DB_TZ)
+END = START + timedelta(days=1)
+
+
+def create_bars(count: int, offset: float = 0) -> list:
+    bars = []
+
+    for i in range(count):
+        bar = BarData(
+            symbol="IF2002",
+            exchange=Exchange.CFFEX,
+            datetime=START + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=100 + i,
+            open_interest=1000 + i,
+            open_price=4000 + i + offset,
+            high_price=4010 + i + offset,
+            low_price=3990 + i + offset,
+            close_price=4005 + i + offset,
+            gateway_name="DB"
+        )
+        bars.append(bar)
+
+    return bars
+
+
+def create_ticks(count: int) -> list:
+    ticks = []
+
+    for i in range(count):
+        tick = TickData(
+            symbol="IF2002",
+            exchange=Exchange.CFFEX,
+            datetime=START + timedelta(seconds=i * 30),
+            name="IF2002 Future",
+            volume=10 + i,
+            last_price=4000 + i,
+            bid_price_1=3999 + i,
+            ask_price_1=4001 + i,
+            bid_volume_1=5,
+            ask_volume_1=6,
+            gateway_name="DB"
+        )
+        ticks.append(tick)
+
+    return ticks
+
+
+def test_bar_round_trip(tmp_path):
+    manager = ColumnarManager(tmp_path)
+
+    bars = create_bars(120)
+    manager.save_bar_data(bars)
+
+    folder = manager.get_bar_folder("IF2002", Exchange.CFFEX, Interval.MINUTE)
+    assert [path.stem for path in manager.list_files(folder)] == ["202001", "202002"]
+
+    result = manager.load_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE, START, END)
+    assert result == bars
+
+    # Range within and across months
+    result = manager.load_bar_data(
+        "IF2002", Exchange.CFFEX, Interval.MINUTE, bars[50].datetime, bars[70].datetime
+    )
+    assert result == bars[50:71]
+
+    # Overlapped records are replaced and new ones appended
+    updated = create_bars(150, 1)[100:]
+    manager.save_bar_data(updated)
+    bars = bars[:100] + updated
+
+    result = manager.load_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE, START, END)
+    assert result == bars
+
+    assert manager.get_oldest_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE) == bars[0]
+    assert manager.get_newest_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE) == bars[-1]
+    assert manager.get_bar_data_statistics() == [{
+        "symbol": "IF2002",
+        "exchange": "CFFEX",
+        "interval": "1m",
+        "count": 150
+    }]
+
+    assert manager.delete_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE) == 150
+    assert not manager.load_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE, START, END)
+    assert manager.get_newest_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE) is None
+    assert not manager.get_bar_data_statistics()
+
+
+def test_tick_round_trip(tmp_path):
+    manager = ColumnarManager(tmp_path)
+
+    ticks = create_ticks(240)
+    manager.save_tick_data(ticks)
+
+    batch = manager.load_tick_array("IF2002", Exchange.CFFEX, START, END)
+    assert batch.name == "IF2002 Future"
+    assert list(batch) == ticks
+
+    assert manager.load_tick_data("IF2002", Exchange.CFFEX, START, END) == ticks
+    assert manager.get_newest_tick_data("IF2002", Exchange.CFFEX) == ticks[-1]
+
+    manager.clean("IF2002")
+    assert not manager.load_tick_data("IF2002", Exchange.CFFEX, START, END)
+    assert manager.get_newest_tick_data("IF2002", Exchange.CFFEX) is None
+
+
+def test_merge_new_version(tmp_path):
+    manager = ColumnarManager(tmp_path)
+
+    bars = create_bars(120)
+    manager.save_bar_data(bars)
+
+    # Array mapped from file is kept valid after merge
+    old_batch = manager.load_bar_array("IF2002", Exchange.CFFEX, Interval.MINUTE, START, END)
+
+    updated = create_bars(120, 1)[30:]
+    manager.save_bar_data(updated)
+
+    folder = manager.get_bar_folder("IF2002", Exchange.CFFEX, Interval.MINUTE)
+    assert [path.name for path in manager.list_files(folder)] == ["202001.1.bin", "202002.1.bin"]
+    assert sorted(path.name for path in folder.iterdir()) == ["202001.1.bin", "202002.1.bin"]
+
+    assert list(old_batch) == bars
+    bars = bars[:30] + updated
+    result = manager.load_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE, START, END)
+    assert result == bars
+
+    # New records appended to latest version
+    appended = create_bars(150)[120:]
+    manager.save_bar_data(appended)
+    assert [path.name for path in manager.list_files(folder)] == ["202001.1.bin", "202002.1.bin"]
+
+    result = manager.load_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE, START, END)
+    assert result == bars + appended
+
+
+def test_partial_record(tmp_path):
+    manager = ColumnarManager(tmp_path)
+
+    bars = create_bars(120)
+    manager.save_bar_data(bars[:100])
+
+    # Interrupted append leaves part of a record at the end of file
+    folder = manager.get_bar_folder("IF2002", Exchange.CFFEX, Interval.MINUTE)
+    path = manager.list_files(folder)[-1]
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 10)
+
+    result = manager.load_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE, START, END)
+    assert result == bars[:100]
+    assert manager.get_newest_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE) == bars[99]
+
+    manager.save_bar_data(bars[100:])
+    assert [path.name for path in manager.list_files(folder)] == ["202001.bin", "202002.1.bin"]
+
+    result = manager.load_bar_data("IF2002", Exchange.CFFEX, Interval.MINUTE, START, END)
+    assert result == bars
@@ -1,8 +1,10 @@
 from datetime import datetime
 from typing import Optional, Sequence, List
 
+import numpy as np
 from influxdb import InfluxDBClient
 
+from vnpy.trader.batch import BAR_COLUMNS, BarBatch
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData
 from vnpy.trader.utility import generate_vt_symbol
@@ -88,6 +90,50 @@ class InfluxManager(BaseDatabaseManager):
 
         return data
 
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> BarBatch:
+        """
+        Load bar data into numpy array from raw query result, with time
+        returned as epoch microseconds.
+        """
+        if isinstance(start, datetime):
+            start = start.date()
+
+        if isinstance(end, datetime):
+            end = end.date()
+
+        query = (
+            f"select {', '.join(BAR_COLUMNS)} from bar_data"
+            " where vt_symbol=$vt_symbol"
+            " and interval=$interval"
+            f" and time >= '{start.isoformat()}'"
+            f" and time <= '{end.isoformat()}';"
+        )
+
+        bind_params = {
+            "vt_symbol": generate_vt_symbol(symbol, exchange),
+            "interval": interval.value
+        }
+
+        result = influx_client.query(query, bind_params=bind_params, epoch="u")
+        series = result.raw.get("series", [])
+
+        data = np.empty(0, dtype=BarBatch.dtype)
+        if series:
+            values = np.array(series[0]["values"], dtype=float)
+            data = np.empty(len(values), dtype=BarBatch.dtype)
+            data["datetime"] = values[:, 0].astype("i8").view("M8[us]")
+            for i, name in enumerate(BAR_COLUMNS):
+                data[name] = values[:, i + 1]
+
+        return BarBatch(symbol, exchange, interval, data, DB_TZ)
+
     def load_tick_data(
         self, symbol: str, exchange: Exchange, start: datetime, end: datetime
     ) -> Sequence[TickData]:
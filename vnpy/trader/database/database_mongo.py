@@ -1,14 +1,23 @@
 from datetime import datetime
-from enum import Enum
-from typing import Optional, Sequence, List
+from time import perf_counter
+from typing import Dict, Iterable, Optional, Sequence, List
 
+import numpy as np
 from mongoengine import DateTimeField, Document, FloatField, StringField, connect
+from pymongo import UpdateOne
+from pymongo.collection import Collection
 
+from vnpy.trader.batch import BAR_COLUMNS, TICK_COLUMNS, BarBatch, TickBatch
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData
 
 from .database import BaseDatabaseManager, Driver, DB_TZ
 
+# Max number of operations sent in one bulk_write call
+BULK_SIZE = 10_000
+
+TICK_FIELDS = ["name"] + TICK_COLUMNS
+
 
 def init(_: Driver, settings: dict):
     database = settings["database"]
@@ -191,6 +200,65 @@ class DbTickData(Document):
         return tick
 
 
+def to_array(
+    documents: Iterable[dict],
+    dtype: np.dtype,
+    columns: List[str],
+    chunk_size: int = 100_000
+) -> np.ndarray:
+    """
+    Convert raw documents into structured array chunk by chunk.
+    """
+    chunks = []
+    rows = []
+
+    for d in documents:
+        rows.append((d["datetime"],) + tuple(d.get(name) or 0 for name in columns))
+
+        if len(rows) >= chunk_size:
+            chunks.append(np.array(rows, dtype=dtype))
+            rows = []
+
+    if rows:
+        chunks.append(np.array(rows, dtype=dtype))
+
+    if not chunks:
+        return np.empty(0, dtype=dtype)
+    elif len(chunks) == 1:
+        return chunks[0]
+    return np.concatenate(chunks)
+
+
+def to_db_datetime(dt: datetime) -> datetime:
+    """
+    Convert into wall clock time of database timezone, without
+    changing datetime of the caller's data.
+    """
+    return dt.astimezone(DB_TZ).replace(tzinfo=None)
+
+
+def bulk_upsert(collection: Collection, keys: List[str], documents: List[dict]) -> int:
+    """
+    Upsert raw documents by unique keys with unordered bulk_write.
+
+    Documents of same keys are coalesced to the last one, so that
+    upserts in one batch never conflict with each other.
+    """
+    unique = {tuple(d[k] for k in keys): d for d in documents}
+
+    requests = [
+        UpdateOne({k: d[k] for k in keys}, {"$set": d}, upsert=True)
+        for d in unique.values()
+    ]
+
+    count = 0
+    for i in range(0, len(requests), BULK_SIZE):
+        result = collection.bulk_write(requests[i:i + BULK_SIZE], ordered=False)
+        count += result.upserted_count + result.matched_count
+
+    return count
+
+
 class MongoManager(BaseDatabaseManager):
 
     def load_bar_data(
@@ -201,15 +269,11 @@ class MongoManager(BaseDatabaseManager):
         start: datetime,
         end: datetime,
     ) -> Sequence[BarData]:
-        s = DbBarData.objects(
-            symbol=symbol,
-            exchange=exchange.value,
-            interval=interval.value,
-            datetime__gte=start,
-            datetime__lte=end,
-        )
-        data = [db_bar.to_bar() for db_bar in s]
-        return data
+        """
+        Load with projection of raw pymongo cursor instead of creating
+        a Document for each bar.
+        """
+        return list(self.load_bar_array(symbol, exchange, interval, start, end))
 
     def load_tick_data(
         self, symbol: str, exchange: Exchange, start: datetime, end: datetime
@@ -223,38 +287,109 @@ class MongoManager(BaseDatabaseManager):
         data = [db_tick.to_tick() for db_tick in s]
         return data
 
-    @staticmethod
-    def to_update_param(d) -> dict:
-        dt = d.datetime.astimezone(DB_TZ)
-        d.datetime = dt.replace(tzinfo=None)
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> BarBatch:
+        """
+        Load bar data with raw pymongo cursor into numpy array.
+        """
+        projection = {"_id": 0, "datetime": 1}
+        projection.update({name: 1 for name in BAR_COLUMNS})
+
+        cursor = DbBarData._get_collection().find(
+            {
+                "symbol": symbol,
+                "exchange": exchange.value,
+                "interval": interval.value,
+                "datetime": {"$gte": start, "$lte": end},
+            },
+            projection,
+            sort=[("datetime", 1)]
+        )
 
-        param = {
-            "set__" + k: v.value if isinstance(v, Enum) else v
-            for k, v in d.__dict__.items()
+        data = to_array(cursor, BarBatch.dtype, BAR_COLUMNS)
+        return BarBatch(symbol, exchange, interval, data, DB_TZ)
+
+    def load_tick_array(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> TickBatch:
+        """
+        Load tick data with raw pymongo cursor into numpy array.
+        """
+        projection = {"_id": 0, "datetime": 1}
+        projection.update({name: 1 for name in TICK_COLUMNS})
+
+        collection = DbTickData._get_collection()
+        query = {
+            "symbol": symbol,
+            "exchange": exchange.value,
+            "datetime": {"$gte": start, "$lte": end},
         }
-        return param
+
+        cursor = collection.find(query, projection, sort=[("datetime", 1)])
+        data = to_array(cursor, TickBatch.dtype, TICK_COLUMNS)
+
+        # Name is same for all ticks of contract, so only queried once.
+        name = ""
+        if len(data):
+            first = collection.find_one(query, {"_id": 0, "name": 1}, sort=[("datetime", 1)])
+            name = first.get("name", "")
+
+        return TickBatch(symbol, exchange, data, DB_TZ, name=name)
 
     def save_bar_data(self, datas: Sequence[BarData]):
-        for d in datas:
-            updates = self.to_update_param(d)
-            updates.pop("set__gateway_name")
-            updates.pop("set__vt_symbol")
-            (
-                DbBarData.objects(
-                    symbol=d.symbol, interval=d.interval.value, datetime=d.datetime
-                ).update_one(upsert=True, **updates)
-            )
+        """
+        Upsert bars with raw pymongo bulk_write.
+        """
+        start = perf_counter()
+
+        documents: List[Dict] = []
+        for bar in datas:
+            d = {
+                "symbol": bar.symbol,
+                "exchange": bar.exchange.value,
+                "interval": bar.interval.value,
+                "datetime": to_db_datetime(bar.datetime),
+            }
+            for name in BAR_COLUMNS:
+                d[name] = getattr(bar, name)
+            documents.append(d)
+
+        count = bulk_upsert(
+            DbBarData._get_collection(),
+            ["symbol", "exchange", "interval", "datetime"],
+            documents
+        )
+        self.update_write_statistics(count, perf_counter() - start)
 
     def save_tick_data(self, datas: Sequence[TickData]):
-        for d in datas:
-            updates = self.to_update_param(d)
-            updates.pop("set__gateway_name")
-            updates.pop("set__vt_symbol")
-            (
-                DbTickData.objects(
-                    symbol=d.symbol, exchange=d.exchange.value, datetime=d.datetime
-                ).update_one(upsert=True, **updates)
-            )
+        """
+        Upsert ticks with raw pymongo bulk_write.
+        """
+        start = perf_counter()
+
+        documents: List[Dict] = []
+        for tick in datas:
+            d = {
+                "symbol": tick.symbol,
+                "exchange": tick.exchange.value,
+                "datetime": to_db_datetime(tick.datetime),
+            }
+            for name in TICK_FIELDS:
+                d[name] = getattr(tick, name)
+            documents.append(d)
+
+        count = bulk_upsert(
+            DbTickData._get_collection(),
+            ["symbol", "exchange", "datetime"],
+            documents
+        )
+        self.update_write_statistics(count, perf_counter() - start)
 
     def get_newest_bar_data(
         self, symbol: str, exchange: "Exchange", interval: "Interval"
@@ -1,7 +1,11 @@
 """"""
+import io
+import sqlite3
 from datetime import datetime
-from typing import List, Dict, Optional, Sequence, Type
+from time import perf_counter
+from typing import Any, List, Dict, Optional, Sequence, Tuple, Type
 
+import numpy as np
 from peewee import (
     AutoField,
     CharField,
@@ -16,12 +20,30 @@ from peewee import (
     fn
 )
 
+from vnpy.trader.batch import BAR_COLUMNS, TICK_COLUMNS, BarBatch, TickBatch
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData
 from vnpy.trader.utility import get_file_path
 
 from .database import BaseDatabaseManager, Driver, DB_TZ
 
+# Max number of bound parameters in one statement.
+MAX_VARIABLES = {
+    Driver.SQLITE: 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999,
+    Driver.MYSQL: 65535,
+    Driver.POSTGRESQL: 65535,
+}
+
+# Writes to PostgreSQL with more rows are loaded with COPY.
+COPY_THRESHOLD = 100_000
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "cache_size": -64 * 1024,       # 64MB
+    "temp_store": "memory",
+}
+
 
 def init(driver: Driver, settings: dict):
     init_funcs = {
@@ -39,7 +61,7 @@ def init(driver: Driver, settings: dict):
 def init_sqlite(settings: dict):
     database = settings["database"]
     path = str(get_file_path(database))
-    db = SqliteDatabase(path)
+    db = SqliteDatabase(path, pragmas=SQLITE_PRAGMAS)
     return db
 
 
@@ -63,6 +85,131 @@ class ModelBase(Model):
         return self.__data__
 
 
+def get_chunk_size(driver: Driver, field_count: int) -> int:
+    """
+    Get max number of rows in one insert statement.
+    """
+    return max(1, MAX_VARIABLES[driver] // field_count)
+
+
+def quote(db: Database, name: str) -> str:
+    """"""
+    return f"{db.quote[0]}{name}{db.quote[-1]}"
+
+
+def bulk_upsert(
+    db: Database,
+    driver: Driver,
+    model: Type[Model],
+    objs: List[Model],
+    conflict_target: Tuple
+) -> int:
+    """
+    Insert objects, replacing existing rows with same conflict target.
+
+    Statement is generated once and executed with driver level batch
+    functions, with multi-row pages sized to parameter limit of the
+    database. Large writes to PostgreSQL are loaded with COPY into a
+    staging table. Should be called inside transaction.
+
+    Return number of rows written.
+    """
+    fields = [f for f in model._meta.sorted_fields if f is not model._meta.primary_key]
+    names = [f.name for f in fields]
+    rows = [tuple(obj.__data__.get(name, None) for name in names) for obj in objs]
+
+    if not rows:
+        return 0
+
+    table = quote(db, model._meta.table_name)
+    columns = ", ".join(quote(db, f.column_name) for f in fields)
+    placeholders = ", ".join([db.param] * len(fields))
+    chunk_size = get_chunk_size(driver, len(fields))
+    cursor = db.cursor()
+
+    if driver is Driver.POSTGRESQL:
+        # Same row cannot be updated twice in one statement, so keep the
+        # last one for duplicate keys.
+        key_names = [f.name for f in conflict_target]
+        key_indexes = [names.index(name) for name in key_names]
+        unique = {tuple(row[i] for i in key_indexes): row for row in rows}
+        rows = list(unique.values())
+
+        keys = ", ".join(quote(db, f.column_name) for f in conflict_target)
+        updates = ", ".join(
+            f"{quote(db, f.column_name)} = EXCLUDED.{quote(db, f.column_name)}"
+            for f in fields if f.name not in key_names
+        )
+        upsert = f"ON CONFLICT ({keys}) DO UPDATE SET {updates}"
+
+        if len(rows) >= COPY_THRESHOLD:
+            copy_upsert(db, table, columns, rows, upsert)
+        else:
+            from psycopg2.extras import execute_values
+
+            sql = f"INSERT INTO {table} ({columns}) VALUES %s {upsert}"
+            execute_values(cursor, sql, rows, page_size=chunk_size)
+    elif driver is Driver.MYSQL:
+        # pymysql rewrites executemany into multi-row statement.
+        sql = f"REPLACE INTO {table} ({columns}) VALUES ({placeholders})"
+        for c in chunked(rows, chunk_size):
+            cursor.executemany(sql, c)
+    else:
+        sql = f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})"
+        cursor.executemany(sql, rows)
+
+    return len(rows)
+
+
+# Characters escaped with backslash in text format of COPY.
+COPY_ESCAPES = str.maketrans({
+    "\\": "\\\\",
+    "\t": "\\t",
+    "\n": "\\n",
+    "\r": "\\r",
+})
+
+
+def format_copy_row(row: Tuple) -> str:
+    """
+    Format row as one line of COPY text format, with null written as
+    \\N and special characters in values escaped.
+    """
+    values = [
+        "\\N" if v is None else str(v).translate(COPY_ESCAPES)
+        for v in row
+    ]
+    return "\t".join(values) + "\n"
+
+
+def copy_upsert(
+    db: Database,
+    table: str,
+    columns: str,
+    rows: List[Tuple],
+    upsert: str
+) -> None:
+    """
+    Load rows into a temp table with COPY, then merge into target table.
+    """
+    staging = f"{table[:-1]}_staging{table[-1]}"
+
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(format_copy_row(row))
+    buf.seek(0)
+
+    cursor = db.cursor()
+    cursor.execute(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        f"SELECT {columns} FROM {table} WITH NO DATA"
+    )
+    cursor.copy_expert(f"COPY {staging} ({columns}) FROM STDIN", buf)
+    cursor.execute(
+        f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} {upsert}"
+    )
+
+
 def init_models(db: Database, driver: Driver):
     class DbBarData(ModelBase):
         """
@@ -133,27 +280,23 @@ def init_models(db: Database, driver: Driver):
             return bar
 
         @staticmethod
-        def save_all(objs: List["DbBarData"]):
+        def save_all(objs: List["DbBarData"]) -> int:
             """
             save a list of objects, update if exists.
             """
-            dicts = [i.to_dict() for i in objs]
             with db.atomic():
-                if driver is Driver.POSTGRESQL:
-                    for bar in dicts:
-                        DbBarData.insert(bar).on_conflict(
-                            update=bar,
-                            conflict_target=(
-                                DbBarData.symbol,
-                                DbBarData.exchange,
-                                DbBarData.interval,
-                                DbBarData.datetime,
-                            ),
-                        ).execute()
-                else:
-                    for c in chunked(dicts, 50):
-                        DbBarData.insert_many(
-                            c).on_conflict_replace().execute()
+                return bulk_upsert(
+                    db,
+                    driver,
+                    DbBarData,
+                    objs,
+                    (
+                        DbBarData.symbol,
+                        DbBarData.exchange,
+                        DbBarData.interval,
+                        DbBarData.datetime,
+                    )
+                )
 
     class DbTickData(ModelBase):
         """
@@ -314,22 +457,19 @@ def init_models(db: Database, driver: Driver):
             return tick
 
         @staticmethod
-        def save_all(objs: List["DbTickData"]):
-            dicts = [i.to_dict() for i in objs]
+        def save_all(objs: List["DbTickData"]) -> int:
             with db.atomic():
-                if driver is Driver.POSTGRESQL:
-                    for tick in dicts:
-                        DbTickData.insert(tick).on_conflict(
-                            update=tick,
-                            conflict_target=(
-                                DbTickData.symbol,
-                                DbTickData.exchange,
-                                DbTickData.datetime,
-                            ),
-                        ).execute()
-                else:
-                    for c in chunked(dicts, 50):
-                        DbTickData.insert_many(c).on_conflict_replace().execute()
+                return bulk_upsert(
+                    db,
+                    driver,
+                    DbTickData,
+                    objs,
+                    (
+                        DbTickData.symbol,
+                        DbTickData.exchange,
+                        DbTickData.datetime,
+                    )
+                )
 
     db.connect()
     db.create_tables([DbBarData, DbTickData])
@@ -341,6 +481,7 @@ class SqlManager(BaseDatabaseManager):
     def __init__(self, class_bar: Type[Model], class_tick: Type[Model]):
         self.class_bar = class_bar
         self.class_tick = class_tick
+        self.write_statistics: Dict[str, Any] = {}
 
     def load_bar_data(
         self,
@@ -382,13 +523,107 @@ class SqlManager(BaseDatabaseManager):
         data = [db_tick.to_tick() for db_tick in s]
         return data
 
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+    ) -> BarBatch:
+        """
+        Load bar data with raw cursor into numpy array.
+        """
+        bar = self.class_bar
+        s = (
+            bar.select(*self._get_array_fields(bar, BAR_COLUMNS))
+            .where(
+                (bar.symbol == symbol)
+                & (bar.exchange == exchange.value)
+                & (bar.interval == interval.value)
+                & (bar.datetime >= start)
+                & (bar.datetime <= end)
+            )
+            .order_by(bar.datetime)
+        )
+
+        data = self._fetch_array(s, BarBatch.dtype)
+        return BarBatch(symbol, exchange, interval, data, DB_TZ)
+
+    def load_tick_array(
+        self, symbol: str, exchange: Exchange, start: datetime, end: datetime
+    ) -> TickBatch:
+        """
+        Load tick data with raw cursor into numpy array.
+        """
+        tick = self.class_tick
+        where = (
+            (tick.symbol == symbol)
+            & (tick.exchange == exchange.value)
+            & (tick.datetime >= start)
+            & (tick.datetime <= end)
+        )
+        s = (
+            tick.select(*self._get_array_fields(tick, TICK_COLUMNS))
+            .where(where)
+            .order_by(tick.datetime)
+        )
+
+        data = self._fetch_array(s, TickBatch.dtype)
+
+        # Name is same for all ticks of contract, so only queried once.
+        name = ""
+        if len(data):
+            first = tick.select(tick.name).where(where).order_by(tick.datetime).first()
+            name = first.name
+
+        return TickBatch(symbol, exchange, data, DB_TZ, name=name)
+
+    @staticmethod
+    def _get_array_fields(model: Type[Model], columns: List[str]) -> list:
+        """
+        Datetime and float columns, with null replaced by 0.
+        """
+        fields = [model.datetime]
+        for name in columns:
+            field = getattr(model, name)
+            fields.append(fn.COALESCE(field, 0).alias(name))
+        return fields
+
+    @staticmethod
+    def _fetch_array(query, dtype: np.dtype, chunk_size: int = 100_000) -> np.ndarray:
+        """
+        Execute query and convert rows into structured array chunk by
+        chunk, without creating model objects.
+        """
+        sql, params = query.sql()
+        cursor = query.model._meta.database.execute_sql(sql, params)
+
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=dtype))
+        cursor.close()
+
+        if not chunks:
+            return np.empty(0, dtype=dtype)
+        elif len(chunks) == 1:
+            return chunks[0]
+        return np.concatenate(chunks)
+
     def save_bar_data(self, datas: Sequence[BarData]):
+        start = perf_counter()
         ds = [self.class_bar.from_bar(i) for i in datas]
-        self.class_bar.save_all(ds)
+        count = self.class_bar.save_all(ds)
+        self.update_write_statistics(count, perf_counter() - start)
 
     def save_tick_data(self, datas: Sequence[TickData]):
+        start = perf_counter()
         ds = [self.class_tick.from_tick(i) for i in datas]
-        self.class_tick.save_all(ds)
+        count = self.class_tick.save_all(ds)
+        self.update_write_statistics(count, perf_counter() - start)
 
     def get_newest_bar_data(
         self, symbol: str, exchange: "Exchange", interval: "Interval"
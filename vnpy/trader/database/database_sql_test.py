@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+from peewee import SqliteDatabase
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData, TickData
+
+from .database import Driver, DB_TZ
+from .database_sql import SqlManager, init_models, bulk_upsert, format_copy_row
+
+
+START = datetime(2020, 1, 2, 9, 30, tzinfo=DB_TZ)
+
+# Datetime in query is compared with naive value saved in database
+QUERY_START = START.replace(tzinfo=None)
+
+
+def create_manager() -> SqlManager:
+    db = SqliteDatabase(":memory:")
+    bar, tick = init_models(db, Driver.SQLITE)
+    return SqlManager(bar, tick)
+
+
+def create_bars(count: int) -> list:
+    bars = []
+
+    for i in range(count):
+        bar = BarData(
+            symbol="IF2001",
+            exchange=Exchange.CFFEX,
+            datetime=START + timedelta(minutes=i),
+            interval=Interval.MINUTE,
+            volume=100 + i,
+            open_interest=1000 + i,
+            open_price=4000 + i,
+            high_price=4010 + i,
+            low_price=3990 + i,
+            close_price=4005 + i,
+            gateway_name="DB"
+        )
+        bars.append(bar)
+
+    return bars
+
+
+def create_ticks(count: int) -> list:
+    ticks = []
+
+    for i in range(count):
+        tick = TickData(
+            symbol="IF2001",
+            exchange=Exchange.CFFEX,
+            datetime=START + timedelta(seconds=i),
+            name="IF2001 Future",
+            volume=10 + i,
+            open_interest=500,
+            last_price=4000 + i,
+            last_volume=1,
+            limit_up=4400,
+            limit_down=3600,
+            open_price=3990,
+            high_price=4100,
+            low_price=3900,
+            pre_close=3995,
+            gateway_name="DB"
+        )
+
+        for n in range(1, 6):
+            setattr(tick, f"bid_price_{n}", tick.last_price - n)
+            setattr(tick, f"ask_price_{n}", tick.last_price + n)
+            setattr(tick, f"bid_volume_{n}", n * 10)
+            setattr(tick, f"ask_volume_{n}", n * 20)
+
+        ticks.append(tick)
+
+    return ticks
+
+
+def test_bar_array_parity():
+    manager = create_manager()
+    manager.save_bar_data(create_bars(100))
+
+    args = (
+        "IF2001", Exchange.CFFEX, Interval.MINUTE,
+        QUERY_START, QUERY_START + timedelta(minutes=50)
+    )
+    bars = manager.load_bar_data(*args)
+    batch = manager.load_bar_array(*args)
+
+    assert len(bars) == 51
+    assert list(batch) == bars
+
+
+def test_tick_array_parity():
+    manager = create_manager()
+    manager.save_tick_data(create_ticks(100))
+
+    args = (
+        "IF2001", Exchange.CFFEX,
+        QUERY_START + timedelta(seconds=10), QUERY_START + timedelta(seconds=60)
+    )
+    ticks = manager.load_tick_data(*args)
+    batch = manager.load_tick_array(*args)
+
+    assert len(ticks) == 51
+    assert batch.name == "IF2001 Future"
+    assert list(batch) == ticks
+
+    # Empty range
+    args = ("IF2001", Exchange.CFFEX, QUERY_START - timedelta(days=1), QUERY_START - timedelta(hours=1))
+    batch = manager.load_tick_array(*args)
+    assert not len(batch)
+    assert batch.name == ""
+
+
+def test_bulk_upsert_overlapping():
+    manager = create_manager()
+    model = manager.class_tick
+    key = (model.symbol, model.exchange, model.datetime)
+
+    ticks = create_ticks(100)
+    objs = [model.from_tick(tick) for tick in ticks[:60]]
+    assert bulk_upsert(model._meta.database, Driver.SQLITE, model, objs, key) == 60
+
+    # Rows overlapped with first write are replaced
+    for tick in ticks[40:]:
+        tick.name = "Updated"
+        tick.last_price += 1
+
+    objs = [model.from_tick(tick) for tick in ticks[40:]]
+    assert bulk_upsert(model._meta.database, Driver.SQLITE, model, objs, key) == 60
+
+    assert model.select().count() == 100
+
+    result = manager.load_tick_data(
+        "IF2001", Exchange.CFFEX, QUERY_START, QUERY_START + timedelta(days=1)
+    )
+    assert result == ticks
+
+
+def test_format_copy_row():
+    dt = datetime(2020, 1, 2, 9, 30)
+    row = ("IF\t2001", "a\tb\nc\r", dt, 1.5, None)
+
+    assert format_copy_row(row) == "IF\\t2001\ta\\tb\\nc\\r\t2020-01-02 09:30:00\t1.5\t\\N\n"
@@ -8,6 +8,8 @@ def init(settings: dict) -> BaseDatabaseManager:
         return init_mongo(driver=driver, settings=settings)
     elif driver is Driver.INFLUX:
         return init_influx(driver=driver, settings=settings)
+    elif driver is Driver.COLUMNAR:
+        return init_columnar(driver=driver, settings=settings)
     else:
         return init_sql(driver=driver, settings=settings)
 
@@ -30,3 +32,9 @@ def init_influx(driver: Driver, settings: dict):
     from .database_influx import init
     _database_manager = init(driver, settings=settings)
     return _database_manager
+
+
+def init_columnar(driver: Driver, settings: dict):
+    from .database_columnar import init
+    _database_manager = init(driver, settings=settings)
+    return _database_manager
@@ -6,11 +6,13 @@ from logging import Logger
 import smtplib
 import os
 from abc import ABC
+from collections import defaultdict
 from datetime import datetime
 from email.message import EmailMessage
 from queue import Empty, Queue
 from threading import Thread
-from typing import Any, Sequence, Type, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Sequence, Type, Dict, List, Mapping, Optional
 
 from vnpy.event import Event, EventEngine
 from .app import BaseApp
@@ -151,6 +153,12 @@ class MainEngine:
         """
         return list(self.apps.values())
 
+    def get_event_metrics(self) -> Dict[str, Any]:
+        """
+        Get latency and queue metrics of event engine.
+        """
+        return self.event_engine.get_metrics()
+
     def get_all_exchanges(self) -> List[Exchange]:
         """
         Get all exchanges.
@@ -346,6 +354,13 @@ class OmsEngine(BaseEngine):
 
         self.active_orders: Dict[str, OrderData] = {}
 
+        # Secondary indexes updated with order and position events,
+        # inner dict key is vt_orderid or vt_positionid.
+        self.symbol_active_orders: Dict[str, Dict[str, OrderData]] = defaultdict(dict)
+        self.gateway_active_orders: Dict[str, Dict[str, OrderData]] = defaultdict(dict)
+        self.reference_active_orders: Dict[str, Dict[str, OrderData]] = defaultdict(dict)
+        self.symbol_positions: Dict[str, Dict[str, PositionData]] = defaultdict(dict)
+
         self.add_function()
         self.register_event()
 
@@ -364,6 +379,11 @@ class OmsEngine(BaseEngine):
         self.main_engine.get_all_accounts = self.get_all_accounts
         self.main_engine.get_all_contracts = self.get_all_contracts
         self.main_engine.get_all_active_orders = self.get_all_active_orders
+        self.main_engine.get_active_order_count = self.get_active_order_count
+        self.main_engine.get_symbol_active_orders = self.get_symbol_active_orders
+        self.main_engine.get_gateway_active_orders = self.get_gateway_active_orders
+        self.main_engine.get_reference_active_orders = self.get_reference_active_orders
+        self.main_engine.get_symbol_positions = self.get_symbol_positions
 
     def register_event(self) -> None:
         """"""
@@ -382,14 +402,30 @@ class OmsEngine(BaseEngine):
     def process_order_event(self, event: Event) -> None:
         """"""
         order = event.data
-        self.orders[order.vt_orderid] = order
+        vt_orderid = order.vt_orderid
+
+        # Reference is only known when order is created by request,
+        # so keep it for later updates from gateway.
+        old_order = self.orders.get(vt_orderid, None)
+        if old_order and not order.reference:
+            order.reference = old_order.reference
+
+        self.orders[vt_orderid] = order
 
-        # If order is active, then update data in dict.
+        # If order is active, then update data in dicts.
         if order.is_active():
-            self.active_orders[order.vt_orderid] = order
-        # Otherwise, pop inactive order from in dict
-        elif order.vt_orderid in self.active_orders:
-            self.active_orders.pop(order.vt_orderid)
+            self.active_orders[vt_orderid] = order
+            self.symbol_active_orders[order.vt_symbol][vt_orderid] = order
+            self.gateway_active_orders[order.gateway_name][vt_orderid] = order
+            if order.reference:
+                self.reference_active_orders[order.reference][vt_orderid] = order
+        # Otherwise, pop inactive order from in dicts
+        elif vt_orderid in self.active_orders:
+            self.active_orders.pop(vt_orderid)
+            self.symbol_active_orders[order.vt_symbol].pop(vt_orderid, None)
+            self.gateway_active_orders[order.gateway_name].pop(vt_orderid, None)
+            if order.reference:
+                self.reference_active_orders[order.reference].pop(vt_orderid, None)
 
     def process_trade_event(self, event: Event) -> None:
         """"""
@@ -400,6 +436,7 @@ class OmsEngine(BaseEngine):
         """"""
         position = event.data
         self.positions[position.vt_positionid] = position
+        self.symbol_positions[position.vt_symbol][position.vt_positionid] = position
 
     def process_account_event(self, event: Event) -> None:
         """"""
@@ -492,12 +529,44 @@ class OmsEngine(BaseEngine):
         if not vt_symbol:
             return list(self.active_orders.values())
         else:
-            active_orders = [
-                order
-                for order in self.active_orders.values()
-                if order.vt_symbol == vt_symbol
-            ]
-            return active_orders
+            return list(self.symbol_active_orders.get(vt_symbol, {}).values())
+
+    def get_active_order_count(self, vt_symbol: str = "") -> int:
+        """
+        Get number of active orders by vt_symbol.
+
+        If vt_symbol is empty, return number of all active orders.
+        """
+        if not vt_symbol:
+            return len(self.active_orders)
+        else:
+            return len(self.symbol_active_orders.get(vt_symbol, {}))
+
+    def get_symbol_active_orders(self, vt_symbol: str) -> Mapping[str, OrderData]:
+        """
+        Get read-only view of active orders of vt_symbol, key is
+        vt_orderid. View is updated in event thread, so copy it before
+        iterating in other threads.
+        """
+        return MappingProxyType(self.symbol_active_orders[vt_symbol])
+
+    def get_gateway_active_orders(self, gateway_name: str) -> Mapping[str, OrderData]:
+        """
+        Get read-only view of active orders of gateway.
+        """
+        return MappingProxyType(self.gateway_active_orders[gateway_name])
+
+    def get_reference_active_orders(self, reference: str) -> Mapping[str, OrderData]:
+        """
+        Get read-only view of active orders of reference, e.g. strategy name.
+        """
+        return MappingProxyType(self.reference_active_orders[reference])
+
+    def get_symbol_positions(self, vt_symbol: str) -> Mapping[str, PositionData]:
+        """
+        Get read-only view of positions of vt_symbol, key is vt_positionid.
+        """
+        return MappingProxyType(self.symbol_positions[vt_symbol])
 
 
 class EmailEngine(BaseEngine):
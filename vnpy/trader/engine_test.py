@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.constant import Direction, Exchange, Status
+from vnpy.trader.engine import OmsEngine
+from vnpy.trader.event import EVENT_ORDER, EVENT_POSITION
+from vnpy.trader.object import OrderData, OrderRequest, OrderType, PositionData
+
+
+def test_oms_active_order_indexes():
+    main_engine = SimpleNamespace()
+    oms_engine = OmsEngine(main_engine, EventEngine())
+
+    req = OrderRequest(
+        symbol="rb2101",
+        exchange=Exchange.SHFE,
+        direction=Direction.LONG,
+        type=OrderType.LIMIT,
+        volume=1,
+        price=3800,
+        reference="strategy"
+    )
+
+    for i in range(3):
+        order = req.create_order_data(str(i), "CTP")
+        oms_engine.process_order_event(Event(EVENT_ORDER, order))
+
+    view = main_engine.get_reference_active_orders("strategy")
+    assert len(view) == 3
+    assert main_engine.get_active_order_count() == 3
+    assert main_engine.get_active_order_count("rb2101.SHFE") == 3
+    assert len(main_engine.get_gateway_active_orders("CTP")) == 3
+
+    # Order updated by gateway without reference
+    order = OrderData(
+        symbol="rb2101",
+        exchange=Exchange.SHFE,
+        orderid="0",
+        direction=Direction.LONG,
+        price=3800,
+        volume=1,
+        traded=1,
+        status=Status.ALLTRADED,
+        gateway_name="CTP"
+    )
+    oms_engine.process_order_event(Event(EVENT_ORDER, order))
+
+    assert order.reference == "strategy"
+    assert len(view) == 2
+    assert main_engine.get_active_order_count("rb2101.SHFE") == 2
+    assert main_engine.get_active_order_count("IF2101.CFFEX") == 0
+    assert [o.orderid for o in main_engine.get_all_active_orders("rb2101.SHFE")] == ["1", "2"]
+
+    position = PositionData(
+        symbol="rb2101",
+        exchange=Exchange.SHFE,
+        direction=Direction.LONG,
+        volume=1,
+        gateway_name="CTP"
+    )
+    oms_engine.process_position_event(Event(EVENT_POSITION, position))
+    assert list(main_engine.get_symbol_positions("rb2101.SHFE").values()) == [position]
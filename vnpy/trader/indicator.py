@@ -0,0 +1,403 @@
+"""
+Streaming technical indicators updated in O(1) with each new bar.
+
+Values are the same as talib functions calculated over the whole
+series of updated data, e.g. SmaIndicator(n).value equals
+talib.SMA(close, n)[-1]. Value is nan before indicator is inited.
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from math import nan, sqrt
+from typing import Deque, List, Tuple
+
+from .object import BarData
+
+
+def is_zero(value: float) -> bool:
+    """
+    Same as TA_IS_ZERO of talib.
+    """
+    return -0.00000001 < value < 0.00000001
+
+
+class BaseIndicator(ABC):
+    """
+    Indicator which can be added into ArrayManager.
+    """
+
+    def __init__(self):
+        """"""
+        self.count: int = 0
+        self.inited: bool = False
+
+    @abstractmethod
+    def update_bar(self, bar: BarData) -> None:
+        """
+        Update indicator with new bar data.
+        """
+        pass
+
+
+class RollingWindow:
+    """
+    Fixed size window of latest values with running sums.
+
+    Sums are calculated again from the window each time it is fully
+    overwritten, so that floating error does not accumulate.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        self.n: int = n
+        self.values: List[float] = [0.0] * n
+        self.index: int = 0
+        self.count: int = 0
+
+        self.total: float = 0
+        self.total_square: float = 0
+
+    def append(self, value: float) -> None:
+        """"""
+        index = self.index
+
+        if self.count >= self.n:
+            old = self.values[index]
+            self.total -= old
+            self.total_square -= old * old
+
+        self.values[index] = value
+        self.total += value
+        self.total_square += value * value
+
+        self.count += 1
+        self.index = index + 1
+
+        if self.index == self.n:
+            self.index = 0
+            self.total = sum(self.values)
+            self.total_square = sum(v * v for v in self.values)
+
+    @property
+    def full(self) -> bool:
+        """"""
+        return self.count >= self.n
+
+    @property
+    def mean(self) -> float:
+        """"""
+        return self.total / self.n
+
+    @property
+    def std(self) -> float:
+        """
+        Population standard deviation, the same as talib.STDDEV.
+        """
+        mean = self.total / self.n
+        variance = self.total_square / self.n - mean * mean
+
+        if variance > 0 and not is_zero(variance):
+            return sqrt(variance)
+        return 0
+
+
+class SmaIndicator(BaseIndicator):
+    """
+    Simple moving average, talib.SMA.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.window: RollingWindow = RollingWindow(n)
+        self.value: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+        self.window.append(value)
+
+        if self.window.full:
+            self.inited = True
+            self.value = self.window.mean
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.update(bar.close_price)
+
+
+class EmaIndicator(BaseIndicator):
+    """
+    Exponential moving average seeded with SMA, talib.EMA.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.k: float = 2 / (n + 1)
+        self.total: float = 0
+        self.value: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        if self.inited:
+            self.value = (value - self.value) * self.k + self.value
+            return
+
+        self.total += value
+        if self.count == self.n:
+            self.inited = True
+            self.value = self.total / self.n
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.update(bar.close_price)
+
+
+class AtrIndicator(BaseIndicator):
+    """
+    Average true range with Wilder smoothing, talib.ATR.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.pre_close: float = nan
+        self.total: float = 0
+        self.true_range: float = nan
+        self.value: float = nan
+
+    def update(self, high: float, low: float, close: float) -> None:
+        """"""
+        self.count += 1
+
+        pre_close = self.pre_close
+        self.pre_close = close
+
+        # True range is available from second bar
+        if self.count == 1:
+            return
+
+        true_range = high - low
+        true_range = max(true_range, abs(pre_close - high), abs(pre_close - low))
+        self.true_range = true_range
+
+        if self.inited:
+            self.value = (self.value * (self.n - 1) + true_range) / self.n
+            return
+
+        self.total += true_range
+        if self.count == self.n + 1:
+            self.inited = True
+            self.value = self.total / self.n
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.update(bar.high_price, bar.low_price, bar.close_price)
+
+
+class RsiIndicator(BaseIndicator):
+    """
+    Relative strength index with Wilder smoothing, talib.RSI.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.pre_value: float = nan
+        self.gain: float = 0
+        self.loss: float = 0
+        self.value: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+
+        change = value - self.pre_value
+        self.pre_value = value
+
+        if self.count == 1:
+            return
+
+        n = self.n
+
+        if self.inited:
+            self.gain *= n - 1
+            self.loss *= n - 1
+
+        if change < 0:
+            self.loss -= change
+        else:
+            self.gain += change
+
+        if self.inited:
+            self.gain /= n
+            self.loss /= n
+        elif self.count == n + 1:
+            self.inited = True
+            self.gain /= n
+            self.loss /= n
+        else:
+            return
+
+        total = self.gain + self.loss
+        if is_zero(total):
+            self.value = 0
+        else:
+            self.value = 100 * (self.gain / total)
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.update(bar.close_price)
+
+
+class BollIndicator(BaseIndicator):
+    """
+    Bollinger channel of SMA and population standard deviation,
+    the same as ArrayManager.boll.
+    """
+
+    def __init__(self, n: int, dev: float):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.dev: float = dev
+        self.window: RollingWindow = RollingWindow(n)
+
+        self.mid: float = nan
+        self.std: float = nan
+        self.up: float = nan
+        self.down: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+        self.window.append(value)
+
+        if not self.window.full:
+            return
+
+        self.inited = True
+        self.mid = self.window.mean
+        self.std = self.window.std
+        self.up = self.mid + self.std * self.dev
+        self.down = self.mid - self.std * self.dev
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.update(bar.close_price)
+
+
+class DonchianIndicator(BaseIndicator):
+    """
+    Highest high and lowest low of latest n bars, talib.MAX/MIN.
+
+    Monotonic queues are used so that each value is pushed and popped
+    at most once.
+    """
+
+    def __init__(self, n: int):
+        """"""
+        super().__init__()
+
+        self.n: int = n
+        self.highs: Deque[Tuple[int, float]] = deque()
+        self.lows: Deque[Tuple[int, float]] = deque()
+
+        self.up: float = nan
+        self.down: float = nan
+
+    def update(self, high: float, low: float) -> None:
+        """"""
+        count = self.count
+        self.count += 1
+
+        highs = self.highs
+        while highs and highs[-1][1] <= high:
+            highs.pop()
+        highs.append((count, high))
+        if highs[0][0] <= count - self.n:
+            highs.popleft()
+
+        lows = self.lows
+        while lows and lows[-1][1] >= low:
+            lows.pop()
+        lows.append((count, low))
+        if lows[0][0] <= count - self.n:
+            lows.popleft()
+
+        if self.count >= self.n:
+            self.inited = True
+            self.up = highs[0][1]
+            self.down = lows[0][1]
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.update(bar.high_price, bar.low_price)
+
+
+class MacdIndicator(BaseIndicator):
+    """
+    MACD line, signal line and histogram, talib.MACD.
+
+    Same as talib, fast EMA starts on the same bar as slow EMA, seeded
+    with SMA of latest fast_period values.
+    """
+
+    def __init__(self, fast_period: int, slow_period: int, signal_period: int):
+        """"""
+        super().__init__()
+
+        if slow_period < fast_period:
+            fast_period, slow_period = slow_period, fast_period
+
+        self.fast_period: int = fast_period
+        self.slow_period: int = slow_period
+        self.signal_period: int = signal_period
+
+        self.fast_window: RollingWindow = RollingWindow(fast_period)
+        self.fast_k: float = 2 / (fast_period + 1)
+        self.fast_ema: float = nan
+        self.slow_ema: EmaIndicator = EmaIndicator(slow_period)
+        self.signal_ema: EmaIndicator = EmaIndicator(signal_period)
+
+        self.macd: float = nan
+        self.signal: float = nan
+        self.hist: float = nan
+
+    def update(self, value: float) -> None:
+        """"""
+        self.count += 1
+        self.slow_ema.update(value)
+
+        if not self.slow_ema.inited:
+            self.fast_window.append(value)
+            return
+        elif self.count == self.slow_period:
+            self.fast_window.append(value)
+            self.fast_ema = self.fast_window.mean
+        else:
+            self.fast_ema = (value - self.fast_ema) * self.fast_k + self.fast_ema
+
+        self.macd = self.fast_ema - self.slow_ema.value
+        self.signal_ema.update(self.macd)
+
+        if self.signal_ema.inited:
+            self.inited = True
+            self.signal = self.signal_ema.value
+            self.hist = self.macd - self.signal
+
+    def update_bar(self, bar: BarData) -> None:
+        """"""
+        self.update(bar.close_price)
@@ -0,0 +1,132 @@
+from datetime import datetime
+
+import numpy as np
+import talib
+
+from vnpy.trader.constant import Exchange
+from vnpy.trader.indicator import (
+    AtrIndicator,
+    BollIndicator,
+    DonchianIndicator,
+    EmaIndicator,
+    MacdIndicator,
+    RsiIndicator,
+    SmaIndicator,
+)
+from vnpy.trader.object import BarData
+from vnpy.trader.utility import ArrayManager
+
+
+def generate_bars(count: int):
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    high = close + np.abs(rng.normal(0, 0.5, count))
+    low = close - np.abs(rng.normal(0, 0.5, count))
+
+    bars = []
+    for i in range(count):
+        bars.append(BarData(
+            symbol="test",
+            exchange=Exchange.LOCAL,
+            datetime=datetime(2020, 1, 1),
+            open_price=close[i - 1] if i else close[0],
+            high_price=high[i],
+            low_price=low[i],
+            close_price=close[i],
+            volume=i,
+            gateway_name="test"
+        ))
+    return bars, high, low, close
+
+
+def assert_series(values: list, expected: np.ndarray):
+    values = np.array(values)
+    assert np.array_equal(np.isnan(values), np.isnan(expected))
+    assert np.allclose(values, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_indicators_match_talib():
+    bars, high, low, close = generate_bars(2000)
+
+    am = ArrayManager(50)
+    sma = am.add_indicator(SmaIndicator(20))
+    ema = am.add_indicator(EmaIndicator(20))
+    atr = am.add_indicator(AtrIndicator(14))
+    rsi = am.add_indicator(RsiIndicator(14))
+    boll = am.add_indicator(BollIndicator(20, 2))
+    donchian = am.add_indicator(DonchianIndicator(20))
+    macd = am.add_indicator(MacdIndicator(12, 26, 9))
+
+    results = {name: [] for name in [
+        "sma", "ema", "atr", "rsi", "up", "down", "dc_up", "dc_down", "macd", "signal", "hist"
+    ]}
+
+    for bar in bars:
+        am.update_bar(bar)
+        results["sma"].append(sma.value)
+        results["ema"].append(ema.value)
+        results["atr"].append(atr.value)
+        results["rsi"].append(rsi.value)
+        results["up"].append(boll.up)
+        results["down"].append(boll.down)
+        results["dc_up"].append(donchian.up)
+        results["dc_down"].append(donchian.down)
+        results["macd"].append(macd.macd)
+        results["signal"].append(macd.signal)
+        results["hist"].append(macd.hist)
+
+    assert_series(results["sma"], talib.SMA(close, 20))
+    assert_series(results["ema"], talib.EMA(close, 20))
+    assert_series(results["atr"], talib.ATR(high, low, close, 14))
+    assert_series(results["rsi"], talib.RSI(close, 14))
+
+    std = talib.STDDEV(close, 20)
+    assert_series(results["up"], talib.SMA(close, 20) + std * 2)
+    assert_series(results["down"], talib.SMA(close, 20) - std * 2)
+
+    assert_series(results["dc_up"], talib.MAX(high, 20))
+    assert_series(results["dc_down"], talib.MIN(low, 20))
+
+    expected_macd, expected_signal, expected_hist = talib.MACD(close, 12, 26, 9)
+    assert_series(results["signal"], expected_signal)
+    assert_series(results["hist"], expected_hist)
+    assert np.allclose(results["macd"][33:], expected_macd[33:])
+
+
+def test_array_manager_ring_buffer():
+    bars, high, low, close = generate_bars(250)
+
+    am = ArrayManager(100)
+    for i, bar in enumerate(bars, 1):
+        am.update_bar(bar)
+
+        expected = np.zeros(100)
+        n = min(i, 100)
+        expected[-n:] = close[i - n:i]
+
+        assert np.array_equal(am.close, expected)
+        assert am.close.flags["C_CONTIGUOUS"]
+
+    assert am.inited
+    assert np.array_equal(am.high, high[-100:])
+    assert am.sma(10) == talib.SMA(close[-100:], 10)[-1]
+
+
+def test_array_manager_write():
+    bars, high, low, close = generate_bars(10)
+
+    # Latest bar patched with tick price is kept by later updates, also
+    # when buffer is full and values are moved back
+    am = ArrayManager(3)
+    am.update_bar(bars[0])
+
+    for i, bar in enumerate(bars[1:], 1):
+        am.close_array[-1] = -i
+        am.update_bar(bar)
+
+        assert am.close_array[-2] == -i
+        assert am.close_array[-1] == close[i]
+
+    am.close_array = np.array([1, 2, 3])
+    am.update_bar(bars[0])
+    assert np.array_equal(am.close_array, [2, 3, close[0]])
@@ -2,10 +2,11 @@
 Basic data structure used for general trading function in VN Trader.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields, make_dataclass
 from datetime import datetime
 import json
 from logging import INFO
+from typing import Type
 
 from .constant import Direction, Exchange, Interval, Offset, Status, Product, OptionType, OrderType
 
@@ -119,6 +120,7 @@ class OrderData(BaseData):
     traded: float = 0
     status: Status = Status.SUBMITTING
     datetime: datetime = None
+    reference: str = ""
 
     def __post_init__(self):
         """"""
@@ -299,6 +301,7 @@ class OrderRequest:
             offset=self.offset,
             price=self.price,
             volume=self.volume,
+            reference=self.reference,
             gateway_name=gateway_name,
         )
         return order
@@ -343,3 +346,55 @@ class StockListRequest:
 
     def __post_init__(self):
         pass
+
+
+def _vt_symbol(self) -> str:
+    """
+    vt_symbol generated when first accessed.
+    """
+    try:
+        return self._vt_symbol
+    except AttributeError:
+        self._vt_symbol = f"{self.symbol}.{self.exchange.value}"
+        return self._vt_symbol
+
+
+def _make_compact(data_class: Type, name: str, convert_name: str) -> Type:
+    """
+    Create a dataclass with same fields as data_class, but stored in
+    __slots__ without instance __dict__, and vt_symbol calculated
+    lazily instead of in __post_init__.
+    """
+    specs = [
+        (f.name, f.type, field(default=f.default))
+        for f in fields(data_class)
+    ]
+    cls = make_dataclass(name, specs)
+
+    # Dataclass stores default values as class attributes, which must be
+    # removed before the same names can be used as slots.
+    names = tuple(f.name for f in fields(cls))
+    namespace = {
+        k: v for k, v in cls.__dict__.items()
+        if k not in names and k not in ("__dict__", "__weakref__")
+    }
+
+    def convert(self) -> data_class:
+        return data_class(**{n: getattr(self, n) for n in names})
+
+    convert.__doc__ = f"Convert into {data_class.__name__} object."
+
+    namespace["__slots__"] = names + ("_vt_symbol",)
+    namespace["__module__"] = __name__
+    namespace["__doc__"] = (
+        f"Same as {data_class.__name__}, but uses __slots__ for less memory "
+        "and faster creation."
+    )
+    namespace["vt_symbol"] = property(_vt_symbol)
+    namespace[convert_name] = convert
+
+    return type(name, (), namespace)
+
+
+CompactTickData = _make_compact(TickData, "CompactTickData", "to_tick")
+CompactBarData = _make_compact(BarData, "CompactBarData", "to_bar")
@@ -0,0 +1,224 @@
+"""
+Level 2 order book maintained from snapshot and incremental updates.
+
+Price levels of each side are kept in a sorted list, so that updates
+find level with binary search, and top levels are read without sorting.
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+from zlib import crc32
+
+from .object import TickData
+
+
+Number = Union[str, float, int]
+
+BID_PRICE_NAMES = [f"bid_price_{i}" for i in range(1, 6)]
+BID_VOLUME_NAMES = [f"bid_volume_{i}" for i in range(1, 6)]
+ASK_PRICE_NAMES = [f"ask_price_{i}" for i in range(1, 6)]
+ASK_VOLUME_NAMES = [f"ask_volume_{i}" for i in range(1, 6)]
+
+
+class BookSide:
+    """
+    Price levels of bid or ask side, sorted from best to worst.
+    """
+
+    def __init__(self, descending: bool):
+        """
+        Bid side is descending, and stored with negative price as key.
+        """
+        self.descending: bool = descending
+
+        self.keys: List[float] = []
+        self.volumes: Dict[float, float] = {}
+        self.texts: Dict[float, Tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        """"""
+        return len(self.keys)
+
+    def clear(self) -> None:
+        """"""
+        self.keys.clear()
+        self.volumes.clear()
+        self.texts.clear()
+
+    def update(self, price: float, volume: float) -> int:
+        """
+        Set volume of price level, and remove the level if volume is 0.
+
+        Return index of level counted from best price, or -1 if nothing
+        is changed.
+        """
+        volumes = self.volumes
+        old_volume = volumes.get(price, 0)
+
+        if volume == old_volume:
+            return -1
+
+        key = -price if self.descending else price
+        keys = self.keys
+        index = bisect_left(keys, key)
+
+        if not volume:
+            del keys[index]
+            del volumes[price]
+            self.texts.pop(price, None)
+        else:
+            if not old_volume:
+                keys.insert(index, key)
+            volumes[price] = volume
+
+        return index
+
+    def get_price(self, index: int) -> float:
+        """"""
+        key = self.keys[index]
+        return -key if self.descending else key
+
+    def get_levels(self, n: int) -> List[Tuple[float, float]]:
+        """
+        Get price and volume of top n levels.
+        """
+        volumes = self.volumes
+
+        if self.descending:
+            return [(-key, volumes[-key]) for key in self.keys[:n]]
+        else:
+            return [(key, volumes[key]) for key in self.keys[:n]]
+
+
+class OrderBook:
+    """
+    Order book of one symbol.
+
+    * Use on_snapshot and update_bid/update_ask to maintain price levels.
+    * Use update_tick to fill top levels into tick, which returns False if
+      no level within depth is changed since last call.
+    * Set keep_text to keep price and volume strings received, which
+      are needed for checksum.
+    """
+
+    def __init__(self, depth: int = 5, keep_text: bool = False):
+        """"""
+        self.depth: int = depth
+        self.keep_text: bool = keep_text
+
+        self.bids: BookSide = BookSide(True)
+        self.asks: BookSide = BookSide(False)
+
+        self.changed: bool = False
+
+    def clear(self) -> None:
+        """"""
+        self.bids.clear()
+        self.asks.clear()
+        self.changed = True
+
+    def on_snapshot(
+        self,
+        bids: Iterable[Sequence[Number]],
+        asks: Iterable[Sequence[Number]]
+    ) -> None:
+        """
+        Replace all levels with snapshot of (price, volume) items.
+        """
+        self.clear()
+
+        for price, volume, *_ in bids:
+            self.update_bid(price, volume)
+
+        for price, volume, *_ in asks:
+            self.update_ask(price, volume)
+
+    def update_bid(self, price: Number, volume: Number) -> None:
+        """
+        Update bid level, volume of 0 means deleting the level.
+        """
+        self._update(self.bids, price, volume)
+
+    def update_ask(self, price: Number, volume: Number) -> None:
+        """
+        Update ask level, volume of 0 means deleting the level.
+        """
+        self._update(self.asks, price, volume)
+
+    def _update(self, side: BookSide, price: Number, volume: Number) -> None:
+        """"""
+        price_value = float(price)
+        volume_value = float(volume)
+
+        index = side.update(price_value, volume_value)
+        if 0 <= index < self.depth:
+            self.changed = True
+
+        if self.keep_text and volume_value:
+            side.texts[price_value] = (str(price), str(volume))
+
+    def get_bids(self, n: int = 0) -> List[Tuple[float, float]]:
+        """
+        Get top n bid levels, depth levels by default.
+        """
+        return self.bids.get_levels(n or self.depth)
+
+    def get_asks(self, n: int = 0) -> List[Tuple[float, float]]:
+        """
+        Get top n ask levels, depth levels by default.
+        """
+        return self.asks.get_levels(n or self.depth)
+
+    def update_tick(self, tick: TickData) -> bool:
+        """
+        Fill top 5 levels into tick, missing levels are filled with 0.
+        Return False without changing tick if top levels not changed.
+        """
+        if not self.changed:
+            return False
+        self.changed = False
+
+        n = min(self.depth, 5)
+
+        for names, side in [
+            ((BID_PRICE_NAMES, BID_VOLUME_NAMES), self.bids),
+            ((ASK_PRICE_NAMES, ASK_VOLUME_NAMES), self.asks)
+        ]:
+            price_names, volume_names = names
+            levels = side.get_levels(n)
+
+            for i in range(n):
+                if i < len(levels):
+                    price, volume = levels[i]
+                else:
+                    price, volume = 0, 0
+
+                setattr(tick, price_names[i], price)
+                setattr(tick, volume_names[i], volume)
+
+        return True
+
+    def get_checksum(self, n: int = 25) -> int:
+        """
+        CRC32 (signed 32 bit int) of top n levels, in format of
+        "bid_price:bid_volume:ask_price:ask_volume:..." with original
+        strings received, which is used by OKEx and others.
+        """
+        bids = self.bids
+        asks = self.asks
+        items = []
+
+        for i in range(n):
+            if i < len(bids):
+                items.extend(bids.texts[bids.get_price(i)])
+            if i < len(asks):
+                items.extend(asks.texts[asks.get_price(i)])
+
+        checksum = crc32(":".join(items).encode())
+        if checksum >= 2 ** 31:
+            checksum -= 2 ** 32
+        return checksum
+
+    def validate_checksum(self, checksum: int, n: int = 25) -> bool:
+        """"""
+        return self.get_checksum(n) == checksum
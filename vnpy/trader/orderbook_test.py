@@ -0,0 +1,83 @@
+from datetime import datetime
+from zlib import crc32
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange
+from vnpy.trader.object import TickData
+from vnpy.trader.orderbook import OrderBook
+
+
+def create_tick() -> TickData:
+    return TickData(
+        symbol="BTC-USD",
+        exchange=Exchange.COINBASE,
+        datetime=datetime(2020, 1, 1),
+        gateway_name="test"
+    )
+
+
+def test_order_book_matches_sorted_dict():
+    rng = np.random.default_rng(5)
+
+    book = OrderBook(5)
+    bids = {}
+    asks = {}
+    tick = create_tick()
+
+    for _ in range(20000):
+        price = float(rng.integers(9000, 9100)) / 10
+        volume = float(rng.integers(0, 3))
+
+        if price < 905:
+            book.update_bid(str(price), str(volume))
+            levels = bids
+        else:
+            book.update_ask(price, volume)
+            levels = asks
+
+        old_tick = (tick.bid_price_1, tick.bid_volume_5, tick.ask_price_1, tick.ask_volume_5)
+        previous = (book.get_bids(), book.get_asks())
+
+        if volume:
+            levels[price] = volume
+        else:
+            levels.pop(price, None)
+
+        expected_bids = [(p, bids[p]) for p in sorted(bids, reverse=True)[:5]]
+        expected_asks = [(p, asks[p]) for p in sorted(asks)[:5]]
+
+        assert book.get_bids() == expected_bids
+        assert book.get_asks() == expected_asks
+
+        changed = book.update_tick(tick)
+        if not changed:
+            assert previous == (expected_bids, expected_asks)
+            assert old_tick == (tick.bid_price_1, tick.bid_volume_5, tick.ask_price_1, tick.ask_volume_5)
+        elif len(expected_bids) == 5:
+            assert tick.bid_price_5 == expected_bids[4][0]
+            assert tick.bid_volume_5 == expected_bids[4][1]
+
+
+def test_order_book_snapshot_and_checksum():
+    book = OrderBook(5, keep_text=True)
+    book.on_snapshot(
+        [["3366.1", "7.0", "1"], ["3366", "6", "3"]],
+        [["3366.8", "9", "10"], ["3368", "8", "3"]]
+    )
+    book.update_ask("3368", "0")
+
+    expected = crc32("3366.1:7.0:3366.8:9:3366:6".encode())
+    expected -= 2 ** 32 if expected >= 2 ** 31 else 0
+
+    assert book.validate_checksum(expected)
+
+    tick = create_tick()
+    assert book.update_tick(tick)
+    assert tick.ask_price_1 == 3366.8
+    assert tick.ask_price_2 == 0
+    assert not book.update_tick(tick)
+
+    book.on_snapshot([], [])
+    assert book.update_tick(tick)
+    assert tick.bid_price_1 == 0
@@ -48,7 +48,18 @@ SETTINGS: Dict[str, Any] = {
 
     "log_debug": True,
     "log_debug_exclude_events": "eTimer,eAccount.*,eContract.", # split by comma, e.g. "eAccount.,eTick."
-    "websocket_interval_ms": 200,
+    "log_debug_console": True,
+    "log_debug_buffer_size": 100000,            # events dropped when buffer is full
+    "log_debug_batch_size": 500,
+
+    "event_metrics": False,                     # record event engine latency
+    "event_metrics_interval": 10,               # seconds between eMetrics events
+    "websocket_interval_ms": 0,                 # min interval of conflated websocket data
+
+    "recorder.batch_size": 1000,                # max data of one symbol in a batch
+    "recorder.flush_interval": 1,               # seconds between flushing all batches
+    "recorder.max_backlog": 100000,             # spill into local file above this queue size
+    "recorder.retry_interval": 10,              # seconds before retrying failed database
     
     "kafka_broker_host_port": "localhost:19092",
 }
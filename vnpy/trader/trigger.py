@@ -0,0 +1,162 @@
+"""
+Price indexed book of stop orders waiting to be triggered.
+
+Stop orders of each symbol are kept in two sorted lists: buy stops by
+price ascending and sell stops by price descending. Orders triggered by
+a price are then always a prefix of the list, so that checking a tick
+only touches orders which are triggered.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Tuple
+
+from .constant import Direction
+
+
+INFINITY = float("inf")
+
+
+class SymbolTriggers:
+    """
+    Buy and sell stops of one symbol.
+    """
+
+    def __init__(self):
+        """
+        Keys are (price, seq) for buy stops and (-price, seq) for sell
+        stops, seq is used to keep order of adding.
+        """
+        self.buy_keys: List[Tuple[float, int]] = []
+        self.sell_keys: List[Tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        """"""
+        return len(self.buy_keys) + len(self.sell_keys)
+
+
+class TriggerBook:
+    """
+    Stop orders of all symbols, identified by orderid.
+
+    * Buy stop is triggered when price rises to or above stop price.
+    * Sell stop is triggered when price falls to or below stop price.
+    """
+
+    def __init__(self):
+        """"""
+        self.symbols: Dict[str, SymbolTriggers] = {}
+
+        # orderid: (vt_symbol, key, is buy, data)
+        self.entries: Dict[str, Tuple[str, Tuple[float, int], bool, Any]] = {}
+        self.datas: Dict[int, Any] = {}
+        self.seq: int = 0
+
+    def __len__(self) -> int:
+        """"""
+        return len(self.entries)
+
+    def __contains__(self, orderid: str) -> bool:
+        """"""
+        return orderid in self.entries
+
+    def add(
+        self,
+        vt_symbol: str,
+        orderid: str,
+        direction: Direction,
+        price: float,
+        data: Any
+    ) -> None:
+        """
+        Add stop order, data is returned when triggered.
+        """
+        if orderid in self.entries:
+            self.remove(orderid)
+
+        self.seq += 1
+
+        triggers = self.symbols.get(vt_symbol, None)
+        if not triggers:
+            triggers = SymbolTriggers()
+            self.symbols[vt_symbol] = triggers
+
+        is_buy = direction == Direction.LONG
+        if is_buy:
+            key = (price, self.seq)
+            keys = triggers.buy_keys
+        else:
+            key = (-price, self.seq)
+            keys = triggers.sell_keys
+
+        keys.insert(bisect_left(keys, key), key)
+
+        self.entries[orderid] = (vt_symbol, key, is_buy, data)
+        self.datas[self.seq] = data
+
+    def remove(self, orderid: str) -> Any:
+        """
+        Remove stop order and return its data, None if not found.
+        """
+        entry = self.entries.pop(orderid, None)
+        if not entry:
+            return None
+
+        vt_symbol, key, is_buy, data = entry
+        triggers = self.symbols[vt_symbol]
+
+        if is_buy:
+            keys = triggers.buy_keys
+        else:
+            keys = triggers.sell_keys
+
+        del keys[bisect_left(keys, key)]
+        self.datas.pop(key[1])
+
+        if not triggers:
+            self.symbols.pop(vt_symbol)
+
+        return data
+
+    def get(self, orderid: str) -> Any:
+        """"""
+        entry = self.entries.get(orderid, None)
+        if entry:
+            return entry[3]
+        return None
+
+    def get_triggered(
+        self,
+        vt_symbol: str,
+        buy_price: float,
+        sell_price: float
+    ) -> List[Any]:
+        """
+        Get data of buy stops triggered by buy_price and sell stops
+        triggered by sell_price, in order of adding. Orders are not
+        removed.
+        """
+        triggers = self.symbols.get(vt_symbol, None)
+        if not triggers:
+            return []
+
+        buy_keys = triggers.buy_keys
+        sell_keys = triggers.sell_keys
+
+        buy_count = bisect_right(buy_keys, (buy_price, INFINITY)) if buy_keys else 0
+        sell_count = bisect_right(sell_keys, (-sell_price, INFINITY)) if sell_keys else 0
+
+        if not buy_count and not sell_count:
+            return []
+
+        seqs = [key[1] for key in buy_keys[:buy_count]]
+        seqs.extend(key[1] for key in sell_keys[:sell_count])
+        seqs.sort()
+
+        datas = self.datas
+        return [datas[seq] for seq in seqs]
+
+    def clear(self) -> None:
+        """"""
+        self.symbols.clear()
+        self.entries.clear()
+        self.datas.clear()
@@ -0,0 +1,44 @@
+import numpy as np
+
+from vnpy.trader.constant import Direction
+from vnpy.trader.trigger import TriggerBook
+
+
+def test_trigger_book_matches_scan():
+    rng = np.random.default_rng(7)
+
+    book = TriggerBook()
+    orders = {}
+
+    for i in range(5000):
+        orderid = str(i)
+        vt_symbol = ["a.LOCAL", "b.LOCAL"][int(rng.integers(0, 2))]
+        direction = [Direction.LONG, Direction.SHORT][int(rng.integers(0, 2))]
+        price = float(rng.integers(90, 110))
+
+        book.add(vt_symbol, orderid, direction, price, orderid)
+        orders[orderid] = (vt_symbol, direction, price)
+
+        if rng.random() < 0.3:
+            removed = str(int(rng.integers(0, i + 1)))
+            assert book.remove(removed) == (removed if orders.pop(removed, None) else None)
+
+        last_price = float(rng.integers(85, 115))
+        bid_price = last_price - 1
+
+        expected = [
+            orderid for orderid, (symbol, direction, price) in orders.items()
+            if symbol == "a.LOCAL" and (
+                (direction == Direction.LONG and last_price >= price)
+                or (direction == Direction.SHORT and bid_price <= price)
+            )
+        ]
+        triggered = book.get_triggered("a.LOCAL", last_price, bid_price)
+        assert triggered == sorted(expected, key=int)
+
+        for orderid in triggered:
+            book.remove(orderid)
+            orders.pop(orderid)
+
+    assert len(book) == len(orders)
+    assert book.get_triggered("c.LOCAL", 100, 100) == []
@@ -6,7 +6,7 @@ import json
 import logging
 import sys
 from pathlib import Path
-from typing import Callable, Dict, Tuple, Union, Optional
+from typing import Any, Callable, Dict, Tuple, Union, Optional
 from decimal import Decimal
 from math import floor, ceil
 
@@ -324,6 +324,16 @@ class ArrayManager(object):
     For:
     1. time series container of bar data
     2. calculating technical indicator value
+
+    Data is stored in buffers of double size, the latest size values are
+    always a contiguous view ending at index. New value is appended after
+    the view, and only when buffer is full the view is moved back to the
+    start, so arrays are shifted once every size updates instead of every
+    update. Each value is stored only once, so writing into the arrays
+    (e.g. am.close_array[-1] = tick.last_price) is kept by later updates.
+
+    Streaming indicators added by add_indicator are updated with every
+    new bar in O(1), instead of calculating talib over whole arrays.
     """
 
     def __init__(self, size: int = 100):
@@ -332,12 +342,11 @@ class ArrayManager(object):
         self.size: int = size
         self.inited: bool = False
 
-        self.open_array: np.ndarray = np.zeros(size)
-        self.high_array: np.ndarray = np.zeros(size)
-        self.low_array: np.ndarray = np.zeros(size)
-        self.close_array: np.ndarray = np.zeros(size)
-        self.volume_array: np.ndarray = np.zeros(size)
-        self.open_interest_array: np.ndarray = np.zeros(size)
+        # Rows: open, high, low, close, volume, open_interest
+        self.buffer: np.ndarray = np.zeros((6, size * 2))
+        self.index: int = size
+
+        self.indicators: list = []
 
     def update_bar(self, bar: BarData) -> None:
         """
@@ -347,19 +356,108 @@ class ArrayManager(object):
         if not self.inited and self.count >= self.size:
             self.inited = True
 
-        self.open_array[:-1] = self.open_array[1:]
-        self.high_array[:-1] = self.high_array[1:]
-        self.low_array[:-1] = self.low_array[1:]
-        self.close_array[:-1] = self.close_array[1:]
-        self.volume_array[:-1] = self.volume_array[1:]
-        self.open_interest_array[:-1] = self.open_interest_array[1:]
-
-        self.open_array[-1] = bar.open_price
-        self.high_array[-1] = bar.high_price
-        self.low_array[-1] = bar.low_price
-        self.close_array[-1] = bar.close_price
-        self.volume_array[-1] = bar.volume
-        self.open_interest_array[-1] = bar.open_interest
+        values = (
+            bar.open_price,
+            bar.high_price,
+            bar.low_price,
+            bar.close_price,
+            bar.volume,
+            bar.open_interest
+        )
+
+        # Move latest values back to the start when buffer is full
+        index = self.index
+        if index == self.size * 2:
+            index = self.size - 1
+            self.buffer[:, :index] = self.buffer[:, self.size + 1:]
+
+        self.buffer[:, index] = values
+        self.index = index + 1
+
+        for indicator in self.indicators:
+            indicator.update_bar(bar)
+
+    def add_indicator(self, indicator: Any) -> Any:
+        """
+        Add a streaming indicator from vnpy.trader.indicator, which is
+        updated with every new bar. Return the indicator for reading
+        its value later.
+        """
+        self.indicators.append(indicator)
+        return indicator
+
+    def get_array(self, row: int) -> np.ndarray:
+        """
+        Get contiguous view of latest values, should not be kept
+        across updates.
+        """
+        return self.buffer[row, self.index - self.size:self.index]
+
+    def set_array(self, row: int, values: np.ndarray) -> None:
+        """
+        Overwrite latest values with array of the same size.
+        """
+        self.get_array(row)[:] = values
+
+    @property
+    def open_array(self) -> np.ndarray:
+        """"""
+        return self.get_array(0)
+
+    @open_array.setter
+    def open_array(self, values: np.ndarray) -> None:
+        """"""
+        self.set_array(0, values)
+
+    @property
+    def high_array(self) -> np.ndarray:
+        """"""
+        return self.get_array(1)
+
+    @high_array.setter
+    def high_array(self, values: np.ndarray) -> None:
+        """"""
+        self.set_array(1, values)
+
+    @property
+    def low_array(self) -> np.ndarray:
+        """"""
+        return self.get_array(2)
+
+    @low_array.setter
+    def low_array(self, values: np.ndarray) -> None:
+        """"""
+        self.set_array(2, values)
+
+    @property
+    def close_array(self) -> np.ndarray:
+        """"""
+        return self.get_array(3)
+
+    @close_array.setter
+    def close_array(self, values: np.ndarray) -> None:
+        """"""
+        self.set_array(3, values)
+
+    @property
+    def volume_array(self) -> np.ndarray:
+        """"""
+        return self.get_array(4)
+
+    @volume_array.setter
+    def volume_array(self, values: np.ndarray) -> None:
+        """"""
+        self.set_array(4, values)
+
+    @property
+    def open_interest_array(self) -> np.ndarray:
+        """"""
+        return self.get_array(5)
+
+    @open_interest_array.setter
+    def open_interest_array(self, values: np.ndarray) -> None:
+        """"""
+        self.set_array(5, values)
 
     @property
     def open(self) -> np.ndarray: